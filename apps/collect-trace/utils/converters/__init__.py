@@ -4,6 +4,7 @@
 from .convert_non_oai_to_chatml import (
     convert_to_json_chatml,
     extract_and_save_chat_history,
+    extract_chat_history,
 )
 from .convert_oai_to_chatml import (
     extract_message_history_from_log,
@@ -13,8 +14,9 @@ from .convert_oai_to_chatml import (
 )
 from .convert_to_chatml_auto_batch import (
     batch_process_files,
+    convert_file,
+    convert_log_data,
     determine_conversion_method,
-    get_llm_provider,
     process_single_file,
 )
 
@@ -27,9 +29,11 @@ __all__ = [
     # Non-OAI conversion functions
     "convert_to_json_chatml",
     "extract_and_save_chat_history",
+    "extract_chat_history",
     # Auto batch conversion functions
-    "get_llm_provider",
     "determine_conversion_method",
     "process_single_file",
     "batch_process_files",
+    "convert_log_data",
+    "convert_file",
 ]
@@ -0,0 +1,173 @@
+# Copyright (c) 2025 MiroMind
+# This source code is licensed under the MIT License.
+
+"""
+Throughput benchmark for ChatML trace conversion.
+
+Generates a synthetic corpus of task logs (mixed OAI / non-OAI providers, main
+agent plus browsing sub-agent sessions) and compares the legacy
+one-subprocess-per-file conversion against the in-process pool.
+
+Usage:
+  python benchmark_conversion.py --files 2000 --legacy-sample 100
+"""
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from convert_to_chatml_auto_batch import (
+    batch_process_files,
+    determine_conversion_method,
+)
+
+PROVIDERS = ["openai", "anthropic", "qwen"]
+
+
+def make_synthetic_log(index: int, turns: int, rng: random.Random) -> dict:
+    """Build a task log shaped like TaskLog output"""
+    provider = PROVIDERS[index % len(PROVIDERS)]
+    oai = determine_conversion_method(provider) == "oai"
+
+    def text(n):
+        return " ".join(
+            rng.choice(["alpha", "beta", "gamma", "delta"]) for _ in range(n)
+        )
+
+    def history(turn_count):
+        system = "You are an agent.\n\n# General Objective\nSolve the task."
+        messages = [{"role": "system", "content": [{"type": "text", "text": system}]}]
+        for turn in range(turn_count):
+            messages.append(
+                {"role": "user", "content": [{"type": "text", "text": text(150)}]}
+            )
+            assistant = {
+                "role": "assistant",
+                "content": [{"type": "text", "text": text(60)}],
+            }
+            if oai and turn < turn_count - 1:
+                assistant["tool_calls"] = [
+                    {
+                        "id": f"call_{turn}",
+                        "type": "function",
+                        "function": {
+                            "name": "tool-google-search-google_search",
+                            "arguments": json.dumps({"q": text(5)}),
+                        },
+                    }
+                ]
+            messages.append(assistant)
+        return {"system_prompt": system, "message_history": messages}
+
+    tool_definitions = [
+        {
+            "name": "tool-google-search",
+            "tools": [{"name": "google_search", "description": "Search", "schema": {}}],
+        }
+    ]
+    return {
+        "status": "success",
+        "task_id": f"task_{index}",
+        "env_info": {"llm_provider": provider},
+        "main_agent_message_history": history(turns),
+        "sub_agent_message_history_sessions": {
+            "agent-browsing_1": history(max(2, turns // 2))
+        },
+        "step_logs": [
+            {
+                "step_name": "get_main_tool_definitions",
+                "message": repr(tool_definitions),
+            },
+            {
+                "step_name": "get_sub_agent-browsing_tool_definitions",
+                "message": repr(tool_definitions),
+            },
+        ],
+    }
+
+
+def generate_corpus(directory: Path, files: int, turns: int) -> int:
+    rng = random.Random(0)
+    total_bytes = 0
+    for index in range(files):
+        path = directory / f"task_{index}.json"
+        path.write_text(json.dumps(make_synthetic_log(index, turns, rng)))
+        total_bytes += path.stat().st_size
+    return total_bytes
+
+
+def run_legacy(json_files, output_dir: Path) -> float:
+    """One interpreter per file, as the auto batch converter used to do"""
+    converters_dir = Path(__file__).parent
+    start = time.perf_counter()
+    for json_file in json_files:
+        with open(json_file, "r", encoding="utf-8") as f:
+            provider = json.load(f).get("env_info", {}).get("llm_provider", "")
+        script = (
+            "convert_oai_to_chatml.py"
+            if determine_conversion_method(provider) == "oai"
+            else "convert_non_oai_to_chatml.py"
+        )
+        subprocess.run(
+            [sys.executable, str(converters_dir / script), json_file, str(output_dir)],
+            capture_output=True,
+            text=True,
+        )
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=2000, help="Synthetic logs")
+    parser.add_argument("--turns", type=int, default=40, help="Main agent turns")
+    parser.add_argument(
+        "--legacy-sample",
+        type=int,
+        default=100,
+        help="Files converted with the legacy subprocess path (0 to skip)",
+    )
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        corpus = tmp_path / "logs"
+        corpus.mkdir()
+        total_bytes = generate_corpus(corpus, args.files, args.turns)
+        json_files = sorted(str(p) for p in corpus.glob("*.json"))
+        print(f"Corpus: {args.files} logs, {total_bytes / 1e6:.1f} MB")
+
+        if args.legacy_sample:
+            sample = json_files[: args.legacy_sample]
+            seconds = run_legacy(sample, tmp_path / "legacy")
+            rate = len(sample) / seconds
+            print(
+                f"legacy subprocess:    {rate:8.1f} files/s "
+                f"({len(sample)} files in {seconds:.1f}s)"
+            )
+
+        for label, workers, jsonl in (
+            ("in-process, 1 worker", 1, False),
+            ("pool, JSON files", args.workers, False),
+            ("pool, JSONL shards", args.workers, True),
+        ):
+            stats = batch_process_files(
+                [str(corpus)],
+                str(tmp_path / label.replace(" ", "_").replace(",", "")),
+                workers=workers,
+                jsonl=jsonl,
+            )
+            print(
+                f"{label:<21} {stats['files_per_second']:8.1f} files/s, "
+                f"{stats['mb_per_second']:6.1f} MB/s "
+                f"({stats['workers']} workers, {stats['failed']} failed)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -37,19 +37,17 @@ def convert_to_json_chatml(messages: List[Dict[str, Any]]) -> List[Dict[str, str
     return chatml_list
 
 
-def extract_and_save_chat_history(
-    log_data: Dict[str, Any], output_dir: Path, input_filename: str
-):
+def extract_chat_history(log_data: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Extract message history from log data and save as ChatML format
+    Extract message history from log data in ChatML format
 
     Args:
         log_data: Log data dictionary
-        output_dir: Output directory
-        input_filename: Input filename (without extension)
+
+    Returns:
+        Dictionary containing main_agent and sub_agents message history
     """
-    # Ensure output directory exists
-    output_dir.mkdir(parents=True, exist_ok=True)
+    result = {"main_agent": [], "sub_agents": {}}
 
     # 1. Extract main_agent_message_history
     main_agent_history = log_data.get("main_agent_message_history", {})
@@ -64,12 +62,7 @@ def extract_and_save_chat_history(
                     "content": main_agent_history.get("system_prompt", ""),
                 },
             )
-            # Save main agent chat records
-            main_output_file = output_dir / f"{input_filename}_main_agent_chatml.json"
-            with open(main_output_file, "w", encoding="utf-8") as f:
-                json.dump(chatml_list, f, ensure_ascii=False, indent=2)
-
-            print(f"✓ Saved main agent chat records: {main_output_file}")
+            result["main_agent"] = chatml_list
 
     # 2. Extract sub_agent_message_history_sessions
     sub_agent_sessions = log_data.get("sub_agent_message_history_sessions", {})
@@ -86,15 +79,44 @@ def extract_and_save_chat_history(
                             "content": session_data.get("system_prompt", ""),
                         },
                     )
+                    result["sub_agents"][session_name] = chatml_list
 
-                    # Save browser agent chat records
-                    sub_agent_output_file = (
-                        output_dir / f"{input_filename}_{session_name}_chatml.json"
-                    )
-                    with open(sub_agent_output_file, "w", encoding="utf-8") as f:
-                        json.dump(chatml_list, f, ensure_ascii=False, indent=2)
+    return result
+
+
+def extract_and_save_chat_history(
+    log_data: Dict[str, Any], output_dir: Path, input_filename: str
+):
+    """
+    Extract message history from log data and save as ChatML format
+
+    Args:
+        log_data: Log data dictionary
+        output_dir: Output directory
+        input_filename: Input filename (without extension)
+    """
+    # Ensure output directory exists
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    chat_history = extract_chat_history(log_data)
+
+    # Save main agent chat records
+    if chat_history["main_agent"]:
+        main_output_file = output_dir / f"{input_filename}_main_agent_chatml.json"
+        with open(main_output_file, "w", encoding="utf-8") as f:
+            json.dump(chat_history["main_agent"], f, ensure_ascii=False, indent=2)
+
+        print(f"✓ Saved main agent chat records: {main_output_file}")
+
+    # Save sub agent chat records
+    for session_name, chatml_list in chat_history["sub_agents"].items():
+        sub_agent_output_file = (
+            output_dir / f"{input_filename}_{session_name}_chatml.json"
+        )
+        with open(sub_agent_output_file, "w", encoding="utf-8") as f:
+            json.dump(chatml_list, f, ensure_ascii=False, indent=2)
 
-                    print(f"✓ Saved sub agent chat records: {sub_agent_output_file}")
+        print(f"✓ Saved sub agent chat records: {sub_agent_output_file}")
 
 
 def main():
@@ -1,36 +1,44 @@
 # Copyright (c) 2025 MiroMind
 # This source code is licensed under the MIT License.
 
+"""
+Convert agent task logs to ChatML training data.
+
+Each log is parsed once, in-process; its llm_provider selects the OAI or
+non-OAI converter. Batches run on a multiprocessing pool fed in chunks, and
+the output is either one JSON file per conversation (the classic layout) or
+streaming JSONL files sharded by agent type.
+
+Library API:
+- convert_log_data: Convert an already parsed log dictionary
+- convert_file: Parse and convert one log file
+- batch_process_files: Convert many files in parallel
+"""
+
+import argparse
 import json
-import subprocess
+import os
 import sys
+import time
+from datetime import datetime
+from multiprocessing import Pool
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, List, Optional, TextIO, Tuple
 
+try:
+    from . import convert_oai_to_chatml as oai_converter
+    from .convert_non_oai_to_chatml import extract_chat_history
+except ImportError:  # Run as a script from this directory
+    import convert_oai_to_chatml as oai_converter
+    from convert_non_oai_to_chatml import extract_chat_history
 
-def get_llm_provider(json_file_path: str) -> str:
-    """
-    Extract llm_provider from JSON file
-
-    Args:
-        json_file_path: Path to JSON file
+# Files handed to a worker per task; amortizes IPC for small traces
+DEFAULT_CHUNK_SIZE = 8
 
-    Returns:
-        llm_provider value or 'unknown' if not found
-    """
-    try:
-        with open(json_file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+# Print a progress line every this many files
+PROGRESS_INTERVAL = 1000
 
-        # Extract llm_provider from env_info
-        provider = data.get("env_info", {}).get("llm_provider")
-        if provider:
-            return provider
-        else:
-            return "unknown"
-    except Exception as e:
-        print(f"Error reading JSON file {json_file_path}: {e}")
-        return "error"
+OAI_PROVIDERS = ["openai", "claude_newapi", "deepseek_newapi"]
 
 
 def determine_conversion_method(provider: str) -> str:
@@ -43,35 +51,85 @@ def determine_conversion_method(provider: str) -> str:
     Returns:
         'oai' for OpenAI, 'non-oai' for others
     """
-    if provider.lower() in ["openai", "claude_newapi", "deepseek_newapi"]:
+    if provider.lower() in OAI_PROVIDERS:
         return "oai"
     else:
         return "non-oai"
 
 
-def get_script_paths() -> tuple:
+def convert_log_data(
+    log_data: Dict[str, Any], creation_time_str: Optional[str] = None
+) -> Tuple[str, Dict[str, Any]]:
     """
-    Get paths to conversion scripts
+    Convert a parsed log to ChatML, choosing the converter by llm_provider
+
+    Args:
+        log_data: Log data dictionary
+        creation_time_str: Date (YYYY-MM-DD) stamped into OAI system prompts
 
     Returns:
-        Tuple of (oai_script_path, non_oai_script_path)
+        Tuple of (conversion_method, chatml_data) where chatml_data holds
+        "main_agent" messages and a "sub_agents" dict of session messages
     """
-    # Get directory of current script
-    current_dir = Path(__file__).parent
+    provider = log_data.get("env_info", {}).get("llm_provider") or "unknown"
+    conversion_method = determine_conversion_method(provider)
+
+    if conversion_method == "oai":
+        if creation_time_str:
+            oai_converter.creation_time_str = creation_time_str
+        return conversion_method, oai_converter.extract_message_history_from_log(
+            log_data
+        )
+    return conversion_method, extract_chat_history(log_data)
 
-    oai_script = current_dir / "convert_oai_to_chatml.py"
-    non_oai_script = current_dir / "convert_non_oai_to_chatml.py"
 
-    # Check if scripts exist
-    if not oai_script.exists():
-        raise FileNotFoundError(f"OAI conversion script not found: {oai_script}")
+def convert_file(json_file_path: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Parse a log file once and convert it to ChatML
+
+    Args:
+        json_file_path: Path to JSON file
+
+    Returns:
+        Tuple of (conversion_method, chatml_data), see convert_log_data
+    """
+    with open(json_file_path, "r", encoding="utf-8") as f:
+        log_data = json.load(f)
+    creation_time = datetime.fromtimestamp(os.stat(json_file_path).st_ctime)
+    return convert_log_data(log_data, creation_time.strftime("%Y-%m-%d"))
+
+
+def get_agent_type(session_name: str) -> str:
+    """Agent type of a sub-agent session (e.g. 'agent-browsing_1' -> 'agent-browsing')"""
+    return session_name.split("_")[0]
 
-    if not non_oai_script.exists():
-        raise FileNotFoundError(
-            f"Non-OAI conversion script not found: {non_oai_script}"
-        )
 
-    return str(oai_script), str(non_oai_script)
+def iter_conversations(chatml_data: Dict[str, Any]):
+    """Yield (agent_type, session_name, messages) for every non-empty conversation"""
+    if chatml_data["main_agent"]:
+        yield "main_agent", "main_agent", chatml_data["main_agent"]
+    for session_name, messages in chatml_data["sub_agents"].items():
+        if messages:
+            yield get_agent_type(session_name), session_name, messages
+
+
+def write_chatml_files(
+    chatml_data: Dict[str, Any], output_dir: Path, input_filename: str
+) -> int:
+    """
+    Save each conversation as {input_filename}_{session}_chatml.json
+
+    Returns:
+        Number of files written
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written = 0
+    for _, session_name, messages in iter_conversations(chatml_data):
+        output_file = output_dir / f"{input_filename}_{session_name}_chatml.json"
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(messages, f, ensure_ascii=False, indent=2)
+        written += 1
+    return written
 
 
 def process_single_file(json_file_path: str, output_dir: str) -> bool:
@@ -86,44 +144,73 @@ def process_single_file(json_file_path: str, output_dir: str) -> bool:
         True if successful, False otherwise
     """
     try:
-        # Get llm_provider
-        provider = get_llm_provider(json_file_path)
-
-        if provider == "error":
-            print(f"❌ Failed to read provider from: {json_file_path}")
-            return False
+        conversion_method, chatml_data = convert_file(json_file_path)
+        print(f"🔧 Using {conversion_method.upper()} conversion for: {json_file_path}")
+        write_chatml_files(chatml_data, Path(output_dir), Path(json_file_path).stem)
+        print(f"✅ Successfully processed: {json_file_path}")
+        return True
+    except Exception as e:
+        print(f"❌ Error processing {json_file_path}: {e}")
+        return False
 
-        # Determine conversion method
-        conversion_method = determine_conversion_method(provider)
 
-        # Get script paths
-        oai_script, non_oai_script = get_script_paths()
+def _convert_worker(args: Tuple[str, Optional[str]]) -> Dict[str, Any]:
+    """
+    Convert one file in a pool worker.
 
-        # Choose script based on conversion method
-        if conversion_method == "oai":
-            script_path = oai_script
-            print(f"🔧 Using OAI conversion for provider: {provider}")
+    With an output directory the worker writes the per-conversation JSON
+    files itself; otherwise it returns serialized JSONL lines per agent type
+    for the parent to append to its shards.
+    """
+    json_file_path, output_dir = args
+    outcome = {"path": json_file_path, "ok": False, "error": None, "files": 0}
+    try:
+        outcome["bytes"] = os.path.getsize(json_file_path)
+        conversion_method, chatml_data = convert_file(json_file_path)
+        outcome["method"] = conversion_method
+        input_filename = Path(json_file_path).stem
+        if output_dir is not None:
+            outcome["files"] = write_chatml_files(
+                chatml_data, Path(output_dir), input_filename
+            )
         else:
-            script_path = non_oai_script
-            print(f"🔧 Using Non-OAI conversion for provider: {provider}")
-
-        # Run conversion script
-        result = subprocess.run(
-            [sys.executable, script_path, json_file_path, output_dir],
-            capture_output=True,
-            text=True,
-        )
+            lines: Dict[str, List[str]] = {}
+            for agent_type, session_name, messages in iter_conversations(chatml_data):
+                record = {
+                    "messages": messages,
+                    "source": f"{input_filename}:{session_name}",
+                }
+                lines.setdefault(agent_type, []).append(
+                    json.dumps(record, ensure_ascii=False)
+                )
+            outcome["lines"] = lines
+        outcome["ok"] = True
+    except Exception as e:
+        outcome["error"] = str(e)
+    return outcome
 
-        if result.returncode == 0:
-            print(f"✅ Successfully processed: {json_file_path}")
-            return True
-        else:
-            print(f"❌ Failed to process {json_file_path}: {result.stderr}")
-            return False
 
-    except Exception as e:
-        print(f"❌ Error processing {json_file_path}: {e}")
-        return False
+class ShardedJsonlWriter:
+    """Append JSONL records to one file per agent type ({agent_type}.jsonl)"""
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = output_dir
+        self.files: Dict[str, TextIO] = {}
+        self.counts: Dict[str, int] = {}
+
+    def write(self, agent_type: str, lines: List[str]):
+        f = self.files.get(agent_type)
+        if f is None:
+            path = self.output_dir / f"{agent_type}.jsonl"
+            f = self.files[agent_type] = open(path, "w", encoding="utf-8")
+            self.counts[agent_type] = 0
+        for line in lines:
+            f.write(line + "\n")
+        self.counts[agent_type] += len(lines)
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
 
 
 def find_json_files(input_paths: List[str]) -> List[str]:
@@ -161,16 +248,26 @@ def find_json_files(input_paths: List[str]) -> List[str]:
     return json_files
 
 
-def batch_process_files(input_paths: List[str], output_dir: str) -> Dict[str, int]:
+def batch_process_files(
+    input_paths: List[str],
+    output_dir: str,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    jsonl: bool = False,
+) -> Dict[str, Any]:
     """
     Batch process multiple files
 
     Args:
         input_paths: List of input paths
         output_dir: Output directory
+        workers: Worker processes (default: CPU count; 1 converts in-process)
+        chunk_size: Files handed to a worker at a time
+        jsonl: Write {agent_type}.jsonl shards instead of one JSON file per
+            conversation
 
     Returns:
-        Dictionary with processing statistics
+        Dictionary with processing statistics and throughput
     """
     # Find JSON files
     json_files = find_json_files(input_paths)
@@ -179,102 +276,156 @@ def batch_process_files(input_paths: List[str], output_dir: str) -> Dict[str, in
         print("❌ No JSON files found in the specified paths")
         return {"total": 0, "success": 0, "failed": 0}
 
-    print(f"📁 Found {len(json_files)} JSON files to process")
+    workers = max(1, min(workers or os.cpu_count() or 1, len(json_files)))
+    print(f"📁 Found {len(json_files)} JSON files to process ({workers} workers)")
 
     # Create output directory
-    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
 
     # Process files
     success_count = 0
     failed_count = 0
+    total_bytes = 0
+    files_written = 0
+    methods: Dict[str, int] = {}
+    writer = ShardedJsonlWriter(output_path) if jsonl else None
+    work = [(path, None if jsonl else output_dir) for path in json_files]
+
+    start_time = time.perf_counter()
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        outcomes = (
+            pool.imap_unordered(_convert_worker, work, chunksize=chunk_size)
+            if pool
+            else map(_convert_worker, work)
+        )
+        for done, outcome in enumerate(outcomes, 1):
+            total_bytes += outcome.get("bytes", 0)
+            if outcome["ok"]:
+                success_count += 1
+                files_written += outcome["files"]
+                methods[outcome["method"]] = methods.get(outcome["method"], 0) + 1
+                if writer:
+                    for agent_type, lines in outcome["lines"].items():
+                        writer.write(agent_type, lines)
+            else:
+                failed_count += 1
+                print(f"❌ Failed to process {outcome['path']}: {outcome['error']}")
+            if done % PROGRESS_INTERVAL == 0:
+                print(f"  Processed {done}/{len(json_files)} files")
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+        if writer:
+            writer.close()
+    elapsed = time.perf_counter() - start_time
+
+    stats = {
+        "total": len(json_files),
+        "success": success_count,
+        "failed": failed_count,
+        "methods": methods,
+        "workers": workers,
+        "seconds": elapsed,
+        "files_per_second": len(json_files) / elapsed if elapsed > 0 else 0.0,
+        "mb_per_second": total_bytes / 1e6 / elapsed if elapsed > 0 else 0.0,
+    }
+    if writer:
+        stats["jsonl_records"] = dict(writer.counts)
+    else:
+        stats["files_written"] = files_written
+    return stats
 
-    for json_file in json_files:
-        if process_single_file(json_file, output_dir):
-            success_count += 1
-        else:
-            failed_count += 1
-
-    return {"total": len(json_files), "success": success_count, "failed": failed_count}
-
-
-def show_help():
-    """Show help information"""
-    help_text = """
-Auto ChatML Conversion Script
-============================
-
-Automatically determines conversion method based on llm_provider field in JSON files
-
-Usage:
-  python convert_to_chatml_auto_batch.py <input_paths...> [output_dir]
-  python convert_to_chatml_auto_batch.py <log_dir> [output_dir]
-  python convert_to_chatml_auto_batch.py <log_file_pattern> [output_dir]
-
-Parameters:
-  input_paths: JSON files, directories, or patterns
-  output_dir: Output directory (optional, default: extracted_chatml)
 
+HELP_EPILOG = """
 Examples:
   python convert_to_chatml_auto_batch.py logs/debug_logs/
   python convert_to_chatml_auto_batch.py logs/debug_logs/*.json
   python convert_to_chatml_auto_batch.py logs/debug_logs/ ./my_output
+  python convert_to_chatml_auto_batch.py logs/debug_logs/ -o ./my_output --jsonl
   python convert_to_chatml_auto_batch.py task_1.json task_2.json
 
 Conversion Logic:
-  - If llm_provider = 'openai': Use convert_oai_to_chatml.py
-  - If llm_provider = anything else: Use convert_non_oai_to_chatml.py
-
-Features:
-  1. Auto-detect conversion method per file
-  2. Batch process log files
-  3. Extract main_agent_message_history
-  4. Extract browser_agent_message_history_sessions
-  5. Convert to OpenAI ChatML format
-  6. Save as separate files
-  7. Generate processing summary
+  - If llm_provider is an OpenAI-compatible provider: OAI conversion
+  - If llm_provider = anything else: Non-OAI conversion
+
+Output:
+  - Default: {log_name}_{session}_chatml.json per conversation
+  - --jsonl: main_agent.jsonl, agent-browsing.jsonl, ... (one record per line)
 """
-    print(help_text)
 
 
-def main():
-    """Main function"""
-    # Check for help
-    if len(sys.argv) < 2 or sys.argv[1] in ["-h", "--help"]:
-        show_help()
-        return
-
-    # Parse arguments
-    args = sys.argv[1:]
-
-    # Check if last argument is output directory
-    if len(args) > 1 and not args[-1].startswith("-"):
-        # Check if last argument looks like a directory
-        last_arg = args[-1]
-        if (
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Automatically convert agent logs to ChatML, choosing the "
+        "conversion method from the llm_provider field of each log",
+        epilog=HELP_EPILOG,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("paths", nargs="+", help="JSON files, directories, or patterns")
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        help="Output directory (default: extracted_chatml, or a trailing "
+        "directory-like positional argument)",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Files handed to a worker at a time",
+    )
+    parser.add_argument(
+        "--jsonl",
+        action="store_true",
+        help="Write JSONL shards per agent type instead of per-conversation JSON files",
+    )
+    args = parser.parse_args(argv)
+
+    if args.output_dir is None:
+        # Legacy form: the last positional argument may be the output directory
+        last_arg = args.paths[-1]
+        if len(args.paths) > 1 and (
             last_arg.endswith("/")
             or not Path(last_arg).suffix
             or last_arg == "extracted_chatml"
             or last_arg.startswith("./")
         ):
-            output_dir = last_arg
-            input_paths = args[:-1]
+            args.output_dir = last_arg
+            args.paths = args.paths[:-1]
         else:
-            output_dir = "extracted_chatml"
-            input_paths = args
-    else:
-        output_dir = "extracted_chatml"
-        input_paths = args
+            args.output_dir = "extracted_chatml"
+    return args
+
+
+def main():
+    """Main function"""
+    args = parse_args(sys.argv[1:])
+    input_paths = args.paths
+    output_dir = args.output_dir
 
     print("🚀 Starting auto ChatML conversion")
     print(f"📂 Input paths: {input_paths}")
     print(f"📁 Output directory: {output_dir}")
 
     try:
-        # Check if conversion scripts exist
-        get_script_paths()
-
         # Process files
-        stats = batch_process_files(input_paths, output_dir)
+        stats = batch_process_files(
+            input_paths,
+            output_dir,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            jsonl=args.jsonl,
+        )
 
         # Show results
         print("\n" + "=" * 50)
@@ -283,6 +434,17 @@ def main():
         print(f"Total files: {stats['total']}")
         print(f"Successfully processed: {stats['success']}")
         print(f"Failed: {stats['failed']}")
+        if stats["total"]:
+            print(f"Conversion methods: {stats['methods']}")
+            if "jsonl_records" in stats:
+                print(f"JSONL records: {stats['jsonl_records']}")
+            else:
+                print(f"ChatML files written: {stats['files_written']}")
+            print(
+                f"Throughput: {stats['files_per_second']:.1f} files/s, "
+                f"{stats['mb_per_second']:.1f} MB/s "
+                f"({stats['seconds']:.1f}s, {stats['workers']} workers)"
+            )
         print(f"Output directory: {Path(output_dir).absolute()}")
 
         if stats["failed"] > 0:
@@ -291,9 +453,6 @@ def main():
         else:
             print("\n✅ All files processed successfully!")
 
-    except FileNotFoundError as e:
-        print(f"❌ {e}")
-        sys.exit(1)
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
         sys.exit(1)
@@ -3,8 +3,20 @@
 
 import argparse
 import glob
+import hashlib
+import io
 import json
 import os
+import random
+import shutil
+import tempfile
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Number of temporary buckets used for the bounded-memory shuffle; peak memory
+# is roughly one bucket, i.e. dataset size / SHUFFLE_BUCKETS
+DEFAULT_SHUFFLE_BUCKETS = 64
+
+ZSTD_LEVEL = 10
 
 
 def merge_json_files(input_dir, type="main"):
@@ -39,6 +51,211 @@ def merge_json_files(input_dir, type="main"):
     print(f"Total number of messages: {len(all_conversations)}")
 
 
+def iter_conversations(input_dir: str, type: str) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (source, serialized conversation) pairs in a deterministic order.
+
+    Reads per-conversation ChatML files (*{type}*.json) and JSONL shards from
+    the converter's --jsonl mode (*{type}*.jsonl), skipping merged outputs.
+    """
+    patterns = (f"*{type}*.json", f"*{type}*.jsonl")
+    files = sorted(
+        path
+        for pattern in patterns
+        for path in glob.glob(os.path.join(input_dir, pattern))
+        if "_merged" not in os.path.basename(path)
+    )
+
+    for path in files:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                if path.endswith(".jsonl"):
+                    for line_number, line in enumerate(f, 1):
+                        if not line.strip():
+                            continue
+                        record = json.loads(line)
+                        conversation = {"messages": record["messages"]}
+                        yield (
+                            f"{path}:{line_number}",
+                            json.dumps(conversation, ensure_ascii=False),
+                        )
+                else:
+                    conversation = {"messages": json.load(f)}
+                    yield path, json.dumps(conversation, ensure_ascii=False)
+        except Exception as e:
+            print(f"Error processing {path}: {str(e)}")
+
+
+def content_hash(serialized: str) -> bytes:
+    """Digest of a serialized conversation, used for deduplication"""
+    return hashlib.blake2b(serialized.encode("utf-8"), digest_size=16).digest()
+
+
+class JsonlShardWriter:
+    """
+    Write JSONL lines to {prefix}.jsonl, or to numbered shards of at most
+    shard_bytes (uncompressed) each, optionally zstd-compressed.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        compress: bool = False,
+        shard_bytes: Optional[int] = None,
+    ):
+        if compress:
+            try:
+                import zstandard
+            except ImportError:
+                raise ImportError(
+                    "zstd output requires the 'zstandard' package "
+                    "(uv pip install zstandard)"
+                )
+            self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        self.prefix = prefix
+        self.compress = compress
+        self.shard_bytes = shard_bytes
+        self.paths: List[str] = []
+        self.lines = 0
+        self._file = None
+        self._raw = None
+        self._written = 0
+
+    def _open_next(self):
+        self.close()
+        suffix = ".jsonl.zst" if self.compress else ".jsonl"
+        if self.shard_bytes:
+            path = f"{self.prefix}-{len(self.paths):05d}{suffix}"
+        else:
+            path = f"{self.prefix}{suffix}"
+        self._raw = open(path, "wb")
+        stream = (
+            self._compressor.stream_writer(self._raw) if self.compress else self._raw
+        )
+        self._file = io.TextIOWrapper(stream, encoding="utf-8")
+        self.paths.append(path)
+        self._written = 0
+
+    def write(self, line: str):
+        size = len(line.encode("utf-8")) + 1
+        if (
+            self._file is None
+            or self.shard_bytes
+            and self._written
+            and self._written + size > self.shard_bytes
+        ):
+            self._open_next()
+        self._file.write(line + "\n")
+        self._written += size
+        self.lines += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()  # Also flushes the zstd frame and the raw file
+            self._file = None
+            self._raw = None
+
+
+def merge_json_files_streaming(
+    input_dir: str,
+    type: str = "main",
+    output_dir: Optional[str] = None,
+    compress: bool = False,
+    shard_size_mb: Optional[float] = None,
+    dedup: bool = True,
+    shuffle_seed: Optional[int] = None,
+    shuffle_buckets: int = DEFAULT_SHUFFLE_BUCKETS,
+) -> Dict[str, object]:
+    """
+    Merge ChatML conversations into JSONL without holding the dataset in memory.
+
+    Args:
+        input_dir: Directory with the converted ChatML files
+        type: Agent type substring selecting the input files
+        output_dir: Where to write {type}_merged*.jsonl (default: input_dir)
+        compress: Write zstd-compressed .jsonl.zst files
+        shard_size_mb: Start a new shard after this many (uncompressed) MB
+        dedup: Drop conversations whose content hash was already seen
+        shuffle_seed: Shuffle deterministically with this seed; None keeps the
+            (sorted) input order
+        shuffle_buckets: Temporary buckets for the shuffle; memory use is
+            about one bucket
+
+    Returns:
+        Statistics: conversations read, written, duplicates and output paths
+    """
+    output_dir = output_dir or input_dir
+    os.makedirs(output_dir, exist_ok=True)
+    writer = JsonlShardWriter(
+        os.path.join(output_dir, f"{type}_merged"),
+        compress=compress,
+        shard_bytes=int(shard_size_mb * 1024 * 1024) if shard_size_mb else None,
+    )
+
+    seen = set()
+    read = duplicates = 0
+    bucket_dir = None
+    buckets = []
+    try:
+        if shuffle_seed is not None:
+            bucket_dir = tempfile.mkdtemp(prefix=f"{type}_shuffle_", dir=output_dir)
+            buckets = [
+                open(os.path.join(bucket_dir, f"{i:04d}.jsonl"), "w", encoding="utf-8")
+                for i in range(shuffle_buckets)
+            ]
+
+        for _, serialized in iter_conversations(input_dir, type):
+            read += 1
+            digest = content_hash(serialized)
+            if dedup:
+                if digest in seen:
+                    duplicates += 1
+                    continue
+                seen.add(digest)
+
+            if buckets:
+                # Bucket by seeded hash so the assignment is itself shuffled
+                key = hashlib.blake2b(
+                    digest, key=str(shuffle_seed).encode("utf-8"), digest_size=8
+                ).digest()
+                buckets[int.from_bytes(key, "big") % len(buckets)].write(
+                    serialized + "\n"
+                )
+            else:
+                writer.write(serialized)
+
+        if buckets:
+            for index, bucket in enumerate(buckets):
+                bucket.close()
+                with open(bucket.name, "r", encoding="utf-8") as f:
+                    lines = f.read().splitlines()
+                random.Random(f"{shuffle_seed}:{index}").shuffle(lines)
+                for line in lines:
+                    writer.write(line)
+                os.remove(bucket.name)
+    finally:
+        writer.close()
+        for bucket in buckets:
+            bucket.close()
+        if bucket_dir:
+            shutil.rmtree(bucket_dir, ignore_errors=True)
+
+    print(
+        f"\nMerging complete! {writer.lines} {type} conversations written to "
+        f"{len(writer.paths)} file(s): {', '.join(writer.paths)}"
+    )
+    print(f"Total number of conversations read: {read}")
+    if dedup:
+        print(f"Duplicates dropped: {duplicates}")
+
+    return {
+        "read": read,
+        "written": writer.lines,
+        "duplicates": duplicates,
+        "paths": writer.paths,
+    }
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Merge multiple JSON files which contain chat messages into a single file"
@@ -49,11 +266,57 @@ def main():
         required=True,
         help="File pattern with wildcards to match JSON files (e.g., '*.json' or 'data/*main*.json')",
     )
+    parser.add_argument(
+        "--jsonl",
+        action="store_true",
+        help="Stream to JSONL ({type}_merged.jsonl) with bounded memory instead of one JSON array",
+    )
+    parser.add_argument(
+        "--output_dir", type=str, default=None, help="JSONL output directory"
+    )
+    parser.add_argument(
+        "--zstd", action="store_true", help="Compress JSONL output with zstd"
+    )
+    parser.add_argument(
+        "--shard_size_mb",
+        type=float,
+        default=None,
+        help="Split JSONL output into shards of about this many MB",
+    )
+    parser.add_argument(
+        "--no_dedup",
+        action="store_true",
+        help="Keep conversations with identical content",
+    )
+    parser.add_argument(
+        "--shuffle_seed",
+        type=int,
+        default=None,
+        help="Deterministically shuffle JSONL output with this seed",
+    )
+    parser.add_argument(
+        "--shuffle_buckets",
+        type=int,
+        default=DEFAULT_SHUFFLE_BUCKETS,
+        help="Temporary buckets for the shuffle (more buckets, less memory)",
+    )
 
     args = parser.parse_args()
 
-    merge_json_files(args.input_dir, type="main_agent")
-    merge_json_files(args.input_dir, type="agent-browsing")
+    for type in ("main_agent", "agent-browsing"):
+        if args.jsonl:
+            merge_json_files_streaming(
+                args.input_dir,
+                type=type,
+                output_dir=args.output_dir,
+                compress=args.zstd,
+                shard_size_mb=args.shard_size_mb,
+                dedup=not args.no_dedup,
+                shuffle_seed=args.shuffle_seed,
+                shuffle_buckets=args.shuffle_buckets,
+            )
+        else:
+            merge_json_files(args.input_dir, type=type)
 
 
 if __name__ == "__main__":
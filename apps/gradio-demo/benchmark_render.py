@@ -0,0 +1,220 @@
+"""
+Replay benchmark for rendering the Gradio research stream.
+
+Replays a recorded event stream (or a synthetic 300-event one) through three
+strategies and reports render time, UI updates and bytes sent:
+- full: update the state and re-render everything on every event (old path)
+- incremental: IncrementalRenderer, one render per event
+- batched: IncrementalRenderer with updates throttled to RENDER_INTERVAL_SECONDS
+
+Recorded streams are JSONL files with one stream message per line, optionally
+wrapped as {"t": <seconds since start>, "message": {...}}.
+
+Usage:
+  uv run python benchmark_render.py
+  uv run python benchmark_render.py --events recorded_stream.jsonl
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import List, Tuple
+
+from main import (
+    RENDER_INTERVAL_SECONDS,
+    IncrementalRenderer,
+    _init_render_state,
+    _render_markdown,
+    _update_state_with_event,
+)
+
+# Seconds between streamed text deltas and for a tool round trip
+DELTA_SECONDS = 0.02
+TOOL_SECONDS = 1.5
+
+
+def synthetic_stream(events: int = 300, seed: int = 0) -> List[Tuple[float, dict]]:
+    """A research session: streamed thinking, searches, scrapes, code, summary"""
+    rng = random.Random(seed)
+    stream = []
+    now = 0.0
+
+    def emit(message, delay):
+        nonlocal now
+        now += delay
+        stream.append((now, message))
+
+    def words(n):
+        return " ".join(
+            rng.choice(["alpha", "beta", "gamma", "delta"]) for _ in range(n)
+        )
+
+    emit(
+        {"event": "start_of_agent", "data": {"agent_id": "a0", "agent_name": "main"}}, 0
+    )
+    turn = 0
+    while len(stream) < events - 40:
+        turn += 1
+        message_id = f"m{turn}"
+        for _ in range(rng.randint(10, 30)):
+            emit(
+                {
+                    "event": "message",
+                    "data": {
+                        "message_id": message_id,
+                        "delta": {"content": words(3) + " "},
+                    },
+                },
+                DELTA_SECONDS,
+            )
+        call_id = f"c{turn}"
+        tool_name = rng.choice(["google_search", "scrape", "python", "wiki"])
+        tool_input = {
+            "google_search": {"q": words(4)},
+            "scrape": {"url": f"https://example.com/{turn}"},
+            "python": {"code": "print(sum(range(10)))"},
+            "wiki": {"title": words(2), "lang": "en"},
+        }[tool_name]
+        emit(
+            {
+                "event": "tool_call",
+                "data": {
+                    "tool_call_id": call_id,
+                    "tool_name": tool_name,
+                    "tool_input": tool_input,
+                },
+            },
+            DELTA_SECONDS,
+        )
+        if tool_name == "google_search":
+            organic = [
+                {"title": words(6), "link": f"https://example.com/{turn}/{i}"}
+                for i in range(10)
+            ]
+            result = json.dumps({"organic": organic})
+        else:
+            result = words(40)
+        emit(
+            {
+                "event": "tool_call",
+                "data": {
+                    "tool_call_id": call_id,
+                    "tool_name": tool_name,
+                    "tool_input": {"result": result},
+                },
+            },
+            TOOL_SECONDS,
+        )
+    emit({"event": "end_of_agent", "data": {"agent_id": "a0"}}, DELTA_SECONDS)
+    emit(
+        {
+            "event": "start_of_agent",
+            "data": {"agent_id": "a1", "agent_name": "Final Summary"},
+        },
+        DELTA_SECONDS,
+    )
+    while len(stream) < events:
+        emit(
+            {
+                "event": "tool_call",
+                "data": {
+                    "tool_call_id": "summary",
+                    "tool_name": "show_text",
+                    "delta_input": {"text": words(5) + " "},
+                },
+            },
+            DELTA_SECONDS,
+        )
+    return stream
+
+
+def load_stream(path: str) -> List[Tuple[float, dict]]:
+    stream = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "message" in record:
+                stream.append(
+                    (
+                        float(record.get("t", len(stream) * DELTA_SECONDS)),
+                        record["message"],
+                    )
+                )
+            else:
+                stream.append((len(stream) * DELTA_SECONDS, record))
+    return stream
+
+
+def replay_full(stream):
+    state = _init_render_state()
+    updates = sent = 0
+    markdown = ""
+    start = time.perf_counter()
+    for _, message in stream:
+        if message.get("event") == "heartbeat":
+            continue
+        state = _update_state_with_event(state, message)
+        markdown = _render_markdown(state)
+        updates += 1
+        sent += len(markdown.encode("utf-8"))
+    return time.perf_counter() - start, updates, sent, markdown
+
+
+def replay_incremental(stream, interval: float = 0.0):
+    """Replay with IncrementalRenderer; interval > 0 throttles like _batch_events"""
+    renderer = IncrementalRenderer()
+    updates = sent = 0
+    markdown = ""
+    last_flush = -interval
+    start = time.perf_counter()
+    for index, (t, message) in enumerate(stream):
+        renderer.apply(message)
+        is_last = index == len(stream) - 1
+        if not renderer.changed or (t - last_flush < interval and not is_last):
+            continue
+        markdown = renderer.render()
+        last_flush = t
+        updates += 1
+        sent += len(markdown.encode("utf-8"))
+    return time.perf_counter() - start, updates, sent, markdown
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", help="Recorded stream (JSONL) to replay")
+    parser.add_argument("--synthetic-events", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=5, help="Best of N replays")
+    args = parser.parse_args()
+
+    stream = (
+        load_stream(args.events)
+        if args.events
+        else synthetic_stream(args.synthetic_events)
+    )
+    print(f"Replaying {len(stream)} events ({stream[-1][0]:.1f}s of stream time)")
+
+    results = {}
+    for label, replay in (
+        ("full", replay_full),
+        ("incremental", replay_incremental),
+        ("batched", lambda s: replay_incremental(s, RENDER_INTERVAL_SECONDS)),
+    ):
+        runs = [replay(stream) for _ in range(args.repeat)]
+        seconds = min(run[0] for run in runs)
+        _, updates, sent, markdown = runs[0]
+        results[label] = markdown
+        print(
+            f"{label:<12} {seconds * 1000:8.1f} ms render, "
+            f"{updates:4d} UI updates, {sent / 1e6:7.2f} MB sent"
+        )
+
+    if len(set(results.values())) != 1:
+        raise SystemExit("Final markdown differs between strategies")
+    print("Final markdown identical across strategies")
+
+
+if __name__ == "__main__":
+    main()
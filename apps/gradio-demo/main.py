@@ -5,17 +5,23 @@ import os
 import threading
 import time
 import uuid
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import AsyncGenerator, List, Optional
+from typing import AsyncGenerator, Callable, List, Optional, Tuple
 
 import gradio as gr
+import uvicorn
 from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import PlainTextResponse
 from hydra import compose, initialize_config_dir
 from omegaconf import DictConfig
 from prompt_patch import apply_prompt_patch
 from src.config.settings import expose_sub_agents_as_tools
 from src.core.pipeline import create_pipeline_components, execute_task_pipeline
+from src.core.stream_handler import DEFAULT_PAYLOAD_PAGE_CHARS, StreamChannel
+from src.logging.metrics import ACTIVE_TASKS, QUEUED_TASKS, REGISTRY, TASKS
 from utils import replace_chinese_punctuation
 
 # Apply custom system prompt patch (adds MiroThinker identity)
@@ -168,37 +174,6 @@ def _ensure_preloaded():
         logger.info("Pipeline components loaded successfully.")
 
 
-class ThreadSafeAsyncQueue:
-    """Thread-safe async queue wrapper"""
-
-    def __init__(self):
-        self._queue = asyncio.Queue()
-        self._loop = None
-        self._closed = False
-
-    def set_loop(self, loop):
-        self._loop = loop
-
-    async def put(self, item):
-        """Put data safely from any thread"""
-        if self._closed:
-            return
-        await self._queue.put(item)
-
-    def put_nowait_threadsafe(self, item):
-        """Put data from other threads - use direct queue put for lower latency"""
-        if self._closed or not self._loop:
-            return
-        # Use put_nowait directly instead of creating a task for lower latency
-        self._loop.call_soon_threadsafe(lambda: self._queue.put_nowait(item))
-
-    async def get(self):
-        return await self._queue.get()
-
-    def close(self):
-        self._closed = True
-
-
 def filter_google_search_organic(organic: List[dict]) -> List[dict]:
     """
     Filter google search organic results to remove unnecessary information
@@ -258,140 +233,310 @@ def filter_message(message: dict) -> dict:
     return message
 
 
-async def stream_events_optimized(
-    task_id: str, query: str, _: Optional[dict] = None, disconnect_check=None
-) -> AsyncGenerator[dict, None]:
-    """Optimized event stream generator that directly outputs structured events, no longer wrapped as SSE strings."""
-    workflow_id = task_id
-    last_send_time = time.time()
-    last_heartbeat_time = time.time()
+# Sessions running the agent pipeline at the same time; the rest wait in line
+MAX_CONCURRENT_SESSIONS = int(os.getenv("MAX_CONCURRENT_SESSIONS", "8"))
+# Sessions allowed to wait for a slot before new ones are turned away
+MAX_QUEUED_SESSIONS = int(os.getenv("MAX_QUEUED_SESSIONS", "64"))
+# Recent sessions whose truncated tool payloads stay fetchable on /payloads
+PAYLOAD_SESSIONS_KEPT = int(os.getenv("PAYLOAD_SESSIONS_KEPT", "32"))
 
-    # Create thread-safe queue
-    stream_queue = ThreadSafeAsyncQueue()
-    stream_queue.set_loop(asyncio.get_event_loop())
+HEARTBEAT_INTERVAL_SECONDS = 15
+STREAM_TIMEOUT_SECONDS = 300
 
-    cancel_event = threading.Event()
 
-    def run_pipeline_in_thread():
+class AdmissionQueue:
+    """
+    Bounded FIFO admission control for sessions, used on the runtime loop only.
+
+    At most `limit` sessions hold a slot; waiting sessions are told their
+    position whenever it changes. A released slot is handed directly to the
+    first waiter so late arrivals can't overtake the line.
+    """
+
+    def __init__(self, limit: int, max_waiting: int):
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.running = 0
+        self._waiting = OrderedDict()  # session_id -> (future, on_position)
+
+    def _notify_positions(self):
+        for position, (_, on_position) in enumerate(self._waiting.values(), 1):
+            on_position(position)
+        self._publish()
+
+    def _publish(self):
+        ACTIVE_TASKS.set(self.running)
+        QUEUED_TASKS.set(len(self._waiting))
+
+    async def acquire(self, session_id: str, on_position: Callable[[int], None]):
+        if self.running < self.limit and not self._waiting:
+            self.running += 1
+            self._publish()
+            return
+        if len(self._waiting) >= self.max_waiting:
+            raise RuntimeError("The demo is at capacity, please try again later.")
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[session_id] = (future, on_position)
+        on_position(len(self._waiting))
+        self._publish()
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            await future
+        except asyncio.CancelledError:
+            self._waiting.pop(session_id, None)
+            if future.done() and not future.cancelled():
+                # The slot was handed over just before the cancellation
+                self.release()
+            else:
+                self._notify_positions()
+            raise
+
+    def release(self):
+        while self._waiting:
+            _, (future, _) = self._waiting.popitem(last=False)
+            if not future.done():
+                future.set_result(None)
+                self._notify_positions()
+                return
+        self.running -= 1
+        self._publish()
+
+
+class PipelineComponentPool:
+    """
+    Reusable ToolManager sets for concurrent sessions on the runtime loop.
+
+    ToolManagers carry per-task state (the task log, the browser session), so
+    concurrent sessions each check out their own set; sets are created on
+    demand and returned for reuse, keeping at most one per concurrent session.
+    """
+
+    def __init__(self):
+        self._idle = []
+        self._seeded = False
+
+    def acquire(self) -> tuple:
+        if not self._seeded:
+            # The preloaded set becomes the first pooled set
+            self._seeded = True
+            self._idle.append(
+                (
+                    _preload_cache["main_agent_tool_manager"],
+                    _preload_cache["sub_agent_tool_managers"],
+                    _preload_cache["output_formatter"],
+                )
+            )
+        if self._idle:
+            return self._idle.pop()
+        return create_pipeline_components(_preload_cache["cfg"])
 
-            class ThreadQueueWrapper:
-                def __init__(self, thread_queue, cancel_event):
-                    self.thread_queue = thread_queue
-                    self.cancel_event = cancel_event
+    def release(self, components: tuple):
+        self._idle.append(components)
 
-                async def put(self, item):
-                    if self.cancel_event.is_set():
-                        logger.info("Pipeline cancelled, stopping execution")
-                        return
-                    self.thread_queue.put_nowait_threadsafe(filter_message(item))
 
-            wrapper_queue = ThreadQueueWrapper(stream_queue, cancel_event)
+class SessionStreamQueue:
+    """stream_queue handed to the pipeline, filtering events into a session"""
 
-            # Ensure pipeline components are loaded (lazy loading)
-            _ensure_preloaded()
+    def __init__(self, channel: StreamChannel):
+        self.channel = channel
 
-            async def pipeline_with_cancellation():
-                pipeline_task = asyncio.create_task(
-                    execute_task_pipeline(
+    async def put(self, item):
+        await self.channel.put(filter_message(item) if item is not None else None)
+
+    def metrics(self) -> dict:
+        return self.channel.metrics()
+
+
+class SessionRuntime:
+    """
+    One background event loop running the pipelines of all sessions.
+
+    Each session is a task on the shared loop, admitted through a bounded
+    queue and using a pooled set of tool managers. Cancelling a session's
+    future cancels its task, wherever it is (waiting, or mid tool call).
+    """
+
+    def __init__(self, max_concurrent: int, max_queued: int):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self._loop = None
+        self._lock = threading.Lock()
+        self._sessions = {}  # session_id -> concurrent.futures.Future
+        # session_id -> StreamChannel of recent sessions, oldest first
+        self._channels = OrderedDict()
+        self._admission = None
+        self._pool = None
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="session-runtime", daemon=True
+                ).start()
+                self._admission = AdmissionQueue(self.max_concurrent, self.max_queued)
+                self._pool = PipelineComponentPool()
+                self._loop = loop
+            return self._loop
+
+    def start_session(self, session_id: str, query: str):
+        """
+        Schedule a session.
+
+        Returns:
+            tuple: (future of the session, its StreamChannel). Read the
+            channel with next_event(); it ends with None.
+        """
+        loop = self._ensure_started()
+        channel = StreamChannel()
+        future = asyncio.run_coroutine_threadsafe(
+            self._run_session(session_id, query, channel), loop
+        )
+        with self._lock:
+            self._sessions[session_id] = future
+            self._channels[session_id] = channel
+            while len(self._channels) > PAYLOAD_SESSIONS_KEPT:
+                self._channels.popitem(last=False)
+        future.add_done_callback(lambda _: self._forget(session_id))
+        return future, channel
+
+    def next_event(self, channel: StreamChannel):
+        """Future of the channel's next message, read on the runtime loop"""
+        return asyncio.run_coroutine_threadsafe(channel.get(), self._loop)
+
+    def close_channel(self, channel: StreamChannel):
+        """Drop a channel whose reader went away, releasing blocked producers"""
+        self._loop.call_soon_threadsafe(channel.close)
+
+    def fetch_payload(self, payload_id: str, offset: int, limit: int) -> dict:
+        """
+        One page of a truncated tool payload of a recent session.
+
+        Raises:
+            KeyError: If no recent session has the payload
+        """
+        with self._lock:
+            channels = list(reversed(self._channels.values()))
+        for channel in channels:
+            try:
+                return channel.fetch_payload(payload_id, offset, limit)
+            except KeyError:
+                continue
+        raise KeyError(payload_id)
+
+    def _forget(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def cancel(self, session_id: str):
+        with self._lock:
+            future = self._sessions.get(session_id)
+        if future is not None:
+            future.cancel()
+
+    async def _run_session(self, session_id: str, query: str, channel: StreamChannel):
+        # Control events bypass the channel bound, the pipeline's events wait
+        emit = channel.put_nowait
+
+        def on_position(position: int):
+            emit(
+                {
+                    "event": "queue_position",
+                    "data": {"position": position, "workflow_id": session_id},
+                }
+            )
+
+        try:
+            await self._admission.acquire(session_id, on_position)
+            try:
+                on_position(0)
+                # Ensure pipeline components are loaded (lazy loading)
+                await asyncio.get_running_loop().run_in_executor(
+                    None, _ensure_preloaded
+                )
+                components = self._pool.acquire()
+                try:
+                    main_agent_tool_manager, sub_agent_tool_managers, formatter = (
+                        components
+                    )
+                    await execute_task_pipeline(
                         cfg=_preload_cache["cfg"],
-                        task_id=workflow_id,
+                        task_id=session_id,
                         task_description=query,
                         task_file_name=None,
-                        main_agent_tool_manager=_preload_cache[
-                            "main_agent_tool_manager"
-                        ],
-                        sub_agent_tool_managers=_preload_cache[
-                            "sub_agent_tool_managers"
-                        ],
-                        output_formatter=_preload_cache["output_formatter"],
-                        stream_queue=wrapper_queue,
+                        main_agent_tool_manager=main_agent_tool_manager,
+                        sub_agent_tool_managers=sub_agent_tool_managers,
+                        output_formatter=formatter,
+                        stream_queue=SessionStreamQueue(channel),
                         log_dir=os.getenv("LOG_DIR", "logs/api-server"),
                         tool_definitions=_preload_cache["tool_definitions"],
                         sub_agent_tool_definitions=_preload_cache[
                             "sub_agent_tool_definitions"
                         ],
                     )
-                )
+                finally:
+                    self._pool.release(components)
+            finally:
+                self._admission.release()
+            TASKS.inc(status="success")
+        except asyncio.CancelledError:
+            logger.info(f"Session {session_id} cancelled")
+            TASKS.inc(status="cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"Pipeline error: {e}", exc_info=True)
+            TASKS.inc(status="failed")
+            emit(
+                {"event": "error", "data": {"error": str(e), "workflow_id": session_id}}
+            )
+        finally:
+            emit(None)
 
-                async def check_cancellation():
-                    while not cancel_event.is_set():
-                        await asyncio.sleep(0.5)
-                    logger.info("Cancel event detected, cancelling pipeline")
-                    pipeline_task.cancel()
 
-                cancel_task = asyncio.create_task(check_cancellation())
+session_runtime = SessionRuntime(MAX_CONCURRENT_SESSIONS, MAX_QUEUED_SESSIONS)
 
-                try:
-                    done, pending = await asyncio.wait(
-                        [pipeline_task, cancel_task],
-                        return_when=asyncio.FIRST_COMPLETED,
-                    )
-                    for task in pending:
-                        task.cancel()
-                    for task in done:
-                        if task == pipeline_task:
-                            try:
-                                await task
-                            except asyncio.CancelledError:
-                                logger.info("Pipeline task was cancelled")
-                except Exception as e:
-                    logger.error(f"Pipeline execution error: {e}")
-                    pipeline_task.cancel()
-                    cancel_task.cancel()
-
-            loop.run_until_complete(pipeline_with_cancellation())
-        except Exception as e:
-            if not cancel_event.is_set():
-                logger.error(f"Pipeline error: {e}", exc_info=True)
-                stream_queue.put_nowait_threadsafe(
-                    {
-                        "event": "error",
-                        "data": {"error": str(e), "workflow_id": workflow_id},
-                    }
-                )
-        finally:
-            stream_queue.put_nowait_threadsafe(None)
-            if "loop" in locals():
-                loop.close()
 
-    executor = ThreadPoolExecutor(max_workers=1)
-    future = executor.submit(run_pipeline_in_thread)
+async def stream_events_optimized(
+    task_id: str, query: str, _: Optional[dict] = None
+) -> AsyncGenerator[dict, None]:
+    """Optimized event stream generator that directly outputs structured events, no longer wrapped as SSE strings."""
+    workflow_id = task_id
+    last_send_time = time.time()
+    queued = False
+
+    # Events are read from the session's channel on the runtime loop; a read
+    # outlives heartbeat timeouts so no message is lost to a cancelled get
+    future, channel = session_runtime.start_session(task_id, query)
+    pending = None
 
     try:
         while True:
-            try:
-                if disconnect_check and await disconnect_check():
-                    logger.info("Client disconnected, stopping pipeline")
-                    cancel_event.set()
-                    break
-                message = await asyncio.wait_for(stream_queue.get(), timeout=0.1)
-                if message is None:
-                    logger.info("Pipeline completed")
-                    break
-                yield message
-                last_send_time = time.time()
-            except asyncio.TimeoutError:
+            if pending is None:
+                pending = asyncio.wrap_future(session_runtime.next_event(channel))
+            done, _ = await asyncio.wait({pending}, timeout=HEARTBEAT_INTERVAL_SECONDS)
+            if not done:
                 current_time = time.time()
-                if current_time - last_send_time > 300:
+                # Waiting in the admission queue doesn't count as a stall
+                if (
+                    not queued
+                    and current_time - last_send_time > STREAM_TIMEOUT_SECONDS
+                ):
                     logger.info("Stream timeout")
                     break
-                if future.done():
-                    try:
-                        message = stream_queue._queue.get_nowait()
-                        if message is not None:
-                            yield message
-                            continue
-                    except Exception:
-                        break
-                if current_time - last_heartbeat_time >= 15:
-                    yield {
-                        "event": "heartbeat",
-                        "data": {"timestamp": current_time, "workflow_id": workflow_id},
-                    }
-                    last_heartbeat_time = current_time
+                yield {
+                    "event": "heartbeat",
+                    "data": {"timestamp": current_time, "workflow_id": workflow_id},
+                }
+                continue
+            message = pending.result()
+            pending = None
+            if message is None:
+                logger.info("Pipeline completed")
+                break
+            if message.get("event") == "queue_position":
+                queued = message["data"]["position"] > 0
+            yield message
+            last_send_time = time.time()
     except Exception as e:
         logger.error(f"Stream error: {e}", exc_info=True)
         yield {
@@ -399,13 +544,11 @@ async def stream_events_optimized(
             "data": {"workflow_id": workflow_id, "error": f"Stream error: {str(e)}"},
         }
     finally:
-        cancel_event.set()
-        stream_queue.close()
-        try:
-            future.result(timeout=1.0)
-        except Exception:
-            pass
-        executor.shutdown(wait=False)
+        if pending is not None:
+            pending.cancel()
+        # Cancels the session if it is still queued or running (stop, disconnect)
+        future.cancel()
+        session_runtime.close_channel(channel)
 
 
 # ========================= Gradio Integration =========================
@@ -417,6 +560,7 @@ def _init_render_state():
         "agents": {},  # agent_id -> {"agent_name": str, "tool_call_order": [], "tools": {tool_call_id: {...}}}
         "current_agent_id": None,
         "errors": [],
+        "queue_position": 0,  # > 0 while waiting for a free session slot
     }
 
 
@@ -624,7 +768,117 @@ def _format_scrape_results(tool_input: dict, tool_output: dict) -> str:
     return "\n".join(lines)
 
 
-def _render_markdown(state: dict) -> str:
+def _render_tool_call(
+    call: dict, is_final_summary: bool
+) -> Tuple[List[str], List[str]]:
+    """
+    Render one tool call or message entry.
+
+    Returns:
+        tuple: (lines for the research stream, lines for the final summary)
+    """
+    lines = []
+    final_summary_lines = []
+    tool_name = call.get("tool_name", "unknown_tool")
+
+    # Show text / message - display directly
+    if tool_name in ("show_text", "message"):
+        content = call.get("content", "")
+        if content:
+            if is_final_summary:
+                final_summary_lines.append(content)
+            else:
+                lines.append(content)
+        return lines, final_summary_lines
+
+    tool_input = call.get("input", {})
+    tool_output = call.get("output", {})
+    has_input = not _is_empty_payload(tool_input)
+    has_output = not _is_empty_payload(tool_output)
+
+    # Special formatting for google_search
+    if tool_name == "google_search" and (has_input or has_output):
+        formatted = _format_search_results(tool_input, tool_output)
+        if formatted:
+            lines.append(formatted)
+        return lines, final_summary_lines
+
+    # Special formatting for sogou_search
+    if tool_name == "sogou_search" and (has_input or has_output):
+        formatted = _format_sogou_search_results(tool_input, tool_output)
+        if formatted:
+            lines.append(formatted)
+        return lines, final_summary_lines
+
+    # Special formatting for scrape/webpage tools
+    if tool_name in (
+        "scrape",
+        "scrape_website",
+        "scrape_webpage",
+        "scrape_and_extract_info",
+    ) and (has_input or has_output):
+        formatted = _format_scrape_results(tool_input, tool_output)
+        if formatted:
+            lines.append(formatted)
+        return lines, final_summary_lines
+
+    # Special formatting for code execution tools
+    if tool_name in ("python", "run_python_code") and (has_input or has_output):
+        # Use pure Markdown to avoid HTML wrapper blocking Markdown rendering
+        lines.append("\n---\n")
+        lines.append("#### 💻 Code Execution\n")
+        # Show code input - try multiple possible keys
+        code = ""
+        if isinstance(tool_input, dict):
+            code = tool_input.get("code") or tool_input.get("code_block") or ""
+        elif isinstance(tool_input, str):
+            code = tool_input
+        if code:
+            lines.append(f"\n```python\n{code}\n```\n")
+        # Show output if available
+        if has_output:
+            output = ""
+            if isinstance(tool_output, dict):
+                output = (
+                    tool_output.get("result")
+                    or tool_output.get("output")
+                    or tool_output.get("stdout")
+                    or ""
+                )
+            elif isinstance(tool_output, str):
+                output = tool_output
+            if isinstance(output, str) and output.strip():
+                lines.append("\n**Output:**\n")
+                lines.append(
+                    f'\n```text\n{output[:1000]}{"..." if len(output) > 1000 else ""}\n```\n'
+                )
+        lines.append("\n✅ Executed\n")
+        return lines, final_summary_lines
+
+    # Other tools - show as compact card
+    if has_input or has_output:
+        target_lines = final_summary_lines if is_final_summary else lines
+        target_lines.append('<div class="tool-card">')
+        target_lines.append(f'<div class="tool-header">🔧 {tool_name}</div>')
+        if has_input:
+            # Show brief input summary
+            if isinstance(tool_input, dict):
+                brief = ", ".join(
+                    f"{k}: {str(v)[:30]}..." if len(str(v)) > 30 else f"{k}: {v}"
+                    for k, v in list(tool_input.items())[:2]
+                )
+                target_lines.append(f'<div class="tool-brief">{brief}</div>')
+        if has_output:
+            target_lines.append('<div class="tool-status">✓ Done</div>')
+        target_lines.append("</div>")
+
+    return lines, final_summary_lines
+
+
+def _assemble_markdown(
+    state: dict, render_call: Callable[[str, str, dict, bool], Tuple]
+) -> str:
+    """Join the rendered entries of all agents, in stream order."""
     lines = []
     final_summary_lines = []  # Collect final summary content separately
 
@@ -636,105 +890,15 @@ def _render_markdown(state: dict) -> str:
     # Render all agents' content
     for agent_id in state.get("agent_order", []):
         agent = state["agents"].get(agent_id, {})
-        agent_name = agent.get("agent_name", "")
-        is_final_summary = agent_name == "Final Summary"
+        is_final_summary = agent.get("agent_name", "") == "Final Summary"
 
         for call_id in agent.get("tool_call_order", []):
             call = agent["tools"].get(call_id, {})
-            tool_name = call.get("tool_name", "unknown_tool")
-
-            # Show text / message - display directly
-            if tool_name in ("show_text", "message"):
-                content = call.get("content", "")
-                if content:
-                    if is_final_summary:
-                        final_summary_lines.append(content)
-                    else:
-                        lines.append(content)
-                continue
-
-            tool_input = call.get("input", {})
-            tool_output = call.get("output", {})
-            has_input = not _is_empty_payload(tool_input)
-            has_output = not _is_empty_payload(tool_output)
-
-            # Special formatting for google_search
-            if tool_name == "google_search" and (has_input or has_output):
-                formatted = _format_search_results(tool_input, tool_output)
-                if formatted:
-                    lines.append(formatted)
-                continue
-
-            # Special formatting for sogou_search
-            if tool_name == "sogou_search" and (has_input or has_output):
-                formatted = _format_sogou_search_results(tool_input, tool_output)
-                if formatted:
-                    lines.append(formatted)
-                continue
-
-            # Special formatting for scrape/webpage tools
-            if tool_name in (
-                "scrape",
-                "scrape_website",
-                "scrape_webpage",
-                "scrape_and_extract_info",
-            ) and (has_input or has_output):
-                formatted = _format_scrape_results(tool_input, tool_output)
-                if formatted:
-                    lines.append(formatted)
-                continue
-
-            # Special formatting for code execution tools
-            if tool_name in ("python", "run_python_code") and (has_input or has_output):
-                # Use pure Markdown to avoid HTML wrapper blocking Markdown rendering
-                lines.append("\n---\n")
-                lines.append("#### 💻 Code Execution\n")
-                # Show code input - try multiple possible keys
-                code = ""
-                if isinstance(tool_input, dict):
-                    code = tool_input.get("code") or tool_input.get("code_block") or ""
-                elif isinstance(tool_input, str):
-                    code = tool_input
-                if code:
-                    lines.append(f"\n```python\n{code}\n```\n")
-                # Show output if available
-                if has_output:
-                    output = ""
-                    if isinstance(tool_output, dict):
-                        output = (
-                            tool_output.get("result")
-                            or tool_output.get("output")
-                            or tool_output.get("stdout")
-                            or ""
-                        )
-                    elif isinstance(tool_output, str):
-                        output = tool_output
-                    if isinstance(output, str) and output.strip():
-                        lines.append("\n**Output:**\n")
-                        lines.append(
-                            f'\n```text\n{output[:1000]}{"..." if len(output) > 1000 else ""}\n```\n'
-                        )
-                lines.append("\n✅ Executed\n")
-                continue
-
-            # Other tools - show as compact card
-            if has_input or has_output:
-                target_lines = final_summary_lines if is_final_summary else lines
-                target_lines.append('<div class="tool-card">')
-                target_lines.append(f'<div class="tool-header">🔧 {tool_name}</div>')
-                if has_input:
-                    # Show brief input summary
-                    if isinstance(tool_input, dict):
-                        brief = ", ".join(
-                            f"{k}: {str(v)[:30]}..."
-                            if len(str(v)) > 30
-                            else f"{k}: {v}"
-                            for k, v in list(tool_input.items())[:2]
-                        )
-                        target_lines.append(f'<div class="tool-brief">{brief}</div>')
-                if has_output:
-                    target_lines.append('<div class="tool-status">✓ Done</div>')
-                target_lines.append("</div>")
+            call_lines, call_summary_lines = render_call(
+                agent_id, call_id, call, is_final_summary
+            )
+            lines.extend(call_lines)
+            final_summary_lines.extend(call_summary_lines)
 
     # Add final summary with Markdown-based styling (no HTML wrapper to preserve Markdown rendering)
     if final_summary_lines:
@@ -742,7 +906,18 @@ def _render_markdown(state: dict) -> str:
         lines.append("## 📋 Research Summary\n\n")
         lines.extend(final_summary_lines)
 
-    return "\n".join(lines) if lines else "*Waiting to start research...*"
+    if lines:
+        return "\n".join(lines)
+    if state.get("queue_position"):
+        return f"*Waiting in line (position {state['queue_position']})...*"
+    return "*Waiting to start research...*"
+
+
+def _render_markdown(state: dict) -> str:
+    return _assemble_markdown(
+        state,
+        lambda agent_id, call_id, call, is_final: _render_tool_call(call, is_final),
+    )
 
 
 def _update_state_with_event(state: dict, message: dict):
@@ -825,6 +1000,8 @@ def _update_state_with_event(state: dict, message: dict):
         delta_content = (data.get("delta") or {}).get("content", "")
         if isinstance(delta_content, str) and delta_content:
             _append_show_text(entry, delta_content)
+    elif event == "queue_position":
+        state["queue_position"] = data.get("position", 0)
     elif event == "error":
         # Collect errors, display uniformly during rendering
         err_text = data.get("error") if isinstance(data, dict) else None
@@ -841,23 +1018,113 @@ def _update_state_with_event(state: dict, message: dict):
     return state
 
 
-_CANCEL_FLAGS = {}
-_CANCEL_LOCK = threading.Lock()
+class IncrementalRenderer:
+    """
+    Keep the render state of one research stream and its rendered markdown.
 
+    Rendered fragments are cached per tool call; applying an event only marks
+    the entry it touches as dirty, so a render re-formats the changed entries
+    instead of every search, scrape and tool card seen so far.
+    """
 
-def _set_cancel_flag(task_id: str):
-    with _CANCEL_LOCK:
-        _CANCEL_FLAGS[task_id] = True
+    def __init__(self):
+        self.state = _init_render_state()
+        self._fragments = {}  # (agent_id, call_id) -> (lines, final_summary_lines)
+        self._dirty = set()
+        self._changed = True
+
+    @property
+    def changed(self) -> bool:
+        """Whether events were applied since the last render"""
+        return self._changed
+
+    def apply(self, message: dict):
+        """Apply one stream event to the state"""
+        event = message.get("event")
+        data = message.get("data", {})
+        if event in ("tool_call", "message"):
+            # Same agent resolution as _update_state_with_event
+            agent_id = self.state.get("current_agent_id") or (
+                self.state["agent_order"][-1] if self.state["agent_order"] else None
+            )
+            call_id = (
+                data.get("tool_call_id")
+                if event == "tool_call"
+                else data.get("message_id")
+            )
+            if agent_id:
+                self._dirty.add((agent_id, call_id))
+        elif event not in (
+            "start_of_agent",
+            "end_of_agent",
+            "error",
+            "queue_position",
+        ):
+            # Heartbeats and other events don't change the rendered output
+            return
+        _update_state_with_event(self.state, message)
+        self._changed = True
+
+    def _render_call(
+        self, agent_id: str, call_id: str, call: dict, is_final_summary: bool
+    ) -> Tuple[List[str], List[str]]:
+        key = (agent_id, call_id)
+        if key in self._dirty or key not in self._fragments:
+            self._fragments[key] = _render_tool_call(call, is_final_summary)
+        return self._fragments[key]
+
+    def render(self) -> str:
+        """Render the markdown, re-formatting only the dirty entries"""
+        markdown = _assemble_markdown(self.state, self._render_call)
+        self._dirty.clear()
+        self._changed = False
+        return markdown
 
 
-def _reset_cancel_flag(task_id: str):
-    with _CANCEL_LOCK:
-        _CANCEL_FLAGS[task_id] = False
+# Minimum interval between UI updates; events arriving in between are batched
+RENDER_INTERVAL_SECONDS = 0.1
 
 
-async def _disconnect_check_for_task(task_id: str):
-    with _CANCEL_LOCK:
-        return _CANCEL_FLAGS.get(task_id, False)
+async def _batch_events(
+    events: AsyncGenerator[dict, None], interval: float = RENDER_INTERVAL_SECONDS
+) -> AsyncGenerator[List[dict], None]:
+    """
+    Group stream events into batches emitted at most once per interval.
+
+    The first event after a quiet period is emitted immediately; bursts are
+    collected until the interval has passed. Heartbeats are dropped.
+    """
+    loop = asyncio.get_running_loop()
+    iterator = events.__aiter__()
+    next_event = asyncio.ensure_future(iterator.__anext__())
+    batch = []
+    last_flush = loop.time() - interval
+    try:
+        while True:
+            timeout = max(last_flush + interval - loop.time(), 0) if batch else None
+            done, _ = await asyncio.wait({next_event}, timeout=timeout)
+            if next_event in done:
+                try:
+                    message = next_event.result()
+                except StopAsyncIteration:
+                    break
+                next_event = asyncio.ensure_future(iterator.__anext__())
+                if message.get("event") == "heartbeat":
+                    continue
+                batch.append(message)
+                if loop.time() - last_flush < interval:
+                    continue
+            yield batch
+            batch = []
+            last_flush = loop.time()
+        if batch:
+            yield batch
+    finally:
+        # Stop the underlying stream (and its pipeline) if we exit early
+        if not next_event.done():
+            next_event.cancel()
+            await asyncio.gather(next_event, return_exceptions=True)
+        await events.aclose()
 
 
 def _spinner_markup(running: bool) -> str:
@@ -874,40 +1141,34 @@ def _spinner_markup(running: bool) -> str:
 async def gradio_run(query: str, ui_state: Optional[dict]):
     query = replace_chinese_punctuation(query or "")
     task_id = str(uuid.uuid4())
-    _reset_cancel_flag(task_id)
     if not ui_state:
         ui_state = {"task_id": task_id}
     else:
         ui_state = {**ui_state, "task_id": task_id}
-    state = _init_render_state()
+    renderer = IncrementalRenderer()
     # Initial: disable Run, enable Stop, and show spinner at bottom of text
     yield (
-        _render_markdown(state) + _spinner_markup(True),
+        renderer.render() + _spinner_markup(True),
         gr.update(interactive=False),
         gr.update(interactive=True),
         ui_state,
     )
-    async for message in stream_events_optimized(
-        task_id, query, None, lambda: _disconnect_check_for_task(task_id)
-    ):
-        # Skip heartbeat events - they don't need UI update
-        event_type = message.get("event", "unknown")
-        if event_type == "heartbeat":
+    stream = stream_events_optimized(task_id, query, None)
+    # Bursts of events (e.g. streamed text deltas) become one UI update
+    async for batch in _batch_events(stream):
+        for message in batch:
+            renderer.apply(message)
+        if not renderer.changed:
             continue
-
-        state = _update_state_with_event(state, message)
-        md = _render_markdown(state)
         yield (
-            md + _spinner_markup(True),
+            renderer.render() + _spinner_markup(True),
             gr.update(interactive=False),
             gr.update(interactive=True),
             ui_state,
         )
-        # Small delay to allow Gradio to process the update
-        await asyncio.sleep(0.01)
     # End: enable Run, disable Stop, remove spinner
     yield (
-        _render_markdown(state),
+        renderer.render(),
         gr.update(interactive=True),
         gr.update(interactive=False),
         ui_state,
@@ -917,7 +1178,7 @@ async def gradio_run(query: str, ui_state: Optional[dict]):
 def stop_current(ui_state: Optional[dict]):
     tid = (ui_state or {}).get("task_id")
     if tid:
-        _set_cancel_flag(tid)
+        session_runtime.cancel(tid)
     # Immediately switch button availability: enable Run, disable Stop
     return (
         gr.update(interactive=True),
@@ -1679,6 +1940,8 @@ def build_demo():
             fn=gradio_run,
             inputs=[inp, ui_state],
             outputs=[out_md, run_btn, stop_btn, ui_state],
+            # Sessions are admitted by session_runtime, not by the Gradio queue
+            concurrency_limit=None,
         )
         stop_btn.click(fn=stop_current, inputs=[ui_state], outputs=[run_btn, stop_btn])
 
@@ -1692,8 +1955,38 @@ def build_demo():
     return demo
 
 
+def build_app() -> FastAPI:
+    """
+    The demo UI with a Prometheus /metrics endpoint next to it, and
+    /payloads/{payload_id} serving tool payloads the stream truncated (listed
+    under "paged" in tool_call events) page by page.
+    """
+    app = FastAPI()
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    def metrics():
+        return PlainTextResponse(
+            REGISTRY.render_prometheus(),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+    @app.get("/payloads/{payload_id}")
+    def payload(
+        payload_id: str,
+        offset: int = Query(0, ge=0),
+        limit: int = Query(DEFAULT_PAYLOAD_PAGE_CHARS, ge=1),
+    ):
+        try:
+            return session_runtime.fetch_payload(payload_id, offset, limit)
+        except KeyError:
+            raise HTTPException(
+                status_code=404, detail=f"Payload {payload_id} not found or expired"
+            )
+
+    return gr.mount_gradio_app(app, build_demo().queue(), path="/")
+
+
 if __name__ == "__main__":
-    demo = build_demo()
     host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", "8080"))
-    demo.queue().launch(server_name=host, server_port=port)
+    uvicorn.run(build_app(), host=host, port=port)
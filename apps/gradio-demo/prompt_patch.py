@@ -160,7 +160,6 @@ def _patch_system_prompt():
 
 def _patch_input_handler():
     """Patch input handler to remove boxed format requirement."""
-    from src.core import orchestrator
     from src.io import input_handler
 
     # Store original function
@@ -174,10 +173,9 @@ def _patch_input_handler():
         result2 = result2.replace(BOXED_FORMAT_SUFFIX, "")
         return result1, result2
 
-    # Apply patch to input_handler module
+    # Apply patch to input_handler module; the orchestrator calls it through
+    # process_input_async, which looks it up there
     input_handler.process_input = patched_process_input
-    # Also patch in orchestrator where it's imported
-    orchestrator.process_input = patched_process_input
 
 
 def _patch_summarize_prompt():
@@ -11,7 +11,7 @@ MCP format:
 """
 
 import json
-from collections.abc import Sequence
+from collections.abc import Iterator, Sequence
 
 import json_repair
 import regex as re
@@ -33,6 +33,59 @@ from vllm.logger import init_logger
 
 logger = init_logger(__name__)
 
+_MCP_TOOL_START = "<use_mcp_tool>"
+
+# Tool block up to its arguments. Names cannot contain "<", so a malformed
+# block fails at the next tag instead of scanning the rest of the text.
+_MCP_TOOL_HEADER_PATTERN = re.compile(
+    r"<use_mcp_tool>\s*<server_name>([^<]*)</server_name>\s*"
+    r"<tool_name>([^<]*)</tool_name>\s*<arguments>"
+)
+_MCP_TOOL_TAIL_PATTERN = re.compile(r"\s*</use_mcp_tool>")
+
+
+def _iter_mcp_tool_blocks(text: str) -> Iterator[tuple[str, str, str]]:
+    """
+    Yield complete <use_mcp_tool> blocks as (server_name, tool_name, arguments).
+
+    Single pass and linear in the text length, also for unterminated tags
+    (same scanner as miroflow-agent's parsing_utils.scan_mcp_tool_blocks,
+    kept here because this plugin is loaded as a single file).
+    """
+    pos = 0
+    arguments_end = -1
+    while True:
+        start = text.find(_MCP_TOOL_START, pos)
+        if start < 0:
+            return
+        header = _MCP_TOOL_HEADER_PATTERN.match(text, start)
+        if header is None:
+            pos = start + len(_MCP_TOOL_START)
+            continue
+
+        # The arguments end at the first </arguments> closing the block
+        search = header.end()
+        block_end = None
+        while True:
+            if arguments_end < search:
+                arguments_end = text.find("</arguments>", search)
+            if arguments_end < 0:
+                return  # No later block can be complete either
+            tail = _MCP_TOOL_TAIL_PATTERN.match(
+                text, arguments_end + len("</arguments>")
+            )
+            if tail:
+                block_end = tail.end()
+                break
+            search = arguments_end + 1
+
+        yield (
+            header.group(1).strip(),
+            header.group(2).strip(),
+            text[header.end() : arguments_end].strip(),
+        )
+        pos = block_end
+
 
 class MirothinkerToolParser(ToolParser):
     def __init__(self, tokenizer):
@@ -59,16 +112,6 @@ class MirothinkerToolParser(ToolParser):
         self.tool_call_start_token: str = "<use_mcp_tool>"
         self.tool_call_end_token: str = "</use_mcp_tool>"
 
-        # Regex patterns
-        self.tool_call_regex = re.compile(
-            r"<use_mcp_tool>\s*"
-            r"<server_name>(.*?)</server_name>\s*"
-            r"<tool_name>(.*?)</tool_name>\s*"
-            r"<arguments>\s*(.*?)\s*</arguments>\s*"
-            r"</use_mcp_tool>",
-            re.DOTALL,
-        )
-
         # For streaming partial tool calls
         # IMPORTANT: Use GREEDY matching (.*) for arguments to capture all content
         # in streaming mode. We'll clean up </arguments> tag in the code if present.
@@ -177,11 +220,10 @@ class MirothinkerToolParser(ToolParser):
             had_any_match = False
             had_parse_error = False
             # Find all complete tool calls
-            for match in self.tool_call_regex.finditer(model_output):
+            for server_name, tool_name, arguments_str in _iter_mcp_tool_blocks(
+                model_output
+            ):
                 had_any_match = True
-                server_name = match.group(1).strip()
-                tool_name = match.group(2).strip()
-                arguments_str = match.group(3).strip()
 
                 # Resolve tool name
                 tool_name = self._resolve_tool_name(server_name, tool_name, request)
@@ -1,7 +1,7 @@
 import asyncio
 import json
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 import httpx
 import json_repair
@@ -29,6 +29,85 @@ CONTENT TO ANALYZE:
 EXTRACTED INFORMATION:"""
 
 
+class RepeatedOutputError(Exception):
+    """The model got stuck in a loop; its generation was stopped early"""
+
+
+class RepetitionDetector:
+    """
+    Online detector for degenerate loops in a streamed response.
+
+    Flags the text once it ends in a run of consecutive repeats: the last
+    `window` characters occur more than `max_repeats` times (non-overlapping),
+    evenly spaced, with identical text between each occurrence and the next.
+    Text that merely quotes the same passage several times (a URL in every
+    bullet of a list, say) is not a loop, since what lies between the
+    occurrences differs. Each window is fingerprinted once, and units are
+    compared only when a fingerprint recurs at its previous spacing.
+    """
+
+    def __init__(self, window: int = 50, max_repeats: int = 5):
+        self.window = window
+        self.max_repeats = max_repeats
+        self.detected_at: Optional[int] = None  # Length when the loop was found
+        self.period: Optional[int] = None  # Length of the repeated unit
+        self._text = ""
+        # Per fingerprint, start of its last non-overlapping occurrence
+        self._last_start: Dict[int, int] = {}
+        # Per fingerprint, (spacing, occurrences) of the run ending there
+        self._runs: Dict[int, Tuple[int, int]] = {}
+
+    @property
+    def length(self) -> int:
+        """Characters fed so far"""
+        return len(self._text)
+
+    @property
+    def detected(self) -> bool:
+        return self.detected_at is not None
+
+    def feed(self, chunk: str) -> bool:
+        """Add streamed text; returns True once a loop has been detected"""
+        if self.detected or not chunk:
+            return self.detected
+
+        window = self.window
+        first_end = max(window, len(self._text) + 1)
+        self._text += chunk
+        text = self._text
+        for end in range(first_end, len(text) + 1):
+            start = end - window
+            fingerprint = hash(text[start:end])
+            previous = self._last_start.get(fingerprint)
+            if previous is not None and start < previous + window:
+                continue
+            self._last_start[fingerprint] = start
+            if previous is None:
+                continue
+            spacing = start - previous
+            run_spacing, occurrences = self._runs.get(fingerprint, (0, 1))
+            if spacing == run_spacing and (
+                text[previous:start] == text[previous - spacing : previous]
+            ):
+                occurrences += 1
+            else:
+                occurrences = 2
+            self._runs[fingerprint] = (spacing, occurrences)
+            if occurrences > self.max_repeats:
+                self.detected_at = end
+                self.period = spacing
+                break
+
+        return self.detected
+
+    def loops_to_end(self) -> bool:
+        """Whether the detected loop runs on to the end of the text fed so far"""
+        if not self.detected:
+            return False
+        end, period = self.detected_at, self.period
+        return self._text[end:] == self._text[end - period : self.length - period]
+
+
 class LLMClient:
     def __init__(self, config: Config):
         self.config = config
@@ -70,16 +149,13 @@ class LLMClient:
                 else:
                     response = await self._chat_summary(messages, temperature, max_tokens)
 
-                if len(response) >= 50:
-                    tail_50 = response[-50:]
-                    repeat_count = response.count(tail_50)
-                    if repeat_count > 5:
-                        logger.info(f"Repeat detected, retrying (attempt {attempt})")
-                        await asyncio.sleep(delay)
-                        continue
-
                 return response
 
+            except RepeatedOutputError as e:
+                # Caught while streaming, so retry right away
+                last_exception = e
+                logger.info(f"Repeat detected, {e}, retrying (attempt {attempt})")
+                continue
             except Exception as e:
                 last_exception = e
                 if "context length" in str(e).lower() or "longer than the model's context" in str(e):
@@ -112,8 +188,7 @@ class LLMClient:
         else:
             params["max_tokens"] = max_tokens
 
-        response = await self.main_client.chat.completions.create(**params)
-        return response.choices[0].message.content or ""
+        return await self._stream_chat(self.main_client, params)
 
     async def _chat_summary(self, messages: list, temperature: float, max_tokens: int) -> str:
         if isinstance(messages, str):
@@ -130,11 +205,34 @@ class LLMClient:
             else:
                 params["max_tokens"] = max_tokens
 
-            response = await self.summary_client.chat.completions.create(**params)
-            return response.choices[0].message.content or ""
+            return await self._stream_chat(self.summary_client, params)
         else:
             return await self._chat_summary_direct(messages, temperature, max_tokens)
 
+    def _new_detector(self) -> RepetitionDetector:
+        return RepetitionDetector(self.config.repetition_window, self.config.repetition_max_repeats)
+
+    async def _stream_chat(self, client: AsyncOpenAI, params: dict) -> str:
+        """Stream a chat completion, stopping it as soon as the output loops"""
+        detector = self._new_detector()
+        parts = []
+        stream = await client.chat.completions.create(**params, stream=True)
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if content:
+                    parts.append(content)
+                    if detector.feed(content):
+                        raise RepeatedOutputError(
+                            f"generation stopped after {detector.detected_at} chars"
+                        )
+        finally:
+            # Closing the connection makes the server stop generating
+            await stream.close()
+        return "".join(parts)
+
     async def _chat_summary_direct(
         self, messages: list, temperature: float, max_tokens: int
     ) -> str:
@@ -170,7 +268,12 @@ class LLMClient:
             response_data = response.json()
 
             if "choices" in response_data and len(response_data["choices"]) > 0:
-                return response_data["choices"][0]["message"]["content"] or ""
+                content = response_data["choices"][0]["message"]["content"] or ""
+                # Not streamed, so only a loop the response ends in is rejected
+                detector = self._new_detector()
+                if detector.feed(content) and detector.loops_to_end():
+                    raise RepeatedOutputError(f"loop found after {detector.detected_at} chars")
+                return content
             elif "error" in response_data:
                 raise Exception(f"LLM API error: {response_data['error']}")
             else:
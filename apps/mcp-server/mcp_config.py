@@ -22,6 +22,11 @@ class Config:
 
     port: int
 
+    # Streamed LLM output is stopped once it ends in more than
+    # repetition_max_repeats consecutive repeats of its last repetition_window chars
+    repetition_window: int = 50
+    repetition_max_repeats: int = 5
+
     @classmethod
     def from_env(cls) -> "Config":
         serper_api_key = os.environ.get("SERPER_API_KEY", "")
@@ -45,6 +50,9 @@ class Config:
 
         port = int(os.environ.get("PORT", "8000"))
 
+        repetition_window = int(os.environ.get("LLM_REPETITION_WINDOW", "50"))
+        repetition_max_repeats = int(os.environ.get("LLM_REPETITION_MAX_REPEATS", "5"))
+
         config = cls(
             serper_api_key=serper_api_key,
             serper_base_url=serper_base_url,
@@ -58,6 +66,8 @@ class Config:
             summary_llm_model=summary_llm_model,
             summary_llm_mode=summary_llm_mode,
             port=port,
+            repetition_window=repetition_window,
+            repetition_max_repeats=repetition_max_repeats,
         )
         config.validate()
         return config
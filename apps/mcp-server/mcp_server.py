@@ -1,11 +1,12 @@
 import os
+import time
 import logging
 import uvicorn
 from dotenv import load_dotenv
 from starlette.applications import Starlette
 from starlette.middleware.cors import CORSMiddleware
 from starlette.routing import Route, Mount
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, PlainTextResponse
 from mcp.server import Server
 from mcp.server.sse import SseServerTransport
 import mcp.types as types
@@ -28,6 +29,9 @@ llm_client = LLMClient(config)
 
 server = Server("MiroThinker")
 
+# Tool call counts and latency by (tool, status), served on /metrics
+tool_call_stats = {}
+
 TOOL_DEFINITIONS = [
     types.Tool(
         name="miro_search",
@@ -101,6 +105,8 @@ async def list_tools() -> list[types.Tool]:
 
 @server.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[types.TextContent]:
+    start_time = time.time()
+    status = "ok"
     try:
         if name == "miro_search":
             result = await do_miro_search(
@@ -139,7 +145,13 @@ async def call_tool(name: str, arguments: dict) -> list[types.TextContent]:
     except Exception as e:
         logger.error(f"Tool {name} failed: {e}")
         result = f"Error: {str(e)}"
+        status = "error"
 
+    # Unknown tool names are not used as labels (arbitrary client input)
+    label = name if any(tool.name == name for tool in TOOL_DEFINITIONS) else "unknown"
+    stats = tool_call_stats.setdefault((label, status), {"count": 0, "seconds": 0.0})
+    stats["count"] += 1
+    stats["seconds"] += time.time() - start_time
     return [types.TextContent(type="text", text=result)]
 
 
@@ -161,9 +173,26 @@ async def health(request):
     return JSONResponse({"status": "ok"})
 
 
+async def metrics(request):
+    lines = [
+        "# HELP miroflow_tool_calls_total Tool calls by tool and outcome",
+        "# TYPE miroflow_tool_calls_total counter",
+    ]
+    for (name, status), stats in sorted(tool_call_stats.items()):
+        lines.append(f'miroflow_tool_calls_total{{tool="{name}",status="{status}"}} {stats["count"]}')
+    lines += [
+        "# HELP miroflow_tool_call_seconds_total Time spent in tool calls",
+        "# TYPE miroflow_tool_call_seconds_total counter",
+    ]
+    for (name, status), stats in sorted(tool_call_stats.items()):
+        lines.append(f'miroflow_tool_call_seconds_total{{tool="{name}",status="{status}"}} {stats["seconds"]:.3f}')
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
+
+
 app = Starlette(
     routes=[
         Route("/health", endpoint=health),
+        Route("/metrics", endpoint=metrics),
         Route("/sse", endpoint=handle_sse),
         Mount("/messages/", app=sse.handle_post_message),
     ],
@@ -0,0 +1,52 @@
+from llm_client import RepetitionDetector
+
+URL = "https://en.wikipedia.org/wiki/List_of_tallest_buildings_in_the_world"
+
+
+def feed_in_chunks(detector: RepetitionDetector, text: str, size: int = 7) -> bool:
+    for i in range(0, len(text), size):
+        detector.feed(text[i : i + size])
+    return detector.detected
+
+
+def test_url_list_is_not_a_loop():
+    bullets = "".join(
+        f"- Source {i} for the height of building {i}: {URL}\n" for i in range(1, 9)
+    )
+    answer = (
+        "The buildings were compared using the figures from the list below, "
+        "which was checked against the official records of each building.\n\n"
+        f"{bullets}\n"
+        "Taking the tallest building of each year gives the answer.\n\n"
+        "\\boxed{828}"
+    )
+    assert answer.count(URL) == 8
+
+    detector = RepetitionDetector(window=50, max_repeats=5)
+    assert not feed_in_chunks(detector, answer)
+    assert detector.detected_at is None
+
+    # Checked whole, as for non-streamed summaries
+    detector = RepetitionDetector(window=50, max_repeats=5)
+    assert not detector.feed(answer)
+
+
+def test_consecutive_repeats_are_a_loop():
+    prefix = "Let me verify the result once more before answering.\n"
+    unit = "I need to check the population figure for the city again. "
+    text = prefix + unit * 20
+
+    detector = RepetitionDetector(window=50, max_repeats=5)
+    assert feed_in_chunks(detector, text)
+    assert detector.detected_at <= len(prefix) + 7 * len(unit)
+    assert detector.period == len(unit)
+    assert detector.loops_to_end()
+
+
+def test_loop_that_ends_is_not_rejected_whole():
+    unit = "I need to check the population figure for the city again. "
+    text = "Checking.\n" + unit * 8 + "The population is 2.1 million.\n\\boxed{2.1}"
+
+    detector = RepetitionDetector(window=50, max_repeats=5)
+    assert detector.feed(text)
+    assert not detector.loops_to_end()
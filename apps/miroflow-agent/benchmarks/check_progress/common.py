@@ -1,15 +1,24 @@
 # Copyright (c) 2025 MiroMind
 # This source code is licensed under the MIT License.
 
-import glob
 import json
 import math
 import os
 import re
+import sys
 from dataclasses import dataclass
 from datetime import datetime
 from io import StringIO
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# The scripts run standalone: import the stdlib-only logging modules directly,
+# since importing the src package would load the whole agent
+LOGGING_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../src/logging")
+)
+sys.path.insert(0, LOGGING_DIR)
+
+from task_index import read_task_log_header, scan_task_logs  # noqa: E402
 
 # Time estimation constants
 DEFAULT_TASK_TIME_MINUTES = 3.5
@@ -51,23 +60,33 @@ def create_progress_bar(percentage: float, width: int = PROGRESS_BAR_WIDTH) -> s
     return f"{color}[{bar}] {percentage:.1f}%{reset}"
 
 
-def find_earliest_start_time(completed_files: List[str]) -> Optional[datetime]:
-    """Find the earliest start time from all completed files"""
+def _load_timing_fields(item: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Return the timing fields of a task log given its index record or path"""
+    if isinstance(item, dict):
+        return item
+    # Timestamps sit in the log header, no need to load the whole trace
+    return read_task_log_header(item)
+
+
+def _parse_naive_time(time_str: str) -> datetime:
+    """Parse an ISO timestamp (optionally UTC 'Z') into a naive datetime"""
+    if time_str.endswith("Z"):
+        time_str = time_str[:-1] + "+00:00"
+    return datetime.fromisoformat(time_str).replace(tzinfo=None)
+
+
+def find_earliest_start_time(
+    completed_files: List[Union[str, Dict[str, Any]]],
+) -> Optional[datetime]:
+    """Find the earliest start time from all completed files (paths or index records)"""
     earliest_time = None
 
-    for file_path in completed_files:
+    for item in completed_files:
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            if "start_time" in data:
-                # Parse UTC time and convert to naive datetime
-                start_time_str = data["start_time"]
-                if start_time_str.endswith("Z"):
-                    start_time_str = start_time_str[:-1] + "+00:00"
-                start_time = datetime.fromisoformat(start_time_str)
-                # Convert to naive datetime for comparison
-                start_time = start_time.replace(tzinfo=None)
+            data = _load_timing_fields(item)
+
+            if data.get("start_time"):
+                start_time = _parse_naive_time(data["start_time"])
 
                 if earliest_time is None or start_time < earliest_time:
                     earliest_time = start_time
@@ -78,23 +97,18 @@ def find_earliest_start_time(completed_files: List[str]) -> Optional[datetime]:
     return earliest_time
 
 
-def find_latest_end_time(completed_files: List[str]) -> Optional[datetime]:
-    """Find the latest end time from all completed files"""
+def find_latest_end_time(
+    completed_files: List[Union[str, Dict[str, Any]]],
+) -> Optional[datetime]:
+    """Find the latest end time from all completed files (paths or index records)"""
     latest_time = None
 
-    for file_path in completed_files:
+    for item in completed_files:
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            if "end_time" in data:
-                # Parse UTC time and convert to naive datetime
-                end_time_str = data["end_time"]
-                if end_time_str.endswith("Z"):
-                    end_time_str = end_time_str[:-1] + "+00:00"
-                end_time = datetime.fromisoformat(end_time_str)
-                # Convert to naive datetime for comparison (UTC-naive)
-                end_time = end_time.replace(tzinfo=None)
+            data = _load_timing_fields(item)
+
+            if data.get("end_time"):
+                end_time = _parse_naive_time(data["end_time"])
 
                 if latest_time is None or end_time > latest_time:
                     latest_time = end_time
@@ -124,7 +138,9 @@ def calculate_mean_and_std(values: List[float]) -> Tuple[float, float]:
 
 
 def estimate_completion_time(
-    total_tasks: int, completed_tasks: int, completed_files: List[str]
+    total_tasks: int,
+    completed_tasks: int,
+    completed_files: List[Union[str, Dict[str, Any]]],
 ) -> str:
     """Estimate completion time based on overall progress rate from all completed tasks"""
     if completed_tasks == 0:
@@ -174,6 +190,8 @@ class TaskStats:
 
     # Completed files for timing analysis
     completed_files: List[str] = None
+    # Index records of the completed files (carry start/end times)
+    completed_records: List[Dict[str, Any]] = None
 
     # Turn statistics
     total_turns: int = 0
@@ -185,6 +203,8 @@ class TaskStats:
     def __post_init__(self):
         if self.completed_files is None:
             self.completed_files = []
+        if self.completed_records is None:
+            self.completed_records = []
 
     @property
     def judge_accuracy(self) -> float:
@@ -405,61 +425,51 @@ class ProgressChecker:
         match = re.match(task_id_pattern, filename)
         return match.group(1) if match else None
 
-    def _get_latest_task_files(self, run_dir: str, task_id_pattern: str) -> List[str]:
-        """Get the latest task file for each task ID in a run directory"""
-        json_files = glob.glob(os.path.join(run_dir, "task_*.json"))
-
-        if not json_files:
-            return []
+    def _get_latest_task_records(
+        self, run_dir: str, task_id_pattern: str
+    ) -> List[Dict[str, Any]]:
+        """Get the index record of the latest task log for each task ID in a run directory"""
+        # Records come from the run's sidecar index; only new or modified
+        # logs are parsed, so repeated checks stay fast on large runs
+        records = scan_task_logs(run_dir, "task_*.json")
 
         # Group by task ID, keep only the latest file for each task
         task_groups: Dict[str, Dict] = {}
 
-        for json_file in json_files:
-            filename = os.path.basename(json_file)
+        for record in records:
+            filename = os.path.basename(record["file"])
             task_id = self._extract_task_id(filename, task_id_pattern)
+            if not task_id:
+                continue
 
-            if task_id:
+            timestamp = record["mtime"]
+            if "parse_error" in record:
+                print(
+                    f"Warning: Could not parse {record['file']}: {record['parse_error']}"
+                )
+            elif record.get("start_time"):
                 try:
-                    # Read the JSON file to get the start_time
-                    with open(json_file, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-
-                    start_time_str = data.get("start_time", "")
-                    if start_time_str:
-                        # Parse the ISO format timestamp
-                        from datetime import datetime
+                    timestamp = datetime.fromisoformat(
+                        record["start_time"].replace("Z", "+00:00")
+                    ).timestamp()
+                except ValueError as e:
+                    # Fallback to file modification time if start_time is invalid
+                    print(f"Warning: Could not parse {record['file']}: {e}")
 
-                        start_time = datetime.fromisoformat(
-                            start_time_str.replace("Z", "+00:00")
-                        )
-                        start_timestamp = start_time.timestamp()
-                    else:
-                        # Fallback to file modification time if start_time is not available
-                        start_timestamp = os.path.getmtime(json_file)
+            if (
+                task_id not in task_groups
+                or timestamp > task_groups[task_id]["timestamp"]
+            ):
+                task_groups[task_id] = {"record": record, "timestamp": timestamp}
 
-                    if (
-                        task_id not in task_groups
-                        or start_timestamp > task_groups[task_id]["timestamp"]
-                    ):
-                        task_groups[task_id] = {
-                            "file": json_file,
-                            "timestamp": start_timestamp,
-                        }
-                except (json.JSONDecodeError, ValueError, OSError) as e:
-                    # Fallback to file modification time if JSON parsing fails
-                    print(f"Warning: Could not parse {json_file}: {e}")
-                    file_mtime = os.path.getmtime(json_file)
-                    if (
-                        task_id not in task_groups
-                        or file_mtime > task_groups[task_id]["timestamp"]
-                    ):
-                        task_groups[task_id] = {
-                            "file": json_file,
-                            "timestamp": file_mtime,
-                        }
+        return [info["record"] for info in task_groups.values()]
 
-        return [info["file"] for info in task_groups.values()]
+    def _get_latest_task_files(self, run_dir: str, task_id_pattern: str) -> List[str]:
+        """Get the latest task file for each task ID in a run directory"""
+        return [
+            record["file"]
+            for record in self._get_latest_task_records(run_dir, task_id_pattern)
+        ]
 
     def _is_task_completed(self, data: Dict) -> bool:
         """Check if a task is completed based on its data"""
@@ -495,6 +505,9 @@ class ProgressChecker:
 
     def _calculate_turns(self, data: Dict) -> int:
         """Calculate number of turns from task data (excluding system prompt)"""
+        # Index records carry a precomputed turn count
+        if "turns" in data:
+            return data["turns"] or 0
         try:
             main_agent_history = data.get("main_agent_message_history", {})
             message_history = main_agent_history.get("message_history", [])
@@ -523,17 +536,19 @@ class ProgressChecker:
         Returns:
             Tuple[TaskStats, Dict[str, bool]]: Statistics and a mapping of task_id -> is_correct
         """
-        latest_files = self._get_latest_task_files(run_dir, task_id_pattern)
+        latest_records = self._get_latest_task_records(run_dir, task_id_pattern)
 
         # Use the correct total tasks
         stats = TaskStats(total=self.total_tasks_per_run)
         completed_files = []  # Track completed files for timing analysis
+        completed_records = []
         task_results = {}  # Track task_id -> is_correct mapping
 
-        for json_file in latest_files:
+        for data in latest_records:
+            json_file = data["file"]
             try:
-                with open(json_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+                if "parse_error" in data:
+                    raise IOError(data["parse_error"])
 
                 status = data.get("status", "")
 
@@ -542,6 +557,7 @@ class ProgressChecker:
                 elif self._is_task_completed(data):
                     stats.completed += 1
                     completed_files.append(json_file)  # Track for timing analysis
+                    completed_records.append(data)
 
                     # Check judge result for completed tasks
                     judge_result = data.get("final_judge_result", None)
@@ -585,6 +601,7 @@ class ProgressChecker:
 
         # Store completed files in stats for timing analysis
         stats.completed_files = completed_files
+        stats.completed_records = completed_records
         return stats, task_results
 
     def run_analysis(
@@ -594,7 +611,7 @@ class ProgressChecker:
         self.run_dirs = self.find_run_directories()
         summary = SummaryStats()
         run_stats_list = []  # Store statistics for each run
-        all_completed_files = []  # Collect all completed files for timing analysis
+        all_completed_files = []  # Collect completed index records for timing analysis
         all_task_results = {}  # Collect task_id -> list of is_correct across all runs
 
         print()
@@ -631,7 +648,7 @@ class ProgressChecker:
             run_stats_list.append((run_name, stats))
 
             # Collect completed files for timing analysis
-            all_completed_files.extend(stats.completed_files)
+            all_completed_files.extend(stats.completed_records)
 
             # Collect task results for Pass@n calculation
             for task_id, is_correct in task_results.items():
@@ -1019,17 +1036,19 @@ class GAIAProgressChecker(ProgressChecker):
         Returns:
             Tuple[GAIATaskStats, Dict[str, bool]]: Statistics and a mapping of task_id -> is_correct
         """
-        latest_files = self._get_latest_task_files(
+        latest_records = self._get_latest_task_records(
             run_dir, task_id_pattern
         )  # 直接用父类的实现
-        stats = GAIATaskStats(total=len(latest_files))
+        stats = GAIATaskStats(total=len(latest_records))
         completed_files = []
+        completed_records = []
         task_results = {}  # Track task_id -> is_correct mapping
 
-        for json_file in latest_files:
+        for data in latest_records:
+            json_file = data["file"]
             try:
-                with open(json_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+                if "parse_error" in data:
+                    raise ValueError(data["parse_error"])
 
                 status = data.get("status", "")
                 if status == "running":
@@ -1037,6 +1056,7 @@ class GAIAProgressChecker(ProgressChecker):
                 elif self._is_task_completed(data):
                     stats.completed += 1
                     completed_files.append(json_file)
+                    completed_records.append(data)
 
                     judge_result = data.get("final_judge_result", None)
                     is_correct = judge_result is not None and self._is_judge_correct(
@@ -1072,6 +1092,7 @@ class GAIAProgressChecker(ProgressChecker):
                 stats.failed += 1
 
         stats.completed_files = completed_files
+        stats.completed_records = completed_records
         return stats, task_results
 
     def run_analysis(
@@ -1081,7 +1102,7 @@ class GAIAProgressChecker(ProgressChecker):
         self.run_dirs = self.find_run_directories()
         summary = GAIASummaryStats()
         run_stats_list = []  # Store statistics for each run
-        all_completed_files = []  # Collect all completed files for timing analysis
+        all_completed_files = []  # Collect completed index records for timing analysis
         all_task_results = {}  # Collect task_id -> list of is_correct across all runs
 
         print()
@@ -1118,7 +1139,7 @@ class GAIAProgressChecker(ProgressChecker):
             run_stats_list.append((run_name, stats))
 
             # Collect completed files for timing analysis
-            all_completed_files.extend(stats.completed_files)
+            all_completed_files.extend(stats.completed_records)
 
             # Collect task results for Pass@n calculation
             for task_id, is_correct in task_results.items():
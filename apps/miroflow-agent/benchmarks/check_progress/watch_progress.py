@@ -0,0 +1,199 @@
+# Copyright (c) 2025 MiroMind
+# This source code is licensed under the MIT License.
+
+"""
+Live progress dashboard for running benchmarks.
+
+Tails the progress_events.jsonl files written by the benchmark runner (one per
+run directory) and shows throughput, ETA, token usage and per-tool latency
+percentiles, without re-reading any task log. Optionally serves the same
+snapshot as JSON over HTTP.
+
+Usage:
+    python watch_progress.py <benchmark_dir_or_run_dir> [--interval 5] [--once]
+    python watch_progress.py <benchmark_dir> --http 8765
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from glob import glob
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+# Importing common puts the agent's src/logging directory on sys.path
+from common import create_progress_bar, estimate_completion_time
+from progress_events import (
+    PROGRESS_EVENTS_FILENAME,
+    ProgressAggregator,
+    read_progress_events,
+)
+
+DEFAULT_INTERVAL_SECONDS = 5.0
+TOP_TOOLS = 15
+
+
+class ProgressWatcher:
+    """Follow the event files of a benchmark directory and keep live statistics"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.aggregator = ProgressAggregator()
+        self.offsets: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def _find_event_files(self) -> List[str]:
+        """Event file of a single run directory, or of each run_* subdirectory"""
+        files = glob(os.path.join(self.path, PROGRESS_EVENTS_FILENAME))
+        files += glob(os.path.join(self.path, "*", PROGRESS_EVENTS_FILENAME))
+        return sorted(files)
+
+    def poll(self):
+        """Read events appended since the last poll"""
+        for file_path in self._find_event_files():
+            events, offset = read_progress_events(
+                file_path, self.offsets.get(file_path, 0)
+            )
+            self.offsets[file_path] = offset
+            if events:
+                with self.lock:
+                    self.aggregator.consume(file_path, events)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current statistics, including the ETA string"""
+        with self.lock:
+            snapshot = self.aggregator.snapshot()
+            snapshot["eta"] = estimate_completion_time(
+                snapshot["total_tasks"],
+                snapshot["completed"],
+                self.aggregator.completed_records(),
+            )
+        snapshot["event_files"] = len(self.offsets)
+        return snapshot
+
+
+def render(snapshot: Dict[str, Any]) -> str:
+    """Format a snapshot as a terminal dashboard"""
+    total = snapshot["total_tasks"]
+    completed = snapshot["completed"]
+    percentage = completed / total * 100 if total else 0.0
+    last_event = snapshot["last_event_age_s"]
+
+    lines = [
+        "=" * 80,
+        f"BENCHMARK PROGRESS  ({time.strftime('%Y-%m-%d %H:%M:%S')})",
+        "=" * 80,
+        f"Runs:          {snapshot['runs_finished']}/{snapshot['runs']} finished"
+        f"  ({snapshot['event_files']} event files)",
+        f"Tasks:         {completed}/{total} completed, {snapshot['running']} running",
+        f"Progress:      {create_progress_bar(percentage)}",
+        f"Accuracy:      {snapshot['correct']}/{completed}"
+        f" ({snapshot['accuracy']:.1f}%)",
+        f"Elapsed:       {snapshot['elapsed_minutes']:.1f} minutes",
+        f"Throughput:    {snapshot['tasks_per_minute']:.2f} tasks/min overall,"
+        f" {snapshot['recent_tasks_per_minute']:.2f} tasks/min recently",
+        f"ETA:           {snapshot['eta']}",
+        f"Turns:         {snapshot['turns']}"
+        f" ({snapshot['compactions']} context compactions)",
+        f"Tokens:        {snapshot['input_tokens']:,} input,"
+        f" {snapshot['output_tokens']:,} output,"
+        f" {snapshot['tokens_per_task']:,.0f} per task",
+        f"Task time:     {snapshot['mean_task_minutes']:.1f} minutes on average",
+        f"Budget:        {snapshot['budget_warnings']} warnings,"
+        f" {snapshot['budget_stops']} runs stopped",
+        "Last event:    "
+        + (f"{last_event:.0f}s ago" if last_event is not None else "none yet"),
+    ]
+
+    tools = sorted(
+        snapshot["tools"].items(), key=lambda item: item[1]["calls"], reverse=True
+    )
+    if tools:
+        lines += [
+            "",
+            f"{'Tool':<40} {'Calls':>7} {'Cached':>7} {'Errors':>7}"
+            f" {'p50 ms':>8} {'p95 ms':>8}",
+            "-" * 80,
+        ]
+        for tool, stats in tools[:TOP_TOOLS]:
+            lines.append(
+                f"{tool[:40]:<40} {stats['calls']:>7} {stats.get('cached', 0):>7}"
+                f" {stats['errors']:>7} {stats['p50_ms']:>8.0f} {stats['p95_ms']:>8.0f}"
+            )
+        if len(tools) > TOP_TOOLS:
+            lines.append(f"... and {len(tools) - TOP_TOOLS} more tools")
+    return "\n".join(lines)
+
+
+def serve_http(watcher: ProgressWatcher, port: int) -> ThreadingHTTPServer:
+    """Serve the latest snapshot as JSON on GET / in a background thread"""
+
+    class SnapshotHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = json.dumps(watcher.snapshot(), indent=2).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Keep the terminal dashboard clean
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), SnapshotHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Live progress of benchmark runs from their progress events."
+    )
+    parser.add_argument("path", help="Benchmark directory or single run directory")
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_INTERVAL_SECONDS,
+        help="Refresh interval in seconds",
+    )
+    parser.add_argument(
+        "--once", action="store_true", help="Print a single snapshot and exit"
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Print snapshots as JSON instead"
+    )
+    parser.add_argument(
+        "--http", type=int, metavar="PORT", help="Also serve snapshots as JSON"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if not os.path.isdir(args.path):
+        print(f"Error: Directory not found: {args.path}")
+        raise SystemExit(1)
+
+    watcher = ProgressWatcher(args.path)
+    if args.http:
+        serve_http(watcher, args.http)
+        print(f"Serving progress snapshots on http://0.0.0.0:{args.http}/")
+
+    try:
+        while True:
+            watcher.poll()
+            snapshot = watcher.snapshot()
+            if args.json:
+                print(json.dumps(snapshot, indent=2))
+            else:
+                if not args.once:
+                    print("\033[2J\033[H", end="")  # Clear screen
+                print(render(snapshot))
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
@@ -7,8 +7,9 @@ import json
 import os
 import random
 import re
+import time
 from abc import ABC
-from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from dataclasses import asdict, dataclass, field
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
@@ -18,20 +19,53 @@ import hydra
 # Import from the new modular structure
 from evaluators.eval_utils import verify_answer_for_datasets
 from omegaconf import DictConfig, OmegaConf
+from src.core.evidence_store import EvidenceStore
 from src.core.pipeline import (
     create_pipeline_components,
     execute_task_pipeline,
 )
+from src.core.task_budget import TaskBudget
+from src.logging.metrics import (
+    ACTIVE_TASKS,
+    DEFAULT_SNAPSHOT_SECONDS,
+    FORMAT_RETRIES,
+    METRICS_DIRNAME,
+    QUEUED_TASKS,
+    TASKS,
+    MetricsSnapshotWriter,
+)
+from src.logging.progress_events import (
+    ATTEMPT_END,
+    PROGRESS_EVENTS_FILENAME,
+    RUN_END,
+    RUN_START,
+    SCHEDULE,
+    SPECULATE,
+    TASK_END,
+    TASK_START,
+    ProgressEventWriter,
+)
+from src.logging.run_state import RunStateStore
 from src.logging.summary_time_cost import generate_summary
+from src.logging.task_index import index_task_log
+from src.logging.tracing import TRACES_FILENAME
 from src.utils.prompt_utils import (
     FAILURE_EXPERIENCE_FOOTER,
     FAILURE_EXPERIENCE_HEADER,
     FAILURE_EXPERIENCE_ITEM,
     FORMAT_ERROR_MESSAGE,
 )
+from task_scheduler import TaskScheduler
+
+
+# How often the parent looks for stragglers when speculative attempts are on
+SPECULATION_POLL_SECONDS = 30
+
+# Metrics snapshot writer of this process, by snapshot file
+_metrics_writers: Dict[Path, MetricsSnapshotWriter] = {}
 
 
-def _task_worker(task_dict, cfg_dict, evaluator_kwargs):
+def _task_worker(task_dict, cfg_dict, evaluator_kwargs, speculative=False):
     """
     Worker function to run a single task in a separate process.
     This function is called by ProcessPoolExecutor and must be at module level.
@@ -63,6 +97,7 @@ def _task_worker(task_dict, cfg_dict, evaluator_kwargs):
         ground_truth_field=evaluator_kwargs.get("ground_truth_field", "ground_truth"),
         file_name_field=evaluator_kwargs.get("file_name_field"),
     )
+    evaluator.run_token = evaluator_kwargs.get("run_token")
 
     # Run task in new event loop
     loop = asyncio.new_event_loop()
@@ -76,7 +111,9 @@ def _task_worker(task_dict, cfg_dict, evaluator_kwargs):
     loop.set_exception_handler(exception_handler)
 
     try:
-        result = loop.run_until_complete(evaluator.run_single_task(task))
+        result = loop.run_until_complete(
+            evaluator.run_single_task(task, speculative=speculative)
+        )
         # Convert result to dict for serialization
         return asdict(result)
     finally:
@@ -117,6 +154,32 @@ class BenchmarkResult:
     k_value: int = 1  # The k value used for this evaluation
 
 
+def merge_attempt_results(
+    primary: BenchmarkResult, extra: BenchmarkResult
+) -> BenchmarkResult:
+    """
+    Merge the result of a speculative worker into the primary result of a task.
+
+    Both workers claim disjoint attempts, so the merged result holds the union
+    of their attempts and passes if either found a correct answer.
+    """
+    attempts = {a["attempt_number"]: a for a in extra.attempts}
+    attempts.update({a["attempt_number"]: a for a in primary.attempts})
+    primary.attempts = [attempts[number] for number in sorted(attempts)]
+
+    if not primary.model_boxed_answer and extra.model_boxed_answer:
+        primary.model_boxed_answer = extra.model_boxed_answer
+        primary.log_file_path = extra.log_file_path
+        primary.status = extra.status
+        primary.error_message = extra.error_message
+
+    if extra.pass_at_k_success:
+        primary.pass_at_k_success = True
+        primary.final_judge_result = "PASS_AT_K_SUCCESS"
+        primary.judge_type = "pass_at_k"
+    return primary
+
+
 class BenchmarkEvaluator(ABC):
     """Abstract base class for benchmark evaluators"""
 
@@ -155,372 +218,757 @@ class BenchmarkEvaluator(ABC):
             f"Pipeline components initialized successfully! Using pass@{self.pass_at_k}"
         )
 
+        # Structured progress events for live monitoring (watch_progress.py)
+        self.progress_events = None
+        if cfg.benchmark.execution.get("progress_events", True):
+            self.progress_events = ProgressEventWriter(
+                self.get_log_dir() / PROGRESS_EVENTS_FILENAME
+            )
+
+        # Durable attempt/retry state used to resume interrupted runs
+        self.run_state = RunStateStore(self.get_log_dir())
+
+        # Task scheduling: "shuffle" or "longest_first" (by predicted cost);
+        # speculative attempts duplicate stragglers onto idle workers (pass@k > 1)
+        self.scheduling = cfg.benchmark.execution.get("scheduling", "shuffle")
+        self.speculative_attempts = (
+            cfg.benchmark.execution.get("speculative_attempts", False)
+            and self.pass_at_k > 1
+        )
+        # Shared by all workers of a run; set only when attempts are claimed
+        self.run_token: Optional[str] = None
+
+        # Number of pass@k attempts of one task run at the same time
+        self.concurrent_attempts = max(
+            1, cfg.benchmark.execution.get("concurrent_attempts", 1)
+        )
+
+        # Search/scrape results shared by the format retries and pass@k
+        # attempts of a task; optionally listed in the retry prompts
+        self.evidence_store = cfg.benchmark.execution.get("evidence_store", True)
+        self.evidence_prompt = cfg.benchmark.execution.get("evidence_prompt", False)
+        self.traces = cfg.benchmark.execution.get("traces", True)
+
+        # Every process of the run writes its metrics to metrics/<pid>.prom
+        self.metrics_snapshot_seconds = cfg.benchmark.execution.get(
+            "metrics_snapshot_seconds", DEFAULT_SNAPSHOT_SECONDS
+        )
+
     def get_log_dir(self) -> Path:
         """Get the log directory for the current benchmark and model."""
         return Path(hydra.core.hydra_config.HydraConfig.get().run.dir)
 
-    async def run_single_task(self, task: BenchmarkTask) -> BenchmarkResult:
+    def _metrics_snapshots(self) -> Optional[MetricsSnapshotWriter]:
+        """This process's metrics snapshot writer, started on first use"""
+        if not self.metrics_snapshot_seconds:
+            return None
+        worker = str(os.getpid())
+        path = self.get_log_dir() / METRICS_DIRNAME / f"{worker}.prom"
+        writer = _metrics_writers.get(path)
+        if writer is None:
+            writer = _metrics_writers[path] = MetricsSnapshotWriter(
+                path,
+                interval_seconds=self.metrics_snapshot_seconds,
+                const_labels={"worker": worker},
+            ).start()
+        return writer
+
+    def _emit_progress(self, event: str, **fields):
+        """Emit a progress event if progress events are enabled."""
+        if self.progress_events:
+            self.progress_events.emit(event, **fields)
+
+    def _load_failure_experience_from_log(
+        self, task_id: str, attempt: int, format_retry: int
+    ) -> Optional[str]:
+        """Read the failure experience of a retry from its task log (runs without run state)"""
+        logs_dir = self.get_log_dir()
+        prev_log_pattern = (
+            f"task_{task_id}_attempt-{attempt}_format-retry-{format_retry}_*.json"
+        )
+        prev_logs = sorted(list(logs_dir.glob(prev_log_pattern)))
+        if not prev_logs:
+            return None
+        prev_log_file = prev_logs[-1]  # Get the latest one
+        try:
+            with open(prev_log_file, "r", encoding="utf-8") as f:
+                prev_log_data = json.load(f)
+            # Extract failure experience from trace_data
+            trace_data = prev_log_data.get("trace_data", {})
+            return trace_data.get("failure_experience_summary")
+        except Exception as e:
+            print(f"      Warning: Failed to load previous log {prev_log_file}: {e}")
+            return None
+
+    def _claim_attempt(
+        self, task: BenchmarkTask, attempt: int, speculative: bool
+    ) -> Optional[str]:
         """
-        Run inference for a single benchmark task with pass@k support
+        Coordinate an attempt with other workers of the same task.
+
+        Returns:
+            None to run the attempt, "skip" if another worker claimed it, or
+            "stop" if another worker already found a correct answer.
+        """
+        if self.run_token is None:
+            return None
+        if (speculative or attempt > 1) and self.run_state.has_correct_attempt(
+            task.task_id
+        ):
+            print(
+                f"  Another worker found a correct answer for task {task.task_id}, stopping"
+            )
+            return "stop"
+        if not self.run_state.claim_attempt(
+            task.task_id, attempt, str(os.getpid()), self.run_token
+        ):
+            print(f"  Attempt {attempt} is handled by another worker")
+            return "skip"
+        return None
+
+    async def _run_attempt(
+        self,
+        task: BenchmarkTask,
+        attempt: int,
+        task_description: str,
+        task_file_path: Optional[str],
+        pipeline_components: Optional[Tuple[Any, Any, Any]] = None,
+        budget: Optional[TaskBudget] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run (or resume) one pass@k attempt, including format retries and judging.
 
         Args:
             task: BenchmarkTask object
+            attempt: Attempt number (1-based), used in the log file names
+            task_description: Prepared task description
+            task_file_path: Prepared task file path
+            pipeline_components: Tool managers and output formatter to use;
+                concurrent attempts need their own, as ToolManager holds the
+                current task log. Defaults to the evaluator's shared ones.
+            budget: Budget of the task, shared by all its attempts and format
+                retries (optional)
 
         Returns:
-            BenchmarkResult object
+            Attempt result dictionary
         """
-        print(f"Processing task {task.task_id} with pass@{self.pass_at_k}")
-
-        result = BenchmarkResult(
-            task_id=task.task_id,
-            task_question=task.task_question,
-            ground_truth=task.ground_truth,
-            file_path=task.file_path,
-            model_boxed_answer="",
-            status="pending",
-            metadata=task.metadata.copy(),
-            k_value=self.pass_at_k,
-        )
-
         logs_dir = self.get_log_dir()
-        found_correct_answer = False
+        (
+            main_agent_tool_manager,
+            sub_agent_tool_managers,
+            output_formatter,
+        ) = pipeline_components or (
+            self.main_agent_tool_manager,
+            self.sub_agent_tool_managers,
+            self.output_formatter,
+        )
 
-        # Print debug info about log directory
-        print(f"  Current log directory: {logs_dir}")
+        print(f"  Attempt {attempt}/{self.pass_at_k} for task {task.task_id}")
+        format_retry_count = 0
+        attempt_start_time = time.time()
+
+        # Resume from the run state store; fall back to the task logs
+        # for runs started before it existed
+        saved_state = self.run_state.latest_retry(task.task_id, attempt)
+
+        # Check if log file exists for this specific attempt in current directory
+        log_pattern = f"task_{task.task_id}_attempt-{attempt}_*.json"
+        matching_logs = []
+
+        # Search only in current log directory
+        if saved_state is None and logs_dir.exists():
+            dir_logs = sorted(list(logs_dir.glob(log_pattern)))
+            if dir_logs:
+                matching_logs.extend(dir_logs)
+
+        if matching_logs:
+            # Sort by timestamp in filename to get the most recent
+            def extract_timestamp(file_path):
+                filename = file_path.name
+                # Extract timestamp from filename like: task_xxx_attempt-1_format-retry-0_2025-08-13-10-13-20.json
+                # The timestamp is the last part before .json
+                if "_" in filename and filename.endswith(".json"):
+                    timestamp_part = filename.split("_")[-1].replace(".json", "")
+                    # Convert timestamp to datetime for proper sorting
+                    from datetime import datetime
+
+                    return datetime.strptime(timestamp_part, "%Y-%m-%d-%H-%M-%S")
+                return filename
+
+            matching_logs = sorted(matching_logs, key=extract_timestamp)
+
+        attempt_result = {
+            "attempt_number": attempt,
+            "model_boxed_answer": "",
+            "status": "pending",
+            "log_file_path": None,
+            "final_judge_result": None,
+            "judge_type": None,
+            "is_correct": False,
+        }
 
-        try:
-            # Prepare task
-            task_description, task_file_path = self.prepare_task_description(task)
+        # Try to load existing result for this attempt
+        if saved_state is not None:
+            attempt_result["log_file_path"] = saved_state["log_file_path"]
+            format_retry_count = saved_state["format_retry"]
+            print(
+                f"    Found saved state for attempt {attempt}: format retry {format_retry_count} ({saved_state['status']})"
+            )
+            if saved_state["status"] == "success":
+                format_retry_count += 1
+            if saved_state["boxed_answer"]:
+                attempt_result["model_boxed_answer"] = saved_state["boxed_answer"]
+                attempt_result["status"] = saved_state["status"]
+                if saved_state["judge_result"]:
+                    attempt_result["final_judge_result"] = saved_state["judge_result"]
+                    attempt_result["judge_type"] = saved_state["judge_type"] or ""
+                    attempt_result["is_correct"] = (
+                        saved_state["judge_result"] == "CORRECT"
+                    )
+                    if saved_state["eval_details"]:
+                        attempt_result["eval_details"] = saved_state["eval_details"]
+                print(
+                    f"    Loaded saved result: {attempt_result['model_boxed_answer']}"
+                )
+        elif matching_logs:
+            log_file = matching_logs[-1]
+            attempt_result["log_file_path"] = str(log_file)
+            print(f"    Found existing log for attempt {attempt}: {log_file.name}")
+
+            match = re.search(r"retry-(\d+)", os.path.basename(str(log_file)))
+            if match:
+                format_retry_count = int(match.group(1))
+            else:
+                raise ValueError(
+                    f"Failed to extract retry number from log file: {log_file}"
+                )
 
-            # Run up to k attempts (with early stopping when correct answer found)
-            for attempt in range(1, self.pass_at_k + 1):
-                print(f"  Attempt {attempt}/{self.pass_at_k} for task {task.task_id}")
-                format_retry_count = 0
-
-                # Check if log file exists for this specific attempt in current directory
-                log_pattern = f"task_{task.task_id}_attempt-{attempt}_*.json"
-                matching_logs = []
-
-                # Search only in current log directory
-                if logs_dir.exists():
-                    dir_logs = sorted(list(logs_dir.glob(log_pattern)))
-                    if dir_logs:
-                        matching_logs.extend(dir_logs)
-
-                if matching_logs:
-                    # Sort by timestamp in filename to get the most recent
-                    def extract_timestamp(file_path):
-                        filename = file_path.name
-                        # Extract timestamp from filename like: task_xxx_attempt-1_format-retry-0_2025-08-13-10-13-20.json
-                        # The timestamp is the last part before .json
-                        if "_" in filename and filename.endswith(".json"):
-                            timestamp_part = filename.split("_")[-1].replace(
-                                ".json", ""
+            try:
+                with open(log_file) as f:
+                    log_data = json.loads(f.read())
+                    # Backfill the run state so later resumes skip the scan
+                    self.run_state.record_retry(
+                        task.task_id,
+                        attempt,
+                        format_retry_count,
+                        status=log_data.get("status"),
+                        log_file_path=str(log_file),
+                        boxed_answer=log_data.get("final_boxed_answer") or "",
+                        failure_experience=(log_data.get("trace_data") or {}).get(
+                            "failure_experience_summary"
+                        ),
+                        judge_result=log_data.get("final_judge_result"),
+                        judge_type=log_data.get("judge_type"),
+                        eval_details=log_data.get("eval_details"),
+                    )
+                    if log_data.get("status") == "success":
+                        format_retry_count += 1
+                    if log_data.get("final_boxed_answer"):
+                        attempt_result["model_boxed_answer"] = log_data[
+                            "final_boxed_answer"
+                        ]
+                        attempt_result["status"] = log_data.get("status")
+                        # Check if we already have judge result in log
+                        if log_data.get("final_judge_result"):
+                            attempt_result["final_judge_result"] = log_data[
+                                "final_judge_result"
+                            ]
+                            attempt_result["judge_type"] = log_data.get(
+                                "judge_type", ""
                             )
-                            # Convert timestamp to datetime for proper sorting
-                            from datetime import datetime
-
-                            return datetime.strptime(
-                                timestamp_part, "%Y-%m-%d-%H-%M-%S"
+                            attempt_result["is_correct"] = (
+                                log_data["final_judge_result"] == "CORRECT"
                             )
-                        return filename
-
-                    matching_logs = sorted(matching_logs, key=extract_timestamp)
-
-                attempt_result = {
-                    "attempt_number": attempt,
-                    "model_boxed_answer": "",
-                    "status": "pending",
-                    "log_file_path": None,
-                    "final_judge_result": None,
-                    "judge_type": None,
-                    "is_correct": False,
-                }
-
-                # Try to load existing result for this attempt
-                if matching_logs:
-                    log_file = matching_logs[-1]
-                    attempt_result["log_file_path"] = str(log_file)
-                    print(
-                        f"    Found existing log for attempt {attempt}: {log_file.name}"
-                    )
-
-                    match = re.search(r"retry-(\d+)", os.path.basename(str(log_file)))
-                    if match:
-                        format_retry_count = int(match.group(1))
-                    else:
-                        raise ValueError(
-                            f"Failed to extract retry number from log file: {log_file}"
+                            # Load evaluation details if available
+                            if log_data.get("eval_details"):
+                                attempt_result["eval_details"] = log_data[
+                                    "eval_details"
+                                ]
+                        print(
+                            f"    Loaded existing result: {attempt_result['model_boxed_answer']}"
+                        )
+            except Exception as e:
+                print(f"    Error loading log file {log_file}: {e}")
+
+        # Run inference if no existing result or if we have a format error
+        if (
+            not attempt_result["model_boxed_answer"]
+            or attempt_result["model_boxed_answer"] == FORMAT_ERROR_MESSAGE
+        ):
+            # Try to get a valid response with format retry
+            print(f"TASK ID: {task.task_id}, ATTEMPT: {attempt}")
+
+            max_format_retries = self.context_compress_limit
+            evidence_store = (
+                EvidenceStore(logs_dir, task.task_id) if self.evidence_store else None
+            )
+
+            # Track accumulated failure experiences for this attempt
+            # Start with the original task description
+            current_task_description = task_description
+            failure_experiences = []
+
+            # Resume: Recover failure experiences from previous retries
+            if format_retry_count > 0 and logs_dir.exists():
+                print(
+                    f"    Resuming from retry {format_retry_count}, recovering previous failure experiences..."
+                )
+                saved_experiences = self.run_state.failure_experiences(
+                    task.task_id, attempt, format_retry_count
+                )
+                for prev_retry, prev_failure_exp in enumerate(saved_experiences):
+                    if prev_failure_exp is None:
+                        prev_failure_exp = self._load_failure_experience_from_log(
+                            task.task_id, attempt, prev_retry
+                        )
+                    if prev_failure_exp:
+                        failure_experiences.append(prev_failure_exp)
+                        print(
+                            f"      Recovered failure experience from retry {prev_retry}"
                         )
 
-                    try:
-                        with open(log_file) as f:
-                            log_data = json.loads(f.read())
-                            if log_data.get("status") == "success":
-                                format_retry_count += 1
-                            if log_data.get("final_boxed_answer"):
-                                attempt_result["model_boxed_answer"] = log_data[
-                                    "final_boxed_answer"
-                                ]
-                                attempt_result["status"] = log_data.get("status")
-                                # Check if we already have judge result in log
-                                if log_data.get("final_judge_result"):
-                                    attempt_result["final_judge_result"] = log_data[
-                                        "final_judge_result"
-                                    ]
-                                    attempt_result["judge_type"] = log_data.get(
-                                        "judge_type", ""
-                                    )
-                                    attempt_result["is_correct"] = (
-                                        log_data["final_judge_result"] == "CORRECT"
-                                    )
-                                    # Load evaluation details if available
-                                    if log_data.get("eval_details"):
-                                        attempt_result["eval_details"] = log_data[
-                                            "eval_details"
-                                        ]
-                                print(
-                                    f"    Loaded existing result: {attempt_result['model_boxed_answer']}"
-                                )
-                    except Exception as e:
-                        print(f"    Error loading log file {log_file}: {e}")
+                # Rebuild enhanced task description with recovered failure experiences
+                if failure_experiences:
+                    current_task_description += FAILURE_EXPERIENCE_HEADER
+                    for idx, exp in enumerate(failure_experiences, 1):
+                        current_task_description += FAILURE_EXPERIENCE_ITEM.format(
+                            attempt_number=idx,
+                            failure_summary=exp,
+                        )
+                    current_task_description += FAILURE_EXPERIENCE_FOOTER
+                    print(
+                        f"    Recovered {len(failure_experiences)} failure experience(s) from previous retries"
+                    )
 
-                # Run inference if no existing result or if we have a format error
-                if (
-                    not attempt_result["model_boxed_answer"]
-                    or attempt_result["model_boxed_answer"] == FORMAT_ERROR_MESSAGE
-                ):
-                    # Try to get a valid response with format retry
-                    print(f"TASK ID: {task.task_id}, ATTEMPT: {attempt}")
+            while format_retry_count <= max_format_retries:
+                try:
+                    # Check if this is the final retry (no more chances after this),
+                    # also once the task's budget is used up
+                    is_final_retry = format_retry_count == max_format_retries or (
+                        budget is not None and budget.exhausted()
+                    )
+                    pipeline_task_description = current_task_description
+                    if evidence_store is not None and self.evidence_prompt:
+                        pipeline_task_description += evidence_store.render_index()
+
+                    (
+                        response,
+                        final_boxed_answer,
+                        log_file_path,
+                        failure_experience_summary,
+                    ) = await execute_task_pipeline(
+                        cfg=self.cfg,
+                        task_id=f"{task.task_id}_attempt-{attempt}_format-retry-{format_retry_count}",
+                        task_file_name=task_file_path,
+                        task_description=pipeline_task_description,
+                        main_agent_tool_manager=main_agent_tool_manager,
+                        sub_agent_tool_managers=sub_agent_tool_managers,
+                        output_formatter=output_formatter,
+                        ground_truth=task.ground_truth,
+                        log_dir=str(self.get_log_dir()),
+                        is_final_retry=is_final_retry,
+                        progress_events=self.progress_events,
+                        evidence_store=evidence_store,
+                        trace_file=(
+                            self.get_log_dir() / TRACES_FILENAME
+                            if self.traces
+                            else None
+                        ),
+                        budget=budget,
+                    )
 
-                    max_format_retries = self.context_compress_limit
+                    attempt_result["model_boxed_answer"] = (
+                        final_boxed_answer if final_boxed_answer else ""
+                    )
+                    attempt_result["log_file_path"] = log_file_path
+                    self.run_state.record_retry(
+                        task.task_id,
+                        attempt,
+                        format_retry_count,
+                        status="success" if final_boxed_answer else "failed",
+                        log_file_path=log_file_path,
+                        boxed_answer=attempt_result["model_boxed_answer"],
+                        failure_experience=failure_experience_summary or "",
+                    )
 
-                    # Track accumulated failure experiences for this attempt
-                    # Start with the original task description
-                    current_task_description = task_description
-                    failure_experiences = []
+                    # Check for format error
+                    if attempt_result["model_boxed_answer"] == FORMAT_ERROR_MESSAGE:
+                        format_retry_count += 1
+                        FORMAT_RETRIES.inc()
+                        if format_retry_count <= max_format_retries:
+                            # Use the model-generated failure experience summary
+                            print(
+                                f"    Format error detected, using model-generated failure summary for retry {format_retry_count}..."
+                            )
 
-                    # Resume: Recover failure experiences from previous retry logs
-                    if format_retry_count > 0 and logs_dir.exists():
-                        print(
-                            f"    Resuming from retry {format_retry_count}, recovering previous failure experiences..."
-                        )
-                        for prev_retry in range(format_retry_count):
-                            prev_log_pattern = f"task_{task.task_id}_attempt-{attempt}_format-retry-{prev_retry}_*.json"
-                            prev_logs = sorted(list(logs_dir.glob(prev_log_pattern)))
-                            if prev_logs:
-                                prev_log_file = prev_logs[-1]  # Get the latest one
-                                try:
-                                    with open(
-                                        prev_log_file, "r", encoding="utf-8"
-                                    ) as f:
-                                        prev_log_data = json.load(f)
-                                        # Extract failure experience from trace_data
-                                        trace_data = prev_log_data.get("trace_data", {})
-                                        prev_failure_exp = trace_data.get(
-                                            "failure_experience_summary"
+                            if failure_experience_summary:
+                                failure_experiences.append(failure_experience_summary)
+
+                                # Build enhanced task description with accumulated failure experiences
+                                # Start fresh from original task_description each time
+                                current_task_description = task_description
+                                current_task_description += FAILURE_EXPERIENCE_HEADER
+                                for idx, exp in enumerate(failure_experiences, 1):
+                                    current_task_description += (
+                                        FAILURE_EXPERIENCE_ITEM.format(
+                                            attempt_number=idx,
+                                            failure_summary=exp,
                                         )
-                                        if prev_failure_exp:
-                                            failure_experiences.append(prev_failure_exp)
-                                            print(
-                                                f"      Recovered failure experience from retry {prev_retry}"
-                                            )
-                                except Exception as e:
-                                    print(
-                                        f"      Warning: Failed to load previous log {prev_log_file}: {e}"
                                     )
+                                current_task_description += FAILURE_EXPERIENCE_FOOTER
 
-                        # Rebuild enhanced task description with recovered failure experiences
-                        if failure_experiences:
-                            current_task_description += FAILURE_EXPERIENCE_HEADER
-                            for idx, exp in enumerate(failure_experiences, 1):
-                                current_task_description += (
-                                    FAILURE_EXPERIENCE_ITEM.format(
-                                        attempt_number=idx,
-                                        failure_summary=exp,
-                                    )
+                                print(
+                                    f"    Enhanced task description with {len(failure_experiences)} failure experience(s)"
                                 )
-                            current_task_description += FAILURE_EXPERIENCE_FOOTER
-                            print(
-                                f"    Recovered {len(failure_experiences)} failure experience(s) from previous retries"
+                            else:
+                                print(
+                                    "    No failure experience summary generated, retrying without enhancement..."
+                                )
+                            continue
+                        else:
+                            # Exceeded format retry limit
+                            attempt_result["status"] = "success"
+                            attempt_result["model_boxed_answer"] = (
+                                f"{FORMAT_ERROR_MESSAGE} (after {max_format_retries} retries)"
                             )
-
-                    while format_retry_count <= max_format_retries:
-                        try:
-                            # Check if this is the final retry (no more chances after this)
-                            is_final_retry = format_retry_count == max_format_retries
-
-                            (
-                                response,
-                                final_boxed_answer,
-                                log_file_path,
-                                failure_experience_summary,
-                            ) = await execute_task_pipeline(
-                                cfg=self.cfg,
-                                task_id=f"{task.task_id}_attempt-{attempt}_format-retry-{format_retry_count}",
-                                task_file_name=task_file_path,
-                                task_description=current_task_description,
-                                main_agent_tool_manager=self.main_agent_tool_manager,
-                                sub_agent_tool_managers=self.sub_agent_tool_managers,
-                                output_formatter=self.output_formatter,
-                                ground_truth=task.ground_truth,
-                                log_dir=str(self.get_log_dir()),
-                                is_final_retry=is_final_retry,
+                            attempt_result["error_message"] = (
+                                f"Exceeded format error retry limit ({max_format_retries})"
                             )
+                            break
+                    else:
+                        # Got valid response, success
+                        attempt_result["status"] = "success"
+                        break
 
-                            attempt_result["model_boxed_answer"] = (
-                                final_boxed_answer if final_boxed_answer else ""
-                            )
-                            attempt_result["log_file_path"] = log_file_path
-
-                            # Check for format error
-                            if (
-                                attempt_result["model_boxed_answer"]
-                                == FORMAT_ERROR_MESSAGE
-                            ):
-                                format_retry_count += 1
-                                if format_retry_count <= max_format_retries:
-                                    # Use the model-generated failure experience summary
-                                    print(
-                                        f"    Format error detected, using model-generated failure summary for retry {format_retry_count}..."
-                                    )
+                except Exception as e:
+                    attempt_result["status"] = "failed"
+                    attempt_result["error_message"] = str(e)
+                    self.run_state.record_retry(
+                        task.task_id,
+                        attempt,
+                        format_retry_count,
+                        status="failed",
+                        error_message=str(e),
+                    )
+                    print(
+                        f"    Error in attempt {attempt}, format retry {format_retry_count}: {e}"
+                    )
+                    break
 
-                                    if failure_experience_summary:
-                                        failure_experiences.append(
-                                            failure_experience_summary
-                                        )
+        # Perform LLM verification if we have an answer and haven't verified yet
+        if (
+            attempt_result["model_boxed_answer"]
+            and attempt_result["final_judge_result"] is None
+            and task.ground_truth is not None
+        ):
+            print(f"    Verifying answer for attempt {attempt}...")
+            try:
+                (
+                    evaluation_result,
+                    judge_type,
+                    eval_details,
+                ) = await verify_answer_for_datasets(
+                    benchmark_name=self.benchmark_name,
+                    question=task.task_question,
+                    target=task.ground_truth,
+                    predicted_answer=attempt_result["model_boxed_answer"],
+                    metadata=task.metadata,
+                )
+                attempt_result["final_judge_result"] = evaluation_result
+                attempt_result["judge_type"] = judge_type
+                attempt_result["is_correct"] = evaluation_result == "CORRECT"
+
+                # Store evaluation details (e.g., for DeepSearchQA metrics)
+                if eval_details:
+                    attempt_result["eval_details"] = eval_details
+
+                self.run_state.record_judge(
+                    task.task_id,
+                    attempt,
+                    evaluation_result,
+                    judge_type,
+                    eval_details,
+                )
 
-                                        # Build enhanced task description with accumulated failure experiences
-                                        # Start fresh from original task_description each time
-                                        current_task_description = task_description
-                                        current_task_description += (
-                                            FAILURE_EXPERIENCE_HEADER
-                                        )
-                                        for idx, exp in enumerate(
-                                            failure_experiences, 1
-                                        ):
-                                            current_task_description += (
-                                                FAILURE_EXPERIENCE_ITEM.format(
-                                                    attempt_number=idx,
-                                                    failure_summary=exp,
-                                                )
-                                            )
-                                        current_task_description += (
-                                            FAILURE_EXPERIENCE_FOOTER
-                                        )
+                # Update the log file with verification result
+                if attempt_result["log_file_path"]:
+                    self._update_log_file_with_evaluation(
+                        attempt_result["model_boxed_answer"],
+                        attempt_result["log_file_path"],
+                        evaluation_result,
+                        judge_type,
+                        eval_details,  # Pass eval_details to save in log file
+                    )
 
-                                        print(
-                                            f"    Enhanced task description with {len(failure_experiences)} failure experience(s)"
-                                        )
-                                    else:
-                                        print(
-                                            "    No failure experience summary generated, retrying without enhancement..."
-                                        )
-                                    continue
-                                else:
-                                    # Exceeded format retry limit
-                                    attempt_result["status"] = "success"
-                                    attempt_result["model_boxed_answer"] = (
-                                        f"{FORMAT_ERROR_MESSAGE} (after {max_format_retries} retries)"
-                                    )
-                                    attempt_result["error_message"] = (
-                                        f"Exceeded format error retry limit ({max_format_retries})"
-                                    )
-                                    break
-                            else:
-                                # Got valid response, success
-                                attempt_result["status"] = "success"
-                                break
+                if attempt_result["is_correct"]:
+                    print(f"    ✅ Attempt {attempt}: CORRECT!")
+                else:
+                    print(f"    ❌ Attempt {attempt}: INCORRECT ({evaluation_result})")
 
-                        except Exception as e:
-                            attempt_result["status"] = "failed"
-                            attempt_result["error_message"] = str(e)
-                            print(
-                                f"    Error in attempt {attempt}, format retry {format_retry_count}: {e}"
-                            )
-                            break
+            except Exception as e:
+                print(f"    Error verifying attempt {attempt}: {e}")
+                attempt_result["final_judge_result"] = "ERROR"
+                attempt_result["judge_type"] = "error"
+                attempt_result["is_correct"] = False
 
-                # Perform LLM verification if we have an answer and haven't verified yet
-                if (
-                    attempt_result["model_boxed_answer"]
-                    and attempt_result["final_judge_result"] is None
-                    and task.ground_truth is not None
-                ):
-                    print(f"    Verifying answer for attempt {attempt}...")
-                    try:
-                        (
-                            evaluation_result,
-                            judge_type,
-                            eval_details,
-                        ) = await verify_answer_for_datasets(
-                            benchmark_name=self.benchmark_name,
-                            question=task.task_question,
-                            target=task.ground_truth,
-                            predicted_answer=attempt_result["model_boxed_answer"],
-                            metadata=task.metadata,
-                        )
-                        attempt_result["final_judge_result"] = evaluation_result
-                        attempt_result["judge_type"] = judge_type
-                        attempt_result["is_correct"] = evaluation_result == "CORRECT"
-
-                        # Store evaluation details (e.g., for DeepSearchQA metrics)
-                        if eval_details:
-                            attempt_result["eval_details"] = eval_details
-
-                        # Update the log file with verification result
-                        if attempt_result["log_file_path"]:
-                            self._update_log_file_with_evaluation(
-                                attempt_result["model_boxed_answer"],
-                                attempt_result["log_file_path"],
-                                evaluation_result,
-                                judge_type,
-                                eval_details,  # Pass eval_details to save in log file
-                            )
+        elif attempt_result["is_correct"]:
+            print(f"    ✅ Attempt {attempt}: CORRECT (cached)")
 
-                        if attempt_result["is_correct"]:
-                            print(f"    ✅ Attempt {attempt}: CORRECT!")
-                            found_correct_answer = True
-                        else:
-                            print(
-                                f"    ❌ Attempt {attempt}: INCORRECT ({evaluation_result})"
-                            )
+        elif attempt_result["final_judge_result"]:
+            print(
+                f"    ❌ Attempt {attempt}: INCORRECT (cached: {attempt_result['final_judge_result']})"
+            )
+        else:
+            print(f"    ⚠️  Attempt {attempt}: No valid answer to verify")
 
-                    except Exception as e:
-                        print(f"    Error verifying attempt {attempt}: {e}")
-                        attempt_result["final_judge_result"] = "ERROR"
-                        attempt_result["judge_type"] = "error"
-                        attempt_result["is_correct"] = False
+        self._emit_progress(
+            ATTEMPT_END,
+            task_id=task.task_id,
+            attempt=attempt,
+            status=attempt_result["status"],
+            judge=attempt_result["final_judge_result"],
+            duration_s=round(time.time() - attempt_start_time, 3),
+        )
 
-                elif attempt_result["is_correct"]:
-                    print(f"    ✅ Attempt {attempt}: CORRECT (cached)")
-                    found_correct_answer = True
+        return attempt_result
 
-                elif attempt_result["final_judge_result"]:
-                    print(
-                        f"    ❌ Attempt {attempt}: INCORRECT (cached: {attempt_result['final_judge_result']})"
+    async def _run_attempts_concurrently(
+        self,
+        task: BenchmarkTask,
+        attempt_numbers: List[int],
+        task_description: str,
+        task_file_path: Optional[str],
+        speculative: bool,
+        result: BenchmarkResult,
+        budget: TaskBudget,
+    ) -> bool:
+        """
+        Run pass@k attempts concurrently, at most concurrent_attempts at a time.
+
+        Judge verdicts are handled as attempts finish; the remaining attempts
+        are cancelled as soon as one is CORRECT. Cancelled attempts leave their
+        logs behind like an interrupted run, so resume picks them up as usual.
+
+        Returns:
+            Whether a correct answer was found (by this or another worker)
+        """
+        semaphore = asyncio.Semaphore(self.concurrent_attempts)
+        stop = asyncio.Event()
+
+        async def run(attempt: int) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                if stop.is_set():
+                    return None
+                claim = self._claim_attempt(task, attempt, speculative)
+                if claim == "stop":
+                    stop.set()
+                if claim is not None:
+                    return None
+                pipeline_components = create_pipeline_components(self.cfg)
+                main_agent_tool_manager, sub_agent_tool_managers, _ = (
+                    pipeline_components
+                )
+                try:
+                    return await self._run_attempt(
+                        task,
+                        attempt,
+                        task_description,
+                        task_file_path,
+                        pipeline_components,
+                        budget,
                     )
-                else:
-                    print(f"    ⚠️  Attempt {attempt}: No valid answer to verify")
-
-                result.attempts.append(attempt_result)
-
-                # Update main result with the first successful attempt or best attempt so far
-                if attempt == 1 or (
-                    attempt_result["status"] == "success"
-                    and not result.model_boxed_answer
-                ):
-                    result.model_boxed_answer = attempt_result["model_boxed_answer"]
-                    result.log_file_path = attempt_result["log_file_path"]
-                    result.status = attempt_result["status"]
-                    if "error_message" in attempt_result:
-                        result.error_message = attempt_result["error_message"]
-
-                # Early stopping: if we found a correct answer, we can stop
-                if found_correct_answer:
+                finally:
+                    # Each attempt has its own tool managers; close their MCP
+                    # sessions so they don't pile up over a long run
+                    for tool_manager in [
+                        main_agent_tool_manager,
+                        *sub_agent_tool_managers.values(),
+                    ]:
+                        await tool_manager.close()
+
+        pending = [asyncio.create_task(run(attempt)) for attempt in attempt_numbers]
+        found_correct_answer = False
+        try:
+            for next_done in asyncio.as_completed(pending):
+                attempt_result = await next_done
+                if attempt_result is None:
+                    continue
+                self._add_attempt_result(result, attempt_result)
+                if attempt_result["is_correct"]:
+                    found_correct_answer = True
                     print(
-                        f"    🎯 Found correct answer! Stopping early after {attempt} attempts."
+                        f"    🎯 Found correct answer in attempt {attempt_result['attempt_number']}! Cancelling remaining attempts."
                     )
                     break
+        finally:
+            for pending_task in pending:
+                pending_task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        result.attempts.sort(key=lambda a: a["attempt_number"])
+        return found_correct_answer or stop.is_set()
+
+    @staticmethod
+    def _add_attempt_result(result: BenchmarkResult, attempt_result: Dict[str, Any]):
+        """Append an attempt and update the main result from the first or first successful attempt"""
+        result.attempts.append(attempt_result)
+        if attempt_result["attempt_number"] == 1 or (
+            attempt_result["status"] == "success" and not result.model_boxed_answer
+        ):
+            result.model_boxed_answer = attempt_result["model_boxed_answer"]
+            result.log_file_path = attempt_result["log_file_path"]
+            result.status = attempt_result["status"]
+            if "error_message" in attempt_result:
+                result.error_message = attempt_result["error_message"]
+
+    def _is_attempt_finished(self, task: BenchmarkTask, retry: Dict[str, Any]) -> bool:
+        """Whether resuming an attempt would run neither the agent nor the judge"""
+        answer = retry["boxed_answer"]
+        if not answer:
+            return False
+        if (
+            answer == FORMAT_ERROR_MESSAGE
+            and retry["format_retry"] < self.context_compress_limit
+        ):
+            return False
+        return bool(retry["judge_result"]) or task.ground_truth is None
+
+    def _is_task_finished(
+        self, task: BenchmarkTask, record: Optional[Dict[str, Any]]
+    ) -> bool:
+        """
+        Whether an earlier run left nothing to do for a task.
+
+        A task is finished once an attempt was judged correct, or once each of
+        attempts 1..k has a final answer, so failed attempts and the extra
+        attempts of a larger pass_at_k still run on resume.
+        """
+        if record is None:
+            return False
+        retries = {retry["attempt"]: retry for retry in record["retries"]}
+        if any(retry["judge_result"] == "CORRECT" for retry in retries.values()):
+            return True
+        return all(
+            attempt in retries and self._is_attempt_finished(task, retries[attempt])
+            for attempt in range(1, self.pass_at_k + 1)
+        )
+
+    def _finished_result(
+        self, task: BenchmarkTask, record: Dict[str, Any]
+    ) -> BenchmarkResult:
+        """Result of a task finished by an earlier run, rebuilt from the run state"""
+        result = BenchmarkResult(
+            task_id=task.task_id,
+            task_question=task.task_question,
+            ground_truth=task.ground_truth,
+            file_path=task.file_path,
+            status=record["status"],
+            metadata=task.metadata.copy(),
+            final_judge_result=record["final_judge_result"],
+            judge_type="pass_at_k",
+            pass_at_k_success=bool(record["pass_at_k_success"]),
+            k_value=self.pass_at_k,
+        )
+        for retry in record["retries"]:
+            attempt_result = {
+                "attempt_number": retry["attempt"],
+                "model_boxed_answer": retry["boxed_answer"] or "",
+                "status": retry["status"] if retry["boxed_answer"] else "pending",
+                "log_file_path": retry["log_file_path"],
+                "final_judge_result": retry["judge_result"],
+                "judge_type": retry["judge_type"],
+                "is_correct": retry["judge_result"] == "CORRECT",
+            }
+            if retry["eval_details"]:
+                attempt_result["eval_details"] = retry["eval_details"]
+            self._add_attempt_result(result, attempt_result)
+        return result
+
+    async def run_single_task(
+        self, task: BenchmarkTask, speculative: bool = False
+    ) -> BenchmarkResult:
+        """
+        Run inference for a single benchmark task with pass@k support
+
+        Args:
+            task: BenchmarkTask object
+            speculative: Run as a speculative duplicate of a straggling task,
+                taking unclaimed attempts from the highest number down
+
+        Returns:
+            BenchmarkResult object
+        """
+        print(
+            f"Processing task {task.task_id} with pass@{self.pass_at_k}"
+            + (" (speculative)" if speculative else "")
+        )
+
+        result = BenchmarkResult(
+            task_id=task.task_id,
+            task_question=task.task_question,
+            ground_truth=task.ground_truth,
+            file_path=task.file_path,
+            model_boxed_answer="",
+            status="pending",
+            metadata=task.metadata.copy(),
+            k_value=self.pass_at_k,
+        )
+
+        logs_dir = self.get_log_dir()
+        found_correct_answer = False
+        task_start_time = time.time()
+        # Wall time, token and tool call limits of the whole task
+        budget = TaskBudget(self.cfg)
+        if not speculative:
+            self._emit_progress(TASK_START, task_id=task.task_id)
+        metrics_writer = self._metrics_snapshots()
+        ACTIVE_TASKS.inc()
+
+        # A speculative duplicate takes attempts from the highest number down
+        if speculative:
+            attempt_numbers = range(self.pass_at_k, 1, -1)
+        else:
+            attempt_numbers = range(1, self.pass_at_k + 1)
+
+        # Print debug info about log directory
+        print(f"  Current log directory: {logs_dir}")
+
+        try:
+            # Prepare task
+            task_description, task_file_path = self.prepare_task_description(task)
+
+            # Run up to k attempts (with early stopping when correct answer found)
+            if min(self.concurrent_attempts, len(attempt_numbers)) > 1:
+                found_correct_answer = await self._run_attempts_concurrently(
+                    task,
+                    list(attempt_numbers),
+                    task_description,
+                    task_file_path,
+                    speculative,
+                    result,
+                    budget,
+                )
+            else:
+                for attempt in attempt_numbers:
+                    claim = self._claim_attempt(task, attempt, speculative)
+                    if claim == "stop":
+                        found_correct_answer = True
+                        break
+                    if claim == "skip":
+                        continue
+
+                    attempt_result = await self._run_attempt(
+                        task, attempt, task_description, task_file_path, budget=budget
+                    )
+                    self._add_attempt_result(result, attempt_result)
+
+                    # Early stopping: if we found a correct answer, we can stop
+                    if attempt_result["is_correct"]:
+                        found_correct_answer = True
+                        print(
+                            f"    🎯 Found correct answer! Stopping early after {attempt} attempts."
+                        )
+                        break
 
         except Exception as e:
             result.error_message = str(e)
@@ -541,6 +989,29 @@ class BenchmarkEvaluator(ABC):
                     result.final_judge_result = "PASS_AT_K_FAILED"
                 result.judge_type = "pass_at_k"
 
+            # The parent records the merged outcome of speculative duplicates
+            if not speculative:
+                self.run_state.record_task(
+                    task.task_id,
+                    result.status,
+                    found_correct_answer,
+                    result.final_judge_result,
+                    len(result.attempts),
+                )
+                self._emit_progress(
+                    TASK_END,
+                    task_id=task.task_id,
+                    status=result.status,
+                    correct=found_correct_answer,
+                    judge=result.final_judge_result,
+                    attempts=len(result.attempts),
+                    duration_s=round(time.time() - task_start_time, 3),
+                )
+
+            ACTIVE_TASKS.dec()
+            if metrics_writer is not None:
+                metrics_writer.write()
+
             print(f"Task {task.task_id} completed with {len(result.attempts)} attempts")
             if result.ground_truth is not None:
                 print(
@@ -579,9 +1050,42 @@ class BenchmarkEvaluator(ABC):
         # Serialize config
         cfg_dict = OmegaConf.to_container(self.cfg, resolve=True)
 
-        # Shuffle tasks to avoid order bias and improve balancing
-        shuffled_tasks = tasks.copy()
-        random.shuffle(shuffled_tasks)
+        # Tasks finished by an earlier run are not submitted again; the others
+        # resume per attempt in run_single_task
+        records = self.run_state.task_records(task.task_id for task in tasks)
+        finished_records = {
+            str(task.task_id): records[str(task.task_id)]
+            for task in tasks
+            if self._is_task_finished(task, records.get(str(task.task_id)))
+        }
+        remaining = {
+            task.task_id for task in tasks if str(task.task_id) not in finished_records
+        }
+        if len(remaining) < len(tasks):
+            print(
+                f"Resuming run: {len(tasks) - len(remaining)} tasks already finished, {len(remaining)} remaining"
+            )
+
+        scheduler = None
+        if self.scheduling == "longest_first" or self.speculative_attempts:
+            scheduler = TaskScheduler.from_log_dirs(self._history_log_dirs())
+
+        if self.scheduling == "longest_first":
+            # Start the tasks predicted to run longest first (LPT scheduling)
+            shuffled_tasks = scheduler.order(tasks)
+            print(
+                f"Scheduling {len(shuffled_tasks)} tasks longest-first "
+                f"({len(scheduler.history)} tasks with history)"
+            )
+            self._emit_progress(
+                SCHEDULE,
+                strategy=self.scheduling,
+                tasks=scheduler.describe(shuffled_tasks),
+            )
+        else:
+            # Shuffle tasks to avoid order bias and improve balancing
+            shuffled_tasks = tasks.copy()
+            random.shuffle(shuffled_tasks)
 
         # Prepare evaluator kwargs for worker processes
         evaluator_kwargs = {
@@ -599,10 +1103,14 @@ class BenchmarkEvaluator(ABC):
             evaluator_kwargs["ground_truth_field"] = self.ground_truth_field
         if hasattr(self, "file_name_field"):
             evaluator_kwargs["file_name_field"] = self.file_name_field
+        if self.speculative_attempts:
+            evaluator_kwargs["run_token"] = f"{os.getpid()}-{time.time():.0f}"
 
         # Prepare serializable arguments for worker processes
         worker_args = []
         for task in shuffled_tasks:
+            if task.task_id not in remaining:
+                continue
             task_dict = {
                 "task_id": task.task_id,
                 "task_question": task.task_question,
@@ -617,7 +1125,24 @@ class BenchmarkEvaluator(ABC):
         task_index_map = {
             task.task_id: (i, task) for i, task in enumerate(shuffled_tasks)
         }
-        results_dict = {}  # Store results by task_id to maintain order
+        results_dict = {
+            task.task_id: self._finished_result(
+                task, finished_records[str(task.task_id)]
+            )
+            for task in shuffled_tasks
+            if task.task_id not in remaining
+        }  # Store results by task_id to maintain order
+
+        run_start_time = time.time()
+        metrics_writer = self._metrics_snapshots()
+        self._emit_progress(
+            RUN_START,
+            total_tasks=len(shuffled_tasks),
+            max_concurrent=max_concurrent,
+            pass_at_k=self.pass_at_k,
+            scheduling=self.scheduling,
+            speculative_attempts=self.speculative_attempts,
+        )
 
         executor = None
         try:
@@ -628,36 +1153,109 @@ class BenchmarkEvaluator(ABC):
                 task_dict = args[0]  # First element is task_dict
                 future = executor.submit(_task_worker, *args)
                 future_to_task_id[future] = task_dict["task_id"]
+            primary_futures = {
+                task_id: future for future, task_id in future_to_task_id.items()
+            }
 
-            # Collect results as they complete
-            from concurrent.futures import as_completed
+            # State for speculative duplicates of straggling tasks
+            open_futures = {task_id: 1 for task_id in primary_futures}
+            partial_results: Dict[str, BenchmarkResult] = {}
+            running_since: Dict[str, float] = {}
+            speculated = set()
+
+            # Collect results as they complete. Futures the executor has
+            # moved to its call queue report running() before a worker picks
+            # them up, so in-flight work is counted here instead
+            pending = set(future_to_task_id)
+            in_flight = len(pending)
+            while pending:
+                # Tasks beyond the worker count wait in the executor's queue
+                QUEUED_TASKS.set(max(in_flight - max_concurrent, 0))
+                done, pending = wait(
+                    pending,
+                    timeout=(
+                        SPECULATION_POLL_SECONDS if self.speculative_attempts else None
+                    ),
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    task_id = future_to_task_id[future]
+                    in_flight -= 1
+                    open_futures[task_id] -= 1
+                    running_since.pop(task_id, None)
+                    try:
+                        result_dict = future.result()
+                        # Reconstruct BenchmarkResult from dict
+                        result = BenchmarkResult(**result_dict)
+                    except Exception as e:
+                        print(f"Exception in task {task_id}: {e}")
+                        # Get original task for error result
+                        _, original_task = task_index_map[task_id]
+                        result = BenchmarkResult(
+                            task_id=original_task.task_id,
+                            task_question=original_task.task_question,
+                            ground_truth=original_task.ground_truth,
+                            file_path=original_task.file_path,
+                            model_boxed_answer="",
+                            status="failed",
+                            metadata=original_task.metadata.copy(),
+                            error_message=str(e),
+                        )
+
+                    # Wait for every worker of a task, then merge their attempts
+                    if task_id in partial_results:
+                        if future is primary_futures[task_id]:
+                            result = merge_attempt_results(
+                                result, partial_results.pop(task_id)
+                            )
+                        else:
+                            result = merge_attempt_results(
+                                partial_results.pop(task_id), result
+                            )
+                    if open_futures[task_id] > 0:
+                        partial_results[task_id] = result
+                        continue
 
-            for future in as_completed(future_to_task_id):
-                task_id = future_to_task_id[future]
-                try:
-                    result_dict = future.result()
-                    # Reconstruct BenchmarkResult from dict
-                    result = BenchmarkResult(**result_dict)
                     results_dict[task_id] = result
+                    if task_id in speculated or not result.attempts:
+                        # Workers did not record the merged (or crashed) outcome
+                        self.run_state.record_task(
+                            task_id,
+                            result.status,
+                            result.pass_at_k_success,
+                            result.final_judge_result,
+                            len(result.attempts),
+                        )
+                        self._emit_progress(
+                            TASK_END,
+                            task_id=task_id,
+                            status=result.status,
+                            correct=result.pass_at_k_success,
+                            judge=result.final_judge_result,
+                            attempts=len(result.attempts),
+                        )
+                    # Counted once per task here: a task may span several workers
+                    TASKS.inc(status=result.status)
                     completed = len(results_dict)
                     print(
                         f"Progress: {completed}/{len(shuffled_tasks)} tasks completed"
                     )
-                except Exception as e:
-                    print(f"Exception in task {task_id}: {e}")
-                    # Get original task for error result
-                    _, original_task = task_index_map[task_id]
-                    error_result = BenchmarkResult(
-                        task_id=original_task.task_id,
-                        task_question=original_task.task_question,
-                        ground_truth=original_task.ground_truth,
-                        file_path=original_task.file_path,
-                        model_boxed_answer="",
-                        status="failed",
-                        metadata=original_task.metadata.copy(),
-                        error_message=str(e),
+
+                if self.speculative_attempts:
+                    in_flight += self._launch_speculative_attempts(
+                        executor,
+                        scheduler,
+                        primary_futures,
+                        future_to_task_id,
+                        pending,
+                        open_futures,
+                        running_since,
+                        speculated,
+                        task_index_map,
+                        cfg_dict,
+                        evaluator_kwargs,
+                        max_concurrent - in_flight,
                     )
-                    results_dict[task_id] = error_result
         except KeyboardInterrupt:
             print("\n⚠️  Received interrupt signal, shutting down gracefully...")
             if executor:
@@ -680,8 +1278,6 @@ class BenchmarkEvaluator(ABC):
                             )
 
                     # Give processes a short time to terminate gracefully
-                    import time
-
                     time.sleep(0.5)
 
                     # Force kill any remaining processes
@@ -705,6 +1301,14 @@ class BenchmarkEvaluator(ABC):
                 except Exception:
                     pass  # Ignore errors during cleanup
 
+        self._emit_progress(
+            RUN_END,
+            completed=len(results_dict),
+            makespan_s=round(time.time() - run_start_time, 3),
+        )
+        if metrics_writer is not None:
+            metrics_writer.write()
+
         # Reconstruct results in original task order
         processed_results = [results_dict[task.task_id] for task in shuffled_tasks]
 
@@ -717,6 +1321,86 @@ class BenchmarkEvaluator(ABC):
         self.results = processed_results
         return processed_results
 
+    def _history_log_dirs(self) -> List[Path]:
+        """Run directories whose task logs feed the cost predictions"""
+        history_dirs = self.cfg.benchmark.execution.get("schedule_history_dirs")
+        if history_dirs:
+            return [Path(d) for d in history_dirs]
+        # Default: this run and its sibling runs (e.g. run_1 ... run_N)
+        log_dir = self.get_log_dir()
+        if not log_dir.parent.is_dir():
+            return [log_dir]
+        return sorted(d for d in log_dir.parent.iterdir() if d.is_dir())
+
+    def _launch_speculative_attempts(
+        self,
+        executor: ProcessPoolExecutor,
+        scheduler: TaskScheduler,
+        primary_futures: Dict[str, Any],
+        future_to_task_id: Dict[Any, str],
+        pending: set,
+        open_futures: Dict[str, int],
+        running_since: Dict[str, float],
+        speculated: set,
+        task_index_map: Dict[str, Tuple[int, BenchmarkTask]],
+        cfg_dict: Dict[str, Any],
+        evaluator_kwargs: Dict[str, Any],
+        idle_workers: int,
+    ) -> int:
+        """
+        Duplicate straggling tasks onto idle workers.
+
+        Every task is submitted up front, so workers only go idle once every
+        task has started. Each idle worker slot is then given to the running
+        task that most exceeds its predicted duration; the duplicate takes the
+        task's remaining attempts from the highest number down.
+
+        Args:
+            idle_workers: Worker slots without in-flight work
+
+        Returns:
+            Number of duplicates submitted
+        """
+        now = time.time()
+        for task_id, future in primary_futures.items():
+            if future.running() and task_id not in running_since:
+                running_since[task_id] = now
+
+        launched = 0
+        for _ in range(idle_workers):
+            task_id = scheduler.pick_straggler(running_since, now, speculated)
+            if task_id is None:
+                break
+            elapsed = now - running_since[task_id]
+            predicted = scheduler.predict(task_id)
+            print(
+                f"Launching speculative attempts for straggler {task_id} "
+                f"(running {elapsed:.0f}s, predicted {predicted:.0f}s)"
+            )
+            self._emit_progress(
+                SPECULATE,
+                task_id=task_id,
+                elapsed_s=round(elapsed, 1),
+                predicted_s=round(predicted, 1),
+            )
+            _, task = task_index_map[task_id]
+            task_dict = {
+                "task_id": task.task_id,
+                "task_question": task.task_question,
+                "ground_truth": task.ground_truth,
+                "file_path": task.file_path,
+                "metadata": task.metadata,
+            }
+            future = executor.submit(
+                _task_worker, task_dict, cfg_dict, evaluator_kwargs, True
+            )
+            future_to_task_id[future] = task_id
+            pending.add(future)
+            open_futures[task_id] += 1
+            speculated.add(task_id)
+            launched += 1
+        return launched
+
     def save_results(self, output_file: str) -> str:
         """Save evaluation results to JSONL file"""
         output_path = Path(output_file)
@@ -798,6 +1482,7 @@ class BenchmarkEvaluator(ABC):
                 json.dump(log_data, f, indent=2, ensure_ascii=False)
 
             os.replace(temp_log_file, log_file)
+            index_task_log(log_file, log_data)
             print(f"    Updated log file {log_file.name} with evaluation result.")
         except Exception as e:
             print(f"    Error updating log file {log_file_path}: {e}")
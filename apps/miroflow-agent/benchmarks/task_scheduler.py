@@ -0,0 +1,169 @@
+# Copyright (c) 2025 MiroMind
+# This source code is licensed under the MIT License.
+
+"""
+Cost-aware task ordering for benchmark runs.
+
+A handful of tasks that run for hundreds of turns dominate benchmark wall time.
+Submitting them first (longest-processing-time-first) lets the short tasks fill
+in around them instead of leaving one straggler running alone at the end.
+
+Task costs are predicted from the task logs of previous runs (read through the
+task index, so no full trace is loaded), and running tasks that exceed their
+prediction can be picked for speculative duplicate attempts.
+"""
+
+import random
+import re
+import statistics
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+from src.logging.task_index import scan_task_logs
+
+# Log task IDs look like "<task_id>_attempt-<n>_format-retry-<r>"
+ATTEMPT_SUFFIX_PATTERN = re.compile(r"_attempt-\d+(?:_format-retry-\d+)?$")
+
+# Fallback cost (seconds) when no history exists at all
+DEFAULT_TASK_SECONDS = 210.0
+
+# A running task is a straggler once it exceeds its prediction by this factor
+STRAGGLER_FACTOR = 1.5
+
+# Ignore stragglers younger than this, predictions are noisy for short tasks
+MIN_STRAGGLER_SECONDS = 300.0
+
+
+def base_task_id(log_task_id: str) -> str:
+    """Strip the attempt/format-retry suffix from a task log's task_id"""
+    return ATTEMPT_SUFFIX_PATTERN.sub("", str(log_task_id))
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    try:
+        return datetime.fromisoformat(value).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def load_task_history(log_dirs: Iterable[Path]) -> Dict[str, List[float]]:
+    """
+    Collect per-attempt durations of finished tasks from previous runs.
+
+    Args:
+        log_dirs: Run directories containing task logs.
+
+    Returns:
+        Mapping of benchmark task ID to the durations (seconds) of its
+        finished attempts, format retries of one attempt summed together.
+    """
+    per_attempt: Dict[tuple, float] = {}
+    for log_dir in log_dirs:
+        if not Path(log_dir).is_dir():
+            continue
+        try:
+            records = scan_task_logs(log_dir)
+        except OSError as e:
+            print(f"Warning: Could not read task history from {log_dir}: {e}")
+            continue
+
+        for record in records:
+            if record.get("status") not in ("success", "failed"):
+                continue
+            start = _parse_time(record.get("start_time"))
+            end = _parse_time(record.get("end_time"))
+            if start is None or end is None or end <= start:
+                continue
+            log_task_id = str(record.get("task_id", ""))
+            match = re.search(r"_attempt-(\d+)", log_task_id)
+            attempt = match.group(1) if match else "1"
+            key = (str(log_dir), base_task_id(log_task_id), attempt)
+            per_attempt[key] = per_attempt.get(key, 0.0) + (
+                (end - start).total_seconds()
+            )
+
+    history: Dict[str, List[float]] = {}
+    for (_, task_id, _), seconds in per_attempt.items():
+        history.setdefault(task_id, []).append(seconds)
+    return history
+
+
+class TaskScheduler:
+    """
+    Predict task costs from run history and order tasks longest-first.
+    """
+
+    def __init__(self, history: Dict[str, List[float]]):
+        self.history = history
+        known = [statistics.mean(durations) for durations in history.values()]
+        # Unknown tasks are assumed typical, so they neither lead nor trail
+        self.default_seconds = (
+            statistics.median(known) if known else DEFAULT_TASK_SECONDS
+        )
+
+    @classmethod
+    def from_log_dirs(cls, log_dirs: Iterable[Path]) -> "TaskScheduler":
+        return cls(load_task_history(log_dirs))
+
+    def predict(self, task_id: str) -> float:
+        """Predicted duration of one attempt of a task, in seconds"""
+        durations = self.history.get(str(task_id))
+        return statistics.mean(durations) if durations else self.default_seconds
+
+    def order(self, tasks: Sequence[Any]) -> List[Any]:
+        """
+        Order tasks by descending predicted cost.
+
+        Tasks with equal predictions (e.g. no history) keep a random relative
+        order, as with the plain shuffle.
+        """
+        shuffled = list(tasks)
+        random.shuffle(shuffled)
+        return sorted(
+            shuffled, key=lambda task: self.predict(task.task_id), reverse=True
+        )
+
+    def describe(self, tasks: Sequence[Any]) -> List[Dict[str, Any]]:
+        """Scheduling decision record: predicted cost and its source per task"""
+        return [
+            {
+                "task_id": task.task_id,
+                "predicted_s": round(self.predict(task.task_id), 1),
+                "samples": len(self.history.get(str(task.task_id), [])),
+            }
+            for task in tasks
+        ]
+
+    def pick_straggler(
+        self,
+        running_since: Dict[str, float],
+        now: float,
+        exclude: Set[str],
+    ) -> Optional[str]:
+        """
+        Pick the running task that most exceeds its predicted duration.
+
+        Args:
+            running_since: Mapping of task ID to the time it started running.
+            now: Current time (same clock as running_since).
+            exclude: Task IDs that must not be picked (e.g. already duplicated).
+
+        Returns:
+            The task ID of the worst straggler, or None if no task qualifies.
+        """
+        best_task_id, best_ratio = None, STRAGGLER_FACTOR
+        for task_id, started in running_since.items():
+            if task_id in exclude:
+                continue
+            elapsed = now - started
+            if elapsed < MIN_STRAGGLER_SECONDS:
+                continue
+            ratio = elapsed / max(self.predict(task_id), 1.0)
+            if ratio >= best_ratio:
+                best_task_id, best_ratio = task_id, ratio
+        return best_task_id
@@ -0,0 +1,114 @@
+# Copyright (c) 2025 MiroMind
+# This source code is licensed under the MIT License.
+
+"""
+Micro-benchmark for parsing assistant responses.
+
+Compares the per-turn parsing work of the orchestrator before and after the
+single-pass scanner: the legacy path ran a lazy-group regex for tool calls,
+searched again for the response text and rescanned for the boxed answer (with
+a regex compiled per call). Cases cover a large (50K-char) response and
+pathological unterminated tags.
+
+Usage:
+  uv run python scripts/benchmark_parsing.py
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.parsing_utils import (  # noqa: E402
+    extract_boxed_content,
+    parse_llm_response_for_tool_calls,
+    safe_json_loads,
+    scan_llm_response,
+)
+
+LEGACY_TOOL_CALL_PATTERN = (
+    r"<use_mcp_tool>\s*<server_name>(.*?)</server_name>\s*<tool_name>(.*?)"
+    r"</tool_name>\s*<arguments>\s*([\s\S]*?)\s*</arguments>\s*</use_mcp_tool>"
+)
+
+
+def legacy_turn(text: str):
+    """Tool calls, response text and boxed answer as parsed before"""
+    tool_calls = [
+        (server.strip(), tool.strip(), safe_json_loads(arguments.strip()))
+        for server, tool, arguments in re.findall(
+            LEGACY_TOOL_CALL_PATTERN, text, re.DOTALL
+        )
+    ]
+    match = re.search(r"<use_mcp_tool>", text)
+    response_text = text[: match.start()].strip() if match else text.strip()
+    re.purge()  # The legacy boxed extraction compiled its regex per call
+    boxed = extract_boxed_content(text)
+    return tool_calls, response_text, boxed
+
+
+def scanner_turn(text: str):
+    """The same three results from the shared single-pass scan"""
+    scan_llm_response.cache_clear()
+    tool_calls = parse_llm_response_for_tool_calls(text)
+    parsed = scan_llm_response(text)
+    return tool_calls, parsed.text, parsed.boxed
+
+
+def make_cases(seed: int = 0):
+    rng = random.Random(seed)
+
+    def words(n):
+        return " ".join(
+            rng.choice(["alpha", "beta", "gamma", "delta"]) for _ in range(n)
+        )
+
+    tool_block = (
+        "<use_mcp_tool>\n<server_name>tool-google-search</server_name>\n"
+        "<tool_name>google_search</tool_name>\n<arguments>\n"
+        '{"q": "%s"}\n</arguments>\n</use_mcp_tool>'
+    )
+    reasoning = f"<think>\n{words(8000)}\n</think>\n\n"
+    return {
+        "50K response, 1 tool call": reasoning + words(200) + tool_block % words(6),
+        "50K response, boxed answer": reasoning + words(200) + r" \boxed{42}",
+        "unterminated <use_mcp_tool> x2000": "<use_mcp_tool><server_name>s" * 2000,
+        # The legacy regex backtracks exponentially here (x100 takes ~15s)
+        "unterminated <arguments> x40": (
+            "<use_mcp_tool><server_name>s</server_name><tool_name>t</tool_name>"
+            "<arguments>{}" * 40
+        ),
+        "unterminated \\boxed{ x2000": r"\boxed{" * 2000 + words(500),
+    }
+
+
+def best_of(fn, text, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5, help="Best of N runs")
+    args = parser.parse_args()
+
+    for label, text in make_cases().items():
+        legacy = best_of(legacy_turn, text, args.repeat)
+        scanner = best_of(scanner_turn, text, args.repeat)
+        print(
+            f"{label:<36} {len(text) / 1000:6.1f}K chars  "
+            f"legacy {legacy * 1000:9.2f} ms  scanner {scanner * 1000:7.2f} ms  "
+            f"({legacy / scanner:6.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
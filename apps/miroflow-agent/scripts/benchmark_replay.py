@@ -0,0 +1,133 @@
+# Copyright (c) 2025 MiroMind
+# This source code is licensed under the MIT License.
+
+"""
+Offline benchmark of the orchestrator from recorded cassettes.
+
+Runs recorded tasks through execute_task_pipeline again with their LLM and
+tool traffic replayed from the cassettes (see src/io/replay.py), so no model
+API or tool service is called and wall time is the agent's own overhead:
+prompt building, response parsing, logging and context checks per turn.
+Record the cassettes with the configuration the benchmark will use:
+
+Usage:
+  uv run python main.py replay.mode=record replay.cassette_dir=/tmp/cassettes
+  uv run python scripts/benchmark_replay.py replay.cassette_dir=/tmp/cassettes
+  uv run python scripts/benchmark_replay.py --runs 10 --task task_example --check \\
+      replay.cassette_dir=/tmp/cassettes llm=qwen-3 agent=single_agent
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+AGENT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AGENT_DIR))
+
+from hydra import compose, initialize_config_dir  # noqa: E402
+
+from src.core.pipeline import (  # noqa: E402
+    create_pipeline_components,
+    execute_task_pipeline,
+)
+from src.io.replay import CASSETTE_SUFFIX, REPLAY_REPLAY, Cassette  # noqa: E402
+
+
+async def replay_task(cfg, task_id: str, task: dict, log_dir: str) -> tuple:
+    """Replay one task; return (wall seconds, replay stats from the task log)"""
+    main_agent_tool_manager, sub_agent_tool_managers, output_formatter = (
+        create_pipeline_components(cfg)
+    )
+    start_time = time.perf_counter()
+    _, _, log_file_path, _ = await execute_task_pipeline(
+        cfg=cfg,
+        task_id=task_id,
+        task_description=task["task_description"],
+        task_file_name=task.get("task_file_name"),
+        main_agent_tool_manager=main_agent_tool_manager,
+        sub_agent_tool_managers=sub_agent_tool_managers,
+        output_formatter=output_formatter,
+        log_dir=log_dir,
+    )
+    elapsed = time.perf_counter() - start_time
+    with open(log_file_path, encoding="utf-8") as f:
+        replay_stats = json.load(f).get("trace_data", {}).get("replay", {})
+    return elapsed, replay_stats
+
+
+def recorded_counts(path: Path) -> Counter:
+    """Recorded exchanges of a cassette by kind (http, tool, tool_definitions)"""
+    with open(path, encoding="utf-8") as f:
+        return Counter(json.loads(line)["kind"] for line in f if line.strip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="Replays per task")
+    parser.add_argument(
+        "--task", action="append", help="Only replay these task IDs (repeatable)"
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit 1 if a replay asked for a request missing from its cassette",
+    )
+    parser.add_argument(
+        "overrides", nargs="*", help="Hydra overrides, as used when recording"
+    )
+    args = parser.parse_args()
+
+    # Relative paths in the config are relative to the agent directory
+    os.chdir(AGENT_DIR)
+    with initialize_config_dir(config_dir=str(AGENT_DIR / "conf"), version_base=None):
+        cfg = compose(
+            config_name="config", overrides=args.overrides + ["replay.mode=replay"]
+        )
+    cassette_dir = Path(cfg.replay.cassette_dir)
+    paths = sorted(cassette_dir.glob(f"*{CASSETTE_SUFFIX}"))
+    if args.task:
+        paths = [path for path in paths if path.stem in args.task]
+    if not paths:
+        raise SystemExit(f"No cassettes to replay in {cassette_dir}")
+
+    diverged = []
+    with tempfile.TemporaryDirectory(prefix="replay-logs-") as log_dir:
+        for path in paths:
+            task = Cassette(path, REPLAY_REPLAY).task
+            if task is None:
+                print(f"{path.stem:<40} SKIP no task recorded")
+                continue
+            counts = recorded_counts(path)
+            times, misses = [], 0
+            for _ in range(args.runs):
+                elapsed, replay_stats = asyncio.run(
+                    replay_task(cfg, path.stem, task, log_dir)
+                )
+                times.append(elapsed)
+                misses = max(misses, replay_stats.get("misses", 0))
+            if misses:
+                diverged.append(path.stem)
+            llm_calls = max(counts["http"], 1)
+            print(
+                f"{path.stem:<40} best {min(times):7.3f}s  "
+                f"median {statistics.median(times):7.3f}s  "
+                f"llm calls {counts['http']:4d}  tool calls {counts['tool']:4d}  "
+                f"per llm call {statistics.median(times) / llm_calls * 1000:7.1f} ms  "
+                f"misses {misses}"
+            )
+
+    if args.check and diverged:
+        raise SystemExit(
+            f"Replays diverged from their cassettes: {', '.join(diverged)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+# Copyright (c) 2025 MiroMind
+# This source code is licensed under the MIT License.
+
+"""
+Startup regression benchmark for the agent and the MCP servers.
+
+Every stdio MCP server call starts a fresh interpreter, so module import time
+is paid on each tool call. This imports each entry point in a new interpreter
+with `python -X importtime` and checks that none of the heavy packages in its
+FORBIDDEN_IMPORTS list is loaded: heavy optional SDKs (openai, anthropic, e2b,
+tencentcloud, wikipedia, ...) and document parsers are imported by the tools
+and converters that use them. It also reports the cumulative import time of
+each module (best of N runs) next to its target in STARTUP_TARGETS_MS. Timings
+depend on the machine, so they are reported but never fail the check.
+
+Usage:
+  uv run python scripts/benchmark_startup.py
+  uv run python scripts/benchmark_startup.py --check  # exit 1 on a heavy import (CI)
+  uv run python scripts/benchmark_startup.py --module miroflow_tools.mcp_servers.python_mcp_server
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+AGENT_DIR = Path(__file__).resolve().parent.parent
+
+# Packages (or modules, with their submodules) that only the tools and
+# converters using them may import
+HEAVY_SDKS = (
+    "openai",
+    "anthropic",
+    "tiktoken",
+    "transformers",
+    "torch",
+    "e2b",
+    "e2b_code_interpreter",
+    # The exception module alone is cheap and caught by the Sogou tools
+    "tencentcloud.common.common_client",
+    "wikipedia",
+    "markdown_it",
+    "mutagen",
+)
+DOCUMENT_PARSERS = (
+    "mammoth",
+    "markdownify",
+    "markitdown",
+    "openpyxl",
+    "pdfminer",
+    "pptx",
+    "bs4",
+)
+# input_handler loads the agent (and with it the LLM SDKs) through src
+AGENT_FORBIDDEN_IMPORTS = DOCUMENT_PARSERS + tuple(
+    name for name in HEAVY_SDKS if name not in ("openai", "anthropic")
+)
+SERVER_FORBIDDEN_IMPORTS = HEAVY_SDKS + DOCUMENT_PARSERS
+
+# Target (ms) per module; keep in sync with the table in
+# libs/miroflow-tools/README.md. Baselines were measured with the uv.lock
+# dependencies on Python 3.12 in a single-core container (best of 5, worst of
+# two sessions): 2.6-3.4 s for the servers built on the standalone fastmcp
+# package, 2.0-2.9 s for those on mcp.server.fastmcp and 4.3-4.6 s for
+# input_handler. Targets add 25% headroom, less than an eagerly imported SDK
+# costs (openai 2.4 s, anthropic 1.9 s, e2b_code_interpreter 1.4 s on the same
+# machine).
+FASTMCP_SERVER_TARGET_MS = 4300
+MCP_SERVER_TARGET_MS = 3700
+STARTUP_TARGETS_MS = {
+    "miroflow_tools.mcp_servers.searching_google_mcp_server": FASTMCP_SERVER_TARGET_MS,
+    "miroflow_tools.mcp_servers.searching_sogou_mcp_server": FASTMCP_SERVER_TARGET_MS,
+    "miroflow_tools.mcp_servers.python_mcp_server": FASTMCP_SERVER_TARGET_MS,
+    "miroflow_tools.mcp_servers.vision_mcp_server": FASTMCP_SERVER_TARGET_MS,
+    "miroflow_tools.mcp_servers.vision_mcp_server_os": FASTMCP_SERVER_TARGET_MS,
+    "miroflow_tools.mcp_servers.audio_mcp_server": FASTMCP_SERVER_TARGET_MS,
+    "miroflow_tools.mcp_servers.audio_mcp_server_os": FASTMCP_SERVER_TARGET_MS,
+    "miroflow_tools.mcp_servers.reasoning_mcp_server": FASTMCP_SERVER_TARGET_MS,
+    "miroflow_tools.mcp_servers.reasoning_mcp_server_os": FASTMCP_SERVER_TARGET_MS,
+    "miroflow_tools.mcp_servers.reading_mcp_server": FASTMCP_SERVER_TARGET_MS,
+    "miroflow_tools.mcp_servers.serper_mcp_server": MCP_SERVER_TARGET_MS,
+    "miroflow_tools.dev_mcp_servers.search_and_scrape_webpage": MCP_SERVER_TARGET_MS,
+    "miroflow_tools.dev_mcp_servers.jina_scrape_llm_summary": MCP_SERVER_TARGET_MS,
+    "miroflow_tools.dev_mcp_servers.stateless_python_server": MCP_SERVER_TARGET_MS,
+    "miroflow_tools.dev_mcp_servers.task_planner": MCP_SERVER_TARGET_MS,
+    # Imported with the agent; document parsers load per converter
+    "src.io.input_handler": 5800,
+}
+FORBIDDEN_IMPORTS = {
+    module: (
+        AGENT_FORBIDDEN_IMPORTS
+        if module.startswith("src.")
+        else SERVER_FORBIDDEN_IMPORTS
+    )
+    for module in STARTUP_TARGETS_MS
+}
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|( *)(\S+)")
+
+
+def measure(module: str) -> tuple:
+    """
+    Import a module in a fresh interpreter.
+
+    Returns:
+        Tuple of (cumulative_ms, top_self, imported), where top_self holds the
+        three largest (self_us, name) entries and imported the set of
+        modules that were loaded
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=AGENT_DIR,
+        # task_planner refuses to load without a task ID
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1", "TASK_ID": "startup"},
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1]
+        raise RuntimeError(f"import {module} failed: {error}")
+
+    cumulative_us = None
+    self_times = []
+    imported = set()
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, total_us, _, name = match.groups()
+        self_times.append((int(self_us), name))
+        imported.add(name)
+        if name == module:
+            cumulative_us = int(total_us)
+    if cumulative_us is None:
+        raise RuntimeError(f"import {module} did not appear in -X importtime output")
+    self_times.sort(reverse=True)
+    return cumulative_us / 1000, self_times[:3], imported
+
+
+def heavy_imports(imported: set, forbidden: tuple) -> list:
+    """Entries of forbidden that were imported, themselves or a submodule"""
+    return [
+        name
+        for name in forbidden
+        if name in imported or any(module.startswith(name + ".") for module in imported)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N runs")
+    parser.add_argument(
+        "--module", action="append", help="Only measure these modules (repeatable)"
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit 1 if any module imports a heavy package",
+    )
+    args = parser.parse_args()
+
+    modules = args.module or list(STARTUP_TARGETS_MS)
+    failed = []
+    for module in modules:
+        target = STARTUP_TARGETS_MS.get(module)
+        try:
+            runs = [measure(module) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"{module:<58} ERROR {e}")
+            failed.append(module)
+            continue
+        best_ms, top_self, imported = min(runs, key=lambda run: run[0])
+        heavy = heavy_imports(imported, FORBIDDEN_IMPORTS.get(module, ()))
+        status = "ok"
+        if heavy:
+            status = "HEAVY"
+            failed.append(module)
+        elif target is not None and best_ms > target:
+            status = "slow"
+        heaviest = ", ".join(f"{name} {us / 1000:.0f}ms" for us, name in top_self)
+        print(
+            f"{module:<58} {best_ms:7.1f} ms  target {target or '-':>4}  {status:<5}  "
+            f"heaviest: {heaviest}"
+        )
+        if heavy:
+            print(f"{'':<58} imports {', '.join(heavy)} at load time")
+
+    if args.check and failed:
+        raise SystemExit(f"Heavy imports at startup: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -449,6 +449,9 @@ def get_env_info(cfg: DictConfig) -> dict:
         "llm_repetition_penalty": cfg.llm.repetition_penalty,
         "llm_async_client": cfg.llm.async_client,
         "keep_tool_result": cfg.agent.keep_tool_result,
+        "context_compaction": bool(
+            (cfg.agent.get("context_compaction") or {}).get("enabled", False)
+        ),
         # Agent Configuration
         "main_agent_max_turns": cfg.agent.main_agent.max_turns,
         **(
@@ -4,15 +4,23 @@
 """Core module containing orchestrator and pipeline components."""
 
 from .answer_generator import AnswerGenerator
+from .context_compactor import ContextCompactor
+from .evidence_store import EvidenceStore, EvidenceToolManager
 from .orchestrator import Orchestrator
 from .pipeline import create_pipeline_components, execute_task_pipeline
-from .stream_handler import StreamHandler
+from .stream_handler import StreamChannel, StreamHandler
+from .task_budget import TaskBudget
 from .tool_executor import ToolExecutor
 
 __all__ = [
     "AnswerGenerator",
+    "ContextCompactor",
+    "EvidenceStore",
+    "EvidenceToolManager",
     "Orchestrator",
+    "StreamChannel",
     "StreamHandler",
+    "TaskBudget",
     "ToolExecutor",
     "create_pipeline_components",
     "execute_task_pipeline",
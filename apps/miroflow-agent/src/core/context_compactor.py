@@ -0,0 +1,354 @@
+# Copyright (c) 2025 MiroMind
+# This source code is licensed under the MIT License.
+
+"""
+Context compactor module for in-loop conversation summarization.
+
+This module provides the ContextCompactor class that keeps a long agent loop
+inside the context window. Once a turn's context crosses a watermark, the older
+turns are summarized into a working-memory block in the background (on a
+separate, optionally cheaper, LLM client) and replaced by it at the next turn
+boundary. The loop keeps going instead of stopping early for the final summary
+or restarting the task with a failure experience.
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from omegaconf import DictConfig
+
+from ..llm.base_client import BaseClient
+from ..logging.task_logger import TaskLog
+from ..utils.parsing_utils import scan_llm_response
+from ..utils.prompt_utils import (
+    COMPACTION_PREVIOUS_MEMORY,
+    COMPACTION_PROMPT,
+    COMPACTION_SYSTEM_PROMPT,
+    WORKING_MEMORY_TEMPLATE,
+    append_text,
+)
+from .answer_generator import AnswerGenerator
+
+
+# Fraction of llm.max_context_length at which summarization starts
+DEFAULT_COMPACTION_WATERMARK = 0.6
+
+# Most recent assistant/user turn pairs that are never summarized
+DEFAULT_KEEP_RECENT_TURNS = 3
+
+# Longest single message shown to the summarizer
+MAX_TRANSCRIPT_MESSAGE_CHARS = 20_000
+
+# Conservative characters per token when sizing the transcript
+TRANSCRIPT_CHARS_PER_TOKEN = 3
+
+# Tokens reserved for the compaction prompt around the transcript
+COMPACTION_PROMPT_RESERVE_TOKENS = 2000
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    """Text of a message in OpenAI (string) or Anthropic (content blocks) format"""
+    content = message.get("content")
+    if isinstance(content, list):
+        return "\n".join(
+            block.get("text", "") for block in content if block.get("type") == "text"
+        )
+    return str(content or "")
+
+
+class ContextCompactor:
+    """
+    Rolling summarization of the older turns of one agent loop.
+
+    At each turn boundary the orchestrator calls apply() to splice in a
+    finished summary and maybe_start() to start one once the context crosses
+    the watermark; compact_now() waits for a summary when the hard context
+    limit is hit. The first message (the task) and the most recent turns are
+    always kept verbatim. The summarizer's tokens are charged to the agent's
+    LLM client, so they count in the task's token usage and budget.
+    """
+
+    def __init__(
+        self,
+        llm_client: BaseClient,
+        cfg: DictConfig,
+        task_log: TaskLog,
+        system_prompt: str,
+        task_description: str,
+        agent_name: str,
+        agent_type: str,
+        create_summarizer: Callable[[], AnswerGenerator],
+        emit_progress: Optional[Callable[..., None]] = None,
+    ):
+        """
+        Initialize the compactor.
+
+        Args:
+            llm_client: The agent's LLM client, used to size its context
+            cfg: Configuration object (reads agent.context_compaction)
+            task_log: Logger for task execution
+            system_prompt: System prompt of the agent loop
+            task_description: Task the agent works on, shown to the summarizer
+            agent_name: Name of the agent for logging
+            agent_type: Type of agent ("main" or sub-agent name)
+            create_summarizer: Factory for the AnswerGenerator that writes summaries
+            emit_progress: Callback for progress events (optional)
+        """
+        settings = cfg.agent.get("context_compaction") or {}
+        self.enabled = bool(settings.get("enabled", False))
+        self.watermark = float(settings.get("watermark", DEFAULT_COMPACTION_WATERMARK))
+        self.keep_recent_turns = int(
+            settings.get("keep_recent_turns", DEFAULT_KEEP_RECENT_TURNS)
+        )
+
+        self.llm_client = llm_client
+        self.task_log = task_log
+        self.system_prompt = system_prompt
+        self.task_description = task_description
+        self.agent_name = agent_name
+        self.agent_type = agent_type
+        self.create_summarizer = create_summarizer
+        self.emit_progress = emit_progress
+
+        self.memory: Optional[str] = None
+        self.compactions = 0
+        self._task_message: Optional[Dict[str, Any]] = None
+        self._summarizer: Optional[AnswerGenerator] = None
+        self._pending: Optional[asyncio.Task] = None
+        self._pending_prefix: List[Dict[str, Any]] = []
+
+    def _context_tokens(self, message_history: List[Dict[str, Any]]) -> int:
+        """Context of the last call plus the tool results appended since"""
+        used = self.llm_client.last_call_context_tokens()
+        if message_history and message_history[-1]["role"] == "user":
+            used += self.llm_client._estimate_tokens(_message_text(message_history[-1]))
+        return used
+
+    def _over_watermark(self, message_history: List[Dict[str, Any]]) -> bool:
+        limit = self.watermark * self.llm_client.max_context_length
+        return self._context_tokens(message_history) >= limit
+
+    def maybe_start(
+        self, message_history: List[Dict[str, Any]], force: bool = False
+    ) -> bool:
+        """
+        Start summarizing the older turns in the background if over the watermark.
+
+        Args:
+            message_history: Current message history, ending with tool results
+            force: Start regardless of the watermark and keep only the last turn
+
+        Returns:
+            True if a summary was started
+        """
+        if not self.enabled or self._pending is not None:
+            return False
+        if not force and not self._over_watermark(message_history):
+            return False
+
+        keep_turns = 1 if force else self.keep_recent_turns
+        split = len(message_history) - 2 * keep_turns
+        # Need at least one assistant/user pair after the task message
+        if split < 3 or message_history[split]["role"] != "assistant":
+            return False
+
+        if self._task_message is None:
+            self._task_message = message_history[0]
+        self._pending_prefix = message_history[:split]
+        self._pending = asyncio.create_task(self._summarize(message_history[1:split]))
+        self.task_log.log_step(
+            "info",
+            f"{self.agent_name} | Context Compaction",
+            f"Summarizing {split - 1} older messages "
+            f"({self._context_tokens(message_history)}/"
+            f"{self.llm_client.max_context_length} tokens)",
+        )
+        return True
+
+    def _render_transcript(
+        self, messages: List[Dict[str, Any]], client: BaseClient
+    ) -> str:
+        """Older turns as text, truncated to fit the summarizer's context"""
+        budget_tokens = (
+            client.max_context_length
+            - client.max_tokens
+            - COMPACTION_PROMPT_RESERVE_TOKENS
+        )
+        budget_chars = max(budget_tokens, 0) * TRANSCRIPT_CHARS_PER_TOKEN
+        budget_chars -= len(self.task_description) + len(self.memory or "")
+        per_message = max(
+            min(MAX_TRANSCRIPT_MESSAGE_CHARS, budget_chars // len(messages)), 500
+        )
+
+        parts = []
+        for message in messages:
+            label = "Agent" if message["role"] == "assistant" else "Tool results"
+            text = _message_text(message)
+            if len(text) > per_message:
+                text = text[:per_message] + "\n... [truncated]"
+            parts.append(f"[{label}]\n{text}")
+        return "\n\n".join(parts)
+
+    async def _summarize(
+        self, messages: List[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Summarize messages into a new working memory; None on failure"""
+        start_time = time.time()
+        client = usage_before = None
+        try:
+            if self._summarizer is None:
+                self._summarizer = self.create_summarizer()
+            client = self._summarizer.llm_client
+            usage_before = client.get_token_usage()
+
+            previous_memory = (
+                COMPACTION_PREVIOUS_MEMORY.format(memory=self.memory)
+                if self.memory
+                else ""
+            )
+            prompt = COMPACTION_PROMPT.format(
+                task_description=self.task_description,
+                previous_memory=previous_memory,
+                transcript=self._render_transcript(messages, client),
+            )
+            response_text, _, _, _ = await self._summarizer.handle_llm_call(
+                COMPACTION_SYSTEM_PROMPT,
+                [{"role": "user", "content": prompt}],
+                [],
+                self.compactions + 1,
+                f"{self.agent_name} | Context Compaction",
+                agent_type=self.agent_type,
+            )
+            parsed = scan_llm_response(response_text or "")
+            memory = parsed.content or parsed.reasoning
+            if not memory:
+                return None
+
+            usage = self._usage_since(client, usage_before)
+            return {
+                "memory": memory,
+                "input_tokens": usage["total_input_tokens"],
+                "output_tokens": usage["total_output_tokens"],
+                "duration_ms": int((time.time() - start_time) * 1000),
+            }
+        except Exception as e:
+            self.task_log.log_step(
+                "warning",
+                f"{self.agent_name} | Context Compaction",
+                f"Summarization failed: {str(e)}",
+            )
+            return None
+        finally:
+            # Charged to the run even when the summary fails or is discarded
+            if usage_before is not None:
+                self.llm_client.charge_token_usage(
+                    self._usage_since(client, usage_before)
+                )
+
+    @staticmethod
+    def _usage_since(client: BaseClient, usage_before: Dict[str, int]) -> Dict:
+        """Tokens a client used since usage_before"""
+        usage_after = client.get_token_usage()
+        return {key: usage_after[key] - usage_before[key] for key in usage_after}
+
+    async def apply(
+        self, message_history: List[Dict[str, Any]], wait: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Replace the summarized turns with the working memory, if a summary is ready.
+
+        Args:
+            message_history: Current message history
+            wait: Wait for a running summary instead of skipping it
+
+        Returns:
+            The compacted message history, or message_history unchanged
+        """
+        if self._pending is None or not (wait or self._pending.done()):
+            return message_history
+
+        pending, prefix = self._pending, self._pending_prefix
+        self._pending, self._pending_prefix = None, []
+        result = await pending
+        if not result:
+            return message_history
+
+        # The summarized turns must still be the head of the history
+        split = len(prefix)
+        if len(message_history) <= split or any(
+            old is not new for old, new in zip(prefix, message_history)
+        ):
+            self.task_log.log_step(
+                "warning",
+                f"{self.agent_name} | Context Compaction",
+                "History changed while summarizing, discarding the summary",
+            )
+            return message_history
+
+        self.memory = result["memory"]
+        self.compactions += 1
+        task_message = dict(self._task_message)
+        task_message["content"] = append_text(
+            self._task_message["content"],
+            WORKING_MEMORY_TEMPLATE.format(memory=self.memory),
+        )
+        compacted = [task_message] + message_history[split:]
+        self.llm_client.estimate_last_call_tokens(self.system_prompt, compacted)
+
+        # Keep the removed turns in the trace, the message history loses them
+        self.task_log.trace_data.setdefault("context_compactions", []).append(
+            {
+                "agent": self.agent_name,
+                "memory": self.memory,
+                "removed_messages": message_history[1:split],
+                "input_tokens": result["input_tokens"],
+                "output_tokens": result["output_tokens"],
+                "duration_ms": result["duration_ms"],
+            }
+        )
+        self.task_log.log_step(
+            "info",
+            f"{self.agent_name} | Context Compaction",
+            f"Replaced {split - 1} messages with a {len(self.memory)}-char working "
+            f"memory (compaction {self.compactions}, "
+            f"{self.llm_client.last_call_context_tokens()} tokens now, "
+            f"summary took {result['duration_ms']}ms)",
+        )
+        if self.emit_progress:
+            self.emit_progress(
+                agent=self.agent_name,
+                messages=split - 1,
+                input_tokens=result["input_tokens"],
+                output_tokens=result["output_tokens"],
+                duration_ms=result["duration_ms"],
+            )
+        return compacted
+
+    async def compact_now(
+        self, message_history: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Compact before the next call, waiting for the summary.
+
+        Used when the context limit is reached: a running summary is applied,
+        and if the context is still over the watermark the older turns are
+        summarized again, keeping only the last turn.
+
+        Returns:
+            The compacted message history, or message_history unchanged
+        """
+        compacted = await self.apply(message_history, wait=True)
+        if compacted is message_history or self._over_watermark(compacted):
+            if self.maybe_start(compacted, force=True):
+                compacted = await self.apply(compacted, wait=True)
+        return compacted
+
+    def close(self):
+        """Cancel a running summary and close the summarizer's client"""
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending, self._pending_prefix = None, []
+        if self._summarizer is not None:
+            self._summarizer.llm_client.close()
+            self._summarizer = None
@@ -0,0 +1,303 @@
+# Copyright (c) 2025 MiroMind
+# This source code is licensed under the MIT License.
+
+"""
+Per-task evidence shared across format retries and pass@k attempts.
+
+This module provides:
+- EvidenceStore: SQLite store in the run's log directory holding the results
+  of search, scrape and extraction tool calls of one task (query -> results,
+  URL -> page content, URL + question -> extracted facts)
+- EvidenceToolManager: Tool manager wrapper that answers repeated tool calls
+  from the store and records new results, transparently to the orchestrator
+- EvidenceStats: Upstream calls avoided by one pipeline run
+
+Format retries and pass@k attempts of a task otherwise start from scratch and
+re-issue the searches and scrapes an earlier attempt already ran. Worker
+processes open short-lived WAL connections, so attempts running in different
+processes share the evidence too. Like the run state, the store is an
+accelerator: failures are reported but never raised, and a failed lookup is a
+cache miss.
+"""
+
+import dataclasses
+import json
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from ..logging.metrics import CACHE_LOOKUPS
+from ..logging.task_index import SQLITE_TIMEOUT_SECONDS
+from ..logging.tracing import span
+from ..utils.prompt_utils import EVIDENCE_INDEX_FOOTER, EVIDENCE_INDEX_HEADER
+
+EVIDENCE_STORE_FILENAME = "evidence.db"
+
+# Read-only tools whose results are reused, by kind of evidence
+EVIDENCE_TOOLS = {
+    "google_search": "search",
+    "sogou_search": "search",
+    "scrape_website": "page",
+    "wiki_get_page_content": "page",
+    "search_wiki_revision": "page",
+    "search_archived_webpage": "page",
+    "scrape_and_extract_info": "fact",
+}
+
+# Entries listed in the prompt by render_index()
+DEFAULT_INDEX_LIMIT = 50
+
+# Results that report a failure instead of evidence
+_ERROR_RESULT = re.compile(
+    r'^(\[ERROR\]|Unknown tool:|[A-Za-z ]{0,30}Error\b)|^\{\s*"success":\s*false'
+)
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS evidence (
+        task_id TEXT NOT NULL,
+        call_key TEXT NOT NULL,
+        server_name TEXT NOT NULL,
+        tool_name TEXT NOT NULL,
+        arguments TEXT NOT NULL,
+        result TEXT NOT NULL,
+        duration_ms INTEGER NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (task_id, call_key)
+    )
+"""
+
+
+def evidence_key(server_name: str, tool_name: str, arguments: Dict[str, Any]) -> str:
+    """Key of a tool call: server, tool and arguments in canonical JSON"""
+    return json.dumps(
+        [server_name, tool_name, arguments], sort_keys=True, ensure_ascii=False
+    )
+
+
+def is_reusable_result(tool_result: Dict[str, Any]) -> bool:
+    """Whether a tool result is evidence worth reusing (not an error or empty)"""
+    result = tool_result.get("result")
+    if "error" in tool_result or not isinstance(result, str) or not result.strip():
+        return False
+    if _ERROR_RESULT.match(result.lstrip()[:200]):
+        return False
+    # google_search without organic results makes the orchestrator roll back
+    if tool_result.get("tool_name") == "google_search":
+        try:
+            return bool(json.loads(result).get("organic"))
+        except (json.JSONDecodeError, AttributeError):
+            return True
+    return True
+
+
+class EvidenceStore:
+    """
+    SQLite evidence store for one task in a benchmark run directory.
+    """
+
+    def __init__(self, log_dir: Union[str, Path], task_id: str):
+        self.log_dir = Path(log_dir)
+        self.path = self.log_dir / EVIDENCE_STORE_FILENAME
+        self.task_id = task_id
+
+    def _connect(self) -> sqlite3.Connection:
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=SQLITE_TIMEOUT_SECONDS)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(_SCHEMA)
+        return conn
+
+    def lookup(
+        self, server_name: str, tool_name: str, arguments: Dict[str, Any]
+    ) -> Optional[Tuple[str, int]]:
+        """
+        Find the stored result of a tool call and count the hit.
+
+        Returns:
+            Tuple of (result, duration_ms of the original call), or None
+        """
+        if tool_name not in EVIDENCE_TOOLS or not self.path.exists():
+            return None
+        key = evidence_key(server_name, tool_name, arguments)
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    row = conn.execute(
+                        "SELECT result, duration_ms FROM evidence "
+                        "WHERE task_id = ? AND call_key = ?",
+                        (self.task_id, key),
+                    ).fetchone()
+                    if row is not None:
+                        conn.execute(
+                            "UPDATE evidence SET hits = hits + 1 "
+                            "WHERE task_id = ? AND call_key = ?",
+                            (self.task_id, key),
+                        )
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"Warning: Could not read evidence store {self.path}: {e}")
+            return None
+        return (row[0], row[1]) if row is not None else None
+
+    def record(
+        self,
+        server_name: str,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        result: str,
+        duration_ms: int,
+    ):
+        """Store the result of a tool call (the first result of a call is kept)"""
+        if tool_name not in EVIDENCE_TOOLS:
+            return
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR IGNORE INTO evidence (task_id, call_key, "
+                        "server_name, tool_name, arguments, result, duration_ms, "
+                        "created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            self.task_id,
+                            evidence_key(server_name, tool_name, arguments),
+                            server_name,
+                            tool_name,
+                            json.dumps(arguments, ensure_ascii=False),
+                            result,
+                            duration_ms,
+                            time.time(),
+                        ),
+                    )
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"Warning: Could not update evidence store {self.path}: {e}")
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Tool calls stored for the task, oldest first (without their results)"""
+        if not self.path.exists():
+            return []
+        try:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    "SELECT tool_name, arguments, length(result), hits FROM evidence "
+                    "WHERE task_id = ? ORDER BY created_at",
+                    (self.task_id,),
+                ).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"Warning: Could not read evidence store {self.path}: {e}")
+            return []
+        return [
+            {
+                "tool_name": tool_name,
+                "kind": EVIDENCE_TOOLS.get(tool_name, "other"),
+                "arguments": json.loads(arguments),
+                "result_chars": result_chars,
+                "hits": hits,
+            }
+            for tool_name, arguments, result_chars, hits in rows
+        ]
+
+    def render_index(self, limit: int = DEFAULT_INDEX_LIMIT) -> str:
+        """
+        List the evidence gathered by earlier attempts, for the task prompt.
+
+        Returns:
+            Prompt section naming the stored calls (most recent last), or ""
+            if nothing is stored yet
+        """
+        entries = self.entries()
+        if not entries:
+            return ""
+        lines = [
+            f"- [{entry['kind']}] {entry['tool_name']}: "
+            f"{json.dumps(entry['arguments'], ensure_ascii=False)}"
+            for entry in entries[-limit:]
+        ]
+        return EVIDENCE_INDEX_HEADER + "\n".join(lines) + "\n" + EVIDENCE_INDEX_FOOTER
+
+
+@dataclasses.dataclass
+class EvidenceStats:
+    """Tool calls of one pipeline run answered from or added to the store"""
+
+    hits: int = 0
+    stored: int = 0
+    saved_ms: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return dataclasses.asdict(self)
+
+
+class EvidenceToolManager:
+    """
+    Tool manager that reuses the evidence of earlier attempts.
+
+    Wraps a ToolManager: repeated search/scrape/extraction calls are answered
+    from the EvidenceStore and successful new results are stored. Results
+    served from the store carry "cached": True. Everything else is delegated.
+    """
+
+    def __init__(self, tool_manager: Any, store: EvidenceStore, stats: EvidenceStats):
+        self.tool_manager = tool_manager
+        self.store = store
+        self.stats = stats
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.tool_manager, name)
+
+    async def get_all_tool_definitions(self) -> Any:
+        return await self.tool_manager.get_all_tool_definitions()
+
+    async def execute_tool_call(
+        self, server_name: str, tool_name: str, arguments: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        with span("evidence.lookup", tool_name=tool_name) as lookup_span:
+            stored = self.store.lookup(server_name, tool_name, arguments)
+            if lookup_span is not None:
+                lookup_span.set_attribute("hit", stored is not None)
+        if tool_name in EVIDENCE_TOOLS:
+            CACHE_LOOKUPS.inc(
+                cache="evidence", result="miss" if stored is None else "hit"
+            )
+        if stored is not None:
+            result, duration_ms = stored
+            self.stats.hits += 1
+            self.stats.saved_ms += duration_ms
+            self.tool_manager._log(
+                "info",
+                "ToolManager | Evidence Reused",
+                f"Tool '{tool_name}' (server: '{server_name}') answered from the "
+                f"evidence of an earlier attempt, saving {duration_ms}ms.",
+            )
+            return {
+                "server_name": server_name,
+                "tool_name": tool_name,
+                "result": result,
+                "cached": True,
+            }
+
+        start_time = time.time()
+        tool_result = await self.tool_manager.execute_tool_call(
+            server_name=server_name, tool_name=tool_name, arguments=arguments
+        )
+        if tool_name in EVIDENCE_TOOLS and is_reusable_result(tool_result):
+            self.store.record(
+                server_name,
+                tool_name,
+                arguments,
+                tool_result["result"],
+                int((time.time() - start_time) * 1000),
+            )
+            self.stats.stored += 1
+        return tool_result
@@ -9,22 +9,31 @@ by coordinating between the main agent, sub-agents, and various tools.
 """
 
 import asyncio
+import functools
 import gc
 import logging
 import time
 import uuid
-from collections import defaultdict
 from datetime import date
 from typing import Any, Dict, List, Optional
 
 from miroflow_tools.manager import ToolManager
-from omegaconf import DictConfig
+from omegaconf import DictConfig, OmegaConf
 
 from ..config.settings import expose_sub_agents_as_tools
-from ..io.input_handler import process_input
+from ..io.input_handler import process_input_async
 from ..io.output_formatter import OutputFormatter
 from ..llm.base_client import BaseClient
+from ..llm.factory import ClientFactory
+from ..logging.progress_events import (
+    BUDGET,
+    COMPACTION,
+    TOOL_CALL,
+    TURN,
+    ProgressEventWriter,
+)
 from ..logging.task_logger import TaskLog, get_utc_plus_8_time
+from ..logging.tracing import span
 from ..utils.parsing_utils import extract_llm_response_text
 from ..utils.prompt_utils import (
     generate_agent_specific_system_prompt,
@@ -33,8 +42,14 @@ from ..utils.prompt_utils import (
     refusal_keywords,
 )
 from .answer_generator import AnswerGenerator
+from .context_compactor import ContextCompactor
 from .stream_handler import StreamHandler
-from .tool_executor import ToolExecutor
+from .task_budget import BUDGET_EXHAUSTED, BUDGET_OK, TaskBudget
+from .tool_executor import (
+    DUPLICATE_POLICY_CACHE,
+    DUPLICATE_POLICY_ROLLBACK,
+    ToolExecutor,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -102,6 +117,8 @@ class Orchestrator:
         stream_queue: Optional[Any] = None,
         tool_definitions: Optional[List[Dict[str, Any]]] = None,
         sub_agent_tool_definitions: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+        progress_events: Optional[ProgressEventWriter] = None,
+        budget: Optional[TaskBudget] = None,
     ):
         """
         Initialize the orchestrator.
@@ -116,6 +133,9 @@ class Orchestrator:
             stream_queue: Optional async queue for streaming events
             tool_definitions: Pre-fetched tool definitions (optional)
             sub_agent_tool_definitions: Pre-fetched sub-agent tool definitions (optional)
+            progress_events: Sink for benchmark progress events (optional)
+            budget: Budget of the task, shared with its other runs (optional;
+                defaults to a budget of this run alone)
         """
         self.main_agent_tool_manager = main_agent_tool_manager
         self.sub_agent_tool_managers = sub_agent_tool_managers
@@ -126,6 +146,7 @@ class Orchestrator:
         self.stream_queue = stream_queue
         self.tool_definitions = tool_definitions
         self.sub_agent_tool_definitions = sub_agent_tool_definitions
+        self.progress_events = progress_events
 
         # Initialize sub-agent tool list function
         self._list_sub_agent_tools = None
@@ -139,12 +160,15 @@ class Orchestrator:
         # Track boxed answers extracted during main loop turns
         self.intermediate_boxed_answers: List[str] = []
 
-        # Record used subtask / q / Query to detect duplicates
-        self.used_queries: Dict[str, Dict[str, int]] = {}
-
         # Retry loop protection limits
         self.MAX_CONSECUTIVE_ROLLBACKS = DEFAULT_MAX_CONSECUTIVE_ROLLBACKS
 
+        # Wall time, token and tool call budgets of the task
+        self.budget = budget or TaskBudget(cfg)
+        self.budget.attach(llm_client)
+        self.budget_warned = False
+        self.budget_exhausted = False
+
         # Context management settings
         self.context_compress_limit = cfg.agent.get("context_compress_limit", 0)
 
@@ -157,7 +181,10 @@ class Orchestrator:
             task_log=task_log,
             stream_handler=self.stream,
             max_consecutive_rollbacks=DEFAULT_MAX_CONSECUTIVE_ROLLBACKS,
+            duplicate_queries=cfg.agent.get("duplicate_queries"),
         )
+        # Record used subtask / q / Query / URL to detect duplicates
+        self.used_queries = self.tool_executor.used_queries
         self.answer_generator = AnswerGenerator(
             llm_client=llm_client,
             output_formatter=output_formatter,
@@ -167,6 +194,166 @@ class Orchestrator:
             intermediate_boxed_answers=self.intermediate_boxed_answers,
         )
 
+    def _emit_progress(self, event: str, **fields):
+        """Emit a progress event tagged with the current task ID, if enabled."""
+        if self.progress_events:
+            self.progress_events.emit(event, task_id=self.task_log.task_id, **fields)
+
+    def _emit_turn(self, agent_name: str, turn_count: int):
+        """Emit a turn event with the token usage of the last LLM call."""
+        input_tokens, output_tokens = self.llm_client.last_call_input_output_tokens()
+        self._emit_progress(
+            TURN,
+            agent=agent_name,
+            turn=turn_count,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+        )
+
+    def _check_tool_budget(
+        self, server_name: str, tool_name: str, agent_name: str, turn_count: int
+    ) -> Optional[dict]:
+        """
+        Charge a tool call to the budget, or refuse it if over its per-tool limit.
+
+        Returns:
+            Error tool result to use instead of running the tool, or None
+        """
+        if self.budget.tool_call_allowed(tool_name):
+            self.budget.record_tool_call(tool_name)
+            return None
+        message = self.budget.tool_budget_exhausted_message(tool_name)
+        self.task_log.log_step(
+            "warning", f"{agent_name} | Turn: {turn_count} | Tool Budget", message
+        )
+        return {"server_name": server_name, "tool_name": tool_name, "error": message}
+
+    def _apply_budget(
+        self, message_history: List[Dict[str, Any]], agent_name: str, turn_count: int
+    ) -> tuple:
+        """
+        Check the budget at the end of a turn and escalate.
+
+        Past the warning threshold the model is told once to converge; once a
+        budget is used up the loop should stop for the final answer.
+
+        Returns:
+            Tuple of (message_history, budget_exhausted)
+        """
+        if not self.budget.enabled:
+            return message_history, False
+
+        status = self.budget.check(agent_name, turn_count, self.task_log.trace_data)
+        if status["level"] == BUDGET_OK:
+            return message_history, False
+
+        if status["level"] == BUDGET_EXHAUSTED:
+            self.budget_exhausted = True
+            self.task_log.log_step(
+                "warning",
+                f"{agent_name} | Turn: {turn_count} | Budget Exhausted",
+                f"{status['binding']} budget used up ({status['used']:.0%}), "
+                "stopping for the final answer",
+            )
+        elif not self.budget_warned:
+            self.budget_warned = True
+            message_history = self.budget.warn(message_history, status)
+            self.task_log.log_step(
+                "info",
+                f"{agent_name} | Turn: {turn_count} | Budget Warning",
+                f"{status['used']:.0%} of the {status['binding']} budget used, "
+                "asking the model to converge",
+            )
+        else:
+            return message_history, False
+
+        self._emit_progress(
+            BUDGET,
+            agent=agent_name,
+            turn=turn_count,
+            level=status["level"],
+            binding=status["binding"],
+            used=status["used"],
+        )
+        return message_history, self.budget_exhausted
+
+    def _create_summarizer(self) -> AnswerGenerator:
+        """Answer generator on a separate LLM client for context compaction."""
+        settings = self.cfg.agent.get("context_compaction") or {}
+        overrides = settings.get("llm") or {}
+        cfg = OmegaConf.merge(self.cfg, {"llm": overrides})
+        return AnswerGenerator(
+            llm_client=ClientFactory(
+                task_id=f"{self.llm_client.task_id}-compaction",
+                cfg=cfg,
+                task_log=self.task_log,
+            ),
+            output_formatter=self.output_formatter,
+            task_log=self.task_log,
+            stream_handler=self.stream,
+            cfg=cfg,
+            intermediate_boxed_answers=[],
+        )
+
+    def _create_compactor(
+        self,
+        system_prompt: str,
+        task_description: str,
+        agent_name: str,
+        agent_type: str,
+    ) -> ContextCompactor:
+        """Context compactor for one agent loop."""
+        return ContextCompactor(
+            llm_client=self.llm_client,
+            cfg=self.cfg,
+            task_log=self.task_log,
+            system_prompt=system_prompt,
+            task_description=task_description,
+            agent_name=agent_name,
+            agent_type=agent_type,
+            create_summarizer=self._create_summarizer,
+            emit_progress=functools.partial(self._emit_progress, COMPACTION),
+        )
+
+    async def _ensure_context(
+        self,
+        compactor: ContextCompactor,
+        message_history: List[Dict[str, Any]],
+        summary_prompt: str,
+    ) -> tuple:
+        """
+        Keep the next LLM call and the final summary within the context window.
+
+        With context compaction enabled, finished summaries of older turns are
+        spliced in and new ones are started past the watermark. If the limit
+        is still reached, the loop waits for a compaction before giving up.
+
+        Args:
+            compactor: Context compactor of the agent loop
+            message_history: Current message history
+            summary_prompt: Prompt that will be used for the final summary
+
+        Returns:
+            Tuple of (pass_length_check, message_history)
+        """
+        with span("context.check", agent=compactor.agent_name):
+            if compactor.enabled:
+                message_history = await compactor.apply(message_history)
+                compactor.maybe_start(message_history)
+                full_history = list(message_history)
+
+            pass_length_check, message_history = self.llm_client.ensure_summary_context(
+                message_history, summary_prompt
+            )
+            if pass_length_check or not compactor.enabled:
+                return pass_length_check, message_history
+
+            # The check dropped the last turn; compact the full history instead
+            compacted = await compactor.compact_now(full_history)
+            if compacted is full_history:
+                return pass_length_check, message_history
+            return self.llm_client.ensure_summary_context(compacted, summary_prompt)
+
     def _save_message_history(
         self, system_prompt: str, message_history: List[Dict[str, Any]]
     ):
@@ -267,7 +454,10 @@ class Orchestrator:
         agent_name: str,
     ) -> tuple:
         """
-        Check for duplicate queries and handle rollback if needed.
+        Check for duplicate queries and apply the duplicate query policy.
+
+        Queries are compared after normalization (case, quotes, whitespace,
+        term order, URL variants); near-duplicates have their own policy.
 
         Args:
             tool_name: Name of the tool being called
@@ -281,48 +471,79 @@ class Orchestrator:
             agent_name: Name of the agent for logging
 
         Returns:
-            Tuple of (is_duplicate, should_rollback, turn_count, consecutive_rollbacks, message_history)
+            Tuple of (cached_result, should_rollback, turn_count, consecutive_rollbacks, message_history);
+            cached_result is the earlier result to use instead of running the tool, or None
         """
+        match = self.tool_executor.find_duplicate_query(
+            cache_name, tool_name, arguments
+        )
+        if match is None:
+            return None, False, turn_count, consecutive_rollbacks, message_history
+
         query_str = self.tool_executor.get_query_str_from_tool_call(
             tool_name, arguments
         )
-        if not query_str:
-            return False, False, turn_count, consecutive_rollbacks, message_history
+        description = (
+            f"{match.kind.capitalize()} duplicate query - tool: {tool_name}, "
+            f"query: '{query_str}', earlier query: '{match.query}' "
+            f"(similarity {match.similarity:.2f}), previous count: {match.count}"
+        )
+        policy = self.tool_executor.get_duplicate_policy(match)
 
-        self.used_queries.setdefault(cache_name, defaultdict(int))
-        count = self.used_queries[cache_name][query_str]
+        if policy == DUPLICATE_POLICY_CACHE:
+            self.tool_executor.count_duplicate_query("served_cached")
+            self.task_log.log_step(
+                "info",
+                f"{agent_name} | Turn: {turn_count} | Reuse Duplicate",
+                f"{description}. Serving the earlier result.",
+            )
+            return (
+                self.tool_executor.get_cached_duplicate_result(match),
+                False,
+                turn_count,
+                consecutive_rollbacks,
+                message_history,
+            )
 
-        if count > 0:
+        if policy == DUPLICATE_POLICY_ROLLBACK:
             if consecutive_rollbacks < self.MAX_CONSECUTIVE_ROLLBACKS - 1:
                 message_history.pop()
                 turn_count -= 1
                 consecutive_rollbacks += 1
+                self.tool_executor.count_duplicate_query("rolled_back")
                 self.task_log.log_step(
                     "warning",
                     f"{agent_name} | Turn: {turn_count} | Rollback",
-                    f"Duplicate query detected - tool: {tool_name}, query: '{query_str}', "
-                    f"previous count: {count}. Consecutive rollbacks: {consecutive_rollbacks}/"
+                    f"{description}. Consecutive rollbacks: {consecutive_rollbacks}/"
                     f"{self.MAX_CONSECUTIVE_ROLLBACKS}, Total attempts: {total_attempts}/{max_attempts}",
                 )
-                return True, True, turn_count, consecutive_rollbacks, message_history
-            else:
-                self.task_log.log_step(
-                    "warning",
-                    f"{agent_name} | Turn: {turn_count} | Allow Duplicate",
-                    f"Allowing duplicate query after {consecutive_rollbacks} rollbacks - "
-                    f"tool: {tool_name}, query: '{query_str}', previous count: {count}",
-                )
+                return None, True, turn_count, consecutive_rollbacks, message_history
+            self.tool_executor.count_duplicate_query("allowed")
+            self.task_log.log_step(
+                "warning",
+                f"{agent_name} | Turn: {turn_count} | Allow Duplicate",
+                f"Allowing duplicate query after {consecutive_rollbacks} rollbacks - "
+                f"{description}",
+            )
+        else:
+            self.tool_executor.count_duplicate_query("warned")
+            self.task_log.log_step(
+                "warning",
+                f"{agent_name} | Turn: {turn_count} | Duplicate Query",
+                f"{description}. Running it anyway.",
+            )
 
-        return False, False, turn_count, consecutive_rollbacks, message_history
+        return None, False, turn_count, consecutive_rollbacks, message_history
 
-    async def _record_query(self, cache_name: str, tool_name: str, arguments: dict):
+    async def _record_query(
+        self,
+        cache_name: str,
+        tool_name: str,
+        arguments: dict,
+        tool_result: Optional[dict] = None,
+    ):
         """Record a successful query execution."""
-        query_str = self.tool_executor.get_query_str_from_tool_call(
-            tool_name, arguments
-        )
-        if query_str:
-            self.used_queries.setdefault(cache_name, defaultdict(int))
-            self.used_queries[cache_name][query_str] += 1
+        self.tool_executor.record_query(cache_name, tool_name, arguments, tool_result)
 
     async def run_sub_agent(
         self,
@@ -386,269 +607,316 @@ class Orchestrator:
         total_attempts = 0
         max_attempts = max_turns + EXTRA_ATTEMPTS_BUFFER
         consecutive_rollbacks = 0
+        compactor = self._create_compactor(
+            system_prompt, task_description, sub_agent_name, sub_agent_name
+        )
 
-        while turn_count < max_turns and total_attempts < max_attempts:
-            turn_count += 1
-            total_attempts += 1
-
-            if consecutive_rollbacks >= self.MAX_CONSECUTIVE_ROLLBACKS:
-                self.task_log.log_step(
-                    "error",
-                    f"{sub_agent_name} | Too Many Rollbacks",
-                    f"Reached {consecutive_rollbacks} consecutive rollbacks, breaking loop.",
-                )
-                break
-
-            self.task_log.save()
-
-            # Reset 'last_call_tokens'
-            self.llm_client.last_call_tokens = {
-                "prompt_tokens": 0,
-                "completion_tokens": 0,
-            }
+        try:
+            while turn_count < max_turns and total_attempts < max_attempts:
+                turn_count += 1
+                total_attempts += 1
 
-            # LLM call using answer generator
-            (
-                assistant_response_text,
-                should_break,
-                tool_calls,
-                message_history,
-            ) = await self.answer_generator.handle_llm_call(
-                system_prompt,
-                message_history,
-                tool_definitions,
-                turn_count,
-                f"{sub_agent_name} | Turn: {turn_count}",
-                agent_type=sub_agent_name,
-            )
+                if consecutive_rollbacks >= self.MAX_CONSECUTIVE_ROLLBACKS:
+                    self.task_log.log_step(
+                        "error",
+                        f"{sub_agent_name} | Too Many Rollbacks",
+                        f"Reached {consecutive_rollbacks} consecutive rollbacks, breaking loop.",
+                    )
+                    break
 
-            if should_break:
-                self.task_log.log_step(
-                    "info",
-                    f"{sub_agent_name} | Turn: {turn_count} | LLM Call",
-                    "should break is True, breaking the loop",
-                )
-                break
+                self.task_log.save()
 
-            if assistant_response_text:
-                text_response = extract_llm_response_text(assistant_response_text)
-                if text_response:
-                    await self.stream.tool_call("show_text", {"text": text_response})
-            else:
-                self.task_log.log_step(
-                    "info",
-                    f"{sub_agent_name} | Turn: {turn_count} | LLM Call",
-                    "LLM call failed",
-                )
-                await asyncio.sleep(5)
-                continue
+                # Reset 'last_call_tokens'
+                self.llm_client.last_call_tokens = {
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                }
 
-            # Handle no tool calls case
-            if not tool_calls:
+                # LLM call using answer generator
                 (
-                    should_continue,
-                    should_break_loop,
-                    turn_count,
-                    consecutive_rollbacks,
-                    message_history,
-                ) = await self._handle_response_format_issues(
                     assistant_response_text,
+                    should_break,
+                    tool_calls,
                     message_history,
+                ) = await self.answer_generator.handle_llm_call(
+                    system_prompt,
+                    message_history,
+                    tool_definitions,
                     turn_count,
-                    consecutive_rollbacks,
-                    total_attempts,
-                    max_attempts,
-                    sub_agent_name,
+                    f"{sub_agent_name} | Turn: {turn_count}",
+                    agent_type=sub_agent_name,
                 )
-                if should_continue:
-                    continue
-                if should_break_loop:
-                    if not any(
-                        mcp_tag in assistant_response_text for mcp_tag in mcp_tags
-                    ) and not any(
-                        keyword in assistant_response_text
-                        for keyword in refusal_keywords
-                    ):
-                        self.task_log.log_step(
-                            "info",
-                            f"{sub_agent_name} | Turn: {turn_count} | LLM Call",
-                            f"No tool calls found in {sub_agent_name}, ending on turn {turn_count}",
-                        )
-                    break
-
-            # Execute tool calls
-            tool_calls_data = []
-            all_tool_results_content_with_id = []
-            should_rollback_turn = False
+                if assistant_response_text:
+                    self._emit_turn(sub_agent_name, turn_count)
 
-            for call in tool_calls:
-                server_name = call["server_name"]
-                tool_name = call["tool_name"]
-                arguments = call["arguments"]
-                call_id = call["id"]
-
-                # Fix common parameter name mistakes
-                arguments = self.tool_executor.fix_tool_call_arguments(
-                    tool_name, arguments
-                )
+                if should_break:
+                    self.task_log.log_step(
+                        "info",
+                        f"{sub_agent_name} | Turn: {turn_count} | LLM Call",
+                        "should break is True, breaking the loop",
+                    )
+                    break
 
-                self.task_log.log_step(
-                    "info",
-                    f"{sub_agent_name} | Turn: {turn_count} | Tool Call",
-                    f"Executing {tool_name} on {server_name}",
-                )
+                if assistant_response_text:
+                    text_response = extract_llm_response_text(assistant_response_text)
+                    if text_response:
+                        await self.stream.tool_call(
+                            "show_text", {"text": text_response}
+                        )
+                else:
+                    self.task_log.log_step(
+                        "info",
+                        f"{sub_agent_name} | Turn: {turn_count} | LLM Call",
+                        "LLM call failed",
+                    )
+                    await asyncio.sleep(5)
+                    continue
 
-                call_start_time = time.time()
-                try:
-                    # Check for duplicate query
-                    cache_name = sub_agent_id + "_" + tool_name
+                # Handle no tool calls case
+                if not tool_calls:
                     (
-                        is_duplicate,
-                        should_rollback,
+                        should_continue,
+                        should_break_loop,
                         turn_count,
                         consecutive_rollbacks,
                         message_history,
-                    ) = await self._check_duplicate_query(
-                        tool_name,
-                        arguments,
-                        cache_name,
-                        consecutive_rollbacks,
+                    ) = await self._handle_response_format_issues(
+                        assistant_response_text,
+                        message_history,
                         turn_count,
+                        consecutive_rollbacks,
                         total_attempts,
                         max_attempts,
-                        message_history,
                         sub_agent_name,
                     )
-                    if should_rollback:
-                        should_rollback_turn = True
+                    if should_continue:
+                        continue
+                    if should_break_loop:
+                        if not any(
+                            mcp_tag in assistant_response_text for mcp_tag in mcp_tags
+                        ) and not any(
+                            keyword in assistant_response_text
+                            for keyword in refusal_keywords
+                        ):
+                            self.task_log.log_step(
+                                "info",
+                                f"{sub_agent_name} | Turn: {turn_count} | LLM Call",
+                                f"No tool calls found in {sub_agent_name}, ending on turn {turn_count}",
+                            )
                         break
 
-                    # Send stream event
-                    tool_call_id = await self.stream.tool_call(tool_name, arguments)
+                # Execute tool calls
+                tool_calls_data = []
+                all_tool_results_content_with_id = []
+                should_rollback_turn = False
 
-                    # Execute tool call
-                    tool_result = await self.sub_agent_tool_managers[
-                        sub_agent_name
-                    ].execute_tool_call(server_name, tool_name, arguments)
+                for call in tool_calls:
+                    server_name = call["server_name"]
+                    tool_name = call["tool_name"]
+                    arguments = call["arguments"]
+                    call_id = call["id"]
 
-                    # Update query count if successful
-                    if "error" not in tool_result:
-                        await self._record_query(cache_name, tool_name, arguments)
-
-                    # Post-process result
-                    tool_result = self.tool_executor.post_process_tool_call_result(
-                        tool_name, tool_result
+                    # Fix common parameter name mistakes
+                    arguments = self.tool_executor.fix_tool_call_arguments(
+                        tool_name, arguments
                     )
-                    result = (
-                        tool_result.get("result")
-                        if tool_result.get("result")
-                        else tool_result.get("error")
+
+                    self.task_log.log_step(
+                        "info",
+                        f"{sub_agent_name} | Turn: {turn_count} | Tool Call",
+                        f"Executing {tool_name} on {server_name}",
                     )
 
-                    # Check for errors that should trigger rollback
-                    if self.tool_executor.should_rollback_result(
-                        tool_name, result, tool_result
-                    ):
-                        if consecutive_rollbacks < self.MAX_CONSECUTIVE_ROLLBACKS - 1:
-                            message_history.pop()
-                            turn_count -= 1
-                            consecutive_rollbacks += 1
+                    call_start_time = time.time()
+                    try:
+                        # Check for duplicate query
+                        cache_name = sub_agent_id + "_" + tool_name
+                        (
+                            cached_result,
+                            should_rollback,
+                            turn_count,
+                            consecutive_rollbacks,
+                            message_history,
+                        ) = await self._check_duplicate_query(
+                            tool_name,
+                            arguments,
+                            cache_name,
+                            consecutive_rollbacks,
+                            turn_count,
+                            total_attempts,
+                            max_attempts,
+                            message_history,
+                            sub_agent_name,
+                        )
+                        if should_rollback:
                             should_rollback_turn = True
-                            self.task_log.log_step(
-                                "warning",
-                                f"{sub_agent_name} | Turn: {turn_count} | Rollback",
-                                f"Tool result error - tool: {tool_name}, result: '{str(result)[:200]}'",
-                            )
                             break
 
-                    await self.stream.tool_call(
-                        tool_name, {"result": result}, tool_call_id=tool_call_id
-                    )
-                    call_end_time = time.time()
-                    call_duration_ms = int((call_end_time - call_start_time) * 1000)
+                        # Send stream event
+                        tool_call_id = await self.stream.tool_call(tool_name, arguments)
 
-                    self.task_log.log_step(
-                        "info",
-                        f"{sub_agent_name} | Turn: {turn_count} | Tool Call",
-                        f"Tool {tool_name} completed in {call_duration_ms}ms",
-                    )
+                        # Execute tool call, unless an earlier result is reused
+                        # or the tool is over its budget
+                        blocked_result = cached_result or self._check_tool_budget(
+                            server_name, tool_name, sub_agent_name, turn_count
+                        )
+                        tool_result = blocked_result or (
+                            await self.sub_agent_tool_managers[
+                                sub_agent_name
+                            ].execute_tool_call(server_name, tool_name, arguments)
+                        )
 
-                    tool_calls_data.append(
-                        {
-                            "server_name": server_name,
-                            "tool_name": tool_name,
-                            "arguments": arguments,
-                            "result": tool_result,
-                            "duration_ms": call_duration_ms,
-                            "call_time": get_utc_plus_8_time(),
-                        }
-                    )
+                        # Update query count if successful
+                        if "error" not in tool_result:
+                            await self._record_query(
+                                cache_name, tool_name, arguments, tool_result
+                            )
 
-                except Exception as e:
-                    call_end_time = time.time()
-                    call_duration_ms = int((call_end_time - call_start_time) * 1000)
+                        # Post-process result
+                        tool_result = self.tool_executor.post_process_tool_call_result(
+                            tool_name, tool_result
+                        )
+                        result = (
+                            tool_result.get("result")
+                            if tool_result.get("result")
+                            else tool_result.get("error")
+                        )
 
-                    tool_calls_data.append(
-                        {
+                        # Check for errors that should trigger rollback
+                        if self.tool_executor.should_rollback_result(
+                            tool_name, result, tool_result
+                        ):
+                            if (
+                                consecutive_rollbacks
+                                < self.MAX_CONSECUTIVE_ROLLBACKS - 1
+                            ):
+                                message_history.pop()
+                                turn_count -= 1
+                                consecutive_rollbacks += 1
+                                should_rollback_turn = True
+                                self.task_log.log_step(
+                                    "warning",
+                                    f"{sub_agent_name} | Turn: {turn_count} | Rollback",
+                                    f"Tool result error - tool: {tool_name}, result: '{str(result)[:200]}'",
+                                )
+                                break
+
+                        await self.stream.tool_call(
+                            tool_name, {"result": result}, tool_call_id=tool_call_id
+                        )
+                        call_end_time = time.time()
+                        call_duration_ms = int((call_end_time - call_start_time) * 1000)
+
+                        self.task_log.log_step(
+                            "info",
+                            f"{sub_agent_name} | Turn: {turn_count} | Tool Call",
+                            f"Tool {tool_name} completed in {call_duration_ms}ms",
+                        )
+                        self._emit_progress(
+                            TOOL_CALL,
+                            agent=sub_agent_name,
+                            server_name=server_name,
+                            tool_name=tool_name,
+                            duration_ms=call_duration_ms,
+                            error="error" in tool_result,
+                            cached=tool_result.get("cached", False),
+                        )
+
+                        tool_calls_data.append(
+                            {
+                                "server_name": server_name,
+                                "tool_name": tool_name,
+                                "arguments": arguments,
+                                "result": tool_result,
+                                "duration_ms": call_duration_ms,
+                                "call_time": get_utc_plus_8_time(),
+                            }
+                        )
+
+                    except Exception as e:
+                        call_end_time = time.time()
+                        call_duration_ms = int((call_end_time - call_start_time) * 1000)
+
+                        tool_calls_data.append(
+                            {
+                                "server_name": server_name,
+                                "tool_name": tool_name,
+                                "arguments": arguments,
+                                "error": str(e),
+                                "duration_ms": call_duration_ms,
+                                "call_time": get_utc_plus_8_time(),
+                            }
+                        )
+                        tool_result = {
+                            "error": f"Tool call failed: {str(e)}",
                             "server_name": server_name,
                             "tool_name": tool_name,
-                            "arguments": arguments,
-                            "error": str(e),
-                            "duration_ms": call_duration_ms,
-                            "call_time": get_utc_plus_8_time(),
                         }
+                        self.task_log.log_step(
+                            "error",
+                            f"{sub_agent_name} | Turn: {turn_count} | Tool Call",
+                            f"Tool {tool_name} failed to execute: {str(e)}",
+                        )
+                        self._emit_progress(
+                            TOOL_CALL,
+                            agent=sub_agent_name,
+                            server_name=server_name,
+                            tool_name=tool_name,
+                            duration_ms=call_duration_ms,
+                            error=True,
+                        )
+
+                    tool_result_for_llm = (
+                        self.output_formatter.format_tool_result_for_user(tool_result)
                     )
-                    tool_result = {
-                        "error": f"Tool call failed: {str(e)}",
-                        "server_name": server_name,
-                        "tool_name": tool_name,
-                    }
-                    self.task_log.log_step(
-                        "error",
-                        f"{sub_agent_name} | Turn: {turn_count} | Tool Call",
-                        f"Tool {tool_name} failed to execute: {str(e)}",
+                    all_tool_results_content_with_id.append(
+                        (call_id, tool_result_for_llm)
                     )
 
-                tool_result_for_llm = self.output_formatter.format_tool_result_for_user(
-                    tool_result
-                )
-                all_tool_results_content_with_id.append((call_id, tool_result_for_llm))
+                if should_rollback_turn:
+                    continue
 
-            if should_rollback_turn:
-                continue
+                # Reset consecutive rollbacks on successful execution
+                if consecutive_rollbacks > 0:
+                    self.task_log.log_step(
+                        "info",
+                        f"{sub_agent_name} | Turn: {turn_count} | Recovery",
+                        f"Successfully recovered after {consecutive_rollbacks} consecutive rollbacks",
+                    )
+                consecutive_rollbacks = 0
 
-            # Reset consecutive rollbacks on successful execution
-            if consecutive_rollbacks > 0:
-                self.task_log.log_step(
-                    "info",
-                    f"{sub_agent_name} | Turn: {turn_count} | Recovery",
-                    f"Successfully recovered after {consecutive_rollbacks} consecutive rollbacks",
+                # Update message history
+                message_history = self.llm_client.update_message_history(
+                    message_history, all_tool_results_content_with_id
                 )
-            consecutive_rollbacks = 0
 
-            # Update message history
-            message_history = self.llm_client.update_message_history(
-                message_history, all_tool_results_content_with_id
-            )
+                # Check context length
+                temp_summary_prompt = generate_agent_summarize_prompt(
+                    task_description,
+                    agent_type=sub_agent_name,
+                )
 
-            # Check context length
-            temp_summary_prompt = generate_agent_summarize_prompt(
-                task_description,
-                agent_type=sub_agent_name,
-            )
+                pass_length_check, message_history = await self._ensure_context(
+                    compactor, message_history, temp_summary_prompt
+                )
 
-            pass_length_check, message_history = self.llm_client.ensure_summary_context(
-                message_history, temp_summary_prompt
-            )
+                if not pass_length_check:
+                    turn_count = max_turns
+                    self.task_log.log_step(
+                        "info",
+                        f"{sub_agent_name} | Turn: {turn_count} | Context Limit Reached",
+                        "Context limit reached, triggering summary",
+                    )
+                    break
 
-            if not pass_length_check:
-                turn_count = max_turns
-                self.task_log.log_step(
-                    "info",
-                    f"{sub_agent_name} | Turn: {turn_count} | Context Limit Reached",
-                    "Context limit reached, triggering summary",
+                message_history, budget_exhausted = self._apply_budget(
+                    message_history, sub_agent_name, turn_count
                 )
-                break
+                if budget_exhausted:
+                    turn_count = max_turns
+                    break
+        finally:
+            compactor.close()
 
         # Log loop end
         if turn_count >= max_turns:
@@ -762,16 +1030,10 @@ class Orchestrator:
                 "info", "Main Agent", f"Associated file: {task_file_name}"
             )
 
-        # Process input
-        initial_user_content, processed_task_desc = process_input(
-            task_description, task_file_name
+        # Process input (attachment captioning runs while tools are listed)
+        input_task = asyncio.create_task(
+            process_input_async(task_description, task_file_name)
         )
-        message_history = [{"role": "user", "content": initial_user_content}]
-
-        # Record initial user input
-        user_input = processed_task_desc
-        if task_file_name:
-            user_input += f"\n[Attached file: {task_file_name}]"
 
         # Get tool definitions
         if not self.tool_definitions:
@@ -799,341 +1061,412 @@ class Orchestrator:
         ) + generate_agent_specific_system_prompt(agent_type="main")
         system_prompt = system_prompt.strip()
 
+        initial_user_content, processed_task_desc = await input_task
+        message_history = [{"role": "user", "content": initial_user_content}]
+
+        # Record initial user input
+        user_input = processed_task_desc
+        if task_file_name:
+            user_input += f"\n[Attached file: {task_file_name}]"
+
         # Main loop configuration
         max_turns = self.cfg.agent.main_agent.max_turns
         turn_count = 0
         total_attempts = 0
         max_attempts = max_turns + EXTRA_ATTEMPTS_BUFFER
         consecutive_rollbacks = 0
+        compactor = self._create_compactor(
+            system_prompt, task_description, "Main Agent", "main"
+        )
 
         self.current_agent_id = await self.stream.start_agent("main")
         await self.stream.start_llm("main")
 
-        while turn_count < max_turns and total_attempts < max_attempts:
-            turn_count += 1
-            total_attempts += 1
-
-            if consecutive_rollbacks >= self.MAX_CONSECUTIVE_ROLLBACKS:
-                self.task_log.log_step(
-                    "error",
-                    "Main Agent | Too Many Rollbacks",
-                    f"Reached {consecutive_rollbacks} consecutive rollbacks, breaking loop.",
-                )
-                break
-
-            self.task_log.save()
-
-            # LLM call
-            (
-                assistant_response_text,
-                should_break,
-                tool_calls,
-                message_history,
-            ) = await self.answer_generator.handle_llm_call(
-                system_prompt,
-                message_history,
-                tool_definitions,
-                turn_count,
-                f"Main agent | Turn: {turn_count}",
-                agent_type="main",
-            )
-
-            # Process LLM response
-            if assistant_response_text:
-                text_response = extract_llm_response_text(assistant_response_text)
-                if text_response:
-                    await self.stream.tool_call("show_text", {"text": text_response})
-
-                # Extract boxed content
-                boxed_content = self.output_formatter._extract_boxed_content(
-                    assistant_response_text
-                )
-                if boxed_content:
-                    self.intermediate_boxed_answers.append(boxed_content)
+        try:
+            while turn_count < max_turns and total_attempts < max_attempts:
+                turn_count += 1
+                total_attempts += 1
 
-                if should_break:
+                if consecutive_rollbacks >= self.MAX_CONSECUTIVE_ROLLBACKS:
                     self.task_log.log_step(
-                        "info",
-                        f"Main Agent | Turn: {turn_count} | LLM Call",
-                        "should break is True, breaking the loop",
+                        "error",
+                        "Main Agent | Too Many Rollbacks",
+                        f"Reached {consecutive_rollbacks} consecutive rollbacks, breaking loop.",
                     )
                     break
-            else:
-                turn_count -= 1
-                self.task_log.log_step(
-                    "warning",
-                    f"Main Agent | Turn: {turn_count} | LLM Call",
-                    "No valid response from LLM, retrying",
-                )
-                await asyncio.sleep(5)
-                continue
 
-            # Handle no tool calls case
-            if not tool_calls:
+                self.task_log.save()
+
+                # LLM call
                 (
-                    should_continue,
-                    should_break_loop,
-                    turn_count,
-                    consecutive_rollbacks,
-                    message_history,
-                ) = await self._handle_response_format_issues(
                     assistant_response_text,
+                    should_break,
+                    tool_calls,
                     message_history,
+                ) = await self.answer_generator.handle_llm_call(
+                    system_prompt,
+                    message_history,
+                    tool_definitions,
                     turn_count,
-                    consecutive_rollbacks,
-                    total_attempts,
-                    max_attempts,
-                    "Main Agent",
+                    f"Main agent | Turn: {turn_count}",
+                    agent_type="main",
                 )
-                if should_continue:
-                    continue
-                if should_break_loop:
-                    if not any(
-                        mcp_tag in assistant_response_text for mcp_tag in mcp_tags
-                    ) and not any(
-                        keyword in assistant_response_text
-                        for keyword in refusal_keywords
-                    ):
+                if assistant_response_text:
+                    self._emit_turn("main", turn_count)
+
+                # Process LLM response
+                if assistant_response_text:
+                    text_response = extract_llm_response_text(assistant_response_text)
+                    if text_response:
+                        await self.stream.tool_call(
+                            "show_text", {"text": text_response}
+                        )
+
+                    # Extract boxed content
+                    boxed_content = self.output_formatter._extract_boxed_content(
+                        assistant_response_text
+                    )
+                    if boxed_content:
+                        self.intermediate_boxed_answers.append(boxed_content)
+
+                    if should_break:
                         self.task_log.log_step(
                             "info",
                             f"Main Agent | Turn: {turn_count} | LLM Call",
-                            "LLM did not request tool usage, ending process.",
+                            "should break is True, breaking the loop",
                         )
-                    break
+                        break
+                else:
+                    turn_count -= 1
+                    self.task_log.log_step(
+                        "warning",
+                        f"Main Agent | Turn: {turn_count} | LLM Call",
+                        "No valid response from LLM, retrying",
+                    )
+                    await asyncio.sleep(5)
+                    continue
 
-            # Execute tool calls
-            tool_calls_data = []
-            all_tool_results_content_with_id = []
-            should_rollback_turn = False
-            main_agent_last_call_tokens = self.llm_client.last_call_tokens
-
-            for call in tool_calls:
-                server_name = call["server_name"]
-                tool_name = call["tool_name"]
-                arguments = call["arguments"]
-                call_id = call["id"]
-
-                # Fix common parameter name mistakes
-                arguments = self.tool_executor.fix_tool_call_arguments(
-                    tool_name, arguments
-                )
+                # Handle no tool calls case
+                if not tool_calls:
+                    (
+                        should_continue,
+                        should_break_loop,
+                        turn_count,
+                        consecutive_rollbacks,
+                        message_history,
+                    ) = await self._handle_response_format_issues(
+                        assistant_response_text,
+                        message_history,
+                        turn_count,
+                        consecutive_rollbacks,
+                        total_attempts,
+                        max_attempts,
+                        "Main Agent",
+                    )
+                    if should_continue:
+                        continue
+                    if should_break_loop:
+                        if not any(
+                            mcp_tag in assistant_response_text for mcp_tag in mcp_tags
+                        ) and not any(
+                            keyword in assistant_response_text
+                            for keyword in refusal_keywords
+                        ):
+                            self.task_log.log_step(
+                                "info",
+                                f"Main Agent | Turn: {turn_count} | LLM Call",
+                                "LLM did not request tool usage, ending process.",
+                            )
+                        break
 
-                call_start_time = time.time()
-                try:
-                    if server_name.startswith("agent-") and self.cfg.agent.sub_agents:
-                        # Sub-agent execution
-                        cache_name = "main_" + tool_name
-                        (
-                            is_duplicate,
-                            should_rollback,
-                            turn_count,
-                            consecutive_rollbacks,
-                            message_history,
-                        ) = await self._check_duplicate_query(
-                            tool_name,
-                            arguments,
-                            cache_name,
-                            consecutive_rollbacks,
-                            turn_count,
-                            total_attempts,
-                            max_attempts,
-                            message_history,
-                            "Main Agent",
-                        )
-                        if should_rollback:
-                            should_rollback_turn = True
-                            break
+                # Execute tool calls
+                tool_calls_data = []
+                all_tool_results_content_with_id = []
+                should_rollback_turn = False
+                main_agent_last_call_tokens = self.llm_client.last_call_tokens
+
+                for call in tool_calls:
+                    server_name = call["server_name"]
+                    tool_name = call["tool_name"]
+                    arguments = call["arguments"]
+                    call_id = call["id"]
+
+                    # Fix common parameter name mistakes
+                    arguments = self.tool_executor.fix_tool_call_arguments(
+                        tool_name, arguments
+                    )
 
-                        # Stream events
-                        await self.stream.end_llm("main")
-                        await self.stream.end_agent("main", self.current_agent_id)
+                    call_start_time = time.time()
+                    try:
+                        if (
+                            server_name.startswith("agent-")
+                            and self.cfg.agent.sub_agents
+                        ):
+                            # Sub-agent execution
+                            cache_name = "main_" + tool_name
+                            (
+                                cached_result,
+                                should_rollback,
+                                turn_count,
+                                consecutive_rollbacks,
+                                message_history,
+                            ) = await self._check_duplicate_query(
+                                tool_name,
+                                arguments,
+                                cache_name,
+                                consecutive_rollbacks,
+                                turn_count,
+                                total_attempts,
+                                max_attempts,
+                                message_history,
+                                "Main Agent",
+                            )
+                            if should_rollback:
+                                should_rollback_turn = True
+                                break
 
-                        # Execute sub-agent
-                        sub_agent_result = await self.run_sub_agent(
-                            server_name,
-                            arguments["subtask"],
-                        )
+                            blocked_result = cached_result or self._check_tool_budget(
+                                server_name, tool_name, "Main Agent", turn_count
+                            )
+                            if blocked_result:
+                                # Reuse the report of an earlier sub-agent run, or
+                                # refuse a run over the budget
+                                tool_result = blocked_result
+                            else:
+                                # Stream events
+                                await self.stream.end_llm("main")
+                                await self.stream.end_agent(
+                                    "main", self.current_agent_id
+                                )
 
-                        # Update query count
-                        await self._record_query(cache_name, tool_name, arguments)
+                                # Execute sub-agent
+                                with span("agent.sub_agent", sub_agent=server_name):
+                                    sub_agent_result = await self.run_sub_agent(
+                                        server_name,
+                                        arguments["subtask"],
+                                    )
+
+                                tool_result = {
+                                    "server_name": server_name,
+                                    "tool_name": tool_name,
+                                    "result": sub_agent_result,
+                                }
+                                self.current_agent_id = await self.stream.start_agent(
+                                    "main", display_name="Summarizing"
+                                )
+                                await self.stream.start_llm(
+                                    "main", display_name="Summarizing"
+                                )
 
-                        tool_result = {
-                            "server_name": server_name,
-                            "tool_name": tool_name,
-                            "result": sub_agent_result,
-                        }
-                        self.current_agent_id = await self.stream.start_agent(
-                            "main", display_name="Summarizing"
-                        )
-                        await self.stream.start_llm("main", display_name="Summarizing")
-                    else:
-                        # Regular tool execution
-                        cache_name = "main_" + tool_name
-                        (
-                            is_duplicate,
-                            should_rollback,
-                            turn_count,
-                            consecutive_rollbacks,
-                            message_history,
-                        ) = await self._check_duplicate_query(
-                            tool_name,
-                            arguments,
-                            cache_name,
-                            consecutive_rollbacks,
-                            turn_count,
-                            total_attempts,
-                            max_attempts,
-                            message_history,
-                            "Main Agent",
-                        )
-                        if should_rollback:
-                            should_rollback_turn = True
-                            break
+                            # Update query count
+                            await self._record_query(
+                                cache_name, tool_name, arguments, tool_result
+                            )
+                        else:
+                            # Regular tool execution
+                            cache_name = "main_" + tool_name
+                            (
+                                cached_result,
+                                should_rollback,
+                                turn_count,
+                                consecutive_rollbacks,
+                                message_history,
+                            ) = await self._check_duplicate_query(
+                                tool_name,
+                                arguments,
+                                cache_name,
+                                consecutive_rollbacks,
+                                turn_count,
+                                total_attempts,
+                                max_attempts,
+                                message_history,
+                                "Main Agent",
+                            )
+                            if should_rollback:
+                                should_rollback_turn = True
+                                break
 
-                        # Send stream event
-                        tool_call_id = await self.stream.tool_call(tool_name, arguments)
+                            # Send stream event
+                            tool_call_id = await self.stream.tool_call(
+                                tool_name, arguments
+                            )
 
-                        # Execute tool call
-                        tool_result = (
-                            await self.main_agent_tool_manager.execute_tool_call(
-                                server_name=server_name,
-                                tool_name=tool_name,
-                                arguments=arguments,
+                            # Execute tool call, unless an earlier result is reused
+                            # or the tool is over its budget
+                            blocked_result = cached_result or self._check_tool_budget(
+                                server_name, tool_name, "Main Agent", turn_count
+                            )
+                            tool_result = blocked_result or (
+                                await self.main_agent_tool_manager.execute_tool_call(
+                                    server_name=server_name,
+                                    tool_name=tool_name,
+                                    arguments=arguments,
+                                )
                             )
-                        )
 
-                        # Update query count if successful
-                        if "error" not in tool_result:
-                            await self._record_query(cache_name, tool_name, arguments)
+                            # Update query count if successful
+                            if "error" not in tool_result:
+                                await self._record_query(
+                                    cache_name, tool_name, arguments, tool_result
+                                )
 
-                        # Post-process result
-                        tool_result = self.tool_executor.post_process_tool_call_result(
-                            tool_name, tool_result
-                        )
-                        result = (
-                            tool_result.get("result")
-                            if tool_result.get("result")
-                            else tool_result.get("error")
-                        )
+                            # Post-process result
+                            tool_result = (
+                                self.tool_executor.post_process_tool_call_result(
+                                    tool_name, tool_result
+                                )
+                            )
+                            result = (
+                                tool_result.get("result")
+                                if tool_result.get("result")
+                                else tool_result.get("error")
+                            )
 
-                        # Check for errors that should trigger rollback
-                        if self.tool_executor.should_rollback_result(
-                            tool_name, result, tool_result
-                        ):
-                            if (
-                                consecutive_rollbacks
-                                < self.MAX_CONSECUTIVE_ROLLBACKS - 1
+                            # Check for errors that should trigger rollback
+                            if self.tool_executor.should_rollback_result(
+                                tool_name, result, tool_result
                             ):
-                                message_history.pop()
-                                turn_count -= 1
-                                consecutive_rollbacks += 1
-                                should_rollback_turn = True
-                                self.task_log.log_step(
-                                    "warning",
-                                    f"Main Agent | Turn: {turn_count} | Rollback",
-                                    f"Tool result error - tool: {tool_name}, result: '{str(result)[:200]}'",
-                                )
-                                break
+                                if (
+                                    consecutive_rollbacks
+                                    < self.MAX_CONSECUTIVE_ROLLBACKS - 1
+                                ):
+                                    message_history.pop()
+                                    turn_count -= 1
+                                    consecutive_rollbacks += 1
+                                    should_rollback_turn = True
+                                    self.task_log.log_step(
+                                        "warning",
+                                        f"Main Agent | Turn: {turn_count} | Rollback",
+                                        f"Tool result error - tool: {tool_name}, result: '{str(result)[:200]}'",
+                                    )
+                                    break
+
+                            await self.stream.tool_call(
+                                tool_name, {"result": result}, tool_call_id=tool_call_id
+                            )
 
-                        await self.stream.tool_call(
-                            tool_name, {"result": result}, tool_call_id=tool_call_id
+                        call_end_time = time.time()
+                        call_duration_ms = int((call_end_time - call_start_time) * 1000)
+
+                        tool_calls_data.append(
+                            {
+                                "server_name": server_name,
+                                "tool_name": tool_name,
+                                "arguments": arguments,
+                                "result": tool_result,
+                                "duration_ms": call_duration_ms,
+                                "call_time": get_utc_plus_8_time(),
+                            }
+                        )
+                        self.task_log.log_step(
+                            "info",
+                            f"Main Agent | Turn: {turn_count} | Tool Call",
+                            f"Tool {tool_name} completed in {call_duration_ms}ms",
+                        )
+                        self._emit_progress(
+                            TOOL_CALL,
+                            agent="main",
+                            server_name=server_name,
+                            tool_name=tool_name,
+                            duration_ms=call_duration_ms,
+                            error="error" in tool_result,
+                            cached=tool_result.get("cached", False),
                         )
 
-                    call_end_time = time.time()
-                    call_duration_ms = int((call_end_time - call_start_time) * 1000)
-
-                    tool_calls_data.append(
-                        {
+                    except Exception as e:
+                        call_end_time = time.time()
+                        call_duration_ms = int((call_end_time - call_start_time) * 1000)
+
+                        tool_calls_data.append(
+                            {
+                                "server_name": server_name,
+                                "tool_name": tool_name,
+                                "arguments": arguments,
+                                "error": str(e),
+                                "duration_ms": call_duration_ms,
+                                "call_time": get_utc_plus_8_time(),
+                            }
+                        )
+                        tool_result = {
                             "server_name": server_name,
                             "tool_name": tool_name,
-                            "arguments": arguments,
-                            "result": tool_result,
-                            "duration_ms": call_duration_ms,
-                            "call_time": get_utc_plus_8_time(),
+                            "error": str(e),
                         }
+                        self.task_log.log_step(
+                            "error",
+                            f"Main Agent | Turn: {turn_count} | Tool Call",
+                            f"Tool {tool_name} failed to execute: {str(e)}",
+                        )
+                        self._emit_progress(
+                            TOOL_CALL,
+                            agent="main",
+                            server_name=server_name,
+                            tool_name=tool_name,
+                            duration_ms=call_duration_ms,
+                            error=True,
+                        )
+
+                    # Format results for LLM
+                    tool_result_for_llm = (
+                        self.output_formatter.format_tool_result_for_user(tool_result)
                     )
-                    self.task_log.log_step(
-                        "info",
-                        f"Main Agent | Turn: {turn_count} | Tool Call",
-                        f"Tool {tool_name} completed in {call_duration_ms}ms",
+                    all_tool_results_content_with_id.append(
+                        (call_id, tool_result_for_llm)
                     )
 
-                except Exception as e:
-                    call_end_time = time.time()
-                    call_duration_ms = int((call_end_time - call_start_time) * 1000)
+                if should_rollback_turn:
+                    continue
 
-                    tool_calls_data.append(
-                        {
-                            "server_name": server_name,
-                            "tool_name": tool_name,
-                            "arguments": arguments,
-                            "error": str(e),
-                            "duration_ms": call_duration_ms,
-                            "call_time": get_utc_plus_8_time(),
-                        }
-                    )
-                    tool_result = {
-                        "server_name": server_name,
-                        "tool_name": tool_name,
-                        "error": str(e),
-                    }
+                # Reset consecutive rollbacks on successful execution
+                if consecutive_rollbacks > 0:
                     self.task_log.log_step(
-                        "error",
-                        f"Main Agent | Turn: {turn_count} | Tool Call",
-                        f"Tool {tool_name} failed to execute: {str(e)}",
+                        "info",
+                        f"Main Agent | Turn: {turn_count} | Recovery",
+                        f"Successfully recovered after {consecutive_rollbacks} consecutive rollbacks",
                     )
+                consecutive_rollbacks = 0
 
-                # Format results for LLM
-                tool_result_for_llm = self.output_formatter.format_tool_result_for_user(
-                    tool_result
-                )
-                all_tool_results_content_with_id.append((call_id, tool_result_for_llm))
-
-            if should_rollback_turn:
-                continue
+                # Update 'last_call_tokens'
+                self.llm_client.last_call_tokens = main_agent_last_call_tokens
 
-            # Reset consecutive rollbacks on successful execution
-            if consecutive_rollbacks > 0:
-                self.task_log.log_step(
-                    "info",
-                    f"Main Agent | Turn: {turn_count} | Recovery",
-                    f"Successfully recovered after {consecutive_rollbacks} consecutive rollbacks",
+                # Update message history
+                message_history = self.llm_client.update_message_history(
+                    message_history, all_tool_results_content_with_id
                 )
-            consecutive_rollbacks = 0
-
-            # Update 'last_call_tokens'
-            self.llm_client.last_call_tokens = main_agent_last_call_tokens
 
-            # Update message history
-            message_history = self.llm_client.update_message_history(
-                message_history, all_tool_results_content_with_id
-            )
+                self.task_log.main_agent_message_history = {
+                    "system_prompt": system_prompt,
+                    "message_history": message_history,
+                }
+                self.task_log.save()
 
-            self.task_log.main_agent_message_history = {
-                "system_prompt": system_prompt,
-                "message_history": message_history,
-            }
-            self.task_log.save()
+                # Check context length
+                temp_summary_prompt = generate_agent_summarize_prompt(
+                    task_description,
+                    agent_type="main",
+                )
 
-            # Check context length
-            temp_summary_prompt = generate_agent_summarize_prompt(
-                task_description,
-                agent_type="main",
-            )
+                pass_length_check, message_history = await self._ensure_context(
+                    compactor, message_history, temp_summary_prompt
+                )
 
-            pass_length_check, message_history = self.llm_client.ensure_summary_context(
-                message_history, temp_summary_prompt
-            )
+                if not pass_length_check:
+                    turn_count = max_turns
+                    self.task_log.log_step(
+                        "warning",
+                        f"Main Agent | Turn: {turn_count} | Context Limit Reached",
+                        "Context limit reached, triggering summary",
+                    )
+                    break
 
-            if not pass_length_check:
-                turn_count = max_turns
-                self.task_log.log_step(
-                    "warning",
-                    f"Main Agent | Turn: {turn_count} | Context Limit Reached",
-                    "Context limit reached, triggering summary",
+                message_history, budget_exhausted = self._apply_budget(
+                    message_history, "Main Agent", turn_count
                 )
-                break
-
+                if budget_exhausted:
+                    turn_count = max_turns
+                    break
+        finally:
+            compactor.close()
         await self.stream.end_llm("main")
         await self.stream.end_agent("main", self.current_agent_id)
 
@@ -1174,7 +1507,8 @@ class Orchestrator:
             turn_count=turn_count,
             task_description=task_description,
             reached_max_turns=reached_max_turns,
-            is_final_retry=is_final_retry,
+            # An exhausted budget leaves no room for another retry
+            is_final_retry=is_final_retry or self.budget_exhausted,
             save_callback=self._save_message_history,
         )
 
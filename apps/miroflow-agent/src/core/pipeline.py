@@ -12,9 +12,11 @@ The pipeline orchestrates the interaction between LLM clients, tool managers,
 and the orchestrator to execute complex multi-turn agent tasks.
 """
 
+import contextlib
 import traceback
 import uuid
-from typing import Any, Dict, List, Optional
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
 
 from miroflow_tools.manager import ToolManager
 from omegaconf import DictConfig
@@ -24,12 +26,18 @@ from ..config.settings import (
     get_env_info,
 )
 from ..io.output_formatter import OutputFormatter
+from ..io.replay import Cassette, ReplayToolManager
 from ..llm.factory import ClientFactory
+from ..logging.progress_events import ProgressEventWriter
 from ..logging.task_logger import (
     TaskLog,
     get_utc_plus_8_time,
 )
+from ..logging.metrics import REGISTRY
+from ..logging.tracing import Tracer
+from .evidence_store import EvidenceStats, EvidenceStore, EvidenceToolManager
 from .orchestrator import Orchestrator
+from .task_budget import TaskBudget
 
 
 async def execute_task_pipeline(
@@ -46,6 +54,10 @@ async def execute_task_pipeline(
     tool_definitions: Optional[List[Dict[str, Any]]] = None,
     sub_agent_tool_definitions: Optional[Dict[str, List[Dict[str, Any]]]] = None,
     is_final_retry: bool = False,
+    progress_events: Optional[ProgressEventWriter] = None,
+    evidence_store: Optional[EvidenceStore] = None,
+    trace_file: Optional[Union[str, Path]] = None,
+    budget: Optional[TaskBudget] = None,
 ):
     """
     Executes the full pipeline for a single task.
@@ -63,6 +75,15 @@ async def execute_task_pipeline(
         stream_queue: A queue for streaming the task execution (optional).
         tool_definitions: The definitions of the tools for the main agent (optional).
         sub_agent_tool_definitions: The definitions of the tools for the sub-agents (optional).
+        is_final_retry: Whether this is the last format retry of the attempt.
+        progress_events: Sink for benchmark progress events (optional).
+        evidence_store: Tool results shared with the task's other attempts (optional).
+        trace_file: OTLP/JSON file that receives the run's spans (optional).
+        budget: Budget shared by the task's runs (optional; defaults to a
+            budget of this run alone).
+
+    LLM and tool traffic is recorded to, or replayed from, the task's cassette
+    when replay.mode is "record" or "replay" (see src/io/replay.py).
 
     Returns:
         A tuple of (final_summary, final_boxed_answer, log_file_path, failure_experience_summary):
@@ -92,6 +113,47 @@ async def execute_task_pipeline(
         for sub_agent_tool_manager in sub_agent_tool_managers.values():
             sub_agent_tool_manager.set_task_log(task_log)
 
+    # Context of the run (tracer, cassette), closed once the task log is saved
+    run_scope = contextlib.ExitStack()
+
+    # Trace LLM calls, tool calls, log saves and context checks of the run
+    tracer = None
+    if trace_file is not None:
+        tracer = Tracer(
+            trace_file, {"task.id": task_id, "llm.model": cfg.llm.model_name}
+        )
+        run_scope.enter_context(tracer.activate())
+        task_span = run_scope.enter_context(tracer.span("task", task_id=task_id))
+    main_agent_tool_manager.set_tracer(tracer)
+    main_agent_tool_manager.set_metrics(REGISTRY)
+    for sub_agent_tool_manager in (sub_agent_tool_managers or {}).values():
+        sub_agent_tool_manager.set_tracer(tracer)
+        sub_agent_tool_manager.set_metrics(REGISTRY)
+
+    # Reuse search and scrape results of the task's earlier attempts
+    evidence_stats = EvidenceStats()
+    if evidence_store is not None:
+        main_agent_tool_manager = EvidenceToolManager(
+            main_agent_tool_manager, evidence_store, evidence_stats
+        )
+        sub_agent_tool_managers = {
+            name: EvidenceToolManager(manager, evidence_store, evidence_stats)
+            for name, manager in (sub_agent_tool_managers or {}).items()
+        }
+
+    # Record the run's LLM and tool traffic, or replay it offline
+    cassette = Cassette.from_config(cfg, task_id)
+    if cassette is not None:
+        cassette.record_task(task_description, task_file_name)
+        run_scope.enter_context(cassette.activate())
+        main_agent_tool_manager = ReplayToolManager(
+            main_agent_tool_manager, cassette, "main"
+        )
+        sub_agent_tool_managers = {
+            name: ReplayToolManager(manager, cassette, name)
+            for name, manager in (sub_agent_tool_managers or {}).items()
+        }
+
     try:
         # Initialize LLM client
         random_uuid = str(uuid.uuid4())
@@ -109,6 +171,8 @@ async def execute_task_pipeline(
             stream_queue=stream_queue,
             tool_definitions=tool_definitions,
             sub_agent_tool_definitions=sub_agent_tool_definitions,
+            progress_events=progress_events,
+            budget=budget,
         )
 
         (
@@ -160,6 +224,8 @@ async def execute_task_pipeline(
 
         task_log.status = "failed"
         task_log.error = error_details
+        if tracer is not None:
+            task_span.set_error(f"{type(e).__name__}: {e}")
 
         log_file_path = task_log.save()
 
@@ -167,6 +233,10 @@ async def execute_task_pipeline(
 
     finally:
         task_log.end_time = get_utc_plus_8_time()
+        if evidence_store is not None:
+            task_log.trace_data["evidence_store"] = evidence_stats.to_dict()
+        if cassette is not None:
+            task_log.trace_data["replay"] = cassette.to_dict()
 
         # Record task summary to structured log
         task_log.log_step(
@@ -176,6 +246,12 @@ async def execute_task_pipeline(
         )
         task_log.save()
 
+        if tracer is not None:
+            task_span.set_attribute("status", task_log.status)
+        run_scope.close()
+        if tracer is not None:
+            tracer.export()
+
 
 def create_pipeline_components(cfg: DictConfig):
     """
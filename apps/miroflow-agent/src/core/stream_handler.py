@@ -5,15 +5,301 @@
 Stream handler module for SSE (Server-Sent Events) protocol.
 
 This module provides the StreamHandler class that manages all streaming events
-for real-time communication with clients during agent task execution.
+for real-time communication with clients during agent task execution, and
+StreamChannel, a bounded stream queue that keeps memory flat when the client
+reads slower than the agent produces events.
 """
 
+import asyncio
 import logging
+import time
 import uuid
-from typing import Any, Optional
+from collections import OrderedDict, deque
+from typing import Any, Dict, Optional, Tuple
+
+from ..logging.metrics import STREAM_CHANNEL, STREAM_EVENTS
 
 logger = logging.getLogger(__name__)
 
+# Messages buffered before producers wait for the consumer
+DEFAULT_STREAM_MAXSIZE = 256
+
+# Tool payload strings longer than this are truncated and paged via fetch_payload
+DEFAULT_MAX_PAYLOAD_CHARS = 16_000
+DEFAULT_PAYLOAD_PAGE_CHARS = 16_000
+
+# Full payloads kept for fetch_payload; the oldest are evicted beyond this
+DEFAULT_PAYLOAD_STORE_CHARS = 4_000_000
+
+# Informational events dropped (and counted) instead of waited for when full
+DROPPABLE_EVENTS = frozenset({"start_of_llm", "end_of_llm", "heartbeat"})
+
+# Tools whose payload is the user-facing answer and is never truncated
+UNPAGED_TOOLS = frozenset({"show_text", "show_error"})
+
+# StreamChannel counters exported as stream channel outcomes
+CHANNEL_OUTCOMES = ("coalesced", "dropped", "paged", "blocked_puts")
+
+
+def _coalesce_key(message: dict) -> Optional[Tuple[str, Any]]:
+    """Key of a delta event that may be merged into a pending one, else None"""
+    data = message.get("data") or {}
+    if message.get("event") == "message" and "delta" in data:
+        return ("message", data.get("message_id"))
+    if message.get("event") == "tool_call" and "delta_input" in data:
+        return ("tool_call", data.get("tool_call_id"))
+    return None
+
+
+def _merge_delta(target: dict, delta: dict):
+    for key, value in delta.items():
+        previous = target.get(key)
+        if isinstance(previous, str) and isinstance(value, str):
+            target[key] = previous + value
+        else:
+            target[key] = value
+
+
+class PayloadStore:
+    """
+    Full text of truncated stream payloads, fetched by ID in pages.
+
+    Bounded by total characters; the least recently stored payloads are
+    evicted first.
+    """
+
+    def __init__(self, max_chars: int = DEFAULT_PAYLOAD_STORE_CHARS):
+        self.max_chars = max_chars
+        self.chars = 0
+        self._payloads: "OrderedDict[str, str]" = OrderedDict()
+
+    def put(self, text: str) -> str:
+        payload_id = uuid.uuid4().hex
+        self._payloads[payload_id] = text
+        self.chars += len(text)
+        while self.chars > self.max_chars and len(self._payloads) > 1:
+            _, evicted = self._payloads.popitem(last=False)
+            self.chars -= len(evicted)
+        return payload_id
+
+    def fetch(
+        self,
+        payload_id: str,
+        offset: int = 0,
+        limit: int = DEFAULT_PAYLOAD_PAGE_CHARS,
+    ) -> dict:
+        """
+        Return one page of a stored payload.
+
+        Raises:
+            KeyError: If the payload is unknown or was evicted
+        """
+        text = self._payloads[payload_id]
+        end = min(offset + limit, len(text))
+        return {
+            "payload_id": payload_id,
+            "offset": offset,
+            "content": text[offset:end],
+            "total_chars": len(text),
+            "next_offset": end if end < len(text) else None,
+        }
+
+
+class StreamChannel:
+    """
+    Bounded, backpressure-aware stream queue for a single consumer.
+
+    A drop-in for the asyncio.Queue passed as stream_queue:
+    - Streaming deltas (message content, tool_call delta_input) are merged
+      into a still-pending delta of the same message or tool call, so a slow
+      consumer receives fewer, larger deltas instead of a growing backlog.
+    - Large tool payload strings are truncated to max_payload_chars; the full
+      text is kept in a bounded PayloadStore and listed under data["paged"]
+      as {key: {"payload_id", "total_chars"}} for fetch_payload.
+    - When maxsize messages are pending, put() waits for the consumer (the
+      agent is slowed down, not buffered), except for DROPPABLE_EVENTS which
+      are dropped. None (end of stream) and put_nowait() bypass the bound.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_STREAM_MAXSIZE,
+        max_payload_chars: int = DEFAULT_MAX_PAYLOAD_CHARS,
+        payload_store_chars: int = DEFAULT_PAYLOAD_STORE_CHARS,
+    ):
+        self.maxsize = maxsize
+        self.max_payload_chars = max_payload_chars
+        self.payloads = PayloadStore(payload_store_chars)
+        self._items: deque = deque()
+        self._pending: Dict[Tuple[str, Any], dict] = {}
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._closed = False
+        self._stats = {
+            "enqueued": 0,
+            "delivered": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "paged": 0,
+            "blocked_puts": 0,
+            "max_depth": 0,
+        }
+        self._lag_seconds_total = 0.0
+        self._lag_seconds_max = 0.0
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def full(self) -> bool:
+        return len(self._items) >= self.maxsize
+
+    async def put(self, message: Optional[dict]):
+        """Enqueue a stream message, waiting while the channel is full"""
+        if self._closed:
+            return
+        if message is None:
+            self._append(None)
+            return
+
+        message = self._page_large_payloads(message)
+        if self._coalesce(message):
+            return
+
+        if self.full():
+            if message.get("event") in DROPPABLE_EVENTS:
+                self._stats["dropped"] += 1
+                return
+            self._stats["blocked_puts"] += 1
+            started = time.monotonic()
+            while self.full() and not self._closed:
+                self._not_full.clear()
+                await self._not_full.wait()
+            waited = time.monotonic() - started
+            self._lag_seconds_total += waited
+            self._lag_seconds_max = max(self._lag_seconds_max, waited)
+            if self._closed:
+                return
+            # A pending delta may have appeared while waiting
+            if self._coalesce(message):
+                return
+
+        self._append(message)
+
+    def put_nowait(self, message: Optional[dict]):
+        """Enqueue a control message immediately, ignoring the bound"""
+        if self._closed:
+            return
+        if message is not None:
+            message = self._page_large_payloads(message)
+            if self._coalesce(message):
+                return
+        self._append(message)
+
+    async def get(self) -> Optional[dict]:
+        """Next message, or None once the producer has finished"""
+        while not self._items:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        message = self._items.popleft()
+        if message is not None:
+            key = _coalesce_key(message)
+            if key is not None and self._pending.get(key) is message:
+                del self._pending[key]
+        self._stats["delivered"] += 1
+        self._not_full.set()
+        return message
+
+    def close(self):
+        """Stop accepting messages and release producers waiting for space"""
+        self._closed = True
+        self._items.clear()
+        self._pending.clear()
+        self._not_full.set()
+
+    def fetch_payload(
+        self,
+        payload_id: str,
+        offset: int = 0,
+        limit: int = DEFAULT_PAYLOAD_PAGE_CHARS,
+    ) -> dict:
+        """One page of a truncated payload, see PayloadStore.fetch"""
+        return self.payloads.fetch(payload_id, offset, limit)
+
+    def metrics(self) -> dict:
+        """Queue depth, coalescing, drop and producer lag counters"""
+        return {
+            **self._stats,
+            "depth": len(self._items),
+            "maxsize": self.maxsize,
+            "lag_seconds_total": round(self._lag_seconds_total, 3),
+            "lag_seconds_max": round(self._lag_seconds_max, 3),
+            "payload_store_chars": self.payloads.chars,
+        }
+
+    def _append(self, message: Optional[dict]):
+        if message is not None:
+            key = _coalesce_key(message)
+            if key is not None:
+                self._pending[key] = message
+            elif message.get("event") == "tool_call":
+                # Later deltas of this tool call must not jump ahead of it
+                self._pending.pop(
+                    ("tool_call", message["data"].get("tool_call_id")), None
+                )
+        self._items.append(message)
+        self._stats["enqueued"] += 1
+        self._stats["max_depth"] = max(self._stats["max_depth"], len(self._items))
+        self._not_empty.set()
+
+    def _coalesce(self, message: dict) -> bool:
+        key = _coalesce_key(message)
+        pending = self._pending.get(key) if key is not None else None
+        if pending is None:
+            return False
+        field = "delta" if key[0] == "message" else "delta_input"
+        _merge_delta(pending["data"][field], message["data"][field])
+        self._stats["coalesced"] += 1
+        return True
+
+    def _page_large_payloads(self, message: dict) -> dict:
+        data = message.get("data") or {}
+        if message.get("event") != "tool_call" or data.get("tool_name") in (
+            UNPAGED_TOOLS
+        ):
+            return self._own_delta(message)
+        tool_input = data.get("tool_input")
+        if not isinstance(tool_input, dict) or not any(
+            isinstance(value, str) and len(value) > self.max_payload_chars
+            for value in tool_input.values()
+        ):
+            return message
+
+        # Copy, the producer may still use its payload (e.g. tool arguments)
+        tool_input = dict(tool_input)
+        paged = {}
+        for key, value in tool_input.items():
+            if isinstance(value, str) and len(value) > self.max_payload_chars:
+                paged[key] = {
+                    "payload_id": self.payloads.put(value),
+                    "total_chars": len(value),
+                }
+                tool_input[key] = value[: self.max_payload_chars]
+        self._stats["paged"] += len(paged)
+        return {
+            **message,
+            "data": {**data, "tool_input": tool_input, "paged": paged},
+        }
+
+    @staticmethod
+    def _own_delta(message: dict) -> dict:
+        """Copy a delta event so later merges don't modify the producer's dict"""
+        key = _coalesce_key(message)
+        if key is None:
+            return message
+        field = "delta" if key[0] == "message" else "delta_input"
+        data = message["data"]
+        return {**message, "data": {**data, field: dict(data[field])}}
+
 
 class StreamHandler:
     """
@@ -28,15 +314,24 @@ class StreamHandler:
         Initialize the stream handler.
 
         Args:
-            stream_queue: Optional async queue for sending stream messages.
+            stream_queue: Optional async queue for sending stream messages,
+                         ideally a StreamChannel to bound memory use.
                          If None, streaming is disabled.
         """
         self.stream_queue = stream_queue
 
+    def metrics(self) -> Optional[dict]:
+        """Stream channel metrics, if the stream queue provides them"""
+        metrics = getattr(self.stream_queue, "metrics", None)
+        return metrics() if callable(metrics) else None
+
     async def update(self, event_type: str, data: dict):
         """
         Send a streaming update in SSE protocol format.
 
+        Waits while a bounded stream queue is full, so a slow client slows the
+        agent down instead of buffering events without limit.
+
         Args:
             event_type: The type of event (e.g., 'start_of_workflow', 'tool_call')
             data: The event payload data
@@ -48,6 +343,7 @@ class StreamHandler:
                     "data": data,
                 }
                 await self.stream_queue.put(stream_message)
+                STREAM_EVENTS.inc(event=event_type)
             except Exception as e:
                 logger.warning(f"Failed to send stream update: {e}")
 
@@ -89,6 +385,12 @@ class StreamHandler:
                 "workflow_id": workflow_id,
             },
         )
+        metrics = self.metrics()
+        if metrics:
+            logger.info(f"Stream metrics for workflow {workflow_id}: {metrics}")
+            for outcome in CHANNEL_OUTCOMES:
+                if metrics.get(outcome):
+                    STREAM_CHANNEL.inc(metrics[outcome], outcome=outcome)
 
     async def show_error(self, error: str):
         """
@@ -0,0 +1,197 @@
+# Copyright (c) 2025 MiroMind
+# This source code is licensed under the MIT License.
+
+"""
+Task budget module for bounding the cost of one task.
+
+This module provides the TaskBudget class that tracks wall time, LLM tokens
+and tool calls of a task against the limits in agent.budget. A budget spans
+every agent run of the task (main agent and its sub-agents, format retries
+and pass@k attempts) that it is passed to. Budgets are checked at turn
+boundaries: past the warning threshold the model is told in the prompt to
+converge, and once a budget is used up the loop stops and the final answer is
+generated. Per-tool call limits are enforced before each call.
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from omegaconf import DictConfig
+
+from ..llm.base_client import BaseClient
+from ..utils.prompt_utils import (
+    BUDGET_WARNING_TEMPLATE,
+    TOOL_BUDGET_EXHAUSTED_MESSAGE,
+    append_text,
+)
+
+# Fraction of any budget from which the model is warned
+DEFAULT_BUDGET_WARN_AT = 0.8
+
+# Budget levels, from the least used
+BUDGET_OK = "ok"
+BUDGET_WARN = "warn"
+BUDGET_EXHAUSTED = "exhausted"
+
+
+class TaskBudget:
+    """
+    Wall-time, token and tool-call budgets of one task.
+
+    Limits left unset (null) are not enforced. The clock starts when the
+    budget is created. Tokens are read from the counters of the LLM clients
+    of the task's runs, each attached by its orchestrator, and tool calls are
+    recorded by the orchestrators; each turn's consumption is kept in the
+    trace of the run's task log.
+    """
+
+    def __init__(self, cfg: DictConfig):
+        """
+        Initialize the budget.
+
+        Args:
+            cfg: Configuration object (reads agent.budget)
+        """
+        settings = cfg.agent.get("budget") or {}
+        self.wall_time_seconds = settings.get("wall_time_seconds")
+        self.input_tokens = settings.get("input_tokens")
+        self.output_tokens = settings.get("output_tokens")
+        self.total_tool_calls = settings.get("total_tool_calls")
+        self.tool_call_limits: Dict[str, int] = dict(settings.get("tool_calls") or {})
+        self.warn_at = float(settings.get("warn_at", DEFAULT_BUDGET_WARN_AT))
+
+        self.started_at = time.time()
+        self.tool_calls: Dict[str, int] = {}
+        # LLM client of each run, with its token usage when it was attached
+        self._clients: List[Tuple[BaseClient, Dict[str, int]]] = []
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any budget is set"""
+        return any(limit for limit in self.limits().values())
+
+    def limits(self) -> Dict[str, Any]:
+        return {
+            "wall_time_seconds": self.wall_time_seconds,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "total_tool_calls": self.total_tool_calls,
+            "tool_calls": self.tool_call_limits,
+        }
+
+    def attach(self, llm_client: BaseClient):
+        """Charge the tokens a run's LLM client uses from now on"""
+        self._clients.append((llm_client, llm_client.get_token_usage()))
+
+    def usage(self) -> Dict[str, Any]:
+        """Wall time, tokens and tool calls used so far"""
+        input_tokens = output_tokens = 0
+        for llm_client, usage_at_attach in self._clients:
+            current = llm_client.get_token_usage()
+            input_tokens += (
+                current["total_input_tokens"] - usage_at_attach["total_input_tokens"]
+            )
+            output_tokens += (
+                current["total_output_tokens"] - usage_at_attach["total_output_tokens"]
+            )
+        return {
+            "wall_time_seconds": time.time() - self.started_at,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tool_calls": sum(self.tool_calls.values()),
+        }
+
+    def fractions(self, usage: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
+        """Fraction of each set budget used (per-tool limits excluded)"""
+        usage = usage or self.usage()
+        return {
+            name: usage[name] / limit
+            for name, limit in self.limits().items()
+            if name != "tool_calls" and limit
+        }
+
+    def tool_call_allowed(self, tool_name: str) -> bool:
+        """Whether a call to tool_name stays within its per-tool limit"""
+        limit = self.tool_call_limits.get(tool_name)
+        return not limit or self.tool_calls.get(tool_name, 0) < limit
+
+    def record_tool_call(self, tool_name: str):
+        """Charge one executed tool call"""
+        self.tool_calls[tool_name] = self.tool_calls.get(tool_name, 0) + 1
+
+    def tool_budget_exhausted_message(self, tool_name: str) -> str:
+        return TOOL_BUDGET_EXHAUSTED_MESSAGE.format(
+            tool_name=tool_name, limit=self.tool_call_limits[tool_name]
+        )
+
+    def exhausted(self) -> bool:
+        """Whether any budget is used up"""
+        return any(fraction >= 1.0 for fraction in self.fractions().values())
+
+    def check(
+        self, agent_name: str, turn_count: int, trace_data: Dict
+    ) -> Dict[str, Any]:
+        """
+        Record the consumption at the end of a turn and grade it.
+
+        Args:
+            agent_name: Name of the agent whose turn ended
+            turn_count: The turn number
+            trace_data: Trace data of the run's task log, receives the telemetry
+
+        Returns:
+            Dict with the usage, the fraction of each budget used, the largest
+            fraction ("used"), the budget closest to its limit ("binding") and
+            the level (BUDGET_OK, BUDGET_WARN or BUDGET_EXHAUSTED)
+        """
+        usage = self.usage()
+        fractions = self.fractions(usage)
+        binding = max(fractions, key=fractions.get) if fractions else None
+        used = fractions[binding] if binding else 0.0
+        if used >= 1.0:
+            level = BUDGET_EXHAUSTED
+        elif used >= self.warn_at:
+            level = BUDGET_WARN
+        else:
+            level = BUDGET_OK
+
+        status = {
+            "agent": agent_name,
+            "turn": turn_count,
+            "wall_time_seconds": round(usage["wall_time_seconds"], 1),
+            "input_tokens": usage["input_tokens"],
+            "output_tokens": usage["output_tokens"],
+            "tool_calls": dict(self.tool_calls),
+            "used": round(used, 3),
+            "binding": binding,
+            "level": level,
+        }
+        telemetry = trace_data.setdefault(
+            "budget", {"limits": self.limits(), "turns": []}
+        )
+        telemetry["turns"].append(status)
+        return status
+
+    def warn(self, message_history: list, status: Dict[str, Any]) -> list:
+        """
+        Tell the model how much budget is left.
+
+        The note is appended to the latest message (the tool results).
+
+        Returns:
+            The message history with the note
+        """
+        if not message_history:
+            return message_history
+        usage = self.usage()
+        remaining = ", ".join(
+            f"{name.replace('_', ' ')}: {max(limit - usage[name], 0):,.0f} of {limit:,}"
+            for name, limit in self.limits().items()
+            if name != "tool_calls" and limit
+        )
+        note = BUDGET_WARNING_TEMPLATE.format(
+            used_percent=status["used"] * 100, remaining=remaining
+        )
+        last_message = dict(message_history[-1])
+        last_message["content"] = append_text(last_message["content"], note)
+        return message_history[:-1] + [last_message]
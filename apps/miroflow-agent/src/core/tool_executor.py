@@ -12,13 +12,23 @@ import json
 import logging
 import os
 import time
-from collections import defaultdict
 from typing import Any, Dict, List, Optional, Tuple
 
 from miroflow_tools.manager import ToolManager
 
 from ..io.output_formatter import OutputFormatter
+from ..logging.metrics import CACHE_LOOKUPS
 from ..logging.task_logger import TaskLog, get_utc_plus_8_time
+from ..logging.tracing import span
+from ..utils.prompt_utils import DUPLICATE_QUERY_NOTE
+from ..utils.query_utils import (
+    EXACT,
+    NEAR,
+    NORMALIZED,
+    QueryIndex,
+    QueryKey,
+    QueryMatch,
+)
 from .stream_handler import StreamHandler
 
 logger = logging.getLogger(__name__)
@@ -26,6 +36,19 @@ logger = logging.getLogger(__name__)
 # Maximum length for scrape results in demo mode (to support more conversation turns)
 DEMO_SCRAPE_MAX_LENGTH = 20_000
 
+# What to do with a repeated query
+DUPLICATE_POLICY_ROLLBACK = "rollback"  # drop the turn so the model tries again
+DUPLICATE_POLICY_CACHE = "cache"  # answer with the earlier query's result
+DUPLICATE_POLICY_WARN = "warn"  # log it and run the query anyway
+DUPLICATE_POLICIES = (
+    DUPLICATE_POLICY_ROLLBACK,
+    DUPLICATE_POLICY_CACHE,
+    DUPLICATE_POLICY_WARN,
+)
+
+# Term-set similarity from which two queries are near-duplicates
+DEFAULT_NEAR_DUPLICATE_THRESHOLD = 0.8
+
 
 class ToolExecutor:
     """
@@ -43,6 +66,7 @@ class ToolExecutor:
         task_log: TaskLog,
         stream_handler: StreamHandler,
         max_consecutive_rollbacks: int = 5,
+        duplicate_queries: Optional[Dict[str, Any]] = None,
     ):
         """
         Initialize the tool executor.
@@ -54,6 +78,9 @@ class ToolExecutor:
             task_log: Logger for task execution
             stream_handler: Handler for streaming events
             max_consecutive_rollbacks: Maximum allowed consecutive rollbacks
+            duplicate_queries: Duplicate query settings (agent.duplicate_queries):
+                policy, normalized_policy, near_duplicate_policy and
+                near_duplicate_threshold
         """
         self.main_agent_tool_manager = main_agent_tool_manager
         self.sub_agent_tool_managers = sub_agent_tool_managers
@@ -62,8 +89,37 @@ class ToolExecutor:
         self.stream = stream_handler
         self.max_consecutive_rollbacks = max_consecutive_rollbacks
 
-        # Track used queries to detect duplicates
-        self.used_queries: Dict[str, Dict[str, int]] = {}
+        # Track used queries to detect duplicates, per cache (agent and tool)
+        self.used_queries: Dict[str, QueryIndex] = {}
+
+        settings = duplicate_queries or {}
+        self.duplicate_policy = settings.get("policy", DUPLICATE_POLICY_ROLLBACK)
+        # Normalization drops quotes and term order, which can change a query's
+        # meaning ("a to b" vs "b to a"), so only exact repeats roll back
+        self.normalized_policy = settings.get(
+            "normalized_policy", DUPLICATE_POLICY_WARN
+        )
+        self.near_duplicate_policy = settings.get(
+            "near_duplicate_policy", DUPLICATE_POLICY_WARN
+        )
+        for policy in (
+            self.duplicate_policy,
+            self.normalized_policy,
+            self.near_duplicate_policy,
+        ):
+            if policy not in DUPLICATE_POLICIES:
+                raise ValueError(
+                    f"Unknown duplicate query policy '{policy}', "
+                    f"expected one of {DUPLICATE_POLICIES}"
+                )
+        self.near_duplicate_threshold = float(
+            settings.get("near_duplicate_threshold", DEFAULT_NEAR_DUPLICATE_THRESHOLD)
+        )
+
+        # Duplicate counts by kind and by outcome, saved with the task log
+        self.duplicate_query_stats: Dict[str, int] = task_log.trace_data.setdefault(
+            "duplicate_queries", {}
+        )
 
     def fix_tool_call_arguments(self, tool_name: str, arguments: dict) -> dict:
         """
@@ -125,31 +181,125 @@ class ToolExecutor:
             )
         return None
 
-    def is_duplicate_query(self, cache_name: str, query_str: str) -> Tuple[bool, int]:
+    def get_query_key(self, tool_name: str, arguments: dict) -> Optional[QueryKey]:
         """
-        Check if a query has been executed before.
+        Build the normalized key of a tool call for duplicate detection.
 
         Args:
-            cache_name: Name of the cache (e.g., "main_google_search")
-            query_str: The query string to check
+            tool_name: Name of the tool
+            arguments: Tool arguments dictionary
 
         Returns:
-            Tuple of (is_duplicate, previous_count)
+            QueryKey, or None if the tool is not checked for duplicates
         """
-        self.used_queries.setdefault(cache_name, defaultdict(int))
-        count = self.used_queries[cache_name][query_str]
-        return count > 0, count
+        query_str = self.get_query_str_from_tool_call(tool_name, arguments)
+        if query_str is None:
+            return None
+
+        if tool_name == "search_and_browse":
+            return QueryKey.build(
+                query_str, tool_name, text=arguments.get("subtask", "")
+            )
+        elif tool_name in ("google_search", "sogou_search"):
+            text_argument = "q" if tool_name == "google_search" else "Query"
+            other_arguments = {
+                name: value
+                for name, value in arguments.items()
+                if name != text_argument
+            }
+            return QueryKey.build(
+                query_str,
+                tool_name,
+                text=str(arguments.get(text_argument, "")),
+                other_arguments=other_arguments,
+            )
+        return QueryKey.build(
+            query_str,
+            tool_name,
+            text=arguments.get("info_to_extract", ""),
+            url=arguments.get("url", ""),
+        )
+
+    def find_duplicate_query(
+        self, cache_name: str, tool_name: str, arguments: dict
+    ) -> Optional[QueryMatch]:
+        """
+        Check if a query (or a normalized or near-identical one) was executed before.
+
+        Args:
+            cache_name: Name of the cache (e.g., "main_google_search")
+            tool_name: Name of the tool
+            arguments: Tool arguments dictionary
 
-    def record_query(self, cache_name: str, query_str: str):
+        Returns:
+            The earlier query it duplicates, or None
+        """
+        key = self.get_query_key(tool_name, arguments)
+        if key is None or cache_name not in self.used_queries:
+            return None
+        match = self.used_queries[cache_name].find(key, self.near_duplicate_threshold)
+        if match is not None:
+            self.count_duplicate_query(match.kind)
+        return match
+
+    def record_query(
+        self,
+        cache_name: str,
+        tool_name: str,
+        arguments: dict,
+        tool_result: Optional[dict] = None,
+    ):
         """
         Record that a query has been executed.
 
         Args:
             cache_name: Name of the cache
-            query_str: The query string to record
+            tool_name: Name of the tool
+            arguments: Tool arguments dictionary
+            tool_result: The result, served again by the "cache" policy (optional)
         """
-        self.used_queries.setdefault(cache_name, defaultdict(int))
-        self.used_queries[cache_name][query_str] += 1
+        key = self.get_query_key(tool_name, arguments)
+        if key is not None:
+            self.used_queries.setdefault(cache_name, QueryIndex()).record(
+                key, tool_result
+            )
+
+    def get_duplicate_policy(self, match: QueryMatch) -> str:
+        """
+        Policy for a duplicate query.
+
+        The "cache" policy falls back to "warn" when no result was kept.
+        """
+        policy = {
+            EXACT: self.duplicate_policy,
+            NORMALIZED: self.normalized_policy,
+            NEAR: self.near_duplicate_policy,
+        }[match.kind]
+        if policy == DUPLICATE_POLICY_CACHE and match.result is None:
+            return DUPLICATE_POLICY_WARN
+        return policy
+
+    def count_duplicate_query(self, outcome: str):
+        """Count a duplicate kind or handling outcome in the task log"""
+        self.duplicate_query_stats[outcome] = (
+            self.duplicate_query_stats.get(outcome, 0) + 1
+        )
+
+    def get_cached_duplicate_result(self, match: QueryMatch) -> dict:
+        """
+        Earlier result served for a duplicate query.
+
+        Returns:
+            Copy of the earlier tool result, marked as cached, with a note that
+            tells the model it repeated a query
+        """
+        CACHE_LOOKUPS.inc(cache="duplicate_query", result="hit")
+        tool_result = dict(match.result, cached=True)
+        if isinstance(tool_result.get("result"), str):
+            tool_result["result"] = (
+                DUPLICATE_QUERY_NOTE.format(query=match.query) + tool_result["result"]
+            )
+        return tool_result
 
     def is_google_search_empty_result(self, tool_name: str, tool_result: dict) -> bool:
         """
@@ -224,9 +374,10 @@ class ToolExecutor:
                 "scrape",
                 "scrape_website",
             ]:
-                tool_call_result["result"] = self.get_scrape_result(
-                    tool_call_result["result"]
-                )
+                with span("tool.post_process", tool_name=tool_name):
+                    tool_call_result["result"] = self.get_scrape_result(
+                        tool_call_result["result"]
+                    )
         return tool_call_result
 
     def should_rollback_result(
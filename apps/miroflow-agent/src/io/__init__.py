@@ -3,10 +3,14 @@
 
 """Input/Output module for processing task inputs and formatting outputs."""
 
-from .input_handler import process_input
+from .input_handler import process_input, process_input_async
 from .output_formatter import OutputFormatter
+from .replay import Cassette, ReplayToolManager
 
 __all__ = [
     "process_input",
+    "process_input_async",
     "OutputFormatter",
+    "Cassette",
+    "ReplayToolManager",
 ]
@@ -20,28 +20,32 @@ Supported file formats:
 - Archives: ZIP
 """
 
+import asyncio
 import base64
+import contextlib
+import functools
+import hashlib
 import html
+import io
 import json
+import multiprocessing
 import os
+import pickle
 import re
 import shutil
 import tempfile
+import threading
 import traceback
-from typing import Any, Tuple, Union
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 from urllib.parse import quote, unquote, urlparse, urlunparse
 
-import mammoth
-import markdownify
-import openpyxl
-import pdfminer
-import pdfminer.high_level
-import pptx
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
-from markitdown import MarkItDown
-from openai import OpenAI
-from openpyxl.utils import get_column_letter
+
+from ..logging.metrics import CACHE_LOOKUPS
+from .replay import current_cassette
 
 # Ensure .env file is loaded
 load_dotenv()
@@ -54,13 +58,64 @@ MEDIA_EXTENSIONS = IMAGE_EXTENSIONS | AUDIO_EXTENSIONS | VIDEO_EXTENSIONS
 # Extensions that should skip MarkItDown fallback processing
 SKIP_MARKITDOWN_EXTENSIONS = MEDIA_EXTENSIONS | {"pdb"}
 
+# Optional directory for persisting media analysis across processes (e.g.
+# speculative benchmark attempts); results are always cached in memory
+MEDIA_CACHE_DIR_ENV = "MEDIA_ANALYSIS_CACHE_DIR"
+
+
+@dataclass(frozen=True)
+class MediaAttachment:
+    """A media file read once and shared by its caption and extraction calls"""
+
+    path: str
+    kind: str  # "image", "audio" or "video"
+    data: bytes
+    digest: str  # blake2b of the file content
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    @classmethod
+    def load(cls, path: str, kind: str) -> "MediaAttachment":
+        with open(path, "rb") as f:
+            data = f.read()
+        return cls(path, kind, data, hashlib.blake2b(data, digest_size=16).hexdigest())
+
+    @property
+    def b64(self) -> str:
+        # Caption and extraction run on separate threads; encode only once
+        with self._lock:
+            if "_b64" not in self.__dict__:
+                object.__setattr__(
+                    self, "_b64", base64.b64encode(self.data).decode("utf-8")
+                )
+        return self.__dict__["_b64"]
+
 
-def _generate_image_caption(image_path: str) -> str:
+def _openai_client(api_key: str, base_url: str):
+    # Imported on first use: tasks without media attachments never need it
+    from openai import OpenAI
+
+    return OpenAI(api_key=api_key, base_url=base_url)
+
+
+def _read_b64(path: str, attachment: Optional[MediaAttachment]) -> str:
+    """Base64 content of a media file, reusing the attachment's encoding if given"""
+    if attachment is not None:
+        return attachment.b64
+    with open(path, "rb") as f:
+        return base64.b64encode(f.read()).decode("utf-8")
+
+
+def _generate_image_caption(
+    image_path: str, attachment: Optional[MediaAttachment] = None
+) -> str:
     """
     Generate a caption for an image using OpenAI's GPT-4o vision model.
 
     Args:
         image_path: Path to the image file
+        attachment: The file already read by preprocessing (optional)
 
     Returns:
         Caption string, or error message if failed
@@ -72,11 +127,10 @@ def _generate_image_caption(image_path: str) -> str:
         if not OPENAI_API_KEY:
             return "[Caption unavailable: OPENAI_API_KEY not set]"
 
-        client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+        client = _openai_client(OPENAI_API_KEY, OPENAI_BASE_URL)
 
         # Read and encode image
-        with open(image_path, "rb") as image_file:
-            image_data = base64.b64encode(image_file.read()).decode("utf-8")
+        image_data = _read_b64(image_path, attachment)
 
         # Guess MIME type
         _, ext = os.path.splitext(image_path)
@@ -120,12 +174,15 @@ def _generate_image_caption(image_path: str) -> str:
         return f"[Caption generation failed: {str(e)}]"
 
 
-def _generate_audio_caption(audio_path: str) -> str:
+def _generate_audio_caption(
+    audio_path: str, attachment: Optional[MediaAttachment] = None
+) -> str:
     """
     Generate a caption for an audio file using OpenAI's audio transcription.
 
     Args:
         audio_path: Path to the audio file
+        attachment: The file already read by preprocessing (optional)
 
     Returns:
         Caption string (transcription), or error message if failed
@@ -137,13 +194,19 @@ def _generate_audio_caption(audio_path: str) -> str:
         if not OPENAI_API_KEY:
             return "[Caption unavailable: OPENAI_API_KEY not set]"
 
-        client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+        client = _openai_client(OPENAI_API_KEY, OPENAI_BASE_URL)
 
         # Transcribe audio
-        with open(audio_path, "rb") as audio_file:
+        if attachment is not None:
             transcription = client.audio.transcriptions.create(
-                model="gpt-4o-transcribe", file=audio_file
+                model="gpt-4o-transcribe",
+                file=(os.path.basename(audio_path), attachment.data),
             )
+        else:
+            with open(audio_path, "rb") as audio_file:
+                transcription = client.audio.transcriptions.create(
+                    model="gpt-4o-transcribe", file=audio_file
+                )
 
         text = transcription.text
         return text if text else "[Transcription unavailable: Empty response]"
@@ -152,12 +215,15 @@ def _generate_audio_caption(audio_path: str) -> str:
         return f"[Caption generation failed: {str(e)}]"
 
 
-def _generate_video_caption(video_path: str) -> str:
+def _generate_video_caption(
+    video_path: str, attachment: Optional[MediaAttachment] = None
+) -> str:
     """
     Generate a caption for a video using OpenAI's GPT-4o vision model.
 
     Args:
         video_path: Path to the video file
+        attachment: The file already read by preprocessing (optional)
 
     Returns:
         Caption string, or error message if failed
@@ -169,11 +235,10 @@ def _generate_video_caption(video_path: str) -> str:
         if not OPENAI_API_KEY:
             return "[Caption unavailable: OPENAI_API_KEY not set]"
 
-        client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+        client = _openai_client(OPENAI_API_KEY, OPENAI_BASE_URL)
 
         # Read and encode video
-        with open(video_path, "rb") as video_file:
-            video_data = base64.b64encode(video_file.read()).decode("utf-8")
+        video_data = _read_b64(video_path, attachment)
 
         # Guess MIME type
         _, ext = os.path.splitext(video_path)
@@ -218,13 +283,16 @@ def _generate_video_caption(video_path: str) -> str:
 
 
 def _extract_task_relevant_info_from_image(
-    image_path: str, task_description: str
+    image_path: str,
+    task_description: str,
+    attachment: Optional[MediaAttachment] = None,
 ) -> str:
     """
     Extract task-relevant information directly from an image based on the task description.
 
     Args:
         image_path: Path to the image file
+        attachment: The file already read by preprocessing (optional)
         task_description: The user's task description
 
     Returns:
@@ -237,11 +305,10 @@ def _extract_task_relevant_info_from_image(
         if not OPENAI_API_KEY:
             return ""
 
-        client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+        client = _openai_client(OPENAI_API_KEY, OPENAI_BASE_URL)
 
         # Read and encode image
-        with open(image_path, "rb") as image_file:
-            image_data = base64.b64encode(image_file.read()).decode("utf-8")
+        image_data = _read_b64(image_path, attachment)
 
         # Guess MIME type
         _, ext = os.path.splitext(image_path)
@@ -290,13 +357,16 @@ Please provide a concise summary of the relevant information from the image that
 
 
 def _extract_task_relevant_info_from_audio(
-    audio_path: str, task_description: str
+    audio_path: str,
+    task_description: str,
+    attachment: Optional[MediaAttachment] = None,
 ) -> str:
     """
     Extract task-relevant information directly from an audio file based on the task description.
 
     Args:
         audio_path: Path to the audio file
+        attachment: The file already read by preprocessing (optional)
         task_description: The user's task description
 
     Returns:
@@ -309,11 +379,10 @@ def _extract_task_relevant_info_from_audio(
         if not OPENAI_API_KEY:
             return ""
 
-        client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+        client = _openai_client(OPENAI_API_KEY, OPENAI_BASE_URL)
 
         # Read and encode audio file
-        with open(audio_path, "rb") as audio_file:
-            audio_data = base64.b64encode(audio_file.read()).decode("utf-8")
+        audio_data = _read_b64(audio_path, attachment)
 
         # Detect audio format
         _, ext = os.path.splitext(audio_path)
@@ -364,13 +433,16 @@ Please provide a concise summary of the relevant information from the audio that
 
 
 def _extract_task_relevant_info_from_video(
-    video_path: str, task_description: str
+    video_path: str,
+    task_description: str,
+    attachment: Optional[MediaAttachment] = None,
 ) -> str:
     """
     Extract task-relevant information directly from a video based on the task description.
 
     Args:
         video_path: Path to the video file
+        attachment: The file already read by preprocessing (optional)
         task_description: The user's task description
 
     Returns:
@@ -383,11 +455,10 @@ def _extract_task_relevant_info_from_video(
         if not OPENAI_API_KEY:
             return ""
 
-        client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+        client = _openai_client(OPENAI_API_KEY, OPENAI_BASE_URL)
 
         # Read and encode video
-        with open(video_path, "rb") as video_file:
-            video_data = base64.b64encode(video_file.read()).decode("utf-8")
+        video_data = _read_b64(video_path, attachment)
 
         # Guess MIME type
         _, ext = os.path.splitext(video_path)
@@ -435,6 +506,176 @@ Please provide a concise summary of the relevant information from the video that
         return ""
 
 
+_result_cache: Dict[str, Any] = {}
+_inflight: Dict[str, Future] = {}
+_cache_lock = threading.Lock()
+
+
+def _cache_file(cache_dir: Optional[str], key: str) -> Optional[str]:
+    return os.path.join(cache_dir, f"{key}.json") if cache_dir else None
+
+
+def _load_cached_result(cache_dir: Optional[str], key: str) -> Optional[Any]:
+    path = _cache_file(cache_dir, key)
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)["value"]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Warning: Ignoring unreadable cache entry {path}: {e}")
+        return None
+
+
+def _store_cached_result(cache_dir: Optional[str], key: str, value: Any) -> None:
+    path = _cache_file(cache_dir, key)
+    if path is None:
+        return
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"value": value}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Warning: Failed to write cache entry {path}: {e}")
+
+
+def _cached_call(
+    key: str,
+    compute: Callable[[], Any],
+    is_valid: Callable[[Any], bool],
+    cache_dir: Optional[str] = None,
+    memoize: bool = True,
+) -> Any:
+    """
+    Run an expensive call once per cache key.
+
+    Concurrent callers with the same key (e.g. parallel pass@k attempts) wait
+    for the first one instead of repeating the work. Valid results are kept
+    in memory (if memoize) and, given a cache_dir, on disk as JSON for other
+    processes and later runs. Invalid results are not cached, so failed calls
+    are retried by the next attempt.
+    """
+    with _cache_lock:
+        if key in _result_cache:
+            CACHE_LOOKUPS.inc(cache="attachment", result="hit")
+            return _result_cache[key]
+        future = _inflight.get(key)
+        is_owner = future is None
+        if is_owner:
+            future = _inflight[key] = Future()
+    if not is_owner:
+        CACHE_LOOKUPS.inc(cache="attachment", result="hit")
+        return future.result()
+
+    try:
+        value = _load_cached_result(cache_dir, key)
+        CACHE_LOOKUPS.inc(cache="attachment", result="miss" if value is None else "hit")
+        if value is None:
+            value = compute()
+            if is_valid(value):
+                _store_cached_result(cache_dir, key, value)
+        if memoize and is_valid(value):
+            with _cache_lock:
+                _result_cache[key] = value
+        future.set_result(value)
+        return value
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _cache_lock:
+            _inflight.pop(key, None)
+
+
+_MEDIA_CAPTIONERS = {
+    "image": _generate_image_caption,
+    "audio": _generate_audio_caption,
+    "video": _generate_video_caption,
+}
+_MEDIA_EXTRACTORS = {
+    "image": _extract_task_relevant_info_from_image,
+    "audio": _extract_task_relevant_info_from_audio,
+    "video": _extract_task_relevant_info_from_video,
+}
+
+
+# Captions and transcriptions that failed start with one of these
+_FAILED_CAPTION_PREFIXES = ("[Caption", "[Transcription")
+
+
+def _is_valid_caption(caption: str) -> bool:
+    return bool(caption) and not caption.startswith(_FAILED_CAPTION_PREFIXES)
+
+
+def analyze_media_attachment(
+    file_path: str, kind: str, task_description: str
+) -> Tuple[str, str]:
+    """
+    Caption a media file and extract its task-relevant information.
+
+    The file is read and base64-encoded once, both model calls run
+    concurrently, and results are cached by file content hash so format
+    retries and pass@k attempts of the same task reuse them. The caption is
+    shared by every task using the same file.
+
+    Args:
+        file_path: Path to the media file
+        kind: "image", "audio" or "video"
+        task_description: The user's task description
+
+    Returns:
+        Tuple of (caption, relevant_info); relevant_info may be empty
+    """
+    attachment = MediaAttachment.load(file_path, kind)
+    task_digest = hashlib.blake2b(
+        task_description.encode("utf-8"), digest_size=8
+    ).hexdigest()
+    cache_dir = os.environ.get(MEDIA_CACHE_DIR_ENV)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        caption = pool.submit(
+            _cached_call,
+            f"{kind}-caption-{attachment.digest}",
+            lambda: _MEDIA_CAPTIONERS[kind](file_path, attachment),
+            _is_valid_caption,
+            cache_dir,
+        )
+        relevant_info = pool.submit(
+            _cached_call,
+            f"{kind}-relevant-{attachment.digest}-{task_digest}",
+            lambda: _MEDIA_EXTRACTORS[kind](file_path, task_description, attachment),
+            bool,
+            cache_dir,
+        )
+        return caption.result(), relevant_info.result()
+
+
+async def process_input_async(
+    task_description: str, task_file_name: str
+) -> Tuple[str, str]:
+    """
+    Run process_input on a worker thread.
+
+    Media attachments need several blocking model calls; running them off the
+    event loop keeps streaming and other tasks responsive meanwhile. With a
+    cassette active, the processed input of a task with an attachment is
+    recorded or replayed, since those model calls bypass the LLM clients.
+    """
+    cassette = current_cassette()
+    if cassette is None or not task_file_name:
+        return await asyncio.to_thread(process_input, task_description, task_file_name)
+    result = await asyncio.to_thread(
+        cassette.call,
+        "input",
+        [task_description, task_file_name],
+        lambda: process_input(task_description, task_file_name),
+        f"processed input of {task_file_name}",
+    )
+    return tuple(result)
+
+
 def process_input(task_description: str, task_file_name: str) -> Tuple[str, str]:
     """
     Process user input and associated files.
@@ -457,14 +698,12 @@ def process_input(task_description: str, task_file_name: str) -> Tuple[str, str]
         try:
             file_extension = task_file_name.rsplit(".", maxsplit=1)[-1].lower()
             parsing_result = None
+            max_chars = attachment_char_budget()  # Limit results returned to LLM
 
             if file_extension in IMAGE_EXTENSIONS:
-                # Generate unconditional image caption
-                caption = _generate_image_caption(task_file_name)
-
-                # Extract task-relevant information directly from the image
-                relevant_info = _extract_task_relevant_info_from_image(
-                    task_file_name, task_description
+                # Caption the image and extract task-relevant information
+                caption, relevant_info = analyze_media_attachment(
+                    task_file_name, "image", task_description
                 )
 
                 # Format as Markdown
@@ -478,19 +717,19 @@ def process_input(task_description: str, task_file_name: str) -> Tuple[str, str]
 
             elif file_extension == "py":
                 # Python files - read directly
-                with open(task_file_name, "r", encoding="utf-8") as f:
-                    parsing_result = DocumentConverterResult(
-                        title=None, text_content=f.read()
-                    )
+                parsing_result = DocumentConverterResult(
+                    title=None,
+                    text_content=_read_text_file(task_file_name, max_chars),
+                )
                 file_content_section += f"\n\nNote: A Python file '{task_file_name}' is associated with this task. The content has been extracted as text below. You may use available tools to process its content if necessary. If you need to further process this file in the sandbox, please upload it to the sandbox first.\n\n"
                 file_content_section += f"## Python File\nFile: {task_file_name}\n\n"
 
             elif file_extension in ["txt", "md", "sh", "yaml", "yml", "toml", "csv"]:
                 # Text-based files - read directly
-                with open(task_file_name, "r", encoding="utf-8") as f:
-                    parsing_result = DocumentConverterResult(
-                        title=None, text_content=f.read()
-                    )
+                parsing_result = DocumentConverterResult(
+                    title=None,
+                    text_content=_read_text_file(task_file_name, max_chars),
+                )
                 file_type_name = {
                     "txt": "Text",
                     "md": "Markdown",
@@ -517,42 +756,46 @@ def process_input(task_description: str, task_file_name: str) -> Tuple[str, str]
                 file_content_section += f"## JSON File\nFile: {task_file_name}\n\n"
 
             elif file_extension in ["xlsx", "xls"]:
-                parsing_result = XlsxConverter(local_path=task_file_name)
+                parsing_result = convert_file(
+                    XlsxConverter, task_file_name, max_chars=max_chars
+                )
                 file_content_section += f"\n\nNote: An Excel file '{task_file_name}' is associated with this task. The content has been extracted as a markdown table below. You may use available tools to process its content if necessary. If you need to further process this file in the sandbox, please upload it to the sandbox first.\n\n"
                 file_content_section += f"## Excel File\nFile: {task_file_name}\n\n"
 
             elif file_extension == "pdf":
-                parsing_result = DocumentConverterResult(
-                    title=None,
-                    text_content=pdfminer.high_level.extract_text(task_file_name),
+                parsing_result = convert_file(
+                    PdfConverter, task_file_name, max_chars=max_chars
                 )
                 file_content_section += f"\n\nNote: A PDF file '{task_file_name}' is associated with this task. The content has been extracted as text below. You may use available tools to process its content if necessary. If you need to further process this file in the sandbox, please upload it to the sandbox first.\n\n"
                 file_content_section += f"## PDF File\nFile: {task_file_name}\n\n"
 
             elif file_extension in ["docx", "doc"]:
-                parsing_result = DocxConverter(local_path=task_file_name)
+                parsing_result = convert_file(
+                    DocxConverter, task_file_name, max_chars=max_chars
+                )
                 file_content_section += f"\n\nNote: A Word document '{task_file_name}' is associated with this task. The content has been extracted as markdown below. You may use available tools to process its content if necessary. If you need to further process this file in the sandbox, please upload it to the sandbox first.\n\n"
                 file_content_section += f"## Word Document\nFile: {task_file_name}\n\n"
 
             elif file_extension in ["html", "htm"]:
-                parsing_result = HtmlConverter(local_path=task_file_name)
+                parsing_result = convert_file(
+                    HtmlConverter, task_file_name, max_chars=max_chars
+                )
                 file_content_section += f"\n\nNote: An HTML file '{task_file_name}' is associated with this task. The content has been extracted as markdown below. You may use available tools to process its content if necessary. If you need to further process this file in the sandbox, please upload it to the sandbox first.\n\n"
                 file_content_section += f"## HTML File\nFile: {task_file_name}\n\n"
 
             elif file_extension in ["pptx", "ppt"]:
-                parsing_result = PptxConverter(local_path=task_file_name)
+                parsing_result = convert_file(
+                    PptxConverter, task_file_name, max_chars=max_chars
+                )
                 file_content_section += f"\n\nNote: A PowerPoint presentation '{task_file_name}' is associated with this task. The content has been extracted as markdown below. You may use available tools to process its content if necessary. If you need to further process this file in the sandbox, please upload it to the sandbox first.\n\n"
                 file_content_section += (
                     f"## PowerPoint Presentation\nFile: {task_file_name}\n\n"
                 )
 
             elif file_extension in AUDIO_EXTENSIONS:
-                # Generate unconditional audio transcription
-                caption = _generate_audio_caption(task_file_name)
-
-                # Extract task-relevant information directly from the audio
-                relevant_info = _extract_task_relevant_info_from_audio(
-                    task_file_name, task_description
+                # Caption the audio and extract task-relevant information
+                caption, relevant_info = analyze_media_attachment(
+                    task_file_name, "audio", task_description
                 )
 
                 # Format as Markdown
@@ -565,12 +808,9 @@ def process_input(task_description: str, task_file_name: str) -> Tuple[str, str]
                     file_content_section += f"{relevant_info}\n\n"
 
             elif file_extension in VIDEO_EXTENSIONS:
-                # Generate unconditional video caption
-                caption = _generate_video_caption(task_file_name)
-
-                # Extract task-relevant information directly from the video
-                relevant_info = _extract_task_relevant_info_from_video(
-                    task_file_name, task_description
+                # Caption the video and extract task-relevant information
+                caption, relevant_info = analyze_media_attachment(
+                    task_file_name, "video", task_description
                 )
 
                 # Format as Markdown
@@ -583,7 +823,9 @@ def process_input(task_description: str, task_file_name: str) -> Tuple[str, str]
                     file_content_section += f"{relevant_info}\n\n"
 
             elif file_extension in ["zip"]:
-                parsing_result = ZipConverter(local_path=task_file_name)
+                parsing_result = convert_file(
+                    ZipConverter, task_file_name, max_chars=max_chars
+                )
                 file_content_section += f"\n\nNote: A ZIP archive '{task_file_name}' is associated with this task. The content has been extracted as file list and contents below. You may use available tools to process its content if necessary. If you need to further process this file in the sandbox, please upload it to the sandbox first.\n\n"
                 file_content_section += f"## ZIP Archive\nFile: {task_file_name}\n\n"
 
@@ -599,8 +841,9 @@ def process_input(task_description: str, task_file_name: str) -> Tuple[str, str]
             if parsing_result is None:
                 try:
                     if file_extension not in SKIP_MARKITDOWN_EXTENSIONS:
-                        md = MarkItDown(enable_plugins=True)
-                        parsing_result = md.convert(task_file_name)
+                        parsing_result = convert_file(
+                            MarkItDownConverter, task_file_name, max_chars=max_chars
+                        )
                         print(
                             f"Info: Used MarkItDown as fallback to process file {task_file_name}"
                         )
@@ -623,10 +866,7 @@ def process_input(task_description: str, task_file_name: str) -> Tuple[str, str]
                     parsing_result.text_content
                 )
             elif getattr(parsing_result, "text_content", None):
-                content = parsing_result.text_content
-                max_len = 200_000  # Limit the length of results returned to LLM
-                if len(content) > max_len:
-                    content = content[:max_len] + "\n... [File truncated]"
+                content = _truncate_text(parsing_result.text_content, max_chars)
                 file_content_section += "```\n{}\n```\n".format(content)
             else:
                 pass  # for image, audio, video files that already have their content formatted
@@ -651,92 +891,101 @@ def process_input(task_description: str, task_file_name: str) -> Tuple[str, str]
     return updated_task_description, updated_task_description
 
 
-class _CustomMarkdownify(markdownify.MarkdownConverter):
-    """
-    A custom version of markdownify's MarkdownConverter. Changes include:
-
-    - Altering the default heading style to use '#', '##', etc.
-    - Removing javascript hyperlinks.
-    - Truncating images with large data:uri sources.
-    - Ensuring URIs are properly escaped, and do not conflict with Markdown syntax
-    """
-
-    def __init__(self, **options: Any):
-        options["heading_style"] = options.get("heading_style", markdownify.ATX)
-        # Explicitly cast options to the expected type if necessary
-        super().__init__(**options)
-
-    def convert_hn(self, n: int, el: Any, text: str, convert_as_inline: bool) -> str:
-        """Same as usual, but be sure to start with a new line"""
-        if not convert_as_inline:
-            if not re.search(r"^\n", text):
-                return "\n" + super().convert_hn(n, el, text, convert_as_inline)  # type: ignore
-
-        return super().convert_hn(n, el, text, convert_as_inline)  # type: ignore
+@functools.lru_cache(maxsize=1)
+def _custom_markdownify_class():
+    """Build _CustomMarkdownify on first use, importing markdownify lazily"""
+    import markdownify
+
+    class _CustomMarkdownify(markdownify.MarkdownConverter):
+        """
+        A custom version of markdownify's MarkdownConverter. Changes include:
+
+        - Altering the default heading style to use '#', '##', etc.
+        - Removing javascript hyperlinks.
+        - Truncating images with large data:uri sources.
+        - Ensuring URIs are properly escaped, and do not conflict with Markdown syntax
+        """
+
+        def __init__(self, **options: Any):
+            options["heading_style"] = options.get("heading_style", markdownify.ATX)
+            # Explicitly cast options to the expected type if necessary
+            super().__init__(**options)
+
+        def convert_hn(
+            self, n: int, el: Any, text: str, convert_as_inline: bool
+        ) -> str:
+            """Same as usual, but be sure to start with a new line"""
+            if not convert_as_inline:
+                if not re.search(r"^\n", text):
+                    return "\n" + super().convert_hn(n, el, text, convert_as_inline)  # type: ignore
+
+            return super().convert_hn(n, el, text, convert_as_inline)  # type: ignore
+
+        def convert_a(self, el: Any, text: str, convert_as_inline: bool):
+            """Same as usual converter, but removes Javascript links and escapes URIs."""
+            prefix, suffix, text = markdownify.chomp(text)  # type: ignore
+            if not text:
+                return ""
+            href = el.get("href")
+            title = el.get("title")
+
+            # Escape URIs and skip non-http or file schemes
+            if href:
+                try:
+                    parsed_url = urlparse(href)  # type: ignore
+                    if parsed_url.scheme and parsed_url.scheme.lower() not in [
+                        "http",
+                        "https",
+                        "file",
+                    ]:  # type: ignore
+                        return "%s%s%s" % (prefix, text, suffix)
+                    href = urlunparse(
+                        parsed_url._replace(path=quote(unquote(parsed_url.path)))
+                    )  # type: ignore
+                except ValueError:  # It's not clear if this ever gets thrown
+                    return "%s%s%s" % (prefix, text, suffix)
 
-    def convert_a(self, el: Any, text: str, convert_as_inline: bool):
-        """Same as usual converter, but removes Javascript links and escapes URIs."""
-        prefix, suffix, text = markdownify.chomp(text)  # type: ignore
-        if not text:
-            return ""
-        href = el.get("href")
-        title = el.get("title")
+            # For the replacement see #29: text nodes underscores are escaped
+            if (
+                self.options["autolinks"]
+                and text.replace(r"\_", "_") == href
+                and not title
+                and not self.options["default_title"]
+            ):
+                # Shortcut syntax
+                return "<%s>" % href
+            if self.options["default_title"] and not title:
+                title = href
+            title_part = ' "%s"' % title.replace('"', r"\"") if title else ""
+            return (
+                "%s[%s](%s%s)%s" % (prefix, text, href, title_part, suffix)
+                if href
+                else text
+            )
 
-        # Escape URIs and skip non-http or file schemes
-        if href:
-            try:
-                parsed_url = urlparse(href)  # type: ignore
-                if parsed_url.scheme and parsed_url.scheme.lower() not in [
-                    "http",
-                    "https",
-                    "file",
-                ]:  # type: ignore
-                    return "%s%s%s" % (prefix, text, suffix)
-                href = urlunparse(
-                    parsed_url._replace(path=quote(unquote(parsed_url.path)))
-                )  # type: ignore
-            except ValueError:  # It's not clear if this ever gets thrown
-                return "%s%s%s" % (prefix, text, suffix)
-
-        # For the replacement see #29: text nodes underscores are escaped
-        if (
-            self.options["autolinks"]
-            and text.replace(r"\_", "_") == href
-            and not title
-            and not self.options["default_title"]
-        ):
-            # Shortcut syntax
-            return "<%s>" % href
-        if self.options["default_title"] and not title:
-            title = href
-        title_part = ' "%s"' % title.replace('"', r"\"") if title else ""
-        return (
-            "%s[%s](%s%s)%s" % (prefix, text, href, title_part, suffix)
-            if href
-            else text
-        )
+        def convert_img(self, el: Any, text: str, convert_as_inline: bool) -> str:
+            """Same as usual converter, but removes data URIs"""
 
-    def convert_img(self, el: Any, text: str, convert_as_inline: bool) -> str:
-        """Same as usual converter, but removes data URIs"""
+            alt = el.attrs.get("alt", None) or ""
+            src = el.attrs.get("src", None) or ""
+            title = el.attrs.get("title", None) or ""
+            title_part = ' "%s"' % title.replace('"', r"\"") if title else ""
+            if (
+                convert_as_inline
+                and el.parent.name not in self.options["keep_inline_images_in"]
+            ):
+                return alt
 
-        alt = el.attrs.get("alt", None) or ""
-        src = el.attrs.get("src", None) or ""
-        title = el.attrs.get("title", None) or ""
-        title_part = ' "%s"' % title.replace('"', r"\"") if title else ""
-        if (
-            convert_as_inline
-            and el.parent.name not in self.options["keep_inline_images_in"]
-        ):
-            return alt
+            # Remove dataURIs
+            if src.startswith("data:"):
+                src = src.split(",")[0] + "..."
 
-        # Remove dataURIs
-        if src.startswith("data:"):
-            src = src.split(",")[0] + "..."
+            return "![%s](%s%s)" % (alt, src, title_part)
 
-        return "![%s](%s%s)" % (alt, src, title_part)
+        def convert_soup(self, soup: Any) -> str:
+            return super().convert_soup(soup)  # type: ignore
 
-    def convert_soup(self, soup: Any) -> str:
-        return super().convert_soup(soup)  # type: ignore
+    return _CustomMarkdownify
 
 
 class DocumentConverterResult:
@@ -747,11 +996,203 @@ class DocumentConverterResult:
         self.text_content: str = text_content
 
 
+# Document converters by file extension. Converters import their parsing
+# library on first use, so loading this module (and starting the agent) does
+# not pay for libraries that a task never needs.
+DOCUMENT_CONVERTERS: Dict[str, Callable[[str], DocumentConverterResult]] = {}
+
+
+# Output budget for a converted attachment, in tokens of ~4 characters.
+# Converters stop reading once it is reached, so huge files cost no more than
+# what the LLM is shown. Override with the ATTACHMENT_MAX_TOKENS env var.
+DEFAULT_ATTACHMENT_MAX_TOKENS = 50_000
+CHARS_PER_TOKEN = 4
+FILE_TRUNCATED_MARKER = "\n... [File truncated]"
+
+
+def attachment_char_budget() -> int:
+    """The configured attachment output budget, in characters"""
+    max_tokens = os.environ.get("ATTACHMENT_MAX_TOKENS")
+    try:
+        max_tokens = int(max_tokens) if max_tokens else DEFAULT_ATTACHMENT_MAX_TOKENS
+    except ValueError:
+        print(f"Warning: Invalid ATTACHMENT_MAX_TOKENS={max_tokens!r}, using default")
+        max_tokens = DEFAULT_ATTACHMENT_MAX_TOKENS
+    return max_tokens * CHARS_PER_TOKEN
+
+
+def _truncate_text(text: str, max_chars: Optional[int]) -> str:
+    """Cut text to max_chars, marker included"""
+    if max_chars is None or len(text) <= max_chars:
+        return text
+    return (
+        text[: max(max_chars - len(FILE_TRUNCATED_MARKER), 0)] + FILE_TRUNCATED_MARKER
+    )
+
+
+class _BoundedText:
+    """Collects converter output up to a character budget"""
+
+    def __init__(self, max_chars: Optional[int] = None):
+        self.limit = (
+            None
+            if max_chars is None
+            else max(max_chars - len(FILE_TRUNCATED_MARKER), 0)
+        )
+        self.parts = []
+        self.length = 0
+        self.full = False
+
+    def write(self, text: str) -> bool:
+        """Append text; returns False once the budget is used up"""
+        if self.full:
+            return False
+        if self.limit is not None and self.length + len(text) > self.limit:
+            text = text[: self.limit - self.length]
+            self.full = True
+        self.parts.append(text)
+        self.length += len(text)
+        return not self.full
+
+    def getvalue(self) -> str:
+        text = "".join(self.parts)
+        return text + FILE_TRUNCATED_MARKER if self.full else text
+
+
+# Bump when converter output changes, so cached conversions are not reused
+CONVERTER_VERSION = 1
+
+# Document conversion is CPU-bound and runs in a shared pool of worker
+# processes (ATTACHMENT_CONVERSION_WORKERS, 0 converts in-process). Results
+# are cached on disk by file content, converter and budget so every attempt,
+# format retry and benchmark run converts a file once (ATTACHMENT_CACHE_DIR,
+# empty to disable).
+DEFAULT_CONVERSION_WORKERS = 4
+DEFAULT_CONVERSION_CACHE_DIR = os.path.join(
+    tempfile.gettempdir(), "miroflow_attachment_cache"
+)
+
+_conversion_pool: Optional[ProcessPoolExecutor] = None
+_conversion_pool_lock = threading.Lock()
+
+
+def _get_conversion_pool() -> Optional[ProcessPoolExecutor]:
+    global _conversion_pool
+    with _conversion_pool_lock:
+        if _conversion_pool is None:
+            workers = os.environ.get("ATTACHMENT_CONVERSION_WORKERS")
+            workers = (
+                int(workers)
+                if workers
+                else min(DEFAULT_CONVERSION_WORKERS, os.cpu_count() or 1)
+            )
+            if workers <= 0:
+                return None
+            # Spawned, not forked: the parent runs event loops and threads
+            _conversion_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _conversion_pool
+
+
+def _reset_conversion_pool() -> None:
+    global _conversion_pool
+    with _conversion_pool_lock:
+        _conversion_pool = None
+
+
+def _file_digest(local_path: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(local_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _run_converter(
+    converter: Callable, local_path: str, max_chars: Optional[int]
+) -> Dict[str, Any]:
+    """Conversion pool entry point; returns a plain, picklable result"""
+    result = converter(local_path, max_chars=max_chars)
+    return {
+        "title": getattr(result, "title", None),
+        "text_content": getattr(result, "text_content", None) or "",
+    }
+
+
+def _is_cacheable_conversion(value: Dict[str, Any]) -> bool:
+    # ZIP conversion quotes a caption per media member; keep failed ones retryable
+    text = value["text_content"]
+    return not any(f"> {prefix}" in text for prefix in _FAILED_CAPTION_PREFIXES)
+
+
+def convert_file(
+    converter: Callable, local_path: str, max_chars: Optional[int] = None
+) -> "DocumentConverterResult":
+    """
+    Convert a file in the shared conversion pool, cached by its content.
+
+    Args:
+        converter: A converter function, e.g. one from DOCUMENT_CONVERTERS
+        local_path: Path to the file
+        max_chars: Output budget in characters (optional)
+
+    Returns:
+        DocumentConverterResult with the converted title and text
+    """
+    key = (
+        f"convert-{converter.__name__}-v{CONVERTER_VERSION}-"
+        f"{_file_digest(local_path)}-{max_chars}"
+    )
+
+    def compute():
+        pool = _get_conversion_pool()
+        if pool is not None:
+            try:
+                return pool.submit(
+                    _run_converter, converter, local_path, max_chars
+                ).result()
+            except BrokenProcessPool as e:
+                print(f"Warning: Conversion pool failed, converting in-process: {e}")
+                _reset_conversion_pool()
+            except pickle.PicklingError as e:
+                # Converters defined outside an importable module
+                print(f"Warning: Converting {local_path} in-process: {e}")
+        return _run_converter(converter, local_path, max_chars)
+
+    cache_dir = os.environ.get("ATTACHMENT_CACHE_DIR", DEFAULT_CONVERSION_CACHE_DIR)
+    value = _cached_call(
+        key, compute, _is_cacheable_conversion, cache_dir, memoize=False
+    )
+    return DocumentConverterResult(**value)
+
+
+def _read_text_file(local_path: str, max_chars: Optional[int] = None) -> str:
+    """Read a text file, reading no further than the output budget"""
+    with open(local_path, "r", encoding="utf-8") as f:
+        if max_chars is None:
+            return f.read()
+        return _truncate_text(f.read(max_chars + 1), max_chars)
+
+
+def register_converter(*extensions: str):
+    """Register the decorated converter for the given file extensions"""
+
+    def decorator(converter):
+        for extension in extensions:
+            DOCUMENT_CONVERTERS[extension] = converter
+        return converter
+
+    return decorator
+
+
 def convert_html_to_md(html_content):
     """
     Placeholder for HTML to Markdown conversion function
     In the original class, this would call self._convert()
     """
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html_content, "html.parser")
     for script in soup(["script", "style"]):
         script.extract()
@@ -760,9 +1201,9 @@ def convert_html_to_md(html_content):
     body_elm = soup.find("body")
     webpage_text = ""
     if body_elm:
-        webpage_text = _CustomMarkdownify().convert_soup(body_elm)
+        webpage_text = _custom_markdownify_class()().convert_soup(body_elm)
     else:
-        webpage_text = _CustomMarkdownify().convert_soup(soup)
+        webpage_text = _custom_markdownify_class()().convert_soup(soup)
 
     assert isinstance(webpage_text, str)
 
@@ -772,12 +1213,14 @@ def convert_html_to_md(html_content):
     )
 
 
-def HtmlConverter(local_path: str):
+@register_converter("html", "htm")
+def HtmlConverter(local_path: str, max_chars: Optional[int] = None):
     """
     Convert an HTML file to Markdown format.
 
     Args:
         local_path: Path to the HTML file to convert.
+        max_chars: Output budget in characters (optional).
 
     Returns:
         DocumentConverterResult containing the converted Markdown text.
@@ -785,10 +1228,13 @@ def HtmlConverter(local_path: str):
     with open(local_path, "rt", encoding="utf-8") as fh:
         html_content = fh.read()
 
-        return convert_html_to_md(html_content)
+    result = convert_html_to_md(html_content)
+    result.text_content = _truncate_text(result.text_content, max_chars)
+    return result
 
 
-def DocxConverter(local_path: str):
+@register_converter("docx", "doc")
+def DocxConverter(local_path: str, max_chars: Optional[int] = None):
     """
     Convert a DOCX file to Markdown format.
 
@@ -797,30 +1243,43 @@ def DocxConverter(local_path: str):
 
     Args:
         local_path: Path to the DOCX file to convert.
+        max_chars: Output budget in characters (optional).
 
     Returns:
         DocumentConverterResult containing the converted Markdown text.
     """
+    import mammoth
+
     with open(local_path, "rb") as docx_file:
         result = mammoth.convert_to_html(docx_file)
         html_content = result.value
-    return convert_html_to_md(html_content)
+    result = convert_html_to_md(html_content)
+    result.text_content = _truncate_text(result.text_content, max_chars)
+    return result
 
 
-def XlsxConverter(local_path: str):
+@register_converter("xlsx", "xls")
+def XlsxConverter(local_path: str, max_chars: Optional[int] = None):
     """
     Converts Excel files to Markdown using openpyxl.
     Preserves color formatting and other cell styling information.
 
+    The workbook is streamed in read-only mode: one pass over the values finds
+    the used range and column widths, a second renders the table, and both
+    stop once the output budget is reached.
+
     Args:
         local_path: Path to the Excel file
+        max_chars: Output budget in characters (optional)
 
     Returns:
         DocumentConverterResult with the Markdown representation of the Excel file
     """
+    import openpyxl
+
     # Load the workbook
-    wb = openpyxl.load_workbook(local_path, data_only=True)
-    md_content = ""
+    wb = openpyxl.load_workbook(local_path, read_only=True, data_only=True)
+    md_content = _BoundedText(max_chars)
 
     # Helper function to convert RGB color to hex
     def rgb_to_hex(rgb_value):
@@ -897,174 +1356,179 @@ def XlsxConverter(local_path: str):
 
         return info
 
-    # Process each sheet in the workbook
-    for sheet_name in wb.sheetnames:
-        try:
-            sheet = wb[sheet_name]
-            md_content += f"## {sheet_name}\n\n"
-
-            # Get the dimensions of the used part of the sheet
-            min_row, min_col = 1, 1
-            max_row = max(
-                (cell.row for cell in sheet._cells.values() if cell.value is not None),
-                default=0,
-            )
-            max_col = max(
-                (
-                    cell.column
-                    for cell in sheet._cells.values()
-                    if cell.value is not None
-                ),
-                default=0,
-            )
+    def format_cell(cell, width):
+        cell_value = str(cell.value) if cell.value is not None else ""
+        formatted_value = cell_value
 
-            if max_row == 0 or max_col == 0:
-                md_content += "This sheet is empty.\n\n"
-                continue
+        # Get formatting info
+        try:
+            format_info = get_cell_format_info(cell)
         except Exception as e:
-            error_msg = f"Error processing sheet '{sheet_name}': {str(e)}"
-            print(error_msg)
-            md_content += (
-                f"## {sheet_name}\n\nError processing this sheet: {str(e)}\n\n"
-            )
-            continue
+            print(f"Warning: Error getting formatting for cell: {str(e)}")
+            format_info = {}
+
+        # Add HTML-style formatting if needed
+        if format_info:
+            style_parts = []
+
+            if "bg_color" in format_info:
+                style_parts.append(f"background-color:{format_info['bg_color']}")
+
+            if "font_color" in format_info:
+                style_parts.append(f"color:{format_info['font_color']}")
+
+            span_attributes = []
+            if style_parts:
+                span_attributes.append(f'style="{"; ".join(style_parts)}"')
+
+            # Format with bold/italic/underline if needed
+            inner_value = cell_value
+            if "bold" in format_info:
+                inner_value = f"<strong>{inner_value}</strong>"
+            if "italic" in format_info:
+                inner_value = f"<em>{inner_value}</em>"
+            if "underline" in format_info:
+                inner_value = f"<u>{inner_value}</u>"
+
+            # Only add a span if we have style attributes
+            if span_attributes:
+                formatted_value = (
+                    f"<span {' '.join(span_attributes)}>{inner_value}</span>"
+                )
+            else:
+                formatted_value = inner_value
 
-        try:
-            # First, determine column widths
-            col_widths = {}
-            for col_idx in range(min_col, max_col + 1):
-                max_length = 0
-                # col_letter = get_column_letter(col_idx)
-                _ = get_column_letter(col_idx)
-                for row_idx in range(min_row, max_row + 1):
-                    try:
-                        cell = sheet.cell(row=row_idx, column=col_idx)
-                        cell_value = str(cell.value) if cell.value is not None else ""
-                        max_length = max(max_length, len(cell_value))
-                    except Exception as e:
-                        print(
-                            f"Warning: Error processing cell at row {row_idx}, column {col_idx}: {str(e)}"
+        # Pad to column width
+        padding = width - len(cell_value)
+        return " " + formatted_value + " " * (padding + 1), bool(format_info)
+
+    try:
+        # Process each sheet in the workbook
+        for sheet_name in wb.sheetnames:
+            if md_content.full:
+                break
+            try:
+                sheet = wb[sheet_name]
+                # Dimensions recorded in the file may be missing or stale
+                sheet.reset_dimensions()
+                md_content.write(f"## {sheet_name}\n\n")
+
+                # Find the used part of the sheet and the column widths. Rows
+                # past the output budget can never be rendered, so stop there.
+                max_row, max_col = 0, 0
+                value_widths = {}
+                scanned_chars = 0
+                for row_idx, values in enumerate(
+                    sheet.iter_rows(min_row=1, min_col=1, values_only=True), start=1
+                ):
+                    for col_idx, value in enumerate(values, start=1):
+                        if value is None:
+                            continue
+                        length = len(str(value))
+                        max_row = row_idx
+                        max_col = max(max_col, col_idx)
+                        value_widths[col_idx] = max(
+                            value_widths.get(col_idx, 0), length
                         )
-                        max_length = max(max_length, 10)  # Use reasonable default
-                col_widths[col_idx] = max(max_length + 2, 5)  # Min width of 5
-
-            # Start building the table
-            # Header row with column separators
-            md_content += "|"
-            for col_idx in range(min_col, max_col + 1):
-                md_content += " " + " " * col_widths[col_idx] + " |"
-            md_content += "\n"
-
-            # Separator row
-            md_content += "|"
-            for col_idx in range(min_col, max_col + 1):
-                md_content += ":" + "-" * col_widths[col_idx] + ":|"
-            md_content += "\n"
-
-            # Data rows
-            for row_idx in range(min_row, max_row + 1):
-                md_content += "|"
-                for col_idx in range(min_col, max_col + 1):
-                    try:
-                        cell = sheet.cell(row=row_idx, column=col_idx)
-                        cell_value = str(cell.value) if cell.value is not None else ""
+                        scanned_chars += length
+                    if max_chars is not None and scanned_chars > max_chars:
+                        break
+
+                if max_row == 0 or max_col == 0:
+                    md_content.write("This sheet is empty.\n\n")
+                    continue
+            except Exception as e:
+                error_msg = f"Error processing sheet '{sheet_name}': {str(e)}"
+                print(error_msg)
+                md_content.write(
+                    f"## {sheet_name}\n\nError processing this sheet: {str(e)}\n\n"
+                )
+                continue
 
-                        # Get formatting info
+            has_formatting = False
+            try:
+                col_widths = {
+                    col_idx: max(value_widths.get(col_idx, 0) + 2, 5)  # Min width of 5
+                    for col_idx in range(1, max_col + 1)
+                }
+
+                # Start building the table
+                # Header row with column separators
+                md_content.write(
+                    "|"
+                    + "".join(" " + " " * width + " |" for width in col_widths.values())
+                    + "\n"
+                )
+
+                # Separator row
+                md_content.write(
+                    "|"
+                    + "".join(":" + "-" * width + ":|" for width in col_widths.values())
+                    + "\n"
+                )
+
+                # Data rows
+                for row_idx, cells in enumerate(
+                    sheet.iter_rows(
+                        min_row=1, max_row=max_row, min_col=1, max_col=max_col
+                    ),
+                    start=1,
+                ):
+                    row_md = "|"
+                    for col_idx, cell in enumerate(cells, start=1):
                         try:
-                            format_info = get_cell_format_info(cell)
+                            padded_value, formatted = format_cell(
+                                cell, col_widths[col_idx]
+                            )
+                            has_formatting = has_formatting or formatted
+                            row_md += padded_value + "|"
                         except Exception as e:
                             print(
-                                f"Warning: Error getting formatting for cell at row {row_idx}, column {col_idx}: {str(e)}"
+                                f"Error processing cell at row {row_idx}, column {col_idx}: {str(e)}"
                             )
-                            format_info = {}
-
-                        formatted_value = cell_value
-
-                        # Add HTML-style formatting if needed
-                        if format_info:
-                            style_parts = []
-
-                            if "bg_color" in format_info:
-                                style_parts.append(
-                                    f"background-color:{format_info['bg_color']}"
-                                )
-
-                            if "font_color" in format_info:
-                                style_parts.append(f"color:{format_info['font_color']}")
-
-                            span_attributes = []
-                            if style_parts:
-                                span_attributes.append(
-                                    f'style="{"; ".join(style_parts)}"'
-                                )
-
-                            # Format with bold/italic/underline if needed
-                            inner_value = cell_value
-                            if "bold" in format_info:
-                                inner_value = f"<strong>{inner_value}</strong>"
-                            if "italic" in format_info:
-                                inner_value = f"<em>{inner_value}</em>"
-                            if "underline" in format_info:
-                                inner_value = f"<u>{inner_value}</u>"
-
-                            # Only add a span if we have style attributes
-                            if span_attributes:
-                                formatted_value = f"<span {' '.join(span_attributes)}>{inner_value}</span>"
-                            else:
-                                formatted_value = inner_value
-
-                        # Pad to column width and add to markdown
-                        padding = col_widths[col_idx] - len(cell_value)
-                        padded_value = " " + formatted_value + " " * (padding + 1)
-                        md_content += padded_value + "|"
-                    except Exception as e:
-                        print(
-                            f"Error processing cell at row {row_idx}, column {col_idx}: {str(e)}"
-                        )
-                        # Add a placeholder for the failed cell
-                        padded_value = " [Error] " + " " * (col_widths[col_idx] - 7)
-                        md_content += padded_value + " |"
-
-                md_content += "\n"
-        except Exception as e:
-            error_msg = f"Error generating table for sheet '{sheet_name}': {str(e)}\n{traceback.format_exc()}"
-            print(error_msg)
-            md_content += f"Error generating table: {str(e)}\n\n"
-
-        # Add formatting legend
-        has_formatting = False
-        for row_idx in range(min_row, max_row + 1):
-            for col_idx in range(min_col, max_col + 1):
-                cell = sheet.cell(row=row_idx, column=col_idx)
-                if get_cell_format_info(cell):
-                    has_formatting = True
-                    break
+                            # Add a placeholder for the failed cell
+                            padded_value = " [Error] " + " " * (col_widths[col_idx] - 7)
+                            row_md += padded_value + " |"
+                    if not md_content.write(row_md + "\n"):
+                        break
+            except Exception as e:
+                error_msg = f"Error generating table for sheet '{sheet_name}': {str(e)}\n{traceback.format_exc()}"
+                print(error_msg)
+                md_content.write(f"Error generating table: {str(e)}\n\n")
+
+            # Add formatting legend
             if has_formatting:
-                break
-
-        if has_formatting:
-            md_content += "\n### Formatting Information\n"
-            md_content += "The table above includes HTML formatting to represent colors and styles from the original Excel file.\n"
-            md_content += "This formatting may not display in all Markdown viewers.\n"
+                md_content.write(
+                    "\n### Formatting Information\n"
+                    "The table above includes HTML formatting to represent colors and styles from the original Excel file.\n"
+                    "This formatting may not display in all Markdown viewers.\n"
+                )
 
-        md_content += "\n\n"  # Extra newlines between sheets
+            md_content.write("\n\n")  # Extra newlines between sheets
+    finally:
+        wb.close()
 
     return DocumentConverterResult(
         title=None,
-        text_content=md_content.strip(),
+        text_content=md_content.getvalue().strip(),
     )
 
 
-def PptxConverter(local_path: str) -> DocumentConverterResult:
+@register_converter("pptx", "ppt")
+def PptxConverter(
+    local_path: str, max_chars: Optional[int] = None
+) -> DocumentConverterResult:
     """
     Converts PPTX files to Markdown. Supports headings, tables and images with alt text.
 
     Args:
         local_path: Path to the PPTX file
+        max_chars: Output budget in characters; later slides are skipped (optional)
 
     Returns:
         DocumentConverterResult containing the converted Markdown text
     """
+    import pptx
 
     def is_picture(shape):
         """Check if a shape is a picture"""
@@ -1151,155 +1615,205 @@ def PptxConverter(local_path: str) -> DocumentConverterResult:
                 md_content += notes_frame.text
             md_content = md_content.strip()
 
+        if max_chars is not None and len(md_content) > max_chars:
+            break
+
     return DocumentConverterResult(
         title=None,
-        text_content=md_content.strip(),
+        text_content=_truncate_text(md_content.strip(), max_chars),
     )
 
 
-def ZipConverter(local_path: str, **kwargs):
+@register_converter("pdf")
+def PdfConverter(
+    local_path: str, max_chars: Optional[int] = None
+) -> DocumentConverterResult:
     """
-    Extracts ZIP files to a temporary directory and processes each file according to its extension.
-    Returns a combined result of all processed files.
+    Extract the text of a PDF file with pdfminer, page by page.
+
+    Produces the same text as pdfminer.high_level.extract_text, but stops
+    parsing once the output budget is reached.
+
+    Args:
+        local_path: Path to the PDF file
+        max_chars: Output budget in characters (optional)
+
+    Returns:
+        DocumentConverterResult containing the extracted text
     """
-    import zipfile
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    text = _BoundedText(max_chars)
+    page_text = io.StringIO()
+    resource_manager = PDFResourceManager(caching=True)
+    with open(local_path, "rb") as fp:
+        device = TextConverter(resource_manager, page_text, laparams=LAParams())
+        try:
+            interpreter = PDFPageInterpreter(resource_manager, device)
+            for page in PDFPage.get_pages(fp, caching=True):
+                interpreter.process_page(page)
+                chunk = page_text.getvalue()
+                page_text.seek(0)
+                page_text.truncate()
+                if not text.write(chunk):
+                    break
+        finally:
+            device.close()
 
-    temp_dir = tempfile.mkdtemp(prefix="zip_extract_")
-    md_content = f"# Extracted from ZIP: {os.path.basename(local_path)}\n\n"
+    return DocumentConverterResult(title=None, text_content=text.getvalue())
 
-    try:
-        with zipfile.ZipFile(local_path, "r") as zip_ref:
-            zip_ref.extractall(temp_dir)
-
-        # Get all extracted files
-        extracted_files = []
-        for root, dirs, files in os.walk(temp_dir):
-            for file in files:
-                file_path = os.path.join(root, file)
-                rel_path = os.path.relpath(file_path, temp_dir)
-                extracted_files.append((file_path, rel_path))
-
-        if not extracted_files:
-            md_content += "The ZIP file is empty or contains no files.\n"
-        else:
-            md_content += f"Total files extracted: {len(extracted_files)}\n\n"
 
-            for file_path, rel_path in extracted_files:
-                md_content += f"## File: {rel_path}\n\n"
+def MarkItDownConverter(local_path: str, max_chars: Optional[int] = None):
+    """
+    Convert any file MarkItDown supports; the fallback for unknown extensions.
 
-                # Process each file based on its extension
-                file_extension = (
-                    file_path.rsplit(".", maxsplit=1)[-1].lower()
-                    if "." in file_path
-                    else ""
-                )
-                file_result = None
+    Args:
+        local_path: Path to the file
+        max_chars: Output budget in characters (optional)
 
-                try:
-                    # Use the same processing logic as process_input
-                    if file_extension == "py":
-                        with open(file_path, "r", encoding="utf-8") as f:
-                            file_result = DocumentConverterResult(
-                                title=None, text_content=f.read()
-                            )
+    Returns:
+        MarkItDown's conversion result (with title and text_content)
+    """
+    from markitdown import MarkItDown
 
-                    elif file_extension in [
-                        "txt",
-                        "md",
-                        "sh",
-                        "yaml",
-                        "yml",
-                        "toml",
-                        "csv",
-                    ]:
-                        with open(file_path, "r", encoding="utf-8") as f:
-                            file_result = DocumentConverterResult(
-                                title=None, text_content=f.read()
-                            )
+    result = MarkItDown(enable_plugins=True).convert(local_path)
+    if result.text_content:
+        result.text_content = _truncate_text(result.text_content, max_chars)
+    return result
 
-                    elif file_extension in ["jsonld", "json"]:
-                        with open(file_path, "r", encoding="utf-8") as f:
-                            file_result = DocumentConverterResult(
-                                title=None,
-                                text_content=json.dumps(
-                                    json.load(f), ensure_ascii=False, indent=2
-                                ),
-                            )
 
-                    elif file_extension in ["xlsx", "xls"]:
-                        file_result = XlsxConverter(local_path=file_path)
+# Characters shown per ZIP member, within the overall output budget
+ZIP_MEMBER_MAX_CHARS = 50_000
 
-                    elif file_extension == "pdf":
-                        file_result = DocumentConverterResult(
-                            title=None,
-                            text_content=pdfminer.high_level.extract_text(file_path),
-                        )
+# Plain-text extensions read directly, without a converter
+TEXT_FILE_EXTENSIONS = {"py", "txt", "md", "sh", "yaml", "yml", "toml", "csv"}
 
-                    elif file_extension in ["docx", "doc"]:
-                        file_result = DocxConverter(local_path=file_path)
 
-                    elif file_extension in ["html", "htm"]:
-                        file_result = HtmlConverter(local_path=file_path)
+@contextlib.contextmanager
+def _extracted_zip_member(zip_ref, info):
+    """Extract one ZIP member to a temporary file for converters needing a path"""
+    suffix = os.path.splitext(info.filename)[1]
+    fd, path = tempfile.mkstemp(prefix="zip_member_", suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as out, zip_ref.open(info) as member:
+            shutil.copyfileobj(member, out)
+        yield path
+    finally:
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"Warning: Could not remove temporary file {path}: {e}")
 
-                    elif file_extension in ["pptx", "ppt"]:
-                        file_result = PptxConverter(local_path=file_path)
 
-                    elif file_extension in IMAGE_EXTENSIONS:
-                        # Generate image caption for files in ZIP
-                        caption = _generate_image_caption(file_path)
-                        md_content += "[Image file]\n\n"
-                        md_content += f"> {caption}\n\n"
-                        continue
+def ZipConverter(local_path: str, max_chars: Optional[int] = None, **kwargs):
+    """
+    Processes each file in a ZIP archive according to its extension.
+    Returns a combined result of all processed files.
 
-                    elif file_extension in AUDIO_EXTENSIONS:
-                        # Generate audio caption for files in ZIP
-                        caption = _generate_audio_caption(file_path)
-                        md_content += "[Audio file]\n\n"
-                        md_content += f"> {caption}\n\n"
-                        continue
+    Members are streamed one at a time: text is read straight from the archive
+    and other files are extracted to a temporary file only while converted.
+    Processing stops once the output budget (max_chars) is reached.
+    """
+    import zipfile
 
-                    elif file_extension in VIDEO_EXTENSIONS:
-                        # Generate video caption for files in ZIP
-                        caption = _generate_video_caption(file_path)
-                        md_content += "[Video file]\n\n"
-                        md_content += f"> {caption}\n\n"
-                        continue
+    md_content = _BoundedText(max_chars)
+    md_content.write(f"# Extracted from ZIP: {os.path.basename(local_path)}\n\n")
 
-                    elif file_extension == "pdb":
-                        md_content += "[PDB file - specialized format]\n\n"
-                        continue
+    with zipfile.ZipFile(local_path, "r") as zip_ref:
+        members = [info for info in zip_ref.infolist() if not info.is_dir()]
+
+        if not members:
+            md_content.write("The ZIP file is empty or contains no files.\n")
+        else:
+            md_content.write(f"Total files extracted: {len(members)}\n\n")
+
+        for info in members:
+            if md_content.full:
+                break
+            rel_path = info.filename
+            md_content.write(f"## File: {rel_path}\n\n")
+
+            # Process each file based on its extension
+            file_name = os.path.basename(rel_path)
+            file_extension = (
+                file_name.rsplit(".", maxsplit=1)[-1].lower()
+                if "." in file_name
+                else ""
+            )
+            file_result = None
+
+            try:
+                # Use the same processing logic as process_input
+                if file_extension in TEXT_FILE_EXTENSIONS:
+                    with zip_ref.open(info) as member:
+                        text = io.TextIOWrapper(member, encoding="utf-8").read(
+                            ZIP_MEMBER_MAX_CHARS + 1
+                        )
+                    file_result = DocumentConverterResult(
+                        title=None,
+                        text_content=_truncate_text(text, ZIP_MEMBER_MAX_CHARS),
+                    )
+
+                elif file_extension in ["jsonld", "json"]:
+                    with zip_ref.open(info) as member:
+                        file_result = DocumentConverterResult(
+                            title=None,
+                            text_content=json.dumps(
+                                json.load(member), ensure_ascii=False, indent=2
+                            ),
+                        )
+
+                elif file_extension in DOCUMENT_CONVERTERS:
+                    with _extracted_zip_member(zip_ref, info) as file_path:
+                        file_result = DOCUMENT_CONVERTERS[file_extension](
+                            file_path, max_chars=ZIP_MEMBER_MAX_CHARS
+                        )
 
+                elif file_extension in MEDIA_EXTENSIONS:
+                    # Generate a caption for media files in the ZIP
+                    if file_extension in IMAGE_EXTENSIONS:
+                        label, caption_file = "Image", _generate_image_caption
+                    elif file_extension in AUDIO_EXTENSIONS:
+                        label, caption_file = "Audio", _generate_audio_caption
                     else:
-                        # Try MarkItDown as fallback
-                        try:
-                            md_tool = MarkItDown(enable_plugins=True)
-                            file_result = md_tool.convert(file_path)
-                        except Exception:
-                            md_content += (
-                                f"[Unsupported file type: {file_extension}]\n\n"
-                            )
-                            continue
+                        label, caption_file = "Video", _generate_video_caption
+                    with _extracted_zip_member(zip_ref, info) as file_path:
+                        caption = caption_file(file_path)
+                    md_content.write(f"[{label} file]\n\n")
+                    md_content.write(f"> {caption}\n\n")
+                    continue
 
-                    # Add the processed content
-                    if file_result and getattr(file_result, "text_content", None):
-                        content = file_result.text_content
-                        # Limit length for each file
-                        max_len = 50_000
-                        if len(content) > max_len:
-                            content = content[:max_len] + "\n... [Content truncated]"
-                        md_content += f"```\n{content}\n```\n\n"
+                elif file_extension == "pdb":
+                    md_content.write("[PDB file - specialized format]\n\n")
+                    continue
 
-                except Exception as e:
-                    md_content += f"[Error processing file: {str(e)}]\n\n"
-                    print(f"Warning: Error processing {rel_path} from ZIP: {e}")
+                else:
+                    # Try MarkItDown as fallback
+                    try:
+                        with _extracted_zip_member(zip_ref, info) as file_path:
+                            file_result = MarkItDownConverter(
+                                file_path, max_chars=ZIP_MEMBER_MAX_CHARS
+                            )
+                    except Exception:
+                        md_content.write(
+                            f"[Unsupported file type: {file_extension}]\n\n"
+                        )
+                        continue
 
-    finally:
-        # Clean up temporary directory
-        try:
-            shutil.rmtree(temp_dir)
-        except Exception as e:
-            print(f"Warning: Could not remove temporary directory {temp_dir}: {e}")
+                # Add the processed content
+                if file_result and getattr(file_result, "text_content", None):
+                    content = _truncate_text(
+                        file_result.text_content, ZIP_MEMBER_MAX_CHARS
+                    )
+                    md_content.write(f"```\n{content}\n```\n\n")
+
+            except Exception as e:
+                md_content.write(f"[Error processing file: {str(e)}]\n\n")
+                print(f"Warning: Error processing {rel_path} from ZIP: {e}")
 
     return DocumentConverterResult(
-        title="ZIP Archive Contents", text_content=md_content.strip()
+        title="ZIP Archive Contents", text_content=md_content.getvalue().strip()
     )
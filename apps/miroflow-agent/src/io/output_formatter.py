@@ -3,9 +3,9 @@
 
 """Output formatting utilities for agent responses."""
 
-import re
 from typing import Tuple
 
+from ..utils.parsing_utils import scan_llm_response
 from ..utils.prompt_utils import FORMAT_ERROR_MESSAGE
 
 # Maximum length for tool results before truncation (100k chars ≈ 25k tokens)
@@ -30,67 +30,13 @@ class OutputFormatter:
             text: Input text that may contain \boxed{...} expressions
 
         Returns:
-            The extracted boxed content, or empty string if no match is found.
+            The extracted boxed content, or empty string if no match is found
+            or the content is a placeholder.
         """
         if not text:
             return ""
-
-        _BOXED_RE = re.compile(r"\\boxed\b", re.DOTALL)
-
-        last_result = None  # Track the last boxed content (complete or incomplete)
-        i = 0
-        n = len(text)
-
-        while True:
-            # Find the next \boxed occurrence
-            m = _BOXED_RE.search(text, i)
-            if not m:
-                break
-            j = m.end()
-
-            # Skip any whitespace after \boxed
-            while j < n and text[j].isspace():
-                j += 1
-
-            # Require that the next character is '{'
-            if j >= n or text[j] != "{":
-                i = j
-                continue
-
-            # Parse the brace content manually to handle nesting and escapes
-            depth = 0
-            k = j
-            escaped = False
-            found_closing = False
-            while k < n:
-                ch = text[k]
-                if escaped:
-                    escaped = False
-                elif ch == "\\":
-                    escaped = True
-                elif ch == "{":
-                    depth += 1
-                elif ch == "}":
-                    depth -= 1
-                    # When depth returns to zero, the boxed content ends
-                    if depth == 0:
-                        last_result = text[j + 1 : k]
-                        i = k + 1
-                        found_closing = True
-                        break
-                k += 1
-
-            # If we didn't find a closing brace, this is an incomplete boxed
-            # Store it as the last result (will be overwritten if we find more boxed later)
-            if not found_closing and depth > 0:
-                last_result = text[j + 1 : n]
-                i = k  # Continue from where we stopped
-            elif not found_closing:
-                i = j + 1  # Move past this invalid boxed
-
-        # Return the last boxed content found (complete or incomplete)
-        black_list = ["?", "??", "???", "？", "……", "…", "...", "unknown", None]
-        return last_result.strip() if last_result not in black_list else ""
+        # Shares the per-response scan with tool call and text extraction
+        return scan_llm_response(text).boxed
 
     def format_tool_result_for_user(self, tool_call_execution_result: dict) -> dict:
         """
@@ -0,0 +1,418 @@
+# Copyright (c) 2025 MiroMind
+# This source code is licensed under the MIT License.
+
+"""
+Record/replay of the LLM and tool traffic of a pipeline run.
+
+This module provides:
+- Cassette: JSONL file of one task's LLM HTTP exchanges and tool calls,
+  keyed by normalized request, in record or replay mode
+- CassetteTransport: httpx transport for the provider SDKs' HTTP clients
+  that records LLM responses, or serves them from the cassette offline
+- ReplayToolManager: Tool manager wrapper that records tool definitions and
+  tool call results, or serves them without starting any MCP server
+- current_cassette: The cassette of the current context, if any
+
+Set replay.mode to "record" to capture a live run, then to "replay" to run
+execute_task_pipeline again with no network access (no LLM API, Serper,
+Jina, E2B, ...), e.g. to benchmark the orchestrator itself with
+scripts/benchmark_replay.py. Requests are keyed by their normalized content
+(dates and UUIDs masked, JSON keys sorted); identical requests are answered
+in recorded order. Retry back-off sleeps are skipped when replaying.
+Attachment processing (captions and extraction of images, audio, video and
+ZIP members) uses its own model clients, so its output is recorded as a
+whole with Cassette.call.
+"""
+
+import contextlib
+import contextvars
+import copy
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+import httpx
+from omegaconf import DictConfig
+
+CASSETTE_SUFFIX = ".jsonl"
+
+# replay.mode values
+REPLAY_OFF = "off"
+REPLAY_RECORD = "record"
+REPLAY_REPLAY = "replay"
+
+# Response headers kept in the cassette (bodies are stored decoded)
+RECORDED_HEADERS = ("content-type",)
+
+# Misses listed in the task log
+MAX_REPORTED_MISSES = 20
+
+# Request content that changes between otherwise identical runs
+_VOLATILE_PATTERNS = [
+    (re.compile(r"Today is: \d{4}-\d{2}-\d{2}"), "Today is: <date>"),
+    (
+        re.compile(
+            r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+        ),
+        "<uuid>",
+    ),
+]
+
+_current_cassette: contextvars.ContextVar[Optional["Cassette"]] = (
+    contextvars.ContextVar("miroflow_cassette", default=None)
+)
+
+
+def normalize_request(value: Any) -> str:
+    """Canonical text of a request: sorted-key JSON with volatile content masked"""
+    text = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    for pattern, replacement in _VOLATILE_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def request_key(kind: str, value: Any) -> str:
+    """Cassette key of a request"""
+    digest = hashlib.sha256(normalize_request(value).encode("utf-8")).hexdigest()
+    return f"{kind}:{digest[:32]}"
+
+
+def _http_request_key(request: httpx.Request) -> str:
+    body = request.read().decode("utf-8", errors="replace")
+    with contextlib.suppress(json.JSONDecodeError):
+        body = json.loads(body)
+    target = request.url.raw_path.decode("ascii", errors="replace")
+    return request_key("http", [request.method, target, body])
+
+
+class CassetteMiss(LookupError):
+    """A replayed request that the cassette has no recording of"""
+
+
+class Cassette:
+    """
+    Recorded LLM and tool traffic of one task run.
+
+    In record mode the file is started afresh and every exchange is appended
+    as one JSON line; in replay mode the file is loaded and never written.
+    Write failures are reported once and never interrupt the run.
+    """
+
+    def __init__(self, path: Union[str, Path], mode: str):
+        """
+        Initialize the cassette.
+
+        Args:
+            path: Cassette file
+            mode: REPLAY_RECORD or REPLAY_REPLAY
+
+        Raises:
+            FileNotFoundError: If replaying a cassette that was never recorded
+        """
+        if mode not in (REPLAY_RECORD, REPLAY_REPLAY):
+            raise ValueError(f"Unknown replay mode: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.task: Optional[Dict[str, Any]] = None
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._failed = False
+        self.stats = {"recorded": 0, "replayed": 0, "misses": 0}
+        self.misses: List[str] = []
+
+        if self.replaying:
+            self._load()
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text("", encoding="utf-8")
+
+    @classmethod
+    def from_config(cls, cfg: DictConfig, task_id: str) -> Optional["Cassette"]:
+        """
+        The cassette of a task as configured by replay.mode and replay.cassette_dir.
+
+        Returns:
+            None if replay.mode is off (or unset)
+        """
+        settings = cfg.get("replay") or {}
+        mode = settings.get("mode") or REPLAY_OFF
+        if mode == REPLAY_OFF:
+            return None
+        file_name = re.sub(r"[^\w.-]", "_", task_id) + CASSETTE_SUFFIX
+        return cls(Path(settings.get("cassette_dir") or ".") / file_name, mode)
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY_REPLAY
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry["kind"] == "task":
+                    self.task = entry
+                else:
+                    self._entries.setdefault(entry["key"], []).append(entry)
+
+    def _append(self, entry: Dict[str, Any]):
+        line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+        try:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line.encode("utf-8"))
+            finally:
+                os.close(fd)
+        except OSError as e:
+            if not self._failed:
+                self._failed = True
+                print(f"Warning: Could not write cassette {self.path}: {e}")
+
+    def record(self, key: str, kind: str, **fields: Any):
+        """Append an exchange (no-op when replaying)"""
+        if self.replaying:
+            return
+        with self._lock:
+            self.stats["recorded"] += 1
+            self._append({"kind": kind, "key": key, **fields})
+
+    def record_task(self, task_description: str, task_file_name: Optional[str]):
+        """Store the task the run was given, so a replay can repeat it"""
+        if self.replaying:
+            return
+        self.task = {
+            "kind": "task",
+            "task_description": task_description,
+            "task_file_name": task_file_name,
+        }
+        with self._lock:
+            self._append(self.task)
+
+    def play(self, key: str, description: str = "") -> Dict[str, Any]:
+        """
+        The next recorded exchange with this key.
+
+        Identical requests get the recordings in order; once they are used
+        up, the last one is repeated.
+
+        Raises:
+            CassetteMiss: If the key was never recorded
+        """
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.stats["misses"] += 1
+                if len(self.misses) < MAX_REPORTED_MISSES:
+                    self.misses.append(description or key)
+                raise CassetteMiss(
+                    f"No recording of {description or key} in cassette {self.path}"
+                )
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            self.stats["replayed"] += 1
+            return entries[min(cursor, len(entries) - 1)]
+
+    def call(
+        self, kind: str, request: Any, compute: Callable[[], Any], description: str
+    ) -> Any:
+        """
+        Result of a local computation that makes its own network calls.
+
+        Records compute()'s result, or replays it without calling compute. A
+        replayed request without a recording is computed live (and counted
+        as a miss).
+        """
+        key = request_key(kind, request)
+        if self.replaying:
+            try:
+                return copy.deepcopy(self.play(key, description)["result"])
+            except CassetteMiss:
+                return compute()
+        result = compute()
+        self.record(key, kind, result=result)
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Mode, counts and first misses, for the task log"""
+        return {
+            "mode": self.mode,
+            "cassette": str(self.path),
+            **self.stats,
+            "missed": list(self.misses),
+        }
+
+    @contextlib.contextmanager
+    def activate(self) -> Iterator["Cassette"]:
+        """Make this the cassette of the current context (LLM clients use it)"""
+        token = _current_cassette.set(self)
+        try:
+            yield self
+        finally:
+            _current_cassette.reset(token)
+
+    def http_transport(self, async_client: bool) -> "CassetteTransport":
+        """Transport for an SDK HTTP client, see CassetteTransport"""
+        inner = None
+        if not self.replaying:
+            inner = (
+                httpx.AsyncHTTPTransport() if async_client else httpx.HTTPTransport()
+            )
+        return CassetteTransport(self, inner)
+
+
+def current_cassette() -> Optional[Cassette]:
+    """Cassette of the current context, if any"""
+    return _current_cassette.get()
+
+
+class CassetteTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """
+    httpx transport that records responses to a cassette or replays them.
+
+    Recording reads each response in full before returning it, so streamed
+    completions arrive at once. A replayed request without a recording gets a
+    404 response naming the cassette.
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        inner: Optional[Union[httpx.BaseTransport, httpx.AsyncBaseTransport]] = None,
+    ):
+        self.cassette = cassette
+        self.inner = inner
+
+    def _replay(self, request: httpx.Request, key: str) -> httpx.Response:
+        try:
+            entry = self.cassette.play(key, f"{request.method} {request.url.path}")
+        except CassetteMiss as e:
+            return httpx.Response(
+                404,
+                json={"error": {"message": str(e), "type": "cassette_miss"}},
+                request=request,
+            )
+        return httpx.Response(
+            entry["status"],
+            headers=entry["headers"],
+            content=entry["body"].encode("utf-8"),
+            request=request,
+        )
+
+    def _record(
+        self, request: httpx.Request, key: str, response: httpx.Response, body: bytes
+    ) -> httpx.Response:
+        headers = {
+            name: response.headers[name]
+            for name in RECORDED_HEADERS
+            if name in response.headers
+        }
+        self.cassette.record(
+            key,
+            "http",
+            method=request.method,
+            path=request.url.path,
+            status=response.status_code,
+            headers=headers,
+            body=body.decode("utf-8", errors="replace"),
+        )
+        return httpx.Response(
+            response.status_code, headers=headers, content=body, request=request
+        )
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        key = _http_request_key(request)
+        if self.cassette.replaying:
+            return self._replay(request, key)
+        response = self.inner.handle_request(request)
+        try:
+            body = response.read()
+        finally:
+            response.close()
+        return self._record(request, key, response, body)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = _http_request_key(request)
+        if self.cassette.replaying:
+            return self._replay(request, key)
+        response = await self.inner.handle_async_request(request)
+        try:
+            body = await response.aread()
+        finally:
+            await response.aclose()
+        return self._record(request, key, response, body)
+
+    def close(self):
+        if isinstance(self.inner, httpx.BaseTransport):
+            self.inner.close()
+
+    async def aclose(self):
+        if isinstance(self.inner, httpx.AsyncBaseTransport):
+            await self.inner.aclose()
+
+
+class ReplayToolManager:
+    """
+    Tool manager that records tool traffic to a cassette or replays it.
+
+    Wraps a ToolManager: tool definitions and tool call results are recorded
+    as they pass through, or served from the cassette without connecting to
+    any MCP server. A replayed call without a recording returns an error
+    result. Everything else is delegated.
+    """
+
+    def __init__(self, tool_manager: Any, cassette: Cassette, agent_name: str):
+        self.tool_manager = tool_manager
+        self.cassette = cassette
+        self.agent_name = agent_name
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.tool_manager, name)
+
+    async def get_all_tool_definitions(self) -> Any:
+        key = request_key("tool_definitions", self.agent_name)
+        if self.cassette.replaying:
+            try:
+                entry = self.cassette.play(
+                    key, f"tool definitions of {self.agent_name}"
+                )
+                return copy.deepcopy(entry["result"])
+            except CassetteMiss as e:
+                self.tool_manager._log("error", "ToolManager | Replay Miss", str(e))
+                return []
+        definitions = await self.tool_manager.get_all_tool_definitions()
+        self.cassette.record(key, "tool_definitions", result=definitions)
+        return definitions
+
+    async def execute_tool_call(
+        self, server_name: str, tool_name: str, arguments: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        key = request_key("tool", [server_name, tool_name, arguments])
+        if self.cassette.replaying:
+            try:
+                entry = self.cassette.play(key, f"tool call {server_name}/{tool_name}")
+                return copy.deepcopy(entry["result"])
+            except CassetteMiss as e:
+                self.tool_manager._log("error", "ToolManager | Replay Miss", str(e))
+                return {
+                    "server_name": server_name,
+                    "tool_name": tool_name,
+                    "error": str(e),
+                }
+        tool_result = await self.tool_manager.execute_tool_call(
+            server_name=server_name, tool_name=tool_name, arguments=arguments
+        )
+        self.cassette.record(
+            key,
+            "tool",
+            server_name=server_name,
+            tool_name=tool_name,
+            arguments=arguments,
+            result=tool_result,
+        )
+        return tool_result
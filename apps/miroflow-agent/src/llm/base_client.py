@@ -10,6 +10,7 @@ supporting both OpenAI and Anthropic API formats.
 
 import asyncio
 import dataclasses
+import time
 from abc import ABC
 from typing import (
     Any,
@@ -22,12 +23,23 @@ from typing import (
 
 from omegaconf import DictConfig
 
+from ..io.replay import current_cassette
+from ..logging.metrics import LLM_LATENCY, LLM_REQUESTS, LLM_RETRIES, LLM_TOKENS
 from ..logging.task_logger import TaskLog
+from ..logging.tracing import span
 from .util import with_timeout
 
 # Default timeout for LLM API calls (10 minutes)
 DEFAULT_LLM_TIMEOUT_SECONDS = 600
 
+# Token metric kinds and the token_usage counters they are read from
+_TOKEN_METRIC_KINDS = {
+    "input": "total_input_tokens",
+    "output": "total_output_tokens",
+    "cache_read": "total_cache_read_input_tokens",
+    "cache_write": "total_cache_write_input_tokens",
+}
+
 
 class TokenUsage(TypedDict, total=True):
     """
@@ -73,6 +85,7 @@ class BaseClient(ABC):
     # Initialized in __post_init__
     client: Any = dataclasses.field(init=False)
     token_usage: TokenUsage = dataclasses.field(init=False)
+    charged_usage: TokenUsage = dataclasses.field(init=False)
     last_call_tokens: Dict[str, int] = dataclasses.field(init=False)
 
     def __post_init__(self):
@@ -97,8 +110,19 @@ class BaseClient(ABC):
         self.base_url: Optional[str] = self.cfg.llm.get("base_url")
         self.use_tool_calls: Optional[bool] = self.cfg.llm.get("use_tool_calls")
         self.repetition_penalty: float = self.cfg.llm.get("repetition_penalty", 1.0)
+        # Stream responses and stop generating as soon as they loop
+        self.stream_repetition_check: bool = self.cfg.llm.get(
+            "stream_repetition_check", True
+        )
+        self.repetition_window: int = self.cfg.llm.get("repetition_window", 50)
+        self.repetition_max_repeats: int = self.cfg.llm.get("repetition_max_repeats", 5)
+
+        # Record or replay the HTTP traffic when the pipeline set a cassette
+        self.cassette = current_cassette()
+        self.replaying: bool = self.cassette is not None and self.cassette.replaying
 
         self.token_usage = self._reset_token_usage()
+        self.charged_usage = self._reset_token_usage()
         self.client = self._create_client()
 
         self.task_log.log_step(
@@ -121,6 +145,68 @@ class BaseClient(ABC):
             total_cache_read_input_tokens=0,
         )
 
+    def charge_token_usage(self, usage: Dict[str, int]):
+        """
+        Add the tokens of a helper client (like the context summarizer) to this run.
+
+        They count in token_usage, and so in the task's usage summary and its
+        budget, but not in this client's LLM metrics: the helper client records
+        them under its own model.
+
+        Args:
+            usage: Token counts keyed like TokenUsage
+        """
+        for key in self.token_usage:
+            self.token_usage[key] += usage.get(key, 0)
+            self.charged_usage[key] += usage.get(key, 0)
+
+    def _own_token_usage(self) -> Dict[str, int]:
+        """token_usage without the tokens charged by helper clients"""
+        return {
+            key: value - self.charged_usage[key]
+            for key, value in self.token_usage.items()
+        }
+
+    def last_call_input_output_tokens(self) -> Tuple[int, int]:
+        """
+        Prompt and completion tokens of the last call.
+
+        Returns:
+            Tuple of (input, output) tokens, read from the OpenAI
+            (prompt/completion) or Anthropic (input/output) naming of
+            last_call_tokens.
+        """
+        tokens = self.last_call_tokens
+        return (
+            tokens.get("prompt_tokens", tokens.get("input_tokens", 0)),
+            tokens.get("completion_tokens", tokens.get("output_tokens", 0)),
+        )
+
+    def last_call_context_tokens(self) -> int:
+        """Context used by the last call: its prompt plus completion tokens"""
+        return sum(self.last_call_input_output_tokens())
+
+    def estimate_last_call_tokens(
+        self, system_prompt: str, message_history: List[Dict]
+    ):
+        """
+        Replace last_call_tokens with an estimate of the prompt for a rewritten history.
+
+        Context checks read the size of the last call; after the history is
+        compacted that size is stale until the next call, so it is re-estimated.
+
+        Args:
+            system_prompt: System prompt sent with the history
+            message_history: The rewritten message history
+        """
+        estimate = self._estimate_tokens(
+            system_prompt + "".join(str(m["content"]) for m in message_history)
+        )
+        if "input_tokens" in self.last_call_tokens:
+            self.last_call_tokens = {"input_tokens": estimate, "output_tokens": 0}
+        else:
+            self.last_call_tokens = {"prompt_tokens": estimate, "completion_tokens": 0}
+
     def _remove_tool_result_from_messages(
         self, messages, keep_tool_result
     ) -> List[Dict]:
@@ -251,13 +337,22 @@ class BaseClient(ABC):
             Tuple of (response, updated_message_history)
         """
         # Unified LLM call processing
+        start_time = time.time()
+        usage_before = self._own_token_usage()
+        status = "ok"
         try:
-            response, message_history = await self._create_message(
-                system_prompt,
-                message_history,
-                tool_definitions,
-                keep_tool_result=keep_tool_result,
-            )
+            with span(
+                "llm.call", model=self.model_name, agent=agent_type, step=step_id
+            ) as call_span:
+                response, message_history = await self._create_message(
+                    system_prompt,
+                    message_history,
+                    tool_definitions,
+                    keep_tool_result=keep_tool_result,
+                )
+                if call_span is not None:
+                    for key, value in self.last_call_tokens.items():
+                        call_span.set_attribute(f"llm.{key}", value)
 
         except Exception as e:
             self.task_log.log_step(
@@ -266,9 +361,38 @@ class BaseClient(ABC):
                 f"{agent_type} failed: {str(e)}",
             )
             response = None
+            status = "error"
 
+        self._observe_call(start_time, usage_before, status)
         return response, message_history
 
+    def _observe_call(self, start_time: float, usage_before: Dict, status: str):
+        """Record an LLM call's outcome, latency and tokens in the metrics"""
+        LLM_REQUESTS.inc(model=self.model_name, status=status)
+        LLM_LATENCY.observe(time.time() - start_time, model=self.model_name)
+        usage = self._own_token_usage()
+        for kind, key in _TOKEN_METRIC_KINDS.items():
+            tokens = usage.get(key, 0) - usage_before.get(key, 0)
+            if tokens > 0:
+                LLM_TOKENS.inc(tokens, model=self.model_name, kind=kind)
+
+    async def _retry_sleep(self, seconds: float):
+        """Wait before retrying a failed LLM request (traced as llm.retry_sleep)"""
+        LLM_RETRIES.inc(model=self.model_name)
+        if self.replaying:
+            return
+        with span("llm.retry_sleep", seconds=seconds):
+            await asyncio.sleep(seconds)
+
+    def _http_client_args(self) -> Dict[str, Any]:
+        """Arguments of the provider SDK's HTTP client"""
+        http_client_args = {"headers": {"x-upstream-session-id": self.task_id}}
+        if self.cassette is not None:
+            http_client_args["transport"] = self.cassette.http_transport(
+                self.async_client
+            )
+        return http_client_args
+
     @staticmethod
     async def convert_tool_definition_to_tool_call(tools_definitions):
         """
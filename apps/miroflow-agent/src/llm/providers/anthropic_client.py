@@ -19,7 +19,6 @@ import dataclasses
 import logging
 from typing import Any, Dict, List, Tuple, Union
 
-import tiktoken
 from anthropic import (
     NOT_GIVEN,
     Anthropic,
@@ -27,13 +26,16 @@ from anthropic import (
     DefaultAsyncHttpxClient,
     DefaultHttpxClient,
 )
-from tenacity import retry, stop_after_attempt, wait_fixed
-
+from ...logging.tracing import SPAN_KIND_CLIENT, span
 from ...utils.prompt_utils import generate_mcp_system_prompt
 from ..base_client import BaseClient
 
 logger = logging.getLogger("miroflow_agent")
 
+# Attempts of a request and the wait between them
+MAX_ATTEMPTS = 5
+RETRY_WAIT_SECONDS = 10
+
 
 @dataclasses.dataclass
 class AnthropicClient(BaseClient):
@@ -48,7 +50,7 @@ class AnthropicClient(BaseClient):
 
     def _create_client(self) -> Union[AsyncAnthropic, Anthropic]:
         """Create LLM client"""
-        http_client_args = {"headers": {"x-upstream-session-id": self.task_id}}
+        http_client_args = self._http_client_args()
         if self.async_client:
             return AsyncAnthropic(
                 api_key=self.api_key,
@@ -81,9 +83,9 @@ class AnthropicClient(BaseClient):
             self.task_log.log_step(
                 "info",
                 "LLM | Token Usage",
-                f"Input: {getattr(usage_data, 'input_tokens', 0)}, "
-                f"Cache: {getattr(usage_data, 'cache_creation_input_tokens', 0)}+{getattr(usage_data, 'cache_read_input_tokens', 0)}, "
-                f"Output: {getattr(usage_data, 'output_tokens', 0)}",
+                f"Input: {getattr(usage_data, 'input_tokens', 0) or 0}, "
+                f"Cache: {getattr(usage_data, 'cache_creation_input_tokens', 0) or 0}+{getattr(usage_data, 'cache_read_input_tokens', 0) or 0}, "
+                f"Output: {getattr(usage_data, 'output_tokens', 0) or 0}",
             )
 
             self.last_call_tokens = {
@@ -97,7 +99,6 @@ class AnthropicClient(BaseClient):
                 "warning", "LLM | Token Usage", "Warning: No valid usage_data received."
             )
 
-    @retry(wait=wait_fixed(10), stop=stop_after_attempt(5))
     async def _create_message(
         self,
         system_prompt: str,
@@ -106,11 +107,40 @@ class AnthropicClient(BaseClient):
         keep_tool_result: int = -1,
     ):
         """
-        Send message to Anthropic API.
+        Send message to Anthropic API, retrying failed requests.
         :param system_prompt: System prompt string.
         :param messages_history: Message history list.
         :return: Anthropic API response object or None (if error occurs).
         """
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                with span(
+                    "llm.request",
+                    SPAN_KIND_CLIENT,
+                    attempt=attempt + 1,
+                    max_tokens=self.max_tokens,
+                ) as request_span:
+                    response, messages_history = await self._send_message(
+                        system_prompt, messages_history, keep_tool_result
+                    )
+                    if request_span is not None:
+                        request_span.set_attribute(
+                            "finish_reason", getattr(response, "stop_reason", None)
+                        )
+                return response, messages_history
+            except Exception:
+                if attempt == MAX_ATTEMPTS - 1:
+                    raise
+                # Skipped when replaying, where a failure is a cassette miss
+                await self._retry_sleep(RETRY_WAIT_SECONDS)
+
+    async def _send_message(
+        self,
+        system_prompt: str,
+        messages_history: List[Dict[str, Any]],
+        keep_tool_result: int,
+    ):
+        """Make one request to the Anthropic API"""
         self.task_log.log_step(
             "info",
             "LLM | Call Start",
@@ -177,7 +207,7 @@ class AnthropicClient(BaseClient):
                 "LLM | Call Cancelled",
                 "⚠️ LLM API call was cancelled during execution",
             )
-            raise  # Re-raise to allow decorator to log it
+            raise  # Re-raise to allow the caller to log it
         except Exception as e:
             self.task_log.log_step(
                 "error", "LLM | Call Failed", f"Anthropic LLM call failed: {str(e)}"
@@ -269,7 +299,9 @@ class AnthropicClient(BaseClient):
     def _estimate_tokens(self, text: str) -> int:
         """Use tiktoken to estimate the number of tokens in text"""
         if not hasattr(self, "encoding"):
-            # Initialize tiktoken encoder
+            # Initialize tiktoken encoder (imported here, it is slow to load)
+            import tiktoken
+
             try:
                 self.encoding = tiktoken.get_encoding("o200k_base")
             except Exception:
@@ -11,19 +11,25 @@ Features:
 - Async and sync API support
 - Automatic retry with exponential backoff
 - Token usage tracking and context length management
+- Streamed responses that are aborted as soon as they loop
 - MCP tool call parsing and response processing
 """
 
 import asyncio
 import dataclasses
 import logging
+import time
 from typing import Any, Dict, List, Tuple, Union
 
-import tiktoken
 from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat.chat_completion import Choice
+from openai.types.completion_usage import CompletionUsage
 
+from ...logging.tracing import SPAN_KIND_CLIENT, record_span, span
 from ...utils.prompt_utils import generate_mcp_system_prompt
 from ..base_client import BaseClient
+from ..util import RepetitionDetector
 
 logger = logging.getLogger("miroflow_agent")
 
@@ -32,7 +38,7 @@ logger = logging.getLogger("miroflow_agent")
 class OpenAIClient(BaseClient):
     def _create_client(self) -> Union[AsyncOpenAI, OpenAI]:
         """Create LLM client"""
-        http_client_args = {"headers": {"x-upstream-session-id": self.task_id}}
+        http_client_args = self._http_client_args()
         if self.async_client:
             return AsyncOpenAI(
                 api_key=self.api_key,
@@ -73,10 +79,119 @@ class OpenAIClient(BaseClient):
             self.task_log.log_step(
                 "info",
                 "LLM | Token Usage",
-                f"Input: {self.token_usage['total_input_tokens']}, "
-                f"Output: {self.token_usage['total_output_tokens']}",
+                f"Input: {input_tokens}, Cache: 0+{cached_tokens}, "
+                f"Output: {output_tokens}",
             )
 
+    async def _create_streamed_completion(
+        self, params: Dict[str, Any]
+    ) -> Tuple[ChatCompletion, RepetitionDetector]:
+        """
+        Run a chat completion as a stream, stopping as soon as the output loops.
+
+        Closing the stream makes the server stop generating, so a degenerate
+        response costs the tokens up to the loop instead of up to max_tokens.
+
+        Returns:
+            Tuple of (ChatCompletion assembled from the chunks, detector). If
+            the detector fired, the response holds the text up to the loop,
+            finish_reason "length" and, unless the server sent it, an
+            estimate of the usage.
+        """
+        params = {
+            **params,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+        detector = RepetitionDetector(
+            self.repetition_window, self.repetition_max_repeats
+        )
+        parts: List[str] = []
+        completion = {"id": "", "finish_reason": None, "usage": None}
+        request_start_ns = time.time_ns()
+        first_chunk_ns = None
+
+        def consume(chunk) -> bool:
+            """Record one chunk; True if the stream should be aborted"""
+            nonlocal first_chunk_ns
+            if first_chunk_ns is None:
+                first_chunk_ns = time.time_ns()
+            completion["id"] = chunk.id or completion["id"]
+            if getattr(chunk, "usage", None):
+                completion["usage"] = chunk.usage
+            for choice in chunk.choices:
+                if choice.finish_reason:
+                    completion["finish_reason"] = choice.finish_reason
+                content = choice.delta.content if choice.delta else None
+                if content:
+                    parts.append(content)
+                    if detector.feed(content):
+                        return True
+            return False
+
+        if self.async_client:
+            stream = await self.client.chat.completions.create(**params)
+            try:
+                async for chunk in stream:
+                    if consume(chunk):
+                        break
+            finally:
+                await stream.close()
+        else:
+            stream = self.client.chat.completions.create(**params)
+            try:
+                for chunk in stream:
+                    if consume(chunk):
+                        break
+            finally:
+                stream.close()
+
+        # Split the request into waiting for the first chunk and generation
+        if first_chunk_ns is not None:
+            record_span("llm.time_to_first_token", request_start_ns, first_chunk_ns)
+            record_span(
+                "llm.generation", first_chunk_ns, time.time_ns(), chunks=len(parts)
+            )
+
+        content = "".join(parts)
+        finish_reason = completion["finish_reason"] or "stop"
+        usage = completion["usage"]
+        if detector.detected:
+            if usage is None:
+                # The stream was closed before the server reported usage, so
+                # estimate the prompt and what was generated up to the abort
+                prompt_tokens = self._estimate_tokens(
+                    "".join(str(m.get("content", "")) for m in params["messages"])
+                )
+                completion_tokens = self._estimate_tokens(content)
+                usage = CompletionUsage(
+                    prompt_tokens=prompt_tokens,
+                    completion_tokens=completion_tokens,
+                    total_tokens=prompt_tokens + completion_tokens,
+                )
+            content = content[: detector.detected_at]
+            finish_reason = "length"
+
+        # construct() skips validation, servers may report other finish reasons
+        response = ChatCompletion.construct(
+            id=completion["id"],
+            object="chat.completion",
+            created=int(time.time()),
+            model=self.model_name,
+            choices=[
+                Choice.construct(
+                    index=0,
+                    finish_reason=finish_reason,
+                    logprobs=None,
+                    message=ChatCompletionMessage.construct(
+                        role="assistant", content=content
+                    ),
+                )
+            ],
+            usage=usage,
+        )
+        return response, detector
+
     async def _create_message(
         self,
         system_prompt: str,
@@ -155,10 +270,54 @@ class OpenAIClient(BaseClient):
                 params["extra_body"]["add_generation_prompt"] = False
 
             try:
-                if self.async_client:
-                    response = await self.client.chat.completions.create(**params)
-                else:
-                    response = self.client.chat.completions.create(**params)
+                detector = None
+                with span(
+                    "llm.request",
+                    SPAN_KIND_CLIENT,
+                    attempt=attempt + 1,
+                    max_tokens=current_max_tokens,
+                    stream=self.stream_repetition_check,
+                ) as request_span:
+                    if self.stream_repetition_check:
+                        response, detector = await self._create_streamed_completion(
+                            params
+                        )
+                    elif self.async_client:
+                        response = await self.client.chat.completions.create(**params)
+                    else:
+                        response = self.client.chat.completions.create(**params)
+                    if request_span is not None:
+                        request_span.set_attribute(
+                            "finish_reason",
+                            getattr(response.choices[0], "finish_reason", None),
+                        )
+
+                if detector is not None and detector.detected:
+                    # Aborted streams still cost tokens, count their estimate
+                    self._update_token_usage(response.usage)
+                    generated_tokens = response.usage.completion_tokens
+                    metrics = (
+                        f"loop found after {detector.detected_at} chars "
+                        f"(~{generated_tokens} tokens, max_tokens {current_max_tokens}, "
+                        f"last {detector.window} chars repeated consecutively over "
+                        f"{detector.max_repeats} times)"
+                    )
+                    if attempt < max_retries - 1:
+                        # Nothing failed upstream, so retry without waiting
+                        self.task_log.log_step(
+                            "warning",
+                            "LLM | Repeat Detected",
+                            f"Generation aborted, {metrics} (attempt {attempt + 1}/{max_retries}), retrying...",
+                        )
+                        continue
+                    else:
+                        self.task_log.log_step(
+                            "warning",
+                            "LLM | Repeat Detected - Returning Truncated Response",
+                            f"Generation aborted, {metrics}, after {max_retries} attempts. Returning the response up to the loop.",
+                        )
+                        return response, messages_history
+
                 # Update token count
                 self._update_token_usage(getattr(response, "usage", None))
                 self.task_log.log_step(
@@ -179,7 +338,7 @@ class OpenAIClient(BaseClient):
                             "LLM | Length Limit Reached",
                             f"Response was truncated due to length limit (attempt {attempt + 1}/{max_retries}). Increasing max_tokens to {current_max_tokens} and retrying...",
                         )
-                        await asyncio.sleep(base_wait_time)
+                        await self._retry_sleep(base_wait_time)
                         continue
                     else:
                         # Last retry, return the truncated response instead of raising exception
@@ -191,35 +350,38 @@ class OpenAIClient(BaseClient):
                         # Return the truncated response and let the orchestrator handle it
                         return response, messages_history
 
-                # Check if the last 50 characters of the response appear more than 5 times in the response content.
-                # If so, treat it as a severe repeat and trigger a retry.
-                if hasattr(response.choices[0], "message") and hasattr(
-                    response.choices[0].message, "content"
-                ):
-                    resp_content = response.choices[0].message.content or ""
-                else:
-                    resp_content = getattr(response.choices[0], "text", "")
-
-                if resp_content and len(resp_content) >= 50:
-                    tail_50 = resp_content[-50:]
-                    repeat_count = resp_content.count(tail_50)
-                    if repeat_count > 5:
-                        # If this is not the last retry, retry
-                        if attempt < max_retries - 1:
-                            self.task_log.log_step(
-                                "warning",
-                                "LLM | Repeat Detected",
-                                f"Severe repeat: the last 50 chars appeared over 5 times (attempt {attempt + 1}/{max_retries}), retrying...",
-                            )
-                            await asyncio.sleep(base_wait_time)
-                            continue
-                        else:
-                            # Last retry, return anyway
-                            self.task_log.log_step(
-                                "warning",
-                                "LLM | Repeat Detected - Returning Anyway",
-                                f"Severe repeat detected after {max_retries} attempts. Returning response anyway.",
-                            )
+                # Without streaming, check the finished response: the last
+                # repetition_window chars appearing more than
+                # repetition_max_repeats times is a severe repeat, so retry
+                if detector is None:
+                    if hasattr(response.choices[0], "message") and hasattr(
+                        response.choices[0].message, "content"
+                    ):
+                        resp_content = response.choices[0].message.content or ""
+                    else:
+                        resp_content = getattr(response.choices[0], "text", "")
+
+                    window = self.repetition_window
+                    if resp_content and len(resp_content) >= window:
+                        tail = resp_content[-window:]
+                        repeat_count = resp_content.count(tail)
+                        if repeat_count > self.repetition_max_repeats:
+                            # If this is not the last retry, retry
+                            if attempt < max_retries - 1:
+                                self.task_log.log_step(
+                                    "warning",
+                                    "LLM | Repeat Detected",
+                                    f"Severe repeat: the last {window} chars appeared over {self.repetition_max_repeats} times (attempt {attempt + 1}/{max_retries}), retrying...",
+                                )
+                                await self._retry_sleep(base_wait_time)
+                                continue
+                            else:
+                                # Last retry, return anyway
+                                self.task_log.log_step(
+                                    "warning",
+                                    "LLM | Repeat Detected - Returning Anyway",
+                                    f"Severe repeat detected after {max_retries} attempts. Returning response anyway.",
+                                )
 
                 # Success - return the original messages_history (not the filtered copy)
                 # This ensures that the complete conversation history is preserved in logs
@@ -232,7 +394,7 @@ class OpenAIClient(BaseClient):
                         "LLM | Timeout Error",
                         f"Timeout error (attempt {attempt + 1}/{max_retries}): {str(e)}, retrying...",
                     )
-                    await asyncio.sleep(base_wait_time)
+                    await self._retry_sleep(base_wait_time)
                     continue
                 else:
                     self.task_log.log_step(
@@ -263,7 +425,7 @@ class OpenAIClient(BaseClient):
                             "LLM | API Error",
                             f"Error (attempt {attempt + 1}/{max_retries}): {str(e)}, retrying...",
                         )
-                        await asyncio.sleep(base_wait_time)
+                        await self._retry_sleep(base_wait_time)
                         continue
                     else:
                         self.task_log.log_step(
@@ -363,7 +525,9 @@ class OpenAIClient(BaseClient):
     def _estimate_tokens(self, text: str) -> int:
         """Use tiktoken to estimate the number of tokens in text"""
         if not hasattr(self, "encoding"):
-            # Initialize tiktoken encoder
+            # Initialize tiktoken encoder (imported here, it is slow to load)
+            import tiktoken
+
             try:
                 self.encoding = tiktoken.get_encoding("o200k_base")
             except Exception:
@@ -6,12 +6,13 @@ Utility decorators and helpers for LLM client operations.
 
 This module provides:
 - Timeout decorator for async LLM API calls
+- Online repetition detection for streamed responses
 - Other common utilities shared across LLM providers
 """
 
 import asyncio
 import functools
-from typing import Awaitable, Callable, TypeVar
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
 
 T = TypeVar("T")
 
@@ -34,3 +35,69 @@ def with_timeout(
         return wrapper
 
     return decorator
+
+
+class RepetitionDetector:
+    """
+    Online detector for degenerate loops in a streamed response.
+
+    Flags the text once it ends in a run of consecutive repeats: the last
+    `window` characters occur more than `max_repeats` times (non-overlapping),
+    evenly spaced, with identical text between each occurrence and the next.
+    Text that merely quotes the same passage several times (a URL in every
+    bullet of a list, say) is not a loop, since what lies between the
+    occurrences differs. Each window is fingerprinted once, and units are
+    compared only when a fingerprint recurs at its previous spacing.
+    """
+
+    def __init__(self, window: int = 50, max_repeats: int = 5):
+        self.window = window
+        self.max_repeats = max_repeats
+        self.detected_at: Optional[int] = None  # Length when the loop was found
+        self._text = ""
+        # Per fingerprint, start of its last non-overlapping occurrence
+        self._last_start: Dict[int, int] = {}
+        # Per fingerprint, (spacing, occurrences) of the run ending there
+        self._runs: Dict[int, Tuple[int, int]] = {}
+
+    @property
+    def length(self) -> int:
+        """Characters fed so far"""
+        return len(self._text)
+
+    @property
+    def detected(self) -> bool:
+        return self.detected_at is not None
+
+    def feed(self, chunk: str) -> bool:
+        """Add streamed text; returns True once a loop has been detected"""
+        if self.detected or not chunk:
+            return self.detected
+
+        window = self.window
+        first_end = max(window, len(self._text) + 1)
+        self._text += chunk
+        text = self._text
+        for end in range(first_end, len(text) + 1):
+            start = end - window
+            fingerprint = hash(text[start:end])
+            previous = self._last_start.get(fingerprint)
+            if previous is not None and start < previous + window:
+                continue
+            self._last_start[fingerprint] = start
+            if previous is None:
+                continue
+            spacing = start - previous
+            run_spacing, occurrences = self._runs.get(fingerprint, (0, 1))
+            if spacing == run_spacing and (
+                text[previous:start] == text[previous - spacing : previous]
+            ):
+                occurrences += 1
+            else:
+                occurrences = 2
+            self._runs[fingerprint] = (spacing, occurrences)
+            if occurrences > self.max_repeats:
+                self.detected_at = end
+                break
+
+        return self.detected
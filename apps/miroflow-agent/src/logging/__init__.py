@@ -3,6 +3,10 @@
 
 """Logging module for task execution tracking."""
 
+from .metrics import REGISTRY, MetricsRegistry, MetricsSnapshotWriter
+from .progress_events import ProgressAggregator, ProgressEventWriter
+from .run_state import RunStateStore
+from .task_index import TaskIndex, scan_task_logs
 from .task_logger import (
     LLMCallLog,
     StepLog,
@@ -11,6 +15,7 @@ from .task_logger import (
     bootstrap_logger,
     get_utc_plus_8_time,
 )
+from .tracing import Span, Tracer
 
 __all__ = [
     "TaskLog",
@@ -19,4 +24,14 @@ __all__ = [
     "ToolCallLog",
     "bootstrap_logger",
     "get_utc_plus_8_time",
+    "TaskIndex",
+    "scan_task_logs",
+    "ProgressEventWriter",
+    "ProgressAggregator",
+    "RunStateStore",
+    "Tracer",
+    "Span",
+    "MetricsRegistry",
+    "MetricsSnapshotWriter",
+    "REGISTRY",
 ]
@@ -0,0 +1,386 @@
+# Copyright (c) 2025 MiroMind
+# This source code is licensed under the MIT License.
+
+"""
+In-process metrics for long-running deployments and batch runs.
+
+This module provides:
+- MetricsRegistry: Counters, gauges and histograms with labels, rendered in the
+  Prometheus text exposition format or as a JSON-friendly snapshot
+- MetricsSnapshotWriter: Background thread that periodically writes the
+  registry to a file, for batch runs without an HTTP endpoint
+- REGISTRY: The process-wide registry shared by the LLM clients, the tool
+  managers, the stream handler and the benchmark runner, with the standard
+  metrics defined below
+
+Server apps expose REGISTRY.render_prometheus() on /metrics. Each benchmark
+worker process writes its own snapshot file with a "worker" label, so the
+files of a run can be read together by the node_exporter textfile collector.
+Recording is cheap (a lock and a dict update) and always on.
+"""
+
+import json
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+METRICS_DIRNAME = "metrics"
+DEFAULT_SNAPSHOT_SECONDS = 30
+
+# Histogram buckets in seconds
+LLM_LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300, 600)
+TOOL_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+LabelKey = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    """A metric family: one value per combination of label values"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelKey, Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelKey:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], LabelKey, float]]:
+        """Exposition samples as (name suffix, extra label names, label values, value)"""
+        with self._lock:
+            return [("", (), key, value) for key, value in self._values.items()]
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {"labels": dict(zip(self.labelnames, key)), "value": value}
+                for key, value in self._values.items()
+            ]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that goes up and down"""
+
+    type_name = "gauge"
+
+    def set(self, value: float, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: Any):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = TOOL_LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {
+                    "counts": [0] * len(self.buckets),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], LabelKey, float]]:
+        samples = []
+        with self._lock:
+            for key, state in self._values.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets, state["counts"]):
+                    cumulative += count
+                    samples.append(
+                        ("_bucket", ("le",), key + (_format_value(bound),), cumulative)
+                    )
+                samples.append(("_sum", (), key, state["sum"]))
+                samples.append(("_count", (), key, state["count"]))
+        return samples
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "labels": dict(zip(self.labelnames, key)),
+                    "count": state["count"],
+                    "sum": round(state["sum"], 6),
+                    "buckets": {
+                        _format_value(bound): count
+                        for bound, count in zip(self.buckets, state["counts"])
+                        if count
+                    },
+                }
+                for key, state in self._values.items()
+            ]
+
+
+class MetricsRegistry:
+    """
+    Named metric families of one process.
+
+    counter(), gauge() and histogram() return the existing family of that name,
+    so independent components (like the tool manager library) can record into
+    a shared metric by name without importing its definition.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(
+                    f"Metric {name} is already registered as a {metric.type_name}"
+                )
+            return metric
+
+    def counter(
+        self, name: str, documentation: str = "", labelnames: Sequence[str] = ()
+    ) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(
+        self, name: str, documentation: str = "", labelnames: Sequence[str] = ()
+    ) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str = "",
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = TOOL_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(
+            Histogram, name, documentation, labelnames, buckets=buckets
+        )
+
+    def render_prometheus(self, const_labels: Optional[Dict[str, str]] = None) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Args:
+            const_labels: Labels added to every sample (e.g. the worker process)
+        """
+        const_names = tuple((const_labels or {}).keys())
+        const_values = tuple(str(value) for value in (const_labels or {}).values())
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            samples = metric.samples()
+            if not samples:
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for suffix, extra_names, values, value in samples:
+                labels = _format_labels(
+                    const_names + metric.labelnames + extra_names,
+                    const_values + values,
+                )
+                lines.append(f"{metric.name}{suffix}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All metrics as {name: {"type", "values"}}"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: {"type": metric.type_name, "values": metric.snapshot()}
+            for metric in metrics
+        }
+
+    def write(self, path: Union[str, Path], const_labels: Optional[Dict] = None):
+        """
+        Atomically replace path with the current metrics.
+
+        Files ending in .json get the snapshot, others the Prometheus text.
+        """
+        path = Path(path)
+        if path.suffix == ".json":
+            text = json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+        else:
+            text = self.render_prometheus(const_labels)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, path)
+
+
+class MetricsSnapshotWriter:
+    """
+    Periodically write a registry to a file from a daemon thread.
+
+    Write failures are reported once and never interrupt the run.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        registry: Optional[MetricsRegistry] = None,
+        interval_seconds: float = DEFAULT_SNAPSHOT_SECONDS,
+        const_labels: Optional[Dict[str, str]] = None,
+    ):
+        self.path = Path(path)
+        self.registry = registry or REGISTRY
+        self.interval_seconds = interval_seconds
+        self.const_labels = const_labels
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._failed = False
+
+    def start(self) -> "MetricsSnapshotWriter":
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="metrics-snapshot", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            self.write()
+
+    def write(self):
+        try:
+            self.registry.write(self.path, self.const_labels)
+        except OSError as e:
+            if not self._failed:
+                self._failed = True
+                print(f"Warning: Could not write metrics to {self.path}: {e}")
+
+    def stop(self):
+        """Stop the thread and write a final snapshot"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.write()
+
+
+REGISTRY = MetricsRegistry()
+
+# LLM calls (BaseClient)
+LLM_REQUESTS = REGISTRY.counter(
+    "miroflow_llm_requests_total", "LLM calls by model and outcome", ("model", "status")
+)
+LLM_LATENCY = REGISTRY.histogram(
+    "miroflow_llm_request_seconds",
+    "LLM call latency, retries included",
+    ("model",),
+    buckets=LLM_LATENCY_BUCKETS,
+)
+LLM_TOKENS = REGISTRY.counter(
+    "miroflow_llm_tokens_total",
+    "LLM tokens by model and kind (input, output, cache_read, cache_write)",
+    ("model", "kind"),
+)
+LLM_RETRIES = REGISTRY.counter(
+    "miroflow_llm_retries_total", "LLM requests retried after a failure", ("model",)
+)
+
+# Tool calls (ToolManager, which records into these by name)
+TOOL_CALLS = REGISTRY.counter(
+    "miroflow_tool_calls_total",
+    "Tool calls by server, tool and outcome",
+    ("server", "tool", "status"),
+)
+TOOL_LATENCY = REGISTRY.histogram(
+    "miroflow_tool_call_seconds",
+    "Tool call latency",
+    ("server", "tool"),
+    buckets=TOOL_LATENCY_BUCKETS,
+)
+
+# Caches in front of tools (evidence store, duplicate queries)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "miroflow_cache_lookups_total",
+    "Cache lookups by cache and result",
+    ("cache", "result"),
+)
+
+# Streaming (StreamHandler)
+STREAM_EVENTS = REGISTRY.counter(
+    "miroflow_stream_events_total", "Stream events sent by type", ("event",)
+)
+STREAM_CHANNEL = REGISTRY.counter(
+    "miroflow_stream_channel_total",
+    "Stream channel outcomes (coalesced, dropped, paged, blocked_puts)",
+    ("outcome",),
+)
+
+# Tasks (benchmark runner and server apps)
+ACTIVE_TASKS = REGISTRY.gauge("miroflow_active_tasks", "Tasks running")
+QUEUED_TASKS = REGISTRY.gauge("miroflow_queued_tasks", "Tasks waiting to start")
+TASKS = REGISTRY.counter(
+    "miroflow_tasks_total", "Finished tasks by status", ("status",)
+)
+FORMAT_RETRIES = REGISTRY.counter(
+    "miroflow_format_retries_total", "Task runs repeated for a bad answer format"
+)
@@ -0,0 +1,293 @@
+# Copyright (c) 2025 MiroMind
+# This source code is licensed under the MIT License.
+
+"""
+Structured progress events for benchmark runs.
+
+This module provides:
+- ProgressEventWriter: Append-only JSONL event sink shared by the benchmark
+  runner and its worker processes
+- read_progress_events: Incremental tail reader for the event file
+- ProgressAggregator: Folds events into live run statistics (throughput, tokens,
+  per-tool latency percentiles)
+
+Each event is one short JSON line written with a single O_APPEND write, so
+emitting costs a syscall and no locking; readers follow the file by byte offset
+instead of re-scanning the task logs.
+"""
+
+import json
+import os
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+PROGRESS_EVENTS_FILENAME = "progress_events.jsonl"
+
+# Event types
+RUN_START = "run_start"
+RUN_END = "run_end"
+TASK_START = "task_start"
+TASK_END = "task_end"
+ATTEMPT_END = "attempt_end"
+TURN = "turn"
+TOOL_CALL = "tool_call"
+SCHEDULE = "schedule"
+SPECULATE = "speculate"
+COMPACTION = "compaction"
+BUDGET = "budget"
+
+# Window used for the "recent" throughput figure
+RECENT_WINDOW_SECONDS = 600
+
+
+class ProgressEventWriter:
+    """
+    Append structured progress events to a JSONL file.
+
+    The file descriptor is opened lazily and reopened after a fork, so one
+    writer can be created in the parent and used from worker processes.
+    Write failures are reported once and never interrupt the run.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+        self._pid: Optional[int] = None
+        self._failed = False
+
+    def _get_fd(self) -> int:
+        pid = os.getpid()
+        if self._fd is None or self._pid != pid:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fd = os.open(
+                str(self.path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644
+            )
+            self._pid = pid
+        return self._fd
+
+    def emit(self, event: str, **fields: Any):
+        """
+        Write one event.
+
+        Args:
+            event: Event type (e.g. TASK_START, TOOL_CALL)
+            **fields: JSON-serializable event payload
+        """
+        if self._failed:
+            return
+        record = {"ts": round(time.time(), 3), "pid": os.getpid(), "event": event}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        try:
+            os.write(self._get_fd(), line.encode("utf-8"))
+        except OSError as e:
+            self._failed = True
+            print(f"Warning: Disabling progress events for {self.path}: {e}")
+
+    def close(self):
+        """Close the file descriptor owned by this process"""
+        if self._fd is not None and self._pid == os.getpid():
+            os.close(self._fd)
+        self._fd = None
+        self._pid = None
+
+
+def read_progress_events(
+    path: Union[str, Path], offset: int = 0
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Read the complete events appended since a byte offset.
+
+    Args:
+        path: Path of the JSONL event file.
+        offset: Byte offset returned by the previous call (0 to start over).
+
+    Returns:
+        Tuple of (events, new_offset). A trailing partial line is left for the
+        next call; malformed lines are skipped.
+    """
+    try:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return [], offset
+
+    end = data.rfind(b"\n")
+    if end < 0:
+        return [], offset
+
+    events = []
+    for line in data[: end + 1].splitlines():
+        if not line.strip():
+            continue
+        try:
+            events.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return events, offset + end + 1
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values (0.0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class ProgressAggregator:
+    """
+    Fold progress events into live statistics for one or more runs.
+
+    Runs are told apart by the source key passed to consume(), normally the
+    path of each run's event file.
+    """
+
+    def __init__(self):
+        self.total_tasks: Dict[str, int] = {}
+        self.run_started_at: Dict[str, float] = {}
+        self.run_ended: Dict[str, bool] = {}
+        self.running: Dict[Tuple[str, str], float] = {}
+        self.finished: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.turns = 0
+        self.compactions = 0
+        self.budget_warnings = 0
+        self.budget_stops = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.tool_durations_ms: Dict[str, List[float]] = defaultdict(list)
+        self.tool_errors: Dict[str, int] = defaultdict(int)
+        self.tool_cached: Dict[str, int] = defaultdict(int)
+        self.last_event_ts = 0.0
+
+    def consume(self, source: str, events: List[Dict[str, Any]]):
+        """Apply a batch of events read from one run's event file"""
+        for event in events:
+            kind = event.get("event")
+            ts = event.get("ts", 0.0)
+            self.last_event_ts = max(self.last_event_ts, ts)
+
+            if kind == RUN_START:
+                self.total_tasks[source] = event.get("total_tasks", 0)
+                self.run_started_at.setdefault(source, ts)
+            elif kind == RUN_END:
+                self.run_ended[source] = True
+            elif kind == TASK_START:
+                key = (source, str(event.get("task_id")))
+                if key not in self.finished:
+                    self.running[key] = ts
+            elif kind == TASK_END:
+                key = (source, str(event.get("task_id")))
+                started = self.running.pop(key, ts - event.get("duration_s", 0.0))
+                self.finished[key] = {
+                    "start_ts": started,
+                    "end_ts": ts,
+                    "status": event.get("status"),
+                    "correct": bool(event.get("correct")),
+                }
+            elif kind == TURN:
+                self.turns += 1
+                self.input_tokens += event.get("input_tokens", 0) or 0
+                self.output_tokens += event.get("output_tokens", 0) or 0
+            elif kind == COMPACTION:
+                self.compactions += 1
+                self.input_tokens += event.get("input_tokens", 0) or 0
+                self.output_tokens += event.get("output_tokens", 0) or 0
+            elif kind == BUDGET:
+                if event.get("level") == "exhausted":
+                    self.budget_stops += 1
+                else:
+                    self.budget_warnings += 1
+            elif kind == TOOL_CALL:
+                tool = f"{event.get('server_name')}.{event.get('tool_name')}"
+                # Calls answered from the evidence store would skew the latencies
+                if event.get("cached"):
+                    self.tool_cached[tool] += 1
+                    continue
+                self.tool_durations_ms[tool].append(event.get("duration_ms", 0))
+                if event.get("error"):
+                    self.tool_errors[tool] += 1
+
+    def completed_records(self) -> List[Dict[str, str]]:
+        """Start/end times of finished tasks, in the format used by the progress checkers"""
+        return [
+            {
+                "start_time": datetime.fromtimestamp(info["start_ts"]).isoformat(),
+                "end_time": datetime.fromtimestamp(info["end_ts"]).isoformat(),
+            }
+            for info in self.finished.values()
+        ]
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Summarize the current state.
+
+        Returns:
+            Dictionary with task counts, accuracy, throughput (overall and over
+            the last RECENT_WINDOW_SECONDS), token totals and per-tool latency
+            percentiles.
+        """
+        now = now or time.time()
+        finished = list(self.finished.values())
+        completed = len(finished)
+        correct = sum(1 for info in finished if info["correct"])
+
+        started_at = min(self.run_started_at.values(), default=None)
+        elapsed_min = (now - started_at) / 60 if started_at else 0.0
+        recent = [
+            info for info in finished if info["end_ts"] >= now - RECENT_WINDOW_SECONDS
+        ]
+        recent_window_min = min(RECENT_WINDOW_SECONDS / 60, elapsed_min)
+
+        tools = {}
+        for tool in sorted(set(self.tool_durations_ms) | set(self.tool_cached)):
+            durations = self.tool_durations_ms.get(tool, [])
+            tools[tool] = {
+                "calls": len(durations),
+                "cached": self.tool_cached.get(tool, 0),
+                "errors": self.tool_errors.get(tool, 0),
+                "p50_ms": percentile(durations, 50),
+                "p95_ms": percentile(durations, 95),
+            }
+
+        return {
+            "runs": len(self.total_tasks),
+            "runs_finished": sum(1 for done in self.run_ended.values() if done),
+            "total_tasks": sum(self.total_tasks.values()),
+            "completed": completed,
+            "running": len(self.running),
+            "correct": correct,
+            "accuracy": correct / completed * 100 if completed else 0.0,
+            "elapsed_minutes": elapsed_min,
+            "tasks_per_minute": completed / elapsed_min if elapsed_min > 0 else 0.0,
+            "recent_tasks_per_minute": (
+                len(recent) / recent_window_min if recent_window_min > 0 else 0.0
+            ),
+            "turns": self.turns,
+            "compactions": self.compactions,
+            "budget_warnings": self.budget_warnings,
+            "budget_stops": self.budget_stops,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "tokens_per_task": (
+                (self.input_tokens + self.output_tokens) / completed
+                if completed
+                else 0.0
+            ),
+            "mean_task_minutes": (
+                sum(info["end_ts"] - info["start_ts"] for info in finished)
+                / completed
+                / 60
+                if completed
+                else 0.0
+            ),
+            "tools": tools,
+            "last_event_age_s": now - self.last_event_ts
+            if self.last_event_ts
+            else None,
+        }
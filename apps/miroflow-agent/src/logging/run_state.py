@@ -0,0 +1,314 @@
+# Copyright (c) 2025 MiroMind
+# This source code is licensed under the MIT License.
+
+"""
+Durable per-run task state for resumable benchmark runs.
+
+This module provides:
+- RunStateStore: SQLite store kept in the run's log directory, recording every
+  (task, attempt, format retry) with its status, boxed answer, failure
+  experience and judge result, the final outcome of each task, and attempt
+  claims when several workers run attempts of the same task
+
+Resume decisions become a keyed lookup instead of globbing and re-reading the
+task logs, and "what's left" is a single query. Worker processes open
+short-lived WAL connections, so they can write concurrently.
+
+The store is an accelerator on top of the task logs: write failures are
+reported but never raised, and read failures return empty results so callers
+fall back to scanning the logs.
+"""
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from .task_index import SQLITE_TIMEOUT_SECONDS
+
+RUN_STATE_FILENAME = "run_state.db"
+
+# Columns of the retries table that callers may set
+RETRY_FIELDS = (
+    "status",
+    "log_file_path",
+    "boxed_answer",
+    "failure_experience",
+    "judge_result",
+    "judge_type",
+    "eval_details",
+    "error_message",
+)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS retries (
+        task_id TEXT NOT NULL,
+        attempt INTEGER NOT NULL,
+        format_retry INTEGER NOT NULL,
+        status TEXT,
+        log_file_path TEXT,
+        boxed_answer TEXT,
+        failure_experience TEXT,
+        judge_result TEXT,
+        judge_type TEXT,
+        eval_details TEXT,
+        error_message TEXT,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (task_id, attempt, format_retry)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tasks (
+        task_id TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        pass_at_k_success INTEGER NOT NULL,
+        final_judge_result TEXT,
+        attempts INTEGER NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS claims (
+        task_id TEXT NOT NULL,
+        attempt INTEGER NOT NULL,
+        owner TEXT NOT NULL,
+        run_token TEXT NOT NULL,
+        claimed_at REAL NOT NULL,
+        PRIMARY KEY (task_id, attempt)
+    )
+    """,
+)
+
+
+class RunStateStore:
+    """
+    SQLite state store for one benchmark run directory.
+    """
+
+    def __init__(self, log_dir: Union[str, Path]):
+        self.log_dir = Path(log_dir)
+        self.path = self.log_dir / RUN_STATE_FILENAME
+
+    def _connect(self) -> sqlite3.Connection:
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=SQLITE_TIMEOUT_SECONDS)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        return conn
+
+    def _write(self, sql: str, params: Iterable[Any]):
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(sql, tuple(params))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"Warning: Could not update run state {self.path}: {e}")
+
+    def _read(self, sql: str, params: Iterable[Any]) -> List[sqlite3.Row]:
+        if not self.path.exists():
+            return []
+        try:
+            conn = self._connect()
+            try:
+                return conn.execute(sql, tuple(params)).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"Warning: Could not read run state {self.path}: {e}")
+            return []
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        record = dict(row)
+        if record.get("eval_details"):
+            record["eval_details"] = json.loads(record["eval_details"])
+        return record
+
+    def record_retry(
+        self, task_id: str, attempt: int, format_retry: int, **fields: Any
+    ):
+        """
+        Insert or update one format retry of an attempt.
+
+        Only the given fields are written, so later calls (e.g. the judge
+        result) leave earlier ones (e.g. the failure experience) intact.
+
+        Args:
+            task_id: Benchmark task ID.
+            attempt: Pass@k attempt number (1-based).
+            format_retry: Format retry number within the attempt (0-based).
+            **fields: Any of RETRY_FIELDS.
+        """
+        unknown = set(fields) - set(RETRY_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown run state fields: {sorted(unknown)}")
+        if "eval_details" in fields and fields["eval_details"] is not None:
+            fields["eval_details"] = json.dumps(
+                fields["eval_details"], ensure_ascii=False, default=str
+            )
+
+        columns = list(fields) + ["updated_at"]
+        values = list(fields.values()) + [time.time()]
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns)
+        self._write(
+            f"INSERT INTO retries (task_id, attempt, format_retry, "
+            f"{', '.join(columns)}) VALUES (?, ?, ?, {', '.join('?' * len(columns))}) "
+            f"ON CONFLICT (task_id, attempt, format_retry) DO UPDATE SET {updates}",
+            [str(task_id), attempt, format_retry] + values,
+        )
+
+    def record_judge(
+        self,
+        task_id: str,
+        attempt: int,
+        judge_result: str,
+        judge_type: Optional[str],
+        eval_details: Optional[Dict[str, Any]] = None,
+    ):
+        """Attach a judge result to the latest format retry of an attempt"""
+        latest = self.latest_retry(task_id, attempt)
+        if latest is None:
+            return
+        self.record_retry(
+            task_id,
+            attempt,
+            latest["format_retry"],
+            judge_result=judge_result,
+            judge_type=judge_type,
+            eval_details=eval_details,
+        )
+
+    def latest_retry(self, task_id: str, attempt: int) -> Optional[Dict[str, Any]]:
+        """
+        Return the most recent format retry recorded for an attempt.
+
+        Returns:
+            Dictionary of the retry columns, or None if nothing is recorded.
+        """
+        rows = self._read(
+            "SELECT * FROM retries WHERE task_id = ? AND attempt = ? "
+            "ORDER BY format_retry DESC LIMIT 1",
+            (str(task_id), attempt),
+        )
+        return self._row_to_dict(rows[0]) if rows else None
+
+    def failure_experiences(
+        self, task_id: str, attempt: int, before_retry: int
+    ) -> List[Optional[str]]:
+        """
+        Failure experiences of the retries preceding a given format retry.
+
+        Returns:
+            One entry per retry 0..before_retry-1 (None where nothing was
+            recorded), so callers can tell a gap from an empty summary.
+        """
+        rows = self._read(
+            "SELECT format_retry, failure_experience FROM retries "
+            "WHERE task_id = ? AND attempt = ? AND format_retry < ?",
+            (str(task_id), attempt, before_retry),
+        )
+        experiences: List[Optional[str]] = [None] * before_retry
+        for row in rows:
+            experiences[row["format_retry"]] = row["failure_experience"]
+        return experiences
+
+    def record_task(
+        self,
+        task_id: str,
+        status: str,
+        pass_at_k_success: bool,
+        final_judge_result: Optional[str],
+        attempts: int,
+    ):
+        """Record the final outcome of a task"""
+        self._write(
+            "INSERT OR REPLACE INTO tasks (task_id, status, pass_at_k_success, "
+            "final_judge_result, attempts, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                str(task_id),
+                status,
+                int(pass_at_k_success),
+                final_judge_result,
+                attempts,
+                time.time(),
+            ),
+        )
+
+    def task_records(self, task_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Recorded outcome and latest retry of each attempt of the given tasks.
+
+        Returns:
+            {task_id: {**task columns, "retries": [latest retry of each
+            attempt, by attempt number]}} for the tasks that have an outcome.
+        """
+        wanted = {str(task_id) for task_id in task_ids}
+        records = {
+            row["task_id"]: dict(row, retries=[])
+            for row in self._read("SELECT * FROM tasks", ())
+            if row["task_id"] in wanted
+        }
+        rows = self._read(
+            "SELECT * FROM retries r WHERE format_retry = (SELECT MAX(format_retry) "
+            "FROM retries WHERE task_id = r.task_id AND attempt = r.attempt) "
+            "ORDER BY task_id, attempt",
+            (),
+        )
+        for row in rows:
+            if row["task_id"] in records:
+                records[row["task_id"]]["retries"].append(self._row_to_dict(row))
+        return records
+
+    def has_correct_attempt(self, task_id: str) -> bool:
+        """Whether any attempt of the task has been judged CORRECT"""
+        rows = self._read(
+            "SELECT 1 FROM retries WHERE task_id = ? AND judge_result = 'CORRECT' "
+            "LIMIT 1",
+            (str(task_id),),
+        )
+        return bool(rows)
+
+    def claim_attempt(
+        self, task_id: str, attempt: int, owner: str, run_token: str
+    ) -> bool:
+        """
+        Claim an attempt so concurrent workers of the same task don't repeat it.
+
+        Claims left by an earlier run (different run_token) are taken over, so
+        an interrupted run never blocks its resume.
+
+        Returns:
+            True if the attempt is (now) owned by this owner. Store errors
+            also return True: running an attempt twice is the safe fallback.
+        """
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT INTO claims (task_id, attempt, owner, run_token, "
+                        "claimed_at) VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT (task_id, attempt) DO UPDATE SET "
+                        "owner = excluded.owner, run_token = excluded.run_token, "
+                        "claimed_at = excluded.claimed_at "
+                        "WHERE claims.run_token != excluded.run_token",
+                        (str(task_id), attempt, owner, run_token, time.time()),
+                    )
+                    row = conn.execute(
+                        "SELECT owner FROM claims WHERE task_id = ? AND attempt = ?",
+                        (str(task_id), attempt),
+                    ).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"Warning: Could not claim attempt in run state {self.path}: {e}")
+            return True
+        return row is not None and row["owner"] == owner
@@ -5,7 +5,7 @@ import json
 from collections import defaultdict
 from pathlib import Path
 
-from .task_logger import logger
+from .task_index import scan_task_logs
 
 
 def _get_summary_template():
@@ -81,7 +81,7 @@ def _calculate_averages(summary_block):
 
 def generate_summary(log_dir: Path):
     """
-    Generates a summary of benchmark results by reading log files from a directory,
+    Generates a summary of benchmark results from the task logs of a directory,
     calculating total and average trace data, both overall and grouped by
     final_judge_result.
 
@@ -89,28 +89,27 @@ def generate_summary(log_dir: Path):
         log_dir: The directory where the individual result log files are and where
                  the summary file will be saved.
     """
+    # Per-task metadata comes from the sidecar index; only logs written or
+    # modified since the last scan are parsed
     results = []
-    for log_file in log_dir.glob("*.json"):
-        if log_file.name == "summary.json":
+    for record in scan_task_logs(log_dir):
+        if "parse_error" in record:
+            print(
+                f"Warning: Could not read file {record['file']}: "
+                f"{record['parse_error']}. Skipping."
+            )
             continue
-        try:
-            with open(log_file, "r", encoding="utf-8") as f:
-                results.append(json.load(f))
-        except json.JSONDecodeError:
-            logger.info(f"Warning: Could not decode JSON from {log_file}. Skipping.")
-        except Exception as e:
-            logger.info(f"Warning: Could not read file {log_file}: {e}. Skipping.")
+        results.append(record)
 
     overall_summary = _get_summary_template()
     summary_by_judge = defaultdict(_get_summary_template)
 
     for result in results:
-        trace_data = result.get("trace_data")
-        if not trace_data or "performance_summary" not in trace_data:
+        if not result.get("performance_summary"):
             continue
 
-        perf_summary = trace_data["performance_summary"]
-        tool_workload = trace_data.get("tool_workload_breakdown", {})
+        perf_summary = result["performance_summary"]
+        tool_workload = result.get("tool_workload_breakdown") or {}
 
         # Update overall summary
         _update_summary_data(overall_summary, perf_summary, tool_workload)
@@ -0,0 +1,379 @@
+# Copyright (c) 2025 MiroMind
+# This source code is licensed under the MIT License.
+
+"""
+Sidecar index of task log metadata.
+
+This module provides:
+- TaskIndex: SQLite index stored next to the task logs, keyed by log file name
+- extract_task_log_metadata: Build a compact metadata record from a task log dict
+- read_task_log_header: Partially parse the leading scalar fields of a task log
+- index_task_log: Upsert the record of a freshly written log file
+- scan_task_logs: Stat-based directory scanner backed by the index
+
+Progress checks and time-cost summaries only need a handful of scalar fields
+(status, timestamps, judge result, turn count) from each multi-MB trace file.
+The index lets them read those fields without json.load-ing every log, and the
+scanner re-parses only files whose mtime/size no longer match their entry.
+"""
+
+import fnmatch
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+INDEX_FILENAME = "task_index.db"
+
+# Connection timeout in seconds; benchmark worker processes write concurrently
+SQLITE_TIMEOUT_SECONDS = 30
+
+# Tracebacks are only needed to tell failed logs apart, so keep them short
+MAX_INDEXED_ERROR_CHARS = 2000
+
+# Leading TaskLog fields, serialized before the (large) message histories
+HEADER_FIELDS = (
+    "status",
+    "start_time",
+    "end_time",
+    "task_id",
+    "final_boxed_answer",
+    "final_judge_result",
+    "judge_type",
+    "eval_details",
+    "error",
+)
+
+# Reaching any of these keys means the cheap header section is over
+HEADER_STOP_FIELDS = frozenset(
+    {
+        "main_agent_message_history",
+        "sub_agent_message_history_sessions",
+        "step_logs",
+        "trace_data",
+    }
+)
+
+HEADER_CHUNK_SIZE = 64 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS task_logs (
+    file_name TEXT PRIMARY KEY,
+    task_id TEXT,
+    status TEXT,
+    start_time TEXT,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    metadata TEXT NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+def count_turns(message_history: Any) -> int:
+    """Count main agent turns (user + assistant pairs, excluding system messages)"""
+    if isinstance(message_history, dict):
+        message_history = message_history.get("message_history", [])
+    if not isinstance(message_history, list):
+        return 0
+    non_system_messages = [
+        msg
+        for msg in message_history
+        if isinstance(msg, dict) and msg.get("role") != "system"
+    ]
+    return len(non_system_messages) // 2
+
+
+def extract_task_log_metadata(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the compact index record for a task log.
+
+    Args:
+        data: A TaskLog-shaped dictionary (full log or header only).
+
+    Returns:
+        Dictionary with the header fields, the main agent turn count and, when
+        present, the performance summary blobs from trace_data.
+    """
+    record = {key: data.get(key) for key in HEADER_FIELDS if key in data}
+    error = record.get("error")
+    if isinstance(error, str) and len(error) > MAX_INDEXED_ERROR_CHARS:
+        record["error"] = error[:MAX_INDEXED_ERROR_CHARS]
+
+    record["turns"] = count_turns(data.get("main_agent_message_history"))
+
+    trace_data = data.get("trace_data") or {}
+    if isinstance(trace_data, dict) and "performance_summary" in trace_data:
+        record["performance_summary"] = trace_data["performance_summary"]
+        record["tool_workload_breakdown"] = trace_data.get(
+            "tool_workload_breakdown", {}
+        )
+    return record
+
+
+def read_task_log_header(
+    file_path: Union[str, Path], chunk_size: int = HEADER_CHUNK_SIZE
+) -> Dict[str, Any]:
+    """
+    Parse the leading top-level fields of a task log without loading it whole.
+
+    TaskLog is serialized in field order, so status, timestamps and judge result
+    come before the message histories. Decoding stops at the first history key.
+
+    Args:
+        file_path: Path of the JSON task log.
+        chunk_size: Number of characters read per refill.
+
+    Returns:
+        Dictionary of the top-level fields decoded before the first stop key.
+
+    Raises:
+        json.JSONDecodeError: If the header is malformed or truncated.
+    """
+    decoder = json.JSONDecoder()
+
+    with open(file_path, "r", encoding="utf-8") as f:
+        buf = f.read(chunk_size)
+        eof = len(buf) < chunk_size
+
+        def refill() -> bool:
+            nonlocal buf, eof
+            if eof:
+                return False
+            chunk = f.read(chunk_size)
+            eof = len(chunk) < chunk_size
+            buf += chunk
+            return bool(chunk)
+
+        def skip_ws(pos: int) -> int:
+            while True:
+                while pos < len(buf) and buf[pos] in " \t\r\n":
+                    pos += 1
+                if pos < len(buf) or not refill():
+                    return pos
+
+        def expect(pos: int, chars: str) -> Tuple[str, int]:
+            pos = skip_ws(pos)
+            if pos >= len(buf) or buf[pos] not in chars:
+                raise json.JSONDecodeError(f"Expecting one of {chars!r}", buf, pos)
+            return buf[pos], pos + 1
+
+        def decode(pos: int) -> Tuple[Any, int]:
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if refill():
+                        continue
+                    raise
+                # A number at the buffer edge may continue in the next chunk
+                if end < len(buf) or not refill():
+                    return value, end
+
+        header: Dict[str, Any] = {}
+        _, pos = expect(0, "{")
+        pos = skip_ws(pos)
+        if pos < len(buf) and buf[pos] == "}":
+            return header
+
+        while True:
+            key, pos = decode(skip_ws(pos))
+            if key in HEADER_STOP_FIELDS:
+                return header
+            _, pos = expect(pos, ":")
+            value, pos = decode(skip_ws(pos))
+            header[key] = value
+            separator, pos = expect(pos, ",}")
+            if separator == "}":
+                return header
+
+
+def parse_task_log(file_path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Parse the index record of a task log, reading as little as possible.
+
+    Running tasks only need their header; finished ones are loaded fully once
+    to count turns and pick up the performance summary, then served from the
+    index on later scans.
+    """
+    try:
+        header = read_task_log_header(file_path)
+    except json.JSONDecodeError:
+        header = None
+    if header is not None and header.get("status") == "running":
+        return extract_task_log_metadata(header)
+
+    with open(file_path, "r", encoding="utf-8") as f:
+        return extract_task_log_metadata(json.load(f))
+
+
+class TaskIndex:
+    """
+    SQLite index of task log metadata for one log directory.
+
+    Each process opens short-lived connections, so benchmark workers, the
+    evaluator and progress checkers can read and write it concurrently.
+    """
+
+    def __init__(self, log_dir: Union[str, Path]):
+        self.log_dir = Path(log_dir)
+        self.path = self.log_dir / INDEX_FILENAME
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), timeout=SQLITE_TIMEOUT_SECONDS)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(_SCHEMA)
+        return conn
+
+    def upsert(self, entries: Iterable[Tuple[str, os.stat_result, Dict[str, Any]]]):
+        """
+        Insert or replace index entries.
+
+        Args:
+            entries: Iterable of (file_name, stat_result, metadata_record).
+        """
+        rows = [
+            (
+                file_name,
+                record.get("task_id"),
+                record.get("status"),
+                record.get("start_time"),
+                stat.st_mtime_ns,
+                stat.st_size,
+                json.dumps(record, ensure_ascii=False, default=str),
+                time.time(),
+            )
+            for file_name, stat, record in entries
+        ]
+        if not rows:
+            return
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO task_logs "
+                    "(file_name, task_id, status, start_time, mtime_ns, size, "
+                    "metadata, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+        finally:
+            conn.close()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Load all entries of the index.
+
+        Returns:
+            Mapping of file name to {"mtime_ns", "size", "metadata"}; empty if
+            the index does not exist yet.
+        """
+        if not self.path.exists():
+            return {}
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT file_name, mtime_ns, size, metadata FROM task_logs"
+            ).fetchall()
+        finally:
+            conn.close()
+        return {
+            file_name: {
+                "mtime_ns": mtime_ns,
+                "size": size,
+                "metadata": json.loads(metadata),
+            }
+            for file_name, mtime_ns, size, metadata in rows
+        }
+
+
+def index_task_log(file_path: Union[str, Path], data: Dict[str, Any]) -> None:
+    """
+    Record the metadata of a log file that was just written.
+
+    Failures are reported but never raised: the index is only an accelerator
+    and the scanner rebuilds missing or stale entries from the logs themselves.
+
+    Args:
+        file_path: Path of the written JSON task log.
+        data: The TaskLog-shaped dictionary that was written to it.
+    """
+    try:
+        file_path = Path(file_path)
+        stat = os.stat(file_path)
+        TaskIndex(file_path.parent).upsert(
+            [(file_path.name, stat, extract_task_log_metadata(data))]
+        )
+    except Exception as e:
+        print(f"Warning: Could not update task index for {file_path}: {e}")
+
+
+def scan_task_logs(
+    log_dir: Union[str, Path], pattern: str = "task_*.json"
+) -> List[Dict[str, Any]]:
+    """
+    List the metadata records of all task logs in a directory.
+
+    Entries whose mtime and size match the index are served from it; other
+    files are parsed (header only for running tasks) and written back.
+
+    Args:
+        log_dir: Directory containing the task logs.
+        pattern: Glob pattern selecting task log file names.
+
+    Returns:
+        One record per matching file, with the indexed fields plus "file" (path)
+        and "mtime". Files that cannot be parsed yield a record holding only
+        "file", "mtime" and "parse_error".
+    """
+    index = TaskIndex(log_dir)
+    try:
+        indexed = index.load()
+    except (sqlite3.Error, ValueError) as e:
+        print(f"Warning: Could not read task index {index.path}: {e}")
+        indexed = {}
+
+    records: List[Dict[str, Any]] = []
+    stale: List[Tuple[str, os.stat_result, Dict[str, Any]]] = []
+
+    with os.scandir(log_dir) as entries:
+        for entry in entries:
+            if not fnmatch.fnmatch(entry.name, pattern) or not entry.is_file():
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue  # Removed between listing and stat
+
+            cached = indexed.get(entry.name)
+            if (
+                cached
+                and cached["mtime_ns"] == stat.st_mtime_ns
+                and cached["size"] == stat.st_size
+            ):
+                record = cached["metadata"]
+            else:
+                try:
+                    record = parse_task_log(entry.path)
+                except (json.JSONDecodeError, ValueError, OSError) as e:
+                    records.append(
+                        {
+                            "file": entry.path,
+                            "mtime": stat.st_mtime,
+                            "parse_error": str(e),
+                        }
+                    )
+                    continue
+                stale.append((entry.name, stat, record))
+
+            records.append(dict(record, file=entry.path, mtime=stat.st_mtime))
+
+    if stale:
+        try:
+            index.upsert(stale)
+        except sqlite3.Error as e:
+            print(f"Warning: Could not update task index {index.path}: {e}")
+
+    return records
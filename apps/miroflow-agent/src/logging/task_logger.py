@@ -24,6 +24,9 @@ from typing import Any, Dict, List, Literal, Optional
 # Import colorama for cross-platform colored output
 from colorama import Fore, Style, init
 
+from .task_index import index_task_log
+from .tracing import span
+
 # Initialize colorama
 init(autoreset=True, strip=False)
 
@@ -315,21 +318,25 @@ class TaskLog:
             return json.dumps(serialized_dict, ensure_ascii=True, indent=2)
 
     def save(self):
-        """Save as a single JSON file"""
+        """Save as a single JSON file and refresh its entry in the task index"""
         os.makedirs(self.log_dir, exist_ok=True)
         timestamp = (
             self.start_time.replace(":", "-").replace(".", "-").replace(" ", "-")
         )
 
         filename = f"{self.log_dir}/task_{self.task_id}_{timestamp}.json"
-        try:
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(self.to_json())
-        except UnicodeEncodeError as e:
-            # Fallback: try with different encoding if UTF-8 fails
-            print(f"Warning: UTF-8 encoding failed, trying with system default: {e}")
-            with open(filename, "w") as f:
-                f.write(self.to_json())
+        with span("log.save"):
+            try:
+                with open(filename, "w", encoding="utf-8") as f:
+                    f.write(self.to_json())
+            except UnicodeEncodeError as e:
+                # Fallback: try with different encoding if UTF-8 fails
+                print(
+                    f"Warning: UTF-8 encoding failed, trying with system default: {e}"
+                )
+                with open(filename, "w") as f:
+                    f.write(self.to_json())
+            index_task_log(filename, vars(self))
         return filename
 
     @classmethod
@@ -0,0 +1,292 @@
+# Copyright (c) 2025 MiroMind
+# This source code is licensed under the MIT License.
+
+"""
+OpenTelemetry-style spans for the agent's hot paths.
+
+This module provides:
+- Tracer: Collects the spans of one task run (one trace) and exports them as
+  one OTLP/JSON ExportTraceServiceRequest line to a local file
+- Span: A timed operation with attributes, events and an error status
+- span / record_span / current_span: Helpers that use the tracer of the
+  current context, so LLM clients, tool managers and the orchestrator can be
+  instrumented without passing the tracer around
+
+The active tracer and span live in context variables, so spans started in
+asyncio tasks nest under the span that was current when the task was created.
+Without an active tracer every helper is a no-op. The trace file follows the
+format read by the OpenTelemetry Collector's otlpjsonfile receiver, one line
+per task run; writes are single O_APPEND writes like the progress events, so
+the runner's worker processes can share it.
+"""
+
+import contextlib
+import contextvars
+import json
+import os
+import secrets
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+TRACES_FILENAME = "traces.jsonl"
+
+SERVICE_NAME = "miroflow-agent"
+INSTRUMENTATION_SCOPE = "miroflow_agent"
+
+# Spans kept in memory before an intermediate export
+MAX_BUFFERED_SPANS = 5000
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+STATUS_CODE_UNSET = 0
+STATUS_CODE_ERROR = 2
+
+_current_tracer: contextvars.ContextVar[Optional["Tracer"]] = contextvars.ContextVar(
+    "miroflow_tracer", default=None
+)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "miroflow_span", default=None
+)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    """Attribute value in the OTLP/JSON encoding"""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {"key": key, "value": _otlp_value(value)}
+        for key, value in attributes.items()
+        if value is not None
+    ]
+
+
+class Span:
+    """A timed operation of a trace."""
+
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_span_id",
+        "name",
+        "kind",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "events",
+        "error",
+    )
+
+    def __init__(
+        self,
+        trace_id: str,
+        name: str,
+        parent: Optional["Span"] = None,
+        kind: int = SPAN_KIND_INTERNAL,
+        start_ns: Optional[int] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent.span_id if parent else None
+        self.name = name
+        self.kind = kind
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.events: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes: Any):
+        self.events.append(
+            {"name": name, "time_ns": time.time_ns(), "attributes": attributes}
+        )
+
+    def set_error(self, message: str):
+        self.error = message
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Span in the OTLP/JSON encoding"""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": STATUS_CODE_UNSET},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.events:
+            span["events"] = [
+                {
+                    "timeUnixNano": str(event["time_ns"]),
+                    "name": event["name"],
+                    "attributes": _otlp_attributes(event["attributes"]),
+                }
+                for event in self.events
+            ]
+        if self.error is not None:
+            span["status"] = {"code": STATUS_CODE_ERROR, "message": self.error}
+        return span
+
+
+class Tracer:
+    """
+    Spans of one task run, exported to an OTLP/JSON file.
+
+    Export failures are reported once and never interrupt the run.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        resource_attributes: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Initialize the tracer.
+
+        Args:
+            path: Trace file, one ExportTraceServiceRequest per line
+            resource_attributes: Attributes of the traced process (task ID, model, ...)
+        """
+        self.path = Path(path)
+        self.trace_id = secrets.token_hex(16)
+        self.resource_attributes = {
+            "service.name": SERVICE_NAME,
+            **(resource_attributes or {}),
+        }
+        self.spans: List[Span] = []
+        self._failed = False
+
+    @contextlib.contextmanager
+    def activate(self) -> Iterator["Tracer"]:
+        """Make this the tracer of the current context"""
+        token = _current_tracer.set(self)
+        try:
+            yield self
+        finally:
+            _current_tracer.reset(token)
+
+    @contextlib.contextmanager
+    def span(
+        self, name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any
+    ) -> Iterator[Span]:
+        """
+        Time a block as a child of the current span.
+
+        An exception leaving the block marks the span as failed and propagates.
+        """
+        span = Span(self.trace_id, name, _current_span.get(), kind, None, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current_span.reset(token)
+            self._finish(span)
+
+    def record_span(
+        self, name: str, start_ns: int, end_ns: int, **attributes: Any
+    ) -> Span:
+        """Add a span measured elsewhere as a child of the current span"""
+        span = Span(
+            self.trace_id, name, _current_span.get(), SPAN_KIND_INTERNAL, start_ns
+        )
+        span.attributes.update(attributes)
+        span.end_ns = end_ns
+        self.spans.append(span)
+        return span
+
+    def _finish(self, span: Span):
+        span.end_ns = time.time_ns()
+        self.spans.append(span)
+        if len(self.spans) >= MAX_BUFFERED_SPANS:
+            self.export()
+
+    def export(self):
+        """Append the finished spans to the trace file and clear them"""
+        if not self.spans:
+            return
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes(self.resource_attributes)
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": INSTRUMENTATION_SCOPE},
+                            "spans": [span.to_otlp() for span in self.spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        self.spans = []
+        line = json.dumps(request, ensure_ascii=False, default=str) + "\n"
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line.encode("utf-8"))
+            finally:
+                os.close(fd)
+        except OSError as e:
+            if not self._failed:
+                self._failed = True
+                print(f"Warning: Could not write traces to {self.path}: {e}")
+
+
+def current_tracer() -> Optional[Tracer]:
+    """Tracer of the current context, if any"""
+    return _current_tracer.get()
+
+
+def current_span() -> Optional[Span]:
+    """Innermost open span of the current context, if any"""
+    return _current_span.get()
+
+
+@contextlib.contextmanager
+def span(
+    name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any
+) -> Iterator[Optional[Span]]:
+    """Time a block with the current tracer; yields None when tracing is off"""
+    tracer = _current_tracer.get()
+    if tracer is None:
+        yield None
+        return
+    with tracer.span(name, kind, **attributes) as active_span:
+        yield active_span
+
+
+def record_span(
+    name: str, start_ns: int, end_ns: int, **attributes: Any
+) -> Optional[Span]:
+    """Add a span measured elsewhere with the current tracer, if any"""
+    tracer = _current_tracer.get()
+    if tracer is None:
+        return None
+    return tracer.record_span(name, start_ns, end_ns, **attributes)
@@ -1,20 +1,25 @@
 # Copyright (c) 2025 MiroMind
 # This source code is licensed under the MIT License.
 
-"""Utility functions for parsing, prompts, and wrappers."""
+"""Utility functions for parsing, prompts, query normalization, and wrappers."""
 
 from .parsing_utils import (
+    ParsedLLMResponse,
+    extract_boxed_content,
     extract_failure_experience_summary,
     extract_llm_response_text,
     parse_llm_response_for_tool_calls,
     safe_json_loads,
+    scan_llm_response,
 )
 from .prompt_utils import (
     FORMAT_ERROR_MESSAGE,
+    append_text,
     generate_agent_specific_system_prompt,
     generate_agent_summarize_prompt,
     generate_mcp_system_prompt,
 )
+from .query_utils import QueryIndex, QueryKey, canonicalize_url, query_terms
 from .wrapper_utils import ErrorBox, ResponseBox
 
 __all__ = [
@@ -23,11 +28,20 @@ __all__ = [
     "extract_llm_response_text",
     "extract_failure_experience_summary",
     "safe_json_loads",
+    "scan_llm_response",
+    "extract_boxed_content",
+    "ParsedLLMResponse",
     # prompt_utils
     "FORMAT_ERROR_MESSAGE",
+    "append_text",
     "generate_mcp_system_prompt",
     "generate_agent_specific_system_prompt",
     "generate_agent_summarize_prompt",
+    # query_utils
+    "QueryIndex",
+    "QueryKey",
+    "canonicalize_url",
+    "query_terms",
     # wrapper_utils
     "ErrorBox",
     "ResponseBox",
@@ -6,20 +6,40 @@ Parsing utilities for LLM responses and tool calls.
 
 This module provides functions for:
 - Parsing tool calls from LLM responses (both OpenAI and MCP formats)
+- Scanning MCP responses for reasoning, text, tool blocks and boxed answers
 - Extracting text content from responses
 - Safe JSON parsing with automatic repair
 - Failure experience summary extraction
 """
 
+import dataclasses
+import functools
 import json
 import logging
 import re
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Tuple, Union
 
 from json_repair import repair_json
 
 logger = logging.getLogger("miroflow_agent")
 
+MCP_TOOL_START = "<use_mcp_tool>"
+_ARGUMENTS_END = "</arguments>"
+_THINK_START = "<think>"
+_THINK_END = "</think>"
+
+# Tool block up to its arguments. Names cannot contain "<", so a malformed
+# block fails at the next tag instead of scanning the rest of the response.
+_MCP_HEADER_RE = re.compile(
+    r"<use_mcp_tool>\s*<server_name>([^<]*)</server_name>\s*"
+    r"<tool_name>([^<]*)</tool_name>\s*<arguments>"
+)
+_MCP_TAIL_RE = re.compile(r"\s*</use_mcp_tool>")
+_BOXED_RE = re.compile(r"\\boxed\b")
+
+# Boxed answers that are placeholders rather than answers
+BOXED_PLACEHOLDERS = frozenset(["?", "??", "???", "？", "……", "…", "...", "unknown"])
+
 
 def filter_none_values(arguments: Union[Dict, Any]) -> Union[Dict, Any]:
     """
@@ -125,6 +145,193 @@ def safe_json_loads(arguments_str: str) -> Dict[str, Any]:
     }
 
 
+@dataclasses.dataclass(frozen=True)
+class ParsedLLMResponse:
+    """Parts of an MCP-format assistant response, see scan_llm_response"""
+
+    # Text before the first <use_mcp_tool> tag, stripped
+    text: str
+    # Content of the first <think>...</think> block, stripped
+    reasoning: str
+    # Text after the reasoning block and before the next tool block, stripped
+    content: str
+    # Complete tool blocks as (server_name, tool_name, arguments_str), stripped
+    tool_blocks: Tuple[Tuple[str, str, str], ...]
+    # Content of the last \boxed{...}, "" if none or a placeholder
+    boxed: str
+
+
+def scan_mcp_tool_blocks(text: str) -> List[Tuple[str, str, str]]:
+    """
+    Find the complete <use_mcp_tool> blocks of a response in one pass.
+
+    Equivalent to matching
+    <use_mcp_tool><server_name>..</server_name><tool_name>..</tool_name>
+    <arguments>..</arguments></use_mcp_tool> (whitespace allowed between
+    tags), but linear in the text length: unterminated or malformed blocks
+    don't trigger a rescan of the remaining text.
+
+    Returns:
+        List of (server_name, tool_name, arguments_str), stripped
+    """
+    blocks = []
+    pos = 0
+    # First </arguments> at or after the last search position, reused while
+    # the search moves forward so each occurrence is found only once
+    arguments_end = -1
+    while True:
+        start = text.find(MCP_TOOL_START, pos)
+        if start < 0:
+            break
+        header = _MCP_HEADER_RE.match(text, start)
+        if header is None:
+            pos = start + len(MCP_TOOL_START)
+            continue
+
+        # The arguments end at the first </arguments> closing the block
+        search = header.end()
+        block_end = None
+        while True:
+            if arguments_end < search:
+                arguments_end = text.find(_ARGUMENTS_END, search)
+            if arguments_end < 0:
+                break
+            tail = _MCP_TAIL_RE.match(text, arguments_end + len(_ARGUMENTS_END))
+            if tail:
+                block_end = tail.end()
+                break
+            search = arguments_end + 1
+        if block_end is None:
+            # No later block can be complete either
+            break
+
+        blocks.append(
+            (
+                header.group(1).strip(),
+                header.group(2).strip(),
+                text[header.end() : arguments_end].strip(),
+            )
+        )
+        pos = block_end
+    return blocks
+
+
+def extract_boxed_content(text: str) -> str:
+    r"""
+    Extract the content of the last \boxed{...} occurrence in the given text.
+
+    Supports:
+      - Arbitrary levels of nested braces
+      - Escaped braces (\{ and \})
+      - Whitespace between \boxed and the opening brace
+      - Empty content inside braces
+      - Incomplete boxed expressions (extracts to end of string as fallback)
+
+    Args:
+        text: Input text that may contain \boxed{...} expressions
+
+    Returns:
+        The extracted boxed content, or empty string if no match is found or
+        the content is a placeholder such as "?" or "unknown".
+    """
+    if not text:
+        return ""
+
+    last_result = None  # Track the last boxed content (complete or incomplete)
+    i = 0
+    n = len(text)
+
+    while True:
+        # Find the next \boxed occurrence
+        m = _BOXED_RE.search(text, i)
+        if not m:
+            break
+        j = m.end()
+
+        # Skip any whitespace after \boxed
+        while j < n and text[j].isspace():
+            j += 1
+
+        # Require that the next character is '{'
+        if j >= n or text[j] != "{":
+            i = j
+            continue
+
+        # Parse the brace content manually to handle nesting and escapes
+        depth = 0
+        k = j
+        escaped = False
+        found_closing = False
+        while k < n:
+            ch = text[k]
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth -= 1
+                # When depth returns to zero, the boxed content ends
+                if depth == 0:
+                    last_result = text[j + 1 : k]
+                    i = k + 1
+                    found_closing = True
+                    break
+            k += 1
+
+        # If we didn't find a closing brace, this is an incomplete boxed
+        # Store it as the last result (will be overwritten if we find more boxed later)
+        if not found_closing and depth > 0:
+            last_result = text[j + 1 : n]
+            i = k  # Continue from where we stopped
+        elif not found_closing:
+            i = j + 1  # Move past this invalid boxed
+
+    # Return the last boxed content found (complete or incomplete)
+    if last_result is None or last_result in BOXED_PLACEHOLDERS:
+        return ""
+    return last_result.strip()
+
+
+@functools.lru_cache(maxsize=32)
+def scan_llm_response(text: str) -> ParsedLLMResponse:
+    """
+    Split an MCP-format assistant response into its parts.
+
+    Each turn the orchestrator, the LLM client and the output formatter all
+    need parts of the same response; the result is cached so the text is
+    scanned once however many of them ask.
+
+    Args:
+        text: Assistant response text
+
+    Returns:
+        ParsedLLMResponse with the reasoning, text, tool blocks and boxed answer
+    """
+    tool_start = text.find(MCP_TOOL_START)
+    before_tools = text if tool_start < 0 else text[:tool_start]
+
+    reasoning = ""
+    content_start = 0
+    think_start = text.find(_THINK_START)
+    if think_start >= 0:
+        think_end = text.find(_THINK_END, think_start + len(_THINK_START))
+        if think_end >= 0:
+            reasoning = text[think_start + len(_THINK_START) : think_end].strip()
+            content_start = think_end + len(_THINK_END)
+    content_end = text.find(MCP_TOOL_START, content_start)
+    content = text[content_start : content_end if content_end >= 0 else len(text)]
+
+    return ParsedLLMResponse(
+        text=before_tools.strip(),
+        reasoning=reasoning,
+        content=content.strip(),
+        tool_blocks=tuple(scan_mcp_tool_blocks(text)) if tool_start >= 0 else (),
+        boxed=extract_boxed_content(text),
+    )
+
+
 def extract_failure_experience_summary(text: str) -> str:
     """
     Extract failure experience summary from LLM response text.
@@ -147,33 +354,15 @@ def extract_failure_experience_summary(text: str) -> str:
     if not text:
         return ""
 
-    think_content = ""
-    content = ""
-
-    # Extract think content
-    think_match = re.search(r"<think>([\s\S]*?)</think>", text)
-    if think_match:
-        think_content = think_match.group(1).strip()
-        # Get content after </think>
-        after_think = text[think_match.end() :]
-    else:
-        # No think block, entire text is potential content
-        after_think = text
-
-    # Remove <use_mcp_tool>...</use_mcp_tool> block from content
-    mcp_match = re.search(r"<use_mcp_tool>[\s\S]*", after_think)
-    if mcp_match:
-        content = after_think[: mcp_match.start()].strip()
-    else:
-        content = after_think.strip()
+    parsed = scan_llm_response(text)
 
     # Apply the rules:
     # - If content is empty, use think_content
     # - If both are non-empty, use content
-    if content:
-        return content
+    if parsed.content:
+        return parsed.content
     else:
-        return think_content
+        return parsed.reasoning
 
 
 def extract_llm_response_text(llm_response: Union[str, Dict]) -> str:
@@ -196,16 +385,7 @@ def extract_llm_response_text(llm_response: Union[str, Dict]) -> str:
         # If it's a string type, use directly
         content = str(llm_response)
 
-    # Find the position of <use_mcp_tool> tag
-    tool_start_pattern = r"<use_mcp_tool>"
-    match = re.search(tool_start_pattern, content)
-
-    if match:
-        # If <use_mcp_tool> tag is found, only return content before the tag
-        return content[: match.start()].strip()
-    else:
-        # If no tag is found, return the complete content
-        return content.strip()
+    return scan_llm_response(content).text
 
 
 def parse_llm_response_for_tool_calls(
@@ -305,18 +485,9 @@ def parse_llm_response_for_tool_calls(
 
     # for other clients, such as qwen and anthropic, we use MCP instead of tool calls
     tool_calls = []
-    # Find all <use_mcp_tool> tags
-    tool_call_patterns = re.findall(
-        r"<use_mcp_tool>\s*<server_name>(.*?)</server_name>\s*<tool_name>(.*?)</tool_name>\s*<arguments>\s*([\s\S]*?)\s*</arguments>\s*</use_mcp_tool>",
-        llm_response_content_text,
-        re.DOTALL,
-    )
-
-    for match in tool_call_patterns:
-        server_name = match[0].strip()
-        tool_name = match[1].strip()
-        arguments_str = match[2].strip()
-
+    for server_name, tool_name, arguments_str in scan_llm_response(
+        llm_response_content_text
+    ).tool_blocks:
         # Parse JSON string to dictionary
         arguments = safe_json_loads(arguments_str)
         arguments = filter_none_values(arguments)
@@ -9,8 +9,11 @@ This module provides:
 - Agent-specific prompt generation (main agent, browsing agent)
 - Summary prompt templates for final answer generation
 - Failure experience templates for retry mechanisms
+- append_text for adding a template to a message's content
 """
 
+from typing import Any
+
 # ============================================================================
 # Format Error Messages
 # ============================================================================
@@ -62,6 +65,81 @@ FAILURE_SUMMARY_ASSISTANT_PREFIX = (
     f"<think>\n{FAILURE_SUMMARY_THINK_CONTENT}\n</think>\n\n"
 )
 
+# ============================================================================
+# Context Compaction Templates (for in-loop summarization)
+# ============================================================================
+
+COMPACTION_SYSTEM_PROMPT = """You maintain the working memory of a research agent whose conversation is too long to keep in full. You never call tools and you never answer the task yourself."""
+
+COMPACTION_PROMPT = """The agent is working on this task:
+
+{task_description}
+
+{previous_memory}Below are the agent's earlier turns (its reasoning and tool calls, each followed by the tool results). They will be removed from the conversation and replaced by your summary.
+
+{transcript}
+
+Write the agent's working memory so it can continue without these turns:
+Progress: [what has been tried so far and the current plan]
+Findings: [every fact, number, name, URL or intermediate result that may matter for the task, with its source]
+Dead ends: [searches, pages or approaches that did not help, so they are not repeated]
+Open questions: [what still needs to be found or verified]
+
+Keep every concrete detail that may be needed for the final answer; drop pleasantries and repeated content."""
+
+# Earlier memory handed to the summarizer, so a new memory subsumes it
+COMPACTION_PREVIOUS_MEMORY = """Working memory from even earlier turns (merge it into your summary):
+
+{memory}
+
+"""
+
+# Appended to the initial task message in place of the compacted turns
+WORKING_MEMORY_TEMPLATE = """
+
+=== Working Memory ===
+Earlier turns of this conversation were summarized to save context:
+
+{memory}
+=== End of Working Memory ===
+"""
+
+# ============================================================================
+# Duplicate Query Templates
+# ============================================================================
+
+# Prepended to an earlier result served again for a repeated query
+DUPLICATE_QUERY_NOTE = """[This repeats the earlier query '{query}'. Its earlier result is shown again; try a different query or tool to learn something new.]
+
+"""
+
+# ============================================================================
+# Budget Templates (per-run wall time, token and tool call limits)
+# ============================================================================
+
+# Appended to the tool results once a budget passes its warning threshold
+BUDGET_WARNING_TEMPLATE = """
+
+[Budget notice: {used_percent:.0f}% of this task's budget is used (remaining {remaining}). Stop exploring new leads; verify what you have and give your final answer soon. When the budget runs out you will be asked for the final answer immediately.]"""
+
+# Tool result of a call over its per-tool limit
+TOOL_BUDGET_EXHAUSTED_MESSAGE = "Call budget for {tool_name} exhausted ({limit} calls). Use another tool or work with the results you already have."
+
+# ============================================================================
+# Evidence Index Templates (tool calls already answered by earlier attempts)
+# ============================================================================
+
+EVIDENCE_INDEX_HEADER = """
+
+=== Evidence From Earlier Attempts ===
+Earlier attempts at this task already ran the tool calls below. Repeating one with the same arguments returns its stored result instantly:
+
+"""
+
+EVIDENCE_INDEX_FOOTER = """Verify anything you rely on; earlier attempts may have drawn wrong conclusions from this evidence.
+=== End of Evidence ===
+"""
+
 # ============================================================================
 # MCP Tags for Parsing
 # ============================================================================
@@ -82,6 +160,22 @@ refusal_keywords = [
 ]
 
 
+def append_text(content: Any, text: str) -> Any:
+    """
+    Append text to a message's content, keeping its format.
+
+    Args:
+        content: A string (OpenAI) or a list of content blocks (Anthropic)
+        text: Text to append
+
+    Returns:
+        New content of the same format with text appended
+    """
+    if isinstance(content, list):
+        return content + [{"type": "text", "text": text}]
+    return str(content) + text
+
+
 def generate_mcp_system_prompt(date, mcp_servers):
     """
     Generate the MCP (Model Context Protocol) system prompt for LLM.
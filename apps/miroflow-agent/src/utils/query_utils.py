@@ -0,0 +1,206 @@
+# Copyright (c) 2025 MiroMind
+# This source code is licensed under the MIT License.
+
+"""
+Query normalization utilities for duplicate tool call detection.
+
+This module provides:
+- canonicalize_url: URL form that ignores case, tracking parameters and fragments
+- query_terms: Term set of a free-text query, ignoring case, quotes and order
+- QueryKey: Normalized key of a search/scrape tool call
+- QueryIndex: Queries of one cache with exact, normalized and near-duplicate lookup
+"""
+
+import dataclasses
+import json
+import re
+import unicodedata
+from typing import Any, Dict, FrozenSet, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track the visitor and never change the page
+TRACKING_PARAMS = {
+    "fbclid",
+    "gclid",
+    "dclid",
+    "msclkid",
+    "yclid",
+    "igshid",
+    "mc_cid",
+    "mc_eid",
+    "_ga",
+    "_gl",
+    "ref_src",
+    "spm",
+    "si",
+}
+TRACKING_PARAM_PREFIXES = ("utm_",)
+
+# Quote marks of all kinds (only exact repeats are rolled back by default, so a
+# switch to an exact-phrase search is still run)
+_QUOTES_RE = re.compile(r"[\"'`‘’‚‛“”„«»]")
+# Punctuation stripped from both ends of a term (operators like site: stay)
+_TERM_STRIP = ".,;!?()[]{}<>"
+
+# Kinds of duplicates, from the strictest match
+EXACT = "exact"
+NORMALIZED = "normalized"
+NEAR = "near"
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for comparing scrape targets.
+
+    Ignores the scheme (http/https), letter case of the host, a leading
+    "www.", default ports, the fragment, tracking parameters, the order of
+    query parameters and a trailing slash.
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url if "://" in url else "https://" + url)
+        port = parts.port
+    except ValueError:
+        return url
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS
+        and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def query_terms(text: str) -> FrozenSet[str]:
+    """Terms of a free-text query, ignoring case, quotes, punctuation and order"""
+    text = _QUOTES_RE.sub(" ", unicodedata.normalize("NFKC", text).casefold())
+    terms = (term.strip(_TERM_STRIP) for term in text.split())
+    return frozenset(term for term in terms if term)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Jaccard similarity of two term sets"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+@dataclasses.dataclass(frozen=True)
+class QueryKey:
+    """
+    Normalized key of a tool call.
+
+    Only queries with the same anchor (tool, canonical URL and the remaining
+    arguments) can be duplicates; their free text is compared as term sets.
+    """
+
+    raw: str
+    anchor: str
+    terms: FrozenSet[str] = frozenset()
+
+    @property
+    def signature(self) -> str:
+        return self.anchor + "\n" + " ".join(sorted(self.terms))
+
+    @classmethod
+    def build(
+        cls,
+        raw: str,
+        tool_name: str,
+        text: str = "",
+        url: Optional[str] = None,
+        other_arguments: Optional[Dict[str, Any]] = None,
+    ) -> "QueryKey":
+        """
+        Build the key of a tool call.
+
+        Args:
+            raw: Query string as built by the tool executor (exact matches)
+            tool_name: Name of the tool
+            text: Free-text part of the query (search query, subtask, question)
+            url: Target URL, if any
+            other_arguments: Arguments that change the result (page, language, ...)
+        """
+        anchor = [tool_name]
+        if url is not None:
+            anchor.append(canonicalize_url(url))
+        if other_arguments:
+            anchor.append(json.dumps(other_arguments, sort_keys=True, default=str))
+        return cls(raw=raw, anchor="\n".join(anchor), terms=query_terms(text))
+
+
+@dataclasses.dataclass
+class QueryMatch:
+    """An earlier query that a new one duplicates"""
+
+    kind: str
+    query: str
+    count: int
+    similarity: float
+    result: Optional[Dict[str, Any]] = None
+
+
+@dataclasses.dataclass
+class _QueryEntry:
+    key: QueryKey
+    count: int = 0
+    result: Optional[Dict[str, Any]] = None
+
+
+class QueryIndex:
+    """
+    Queries recorded in one cache (agent and tool), by normalized signature.
+    """
+
+    def __init__(self):
+        self.raw_counts: Dict[str, int] = {}
+        self.entries: Dict[str, _QueryEntry] = {}
+        self.by_anchor: Dict[str, List[_QueryEntry]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def find(
+        self, key: QueryKey, near_duplicate_threshold: float = 1.0
+    ) -> Optional[QueryMatch]:
+        """
+        Find the earlier query that key duplicates.
+
+        Args:
+            key: Key of the new query
+            near_duplicate_threshold: Term-set similarity from which queries with
+                the same anchor are near-duplicates (above 1.0 disables them)
+
+        Returns:
+            The closest earlier query, or None if the query is new
+        """
+        entry = self.entries.get(key.signature)
+        if entry is not None:
+            kind = EXACT if key.raw in self.raw_counts else NORMALIZED
+            return QueryMatch(kind, entry.key.raw, entry.count, 1.0, entry.result)
+
+        best, best_similarity = None, 0.0
+        for entry in self.by_anchor.get(key.anchor, []):
+            similarity = jaccard(key.terms, entry.key.terms)
+            if similarity > best_similarity:
+                best, best_similarity = entry, similarity
+        if best is None or best_similarity < near_duplicate_threshold:
+            return None
+        return QueryMatch(NEAR, best.key.raw, best.count, best_similarity, best.result)
+
+    def record(self, key: QueryKey, result: Optional[Dict[str, Any]] = None):
+        """Record an executed query and keep the first result it returned"""
+        self.raw_counts[key.raw] = self.raw_counts.get(key.raw, 0) + 1
+        entry = self.entries.get(key.signature)
+        if entry is None:
+            entry = self.entries[key.signature] = _QueryEntry(key)
+            self.by_anchor.setdefault(key.anchor, []).append(entry)
+        entry.count += 1
+        if entry.result is None and result is not None:
+            entry.result = result
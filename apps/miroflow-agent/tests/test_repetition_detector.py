@@ -0,0 +1,51 @@
+# Copyright (c) 2025 MiroMind
+# This source code is licensed under the MIT License.
+
+from src.llm.util import RepetitionDetector
+
+URL = "https://en.wikipedia.org/wiki/List_of_tallest_buildings_in_the_world"
+
+
+def feed_in_chunks(detector: RepetitionDetector, text: str, size: int = 7) -> bool:
+    for i in range(0, len(text), size):
+        detector.feed(text[i : i + size])
+    return detector.detected
+
+
+def test_url_list_is_not_a_loop():
+    bullets = "".join(
+        f"- Source {i} for the height of building {i}: {URL}\n" for i in range(1, 9)
+    )
+    answer = (
+        "The buildings were compared using the figures from the list below, "
+        "which was checked against the official records of each building.\n\n"
+        f"{bullets}\n"
+        "Taking the tallest building of each year gives the answer.\n\n"
+        "\\boxed{828}"
+    )
+    tail = answer[-50:]
+    assert answer.count(tail) <= 5  # The check on the finished response passes
+    assert answer.count(URL) == 8
+
+    detector = RepetitionDetector(window=50, max_repeats=5)
+    assert not feed_in_chunks(detector, answer)
+    assert detector.detected_at is None
+
+
+def test_consecutive_repeats_are_a_loop():
+    prefix = "Let me verify the result once more before answering.\n"
+    unit = "I need to check the population figure for the city again. "
+    text = prefix + unit * 20
+
+    detector = RepetitionDetector(window=50, max_repeats=5)
+    assert feed_in_chunks(detector, text)
+    # Found after six repeats, long before the stream would have ended
+    assert detector.detected_at <= len(prefix) + 7 * len(unit)
+    looped = text[: detector.detected_at]
+    assert looped.count(looped[-50:]) > 5
+
+
+def test_short_period_loop():
+    detector = RepetitionDetector(window=50, max_repeats=5)
+    assert feed_in_chunks(detector, "Answer: " + "ha" * 400, size=3)
+    assert detector.detected_at < 8 + 400
@@ -0,0 +1,61 @@
+# Copyright (c) 2025 MiroMind
+# This source code is licensed under the MIT License.
+
+from omegaconf import OmegaConf
+
+from src.core.task_budget import BUDGET_EXHAUSTED, BUDGET_OK, TaskBudget
+
+
+class FakeClient:
+    def __init__(self):
+        self.token_usage = {"total_input_tokens": 0, "total_output_tokens": 0}
+
+    def get_token_usage(self):
+        return dict(self.token_usage)
+
+    def call(self, input_tokens: int, output_tokens: int):
+        self.token_usage["total_input_tokens"] += input_tokens
+        self.token_usage["total_output_tokens"] += output_tokens
+
+
+def make_budget(**limits) -> TaskBudget:
+    return TaskBudget(OmegaConf.create({"agent": {"budget": limits}}))
+
+
+def test_retries_share_the_token_budget():
+    budget = make_budget(input_tokens=1000)
+
+    # First format retry: its own client, within the budget
+    first = FakeClient()
+    budget.attach(first)
+    first.call(600, 50)
+    assert budget.check("Main Agent", 1, {})["level"] == BUDGET_OK
+
+    # Second retry starts a new client; together they are over the limit
+    second = FakeClient()
+    budget.attach(second)
+    second.call(500, 50)
+    trace_data = {}
+    status = budget.check("Main Agent", 1, trace_data)
+    assert status["input_tokens"] == 1100
+    assert status["level"] == BUDGET_EXHAUSTED
+    assert budget.exhausted()
+    assert trace_data["budget"]["turns"] == [status]
+
+
+def test_tokens_used_before_attaching_are_not_charged():
+    budget = make_budget(output_tokens=100)
+    client = FakeClient()
+    client.call(10, 90)
+    budget.attach(client)
+    client.call(10, 20)
+    assert budget.usage()["output_tokens"] == 20
+    assert not budget.exhausted()
+
+
+def test_retries_share_per_tool_limits():
+    budget = make_budget(tool_calls={"google_search": 2})
+    for _ in range(2):  # One call in each of two retries
+        assert budget.tool_call_allowed("google_search")
+        budget.record_tool_call("google_search")
+    assert not budget.tool_call_allowed("google_search")
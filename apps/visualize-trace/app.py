@@ -4,12 +4,77 @@
 import os
 
 from flask import Flask, jsonify, render_template, request
-from trace_analyzer import TraceAnalyzer
+from run_analytics import RunAnalyticsCache
+from trace_analyzer import DEFAULT_CACHE_SIZE, TraceAnalyzerCache
 
 app = Flask(__name__)
 
-# Global variable to store analyzer instance
-analyzer = None
+# Parsed traces shared by all users, keyed by path and modification time
+analyzer_cache = TraceAnalyzerCache(
+    int(os.environ.get("TRACE_CACHE_SIZE", DEFAULT_CACHE_SIZE))
+)
+
+# Task log tables of run directories, refreshed as new logs appear
+run_analytics_cache = RunAnalyticsCache()
+
+# Default number of main agent steps per execution flow page
+DEFAULT_PAGE_SIZE = 50
+
+# Default number of tasks in run analytics rankings
+DEFAULT_TOP_TASKS = 20
+
+
+def resolve_file_path(file_path):
+    """Convert a requested trace path to an absolute path"""
+    # If it's a relative path, convert to absolute path
+    if not os.path.isabs(file_path):
+        file_path = os.path.abspath(file_path)
+    return file_path
+
+
+def get_analyzer():
+    """
+    Get the analyzer of the trace named by the file_path query parameter
+
+    Returns:
+        tuple: (analyzer, None) or (None, error response)
+    """
+    file_path = request.args.get("file_path")
+    if not file_path:
+        return None, (jsonify({"error": "Please load trace file first"}), 400)
+
+    file_path = resolve_file_path(file_path)
+    if not os.path.exists(file_path):
+        return None, (jsonify({"error": f"File does not exist: {file_path}"}), 404)
+
+    try:
+        return analyzer_cache.get(file_path), None
+    except Exception as e:
+        return None, (jsonify({"error": f"Failed to load file: {str(e)}"}), 500)
+
+
+def get_run_analytics():
+    """
+    Get the analytics of the run directory named by the directory parameter
+
+    Returns:
+        tuple: (analytics, None) or (None, error response)
+    """
+    directory = request.args.get("directory", "")
+    if not directory:
+        return None, (jsonify({"error": "Please provide directory"}), 400)
+
+    directory = os.path.abspath(os.path.expanduser(directory))
+    if not os.path.isdir(directory):
+        return None, (
+            jsonify({"error": f"Directory does not exist: {directory}"}),
+            404,
+        )
+
+    try:
+        return run_analytics_cache.get(directory), None
+    except Exception as e:
+        return None, (jsonify({"error": f"Failed to analyze run: {str(e)}"}), 500)
 
 
 @app.route("/")
@@ -85,28 +150,25 @@ def list_files():
 @app.route("/api/load_trace", methods=["POST"])
 def load_trace():
     """Load trace file"""
-    global analyzer
-
     data = request.get_json()
     file_path = data.get("file_path")
 
     if not file_path:
         return jsonify({"error": "Please provide file path"}), 400
 
-    # If it's a relative path, convert to absolute path
-    if not os.path.isabs(file_path):
-        file_path = os.path.abspath(file_path)
+    file_path = resolve_file_path(file_path)
 
     if not os.path.exists(file_path):
         return jsonify({"error": f"File does not exist: {file_path}"}), 404
 
     try:
-        analyzer = TraceAnalyzer(file_path)
+        analyzer = analyzer_cache.get(file_path)
         return jsonify(
             {
                 "message": "File loaded successfully",
                 "file_path": file_path,
                 "file_name": os.path.basename(file_path),
+                "total_steps": len(analyzer.analyze_conversation_flow()),
             }
         )
     except Exception as e:
@@ -116,8 +178,9 @@ def load_trace():
 @app.route("/api/basic_info")
 def get_basic_info():
     """Get basic information"""
-    if not analyzer:
-        return jsonify({"error": "Please load trace file first"}), 400
+    analyzer, error = get_analyzer()
+    if error:
+        return error
 
     try:
         return jsonify(analyzer.get_basic_info())
@@ -128,8 +191,9 @@ def get_basic_info():
 @app.route("/api/performance_summary")
 def get_performance_summary():
     """Get performance summary"""
-    if not analyzer:
-        return jsonify({"error": "Please load trace file first"}), 400
+    analyzer, error = get_analyzer()
+    if error:
+        return error
 
     try:
         return jsonify(analyzer.get_performance_summary())
@@ -139,12 +203,36 @@ def get_performance_summary():
 
 @app.route("/api/execution_flow")
 def get_execution_flow():
-    """Get execution flow"""
-    if not analyzer:
-        return jsonify({"error": "Please load trace file first"}), 400
+    """Get a page of the execution flow with message previews"""
+    analyzer, error = get_analyzer()
+    if error:
+        return error
+
+    try:
+        offset = request.args.get("offset", 0, type=int)
+        limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+        return jsonify(analyzer.get_flow_page(offset, limit))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/step_content")
+def get_step_content():
+    """Get the full content of one message"""
+    analyzer, error = get_analyzer()
+    if error:
+        return error
+
+    step_id = request.args.get("step_id", type=int)
+    if step_id is None:
+        return jsonify({"error": "Please provide step_id"}), 400
 
     try:
-        return jsonify(analyzer.analyze_conversation_flow())
+        return jsonify(
+            analyzer.get_step_content(step_id, request.args.get("session_id"))
+        )
+    except IndexError as e:
+        return jsonify({"error": str(e)}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -152,8 +240,9 @@ def get_execution_flow():
 @app.route("/api/execution_summary")
 def get_execution_summary():
     """Get execution summary"""
-    if not analyzer:
-        return jsonify({"error": "Please load trace file first"}), 400
+    analyzer, error = get_analyzer()
+    if error:
+        return error
 
     try:
         return jsonify(analyzer.get_execution_summary())
@@ -164,8 +253,9 @@ def get_execution_summary():
 @app.route("/api/spans_summary")
 def get_spans_summary():
     """Get spans summary"""
-    if not analyzer:
-        return jsonify({"error": "Please load trace file first"}), 400
+    analyzer, error = get_analyzer()
+    if error:
+        return error
 
     try:
         return jsonify(analyzer.get_spans_summary())
@@ -176,8 +266,9 @@ def get_spans_summary():
 @app.route("/api/step_logs_summary")
 def get_step_logs_summary():
     """Get step logs summary"""
-    if not analyzer:
-        return jsonify({"error": "Please load trace file first"}), 400
+    analyzer, error = get_analyzer()
+    if error:
+        return error
 
     try:
         return jsonify(analyzer.get_step_logs_summary())
@@ -188,8 +279,9 @@ def get_step_logs_summary():
 @app.route("/api/debug/raw_messages")
 def get_raw_messages():
     """Get raw message data for debugging"""
-    if not analyzer:
-        return jsonify({"error": "Please load trace file first"}), 400
+    analyzer, error = get_analyzer()
+    if error:
+        return error
 
     try:
         main_history = analyzer.get_main_agent_history()
@@ -229,5 +321,76 @@ def get_raw_messages():
         return jsonify({"error": str(e)}), 500
 
 
+# ==================== Run Analytics ====================
+
+
+@app.route("/api/run/summary")
+def get_run_summary():
+    """Get task counts, accuracy and totals of a run directory"""
+    analytics, error = get_run_analytics()
+    if error:
+        return error
+
+    try:
+        return jsonify(analytics.summary())
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/run/tool_latency")
+def get_run_tool_latency():
+    """Get per-tool latency percentiles and histograms of a run directory"""
+    analytics, error = get_run_analytics()
+    if error:
+        return error
+
+    try:
+        return jsonify(analytics.tool_latency())
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/run/turns_vs_correctness")
+def get_run_turns_vs_correctness():
+    """Get accuracy grouped by main agent turn count"""
+    analytics, error = get_run_analytics()
+    if error:
+        return error
+
+    try:
+        bucket_size = max(request.args.get("bucket_size", 5, type=int), 1)
+        return jsonify(analytics.turns_vs_correctness(bucket_size))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/run/token_usage")
+def get_run_token_usage():
+    """Get token totals and the tasks with the highest token burn"""
+    analytics, error = get_run_analytics()
+    if error:
+        return error
+
+    try:
+        limit = request.args.get("limit", DEFAULT_TOP_TASKS, type=int)
+        return jsonify(analytics.token_usage(limit))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/run/slowest_tasks")
+def get_run_slowest_tasks():
+    """Get the tasks with the longest wall time"""
+    analytics, error = get_run_analytics()
+    if error:
+        return error
+
+    try:
+        limit = request.args.get("limit", DEFAULT_TOP_TASKS, type=int)
+        return jsonify(analytics.slowest_tasks(limit))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 if __name__ == "__main__":
     app.run(debug=True, host="0.0.0.0", port=5000)
@@ -0,0 +1,375 @@
+# Copyright (c) 2025 MiroMind
+# This source code is licensed under the MIT License.
+
+"""
+Cross-trace analytics for benchmark run directories.
+
+Task logs are reduced to two column tables, one row per task and one row per
+tool call, built from the task status fields and the step logs (tool call
+timings, token usage, turn counts). The tables are refreshed incrementally:
+only task logs whose modification time or size changed are parsed again, so
+the analytics of a running benchmark stay cheap to poll.
+"""
+
+import glob
+import json
+import os
+import re
+import statistics
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+TASK_LOG_PATTERN = "task_*.json"
+
+# Step log messages written by the orchestrator and LLM clients
+TOOL_CALL_MESSAGE_PATTERN = re.compile(
+    r"^Tool (\S+) (?:completed in (\d+)ms|failed to execute)"
+)
+# Per call since "Cache:" was added; older OpenAI logs hold running totals
+TOKEN_USAGE_MESSAGE_PATTERN = re.compile(
+    r"Input: (\d+), (Cache: \d+\+\d+, )?Output: (\d+)"
+)
+TURN_STEP_PATTERN = re.compile(r"^(.+?) \| Turn: (\d+)")
+
+# Upper bounds (ms) of the tool latency histogram buckets; the last is open
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000)
+
+TASK_COLUMNS = (
+    "file",
+    "task_id",
+    "status",
+    "judge_result",
+    "duration_s",
+    "main_turns",
+    "sub_agent_sessions",
+    "tool_calls",
+    "tool_errors",
+    "input_tokens",
+    "output_tokens",
+)
+
+TOOL_CALL_COLUMNS = ("file", "task_id", "agent", "tool_name", "duration_ms", "error")
+
+# Number of analyzed run directories kept in memory
+DEFAULT_CACHE_SIZE = 4
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    try:
+        return datetime.fromisoformat(value).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def _strip_icon(step_name: str) -> str:
+    """Remove the emoji prefix TaskLog.log_step adds to step names"""
+    return re.sub(r"^[^\w]+", "", step_name)
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(fraction * len(ordered)), len(ordered) - 1)
+    return ordered[index]
+
+
+def extract_task_rows(
+    log_data: Dict[str, Any], file_name: str
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Reduce one task log to table rows
+
+    Args:
+        log_data: Parsed task log
+        file_name: Log file name, identifying the rows of this log
+
+    Returns:
+        tuple: (task row, tool call rows)
+    """
+    task_id = str(log_data.get("task_id", ""))
+    tool_rows = []
+    main_turns = 0
+    input_tokens = output_tokens = 0
+    total_input_tokens = total_output_tokens = 0
+
+    for step in log_data.get("step_logs", []):
+        step_name = _strip_icon(str(step.get("step_name", "")))
+        message = str(step.get("message", ""))
+
+        turn_match = TURN_STEP_PATTERN.match(step_name)
+        if turn_match and turn_match.group(1) == "Main Agent":
+            main_turns = max(main_turns, int(turn_match.group(2)))
+
+        if step_name.endswith("| Tool Call"):
+            tool_match = TOOL_CALL_MESSAGE_PATTERN.match(message)
+            if tool_match:
+                duration = tool_match.group(2)
+                tool_rows.append(
+                    {
+                        "file": file_name,
+                        "task_id": task_id,
+                        "agent": turn_match.group(1) if turn_match else "unknown",
+                        "tool_name": tool_match.group(1),
+                        "duration_ms": int(duration) if duration else None,
+                        "error": duration is None,
+                    }
+                )
+        elif step_name == "LLM | Token Usage":
+            usage_match = TOKEN_USAGE_MESSAGE_PATTERN.search(message)
+            if usage_match and usage_match.group(2):
+                input_tokens += int(usage_match.group(1))
+                output_tokens += int(usage_match.group(3))
+            elif usage_match:
+                total_input_tokens = max(total_input_tokens, int(usage_match.group(1)))
+                total_output_tokens = max(
+                    total_output_tokens, int(usage_match.group(3))
+                )
+
+    start = _parse_time(log_data.get("start_time"))
+    end = _parse_time(log_data.get("end_time"))
+    duration_s = (
+        (end - start).total_seconds() if start and end and end > start else None
+    )
+
+    task_row = {
+        "file": file_name,
+        "task_id": task_id,
+        "status": log_data.get("status", ""),
+        "judge_result": log_data.get("final_judge_result", ""),
+        "duration_s": duration_s,
+        "main_turns": main_turns,
+        "sub_agent_sessions": len(
+            log_data.get("sub_agent_message_history_sessions") or {}
+        ),
+        "tool_calls": len(tool_rows),
+        "tool_errors": sum(1 for row in tool_rows if row["error"]),
+        "input_tokens": input_tokens + total_input_tokens,
+        "output_tokens": output_tokens + total_output_tokens,
+    }
+    return task_row, tool_rows
+
+
+class ColumnTable:
+    """Column-oriented table: one list of values per column"""
+
+    def __init__(self, columns: Iterable[str]):
+        self.columns = {name: [] for name in columns}
+
+    @classmethod
+    def from_rows(cls, columns: Iterable[str], rows: Iterable[Dict[str, Any]]):
+        table = cls(columns)
+        for row in rows:
+            for name, values in table.columns.items():
+                values.append(row.get(name))
+        return table
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()), []))
+
+    def column(self, name: str) -> List[Any]:
+        return self.columns[name]
+
+    def rows(self) -> List[Dict[str, Any]]:
+        names = list(self.columns)
+        return [dict(zip(names, values)) for values in zip(*self.columns.values())]
+
+
+class RunAnalytics:
+    """
+    Analytics over all task logs below a directory (a run or a benchmark)
+    """
+
+    def __init__(self, directory: str):
+        self.directory = os.path.abspath(directory)
+        # file path -> ((mtime_ns, size), task row, tool call rows)
+        self._files: Dict[str, Tuple[Tuple[int, int], Dict, List[Dict]]] = {}
+        self.tasks = ColumnTable(TASK_COLUMNS)
+        self.tool_calls = ColumnTable(TOOL_CALL_COLUMNS)
+        self._lock = threading.Lock()
+
+    def _find_task_logs(self) -> List[str]:
+        return sorted(
+            glob.glob(
+                os.path.join(self.directory, "**", TASK_LOG_PATTERN), recursive=True
+            )
+        )
+
+    def refresh(self) -> int:
+        """
+        Parse new and changed task logs and rebuild the tables if needed
+
+        Returns:
+            Number of task logs parsed by this refresh
+        """
+        with self._lock:
+            seen = set()
+            parsed = 0
+            for path in self._find_task_logs():
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                seen.add(path)
+                version = (stat.st_mtime_ns, stat.st_size)
+                cached = self._files.get(path)
+                if cached is not None and cached[0] == version:
+                    continue
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        log_data = json.load(f)
+                except Exception:
+                    # Logs are rewritten while a task runs; retry next refresh
+                    continue
+                task_row, tool_rows = extract_task_rows(
+                    log_data, os.path.relpath(path, self.directory)
+                )
+                self._files[path] = (version, task_row, tool_rows)
+                parsed += 1
+
+            removed = set(self._files) - seen
+            for path in removed:
+                del self._files[path]
+
+            if parsed or removed:
+                entries = [self._files[path] for path in sorted(self._files)]
+                self.tasks = ColumnTable.from_rows(
+                    TASK_COLUMNS, (entry[1] for entry in entries)
+                )
+                self.tool_calls = ColumnTable.from_rows(
+                    TOOL_CALL_COLUMNS, (row for entry in entries for row in entry[2])
+                )
+            return parsed
+
+    # ==================== Queries ====================
+
+    def summary(self) -> Dict[str, Any]:
+        """Task counts, accuracy and totals of the directory"""
+        judge = self.tasks.column("judge_result")
+        status = self.tasks.column("status")
+        durations = [d for d in self.tasks.column("duration_s") if d is not None]
+        finished = sum(1 for s in status if s in ("success", "failed"))
+        correct = sum(1 for j in judge if j == "CORRECT")
+        return {
+            "directory": self.directory,
+            "total_tasks": len(self.tasks),
+            "finished_tasks": finished,
+            "running_tasks": sum(1 for s in status if s == "running"),
+            "correct": correct,
+            "accuracy": correct / finished * 100 if finished else 0.0,
+            "total_tool_calls": len(self.tool_calls),
+            "total_input_tokens": sum(self.tasks.column("input_tokens")),
+            "total_output_tokens": sum(self.tasks.column("output_tokens")),
+            "mean_duration_s": statistics.mean(durations) if durations else 0.0,
+        }
+
+    def tool_latency(self) -> Dict[str, Any]:
+        """Per-tool call counts, error counts, latency percentiles and histograms"""
+        durations: Dict[str, List[int]] = {}
+        calls: Dict[str, int] = {}
+        errors: Dict[str, int] = {}
+        for tool_name, duration, error in zip(
+            self.tool_calls.column("tool_name"),
+            self.tool_calls.column("duration_ms"),
+            self.tool_calls.column("error"),
+        ):
+            calls[tool_name] = calls.get(tool_name, 0) + 1
+            if error:
+                errors[tool_name] = errors.get(tool_name, 0) + 1
+            if duration is not None:
+                durations.setdefault(tool_name, []).append(duration)
+
+        tools = {}
+        for tool_name in sorted(calls, key=calls.get, reverse=True):
+            values = durations.get(tool_name, [])
+            histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+            for value in values:
+                bucket = next(
+                    (i for i, bound in enumerate(LATENCY_BUCKETS_MS) if value <= bound),
+                    len(LATENCY_BUCKETS_MS),
+                )
+                histogram[bucket] += 1
+            tools[tool_name] = {
+                "calls": calls[tool_name],
+                "errors": errors.get(tool_name, 0),
+                "p50_ms": _percentile(values, 0.5),
+                "p95_ms": _percentile(values, 0.95),
+                "max_ms": max(values) if values else 0,
+                "histogram": histogram,
+            }
+        return {"bucket_bounds_ms": list(LATENCY_BUCKETS_MS), "tools": tools}
+
+    def turns_vs_correctness(self, bucket_size: int = 5) -> List[Dict[str, Any]]:
+        """Accuracy of judged tasks grouped by main agent turn count"""
+        buckets: Dict[int, Dict[str, int]] = {}
+        for turns, judge in zip(
+            self.tasks.column("main_turns"), self.tasks.column("judge_result")
+        ):
+            if not judge:
+                continue
+            start = turns // bucket_size * bucket_size
+            bucket = buckets.setdefault(start, {"tasks": 0, "correct": 0})
+            bucket["tasks"] += 1
+            bucket["correct"] += judge == "CORRECT"
+        return [
+            {
+                "turns_from": start,
+                "turns_to": start + bucket_size - 1,
+                "tasks": bucket["tasks"],
+                "correct": bucket["correct"],
+                "accuracy": bucket["correct"] / bucket["tasks"] * 100,
+            }
+            for start, bucket in sorted(buckets.items())
+        ]
+
+    def _top_tasks(self, key: str, limit: int) -> List[Dict[str, Any]]:
+        rows = [row for row in self.tasks.rows() if row[key] is not None]
+        rows.sort(key=lambda row: row[key], reverse=True)
+        return rows[:limit]
+
+    def token_usage(self, limit: int = 20) -> Dict[str, Any]:
+        """Token totals and the tasks that burned the most tokens"""
+        rows = self.tasks.rows()
+        for row in rows:
+            row["total_tokens"] = row["input_tokens"] + row["output_tokens"]
+        rows.sort(key=lambda row: row["total_tokens"], reverse=True)
+        totals = [row["total_tokens"] for row in rows]
+        return {
+            "total_tokens": sum(totals),
+            "p50_tokens_per_task": _percentile(totals, 0.5),
+            "p95_tokens_per_task": _percentile(totals, 0.95),
+            "top_tasks": rows[:limit],
+        }
+
+    def slowest_tasks(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Tasks with the longest wall time"""
+        return self._top_tasks("duration_s", limit)
+
+
+class RunAnalyticsCache:
+    """LRU cache of RunAnalytics instances keyed by directory"""
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, RunAnalytics]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, directory: str) -> RunAnalytics:
+        """Get the analytics of a directory, refreshed with new task logs"""
+        directory = os.path.abspath(directory)
+        with self._lock:
+            analytics = self._entries.get(directory)
+            if analytics is None:
+                analytics = RunAnalytics(directory)
+                self._entries[directory] = analytics
+            self._entries.move_to_end(directory)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        analytics.refresh()
+        return analytics
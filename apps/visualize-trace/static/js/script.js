@@ -3,6 +3,12 @@ let currentFlowData = null;
 let currentBasicInfo = null;
 let currentFileList = [];
 let currentFileIndex = -1;
+let currentFilePath = null;
+let currentLoadToken = 0;
+const stepContentCache = new Map();
+
+// 每页加载的执行步骤数
+const FLOW_PAGE_SIZE = 50;
 
 // DOM elements
 const elements = {
@@ -294,6 +300,44 @@ async function apiCall(url, options = {}) {
     }
 }
 
+// 构造带trace文件路径的API地址
+function traceApiUrl(path, params = {}) {
+    const query = new URLSearchParams({ file_path: currentFilePath, ...params });
+    return `${path}?${query.toString()}`;
+}
+
+// 按需获取消息完整内容（带缓存）
+async function fetchStepContent(stepId, sessionId = null) {
+    const key = `${currentFilePath}|${sessionId || ''}|${stepId}`;
+    if (!stepContentCache.has(key)) {
+        const params = { step_id: stepId };
+        if (sessionId) {
+            params.session_id = sessionId;
+        }
+        const request = apiCall(traceApiUrl('/api/step_content', params)).catch(error => {
+            stepContentCache.delete(key);
+            throw error;
+        });
+        stepContentCache.set(key, request);
+    }
+    const content = await stepContentCache.get(key);
+    return content.full_content;
+}
+
+// 展开步骤时填充完整内容
+async function fillStepContent(index) {
+    const container = document.querySelector(`#step-content-${index} .rendered-content`);
+    if (!container || container.dataset.loaded === 'true' || !currentFlowData[index]) return;
+
+    container.dataset.loaded = 'true';
+    try {
+        container.innerHTML = renderContent(await fetchStepContent(currentFlowData[index].step_id));
+    } catch (error) {
+        container.dataset.loaded = 'false';
+        container.innerHTML = `<p class="text-danger">加载内容失败: ${error.message}</p>`;
+    }
+}
+
 // 文件管理
 function setDefaultDirectory() {
     // 设置默认目录为上级目录
@@ -470,28 +514,34 @@ async function loadTraceFile() {
     
     showLoading();
     
+    const loadToken = ++currentLoadToken;
+    let firstPage = null;
     try {
         // 加载文件
-        await apiCall('/api/load_trace', {
+        const loaded = await apiCall('/api/load_trace', {
             method: 'POST',
             body: JSON.stringify({ file_path: selectedFile })
         });
+        currentFilePath = loaded.file_path;
+        stepContentCache.clear();
         
-        // 并行加载所有数据
+        // 并行加载所有数据，执行流程只加载第一页
         const [basicInfo, executionSummary, performanceSummary, executionFlow, spansStats, stepLogsStats] = await Promise.all([
-            apiCall('/api/basic_info'),
-            apiCall('/api/execution_summary'),
-            apiCall('/api/performance_summary'),
-            apiCall('/api/execution_flow'),
-            apiCall('/api/spans_summary'),
-            apiCall('/api/step_logs_summary')
+            apiCall(traceApiUrl('/api/basic_info')),
+            apiCall(traceApiUrl('/api/execution_summary')),
+            apiCall(traceApiUrl('/api/performance_summary')),
+            apiCall(traceApiUrl('/api/execution_flow', { offset: 0, limit: FLOW_PAGE_SIZE })),
+            apiCall(traceApiUrl('/api/spans_summary')),
+            apiCall(traceApiUrl('/api/step_logs_summary'))
         ]);
+        if (loadToken !== currentLoadToken) return;
+        firstPage = executionFlow;
         
         // 更新界面
         updateBasicInfo(basicInfo);
         updateExecutionSummary(executionSummary);
         updatePerformanceSummary(performanceSummary);
-        updateExecutionFlow(executionFlow);
+        updateExecutionFlow(executionFlow.steps);
         updateSpansStats(spansStats);
         updateStepLogsStats(stepLogsStats);
         
@@ -508,6 +558,24 @@ async function loadTraceFile() {
     } finally {
         hideLoading();
     }
+    
+    // 后台加载其余步骤
+    if (firstPage) {
+        await loadRemainingFlowPages(firstPage.total, loadToken);
+    }
+}
+
+async function loadRemainingFlowPages(total, loadToken) {
+    try {
+        for (let offset = currentFlowData.length; offset < total; offset += FLOW_PAGE_SIZE) {
+            const page = await apiCall(traceApiUrl('/api/execution_flow', { offset, limit: FLOW_PAGE_SIZE }));
+            // 已切换到其他文件
+            if (loadToken !== currentLoadToken) return;
+            appendExecutionFlow(page.steps);
+        }
+    } catch (error) {
+        showError('加载执行流程失败: ' + error.message);
+    }
 }
 
 // 界面更新函数
@@ -591,7 +659,7 @@ function updatePerformanceSummary(data) {
 }
 
 function updateExecutionFlow(data) {
-    currentFlowData = data;
+    currentFlowData = [];
     
     if (!data || data.length === 0) {
         elements.executionFlow.innerHTML = '<p class="text-muted">无执行流程数据</p>';
@@ -603,20 +671,30 @@ function updateExecutionFlow(data) {
     const stepsContainer = document.createElement('div');
     stepsContainer.className = 'execution-steps-container';
     
-    data.forEach((step, index) => {
-        const stepElement = document.createElement('div');
-        stepElement.innerHTML = createStepHTML(step, index);
-        stepsContainer.appendChild(stepElement.firstElementChild);
-    });
-    
     elements.executionFlow.innerHTML = '';
     elements.executionFlow.appendChild(stepsContainer);
     
-    // 更新导航列表
-    updateNavigationList(data);
+    appendExecutionFlow(data);
+}
+
+// 追加一页执行步骤
+function appendExecutionFlow(data) {
+    const stepsContainer = elements.executionFlow.querySelector('.execution-steps-container');
+    const startIndex = currentFlowData.length;
+    
+    data.forEach((step, offset) => {
+        const stepElement = document.createElement('div');
+        stepElement.innerHTML = createStepHTML(step, startIndex + offset);
+        const element = stepElement.firstElementChild;
+        stepsContainer.appendChild(element);
+        
+        // 绑定事件监听器
+        bindStepEventListeners(element);
+    });
+    currentFlowData.push(...data);
     
-    // 绑定事件监听器
-    bindStepEventListeners();
+    // 更新导航列表
+    updateNavigationList(data, startIndex);
 }
 
 function createStepHTML(step, index) {
@@ -626,9 +704,8 @@ function createStepHTML(step, index) {
                      'assistant-message';
     const agentClass = step.agent.includes('browser') ? 'browser-agent' : '';
     
-    // 渲染内容
+    // 渲染内容，被截断的完整内容在展开时加载
     const renderedPreview = renderContent(step.content_preview);
-    const renderedFullContent = renderContent(step.full_content);
     
     return `
         <div class="execution-step fade-in" data-step-id="${step.step_id}" data-agent="${step.agent}" id="step-${index}">
@@ -657,7 +734,11 @@ function createStepHTML(step, index) {
             <div class="step-content collapse" id="step-content-${index}">
                 <div class="mb-3">
                     <h6>完整内容:</h6>
-                    <div class="rendered-content">${renderedFullContent}</div>
+                    ${step.truncated ? `
+                        <div class="rendered-content" data-loaded="false"><p class="text-muted">加载中...</p></div>
+                    ` : `
+                        <div class="rendered-content" data-loaded="true">${renderedPreview}</div>
+                    `}
                 </div>
                 
                 ${step.tool_calls.length > 0 ? `
@@ -719,11 +800,10 @@ function createBrowserStepHTML(step, parentIndex) {
     const browserId = `browser-${parentIndex}-${step.step_id}`;
     
     // 判断内容是否被截断
-    const isContentTruncated = step.full_content && step.content_preview.length < step.full_content.length;
+    const isContentTruncated = step.truncated;
     
     // 渲染内容
     const renderedPreview = renderContent(step.content_preview);
-    const renderedFullContent = renderContent(step.full_content);
     
     return `
         <div class="browser-step ${step.role}" id="browser-step-${parentIndex}-${step.step_id}">
@@ -826,9 +906,9 @@ function updateStepLogsStats(data) {
 }
 
 // 事件处理函数
-function bindStepEventListeners() {
+function bindStepEventListeners(root = document) {
     // 步骤折叠/展开
-    document.querySelectorAll('.step-header').forEach(header => {
+    root.querySelectorAll('.step-header').forEach(header => {
         header.addEventListener('click', function() {
             const target = this.getAttribute('data-target');
             const content = document.querySelector(target);
@@ -840,6 +920,7 @@ function bindStepEventListeners() {
             } else {
                 content.classList.add('show');
                 icon.className = 'fas fa-chevron-up';
+                fillStepContent(parseInt(target.replace('#step-content-', '')));
             }
         });
     });
@@ -847,8 +928,9 @@ function bindStepEventListeners() {
 
 function expandAllSteps() {
     // 展开main agent的步骤
-    document.querySelectorAll('.step-content').forEach(content => {
+    document.querySelectorAll('.step-content').forEach((content, index) => {
         content.classList.add('show');
+        fillStepContent(index);
     });
     document.querySelectorAll('.step-toggle i').forEach(icon => {
         icon.className = 'fas fa-chevron-up';
@@ -883,7 +965,7 @@ function collapseAllSteps() {
 
 // 切换内容预览展开/收起
 // 切换browser预览展开/收起
-function toggleBrowserPreview(browserId, parentIndex, browserStepId) {
+async function toggleBrowserPreview(browserId, parentIndex, browserStepId) {
     const previewElement = document.getElementById(`browser-preview-${browserId}`);
     const button = previewElement.querySelector('.expand-preview-btn');
     const isExpanded = button.getAttribute('data-expanded') === 'true';
@@ -908,7 +990,14 @@ function toggleBrowserPreview(browserId, parentIndex, browserStepId) {
         `;
     } else {
         // 展开
-        const renderedFullContent = renderContent(browserStep.full_content);
+        let fullContent;
+        try {
+            fullContent = await fetchStepContent(browserStep.step_id, parentStep.browser_session);
+        } catch (error) {
+            showError('加载内容失败: ' + error.message);
+            return;
+        }
+        const renderedFullContent = renderContent(fullContent);
         previewElement.querySelector('.preview-text').innerHTML = `
             ${renderedFullContent}
             <button class="btn btn-link btn-sm p-0 ms-2 expand-preview-btn" onclick="toggleBrowserPreview('${browserId}', ${parentIndex}, ${browserStepId})" data-expanded="true">
@@ -918,13 +1007,25 @@ function toggleBrowserPreview(browserId, parentIndex, browserStepId) {
     }
 }
 
-function showFullMessage(stepId) {
+async function showFullMessage(stepId) {
     if (!currentFlowData) return;
     
     const step = currentFlowData.find(s => s.step_id === stepId);
     if (!step) return;
     
-    const renderedFullContent = renderContent(step.full_content);
+    let fullContent, browserContents;
+    try {
+        [fullContent, browserContents] = await Promise.all([
+            fetchStepContent(step.step_id),
+            Promise.all((step.browser_flow || []).map(browserStep =>
+                fetchStepContent(browserStep.step_id, step.browser_session)
+            ))
+        ]);
+    } catch (error) {
+        showError('加载内容失败: ' + error.message);
+        return;
+    }
+    const renderedFullContent = renderContent(fullContent);
     
     const modal = new bootstrap.Modal(elements.messageModal);
     elements.messageContent.innerHTML = `
@@ -965,7 +1066,7 @@ function showFullMessage(stepId) {
                 <h6>Browser会话详情:</h6>
                 <div class="accordion" id="browserAccordion">
                     ${step.browser_flow.map((browserStep, index) => {
-                        const renderedBrowserContent = renderContent(browserStep.full_content);
+                        const renderedBrowserContent = renderContent(browserContents[index]);
                         return `
                             <div class="accordion-item">
                                 <h2 class="accordion-header">
@@ -1002,13 +1103,14 @@ function showFullMessage(stepId) {
 
 // ==================== 导航功能 ====================
 
-function updateNavigationList(data) {
-    if (!data || data.length === 0) {
+function updateNavigationList(data, startIndex = 0) {
+    if (startIndex === 0 && (!data || data.length === 0)) {
         elements.navigationList.innerHTML = '<p class="text-muted p-3 mb-0">暂无步骤</p>';
         return;
     }
     
-    const navigationHTML = data.map((step, index) => {
+    const navigationHTML = data.map((step, offset) => {
+        const index = startIndex + offset;
         const summary = truncateText(step.content_preview, 50);
         const toolsInfo = step.tool_calls.length > 0 ? ` (${step.tool_calls.length}工具)` : '';
         const browserInfo = step.browser_session ? ' [浏览器]' : '';
@@ -1053,7 +1155,11 @@ function updateNavigationList(data) {
         return html;
     }).join('');
     
-    elements.navigationList.innerHTML = navigationHTML;
+    if (startIndex === 0) {
+        elements.navigationList.innerHTML = navigationHTML;
+    } else {
+        elements.navigationList.insertAdjacentHTML('beforeend', navigationHTML);
+    }
 }
 
 function scrollToStep(stepIndex) {
@@ -1075,6 +1181,7 @@ function scrollToStep(stepIndex) {
             });
             collapseInstance.show();
         }
+        fillStepContent(stepIndex);
     }
 }
 
@@ -2,8 +2,69 @@
 # This source code is licensed under the MIT License.
 
 import json
+import os
 import re
-from typing import Any, Dict, List, Optional
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Characters of message text shown in flow previews
+PREVIEW_CHARS = 200
+
+# Number of analyzed trace files kept in memory
+DEFAULT_CACHE_SIZE = 8
+
+MCP_TOOL_START = "<use_mcp_tool>"
+
+# Tool block up to its arguments. Names cannot contain "<", so a malformed
+# block fails at the next tag instead of scanning the rest of the text.
+MCP_TOOL_HEADER_PATTERN = re.compile(
+    r"<use_mcp_tool>\s*<server_name>([^<]*)</server_name>\s*"
+    r"<tool_name>([^<]*)</tool_name>\s*<arguments>"
+)
+MCP_TOOL_TAIL_PATTERN = re.compile(r"\s*</use_mcp_tool>")
+
+
+def iter_mcp_tool_blocks(text: str) -> Iterator[Tuple[str, str, str]]:
+    """
+    Yield complete <use_mcp_tool> blocks as (server_name, tool_name, arguments).
+
+    Single pass and linear in the text length, also for unterminated tags
+    (same scanner as miroflow-agent's parsing_utils.scan_mcp_tool_blocks).
+    """
+    pos = 0
+    arguments_end = -1
+    while True:
+        start = text.find(MCP_TOOL_START, pos)
+        if start < 0:
+            return
+        header = MCP_TOOL_HEADER_PATTERN.match(text, start)
+        if header is None:
+            pos = start + len(MCP_TOOL_START)
+            continue
+
+        # The arguments end at the first </arguments> closing the block
+        search = header.end()
+        block_end = None
+        while True:
+            if arguments_end < search:
+                arguments_end = text.find("</arguments>", search)
+            if arguments_end < 0:
+                return  # No later block can be complete either
+            tail = MCP_TOOL_TAIL_PATTERN.match(
+                text, arguments_end + len("</arguments>")
+            )
+            if tail:
+                block_end = tail.end()
+                break
+            search = arguments_end + 1
+
+        yield (
+            header.group(1).strip(),
+            header.group(2).strip(),
+            text[header.end() : arguments_end].strip(),
+        )
+        pos = block_end
 
 
 class TraceAnalyzer:
@@ -25,6 +86,11 @@ class TraceAnalyzer:
         self.json_file_path = json_file_path
         self.data = self._load_json()
 
+        # Derived views, built on first use and reused by every request
+        self._index_lock = threading.Lock()
+        self._flow: Optional[List[Dict[str, Any]]] = None
+        self._execution_summary: Optional[Dict[str, Any]] = None
+
     def _load_json(self) -> Dict[str, Any]:
         """Load JSON file"""
         try:
@@ -134,14 +200,7 @@ class TraceAnalyzer:
 
     def parse_mcp_tool_call(self, text: str) -> Optional[Dict[str, Any]]:
         """Parse MCP tool call"""
-        pattern = r"<use_mcp_tool>\s*<server_name>(.*?)</server_name>\s*<tool_name>(.*?)</tool_name>\s*<arguments>\s*(.*?)\s*</arguments>\s*</use_mcp_tool>"
-
-        match = re.search(pattern, text, re.DOTALL)
-        if match:
-            server_name = match.group(1).strip()
-            tool_name = match.group(2).strip()
-            arguments_str = match.group(3).strip()
-
+        for server_name, tool_name, arguments_str in iter_mcp_tool_blocks(text):
             try:
                 arguments = json.loads(arguments_str)
             except json.JSONDecodeError:
@@ -165,190 +224,204 @@ class TraceAnalyzer:
             return "".join(text_parts)
         return str(content)
 
+    def _parse_tool_calls(
+        self, message: Dict[str, Any], text_content: str
+    ) -> List[Dict[str, Any]]:
+        """Parse new format tool_calls and old format MCP tool calls of a message"""
+        tool_calls = []
+
+        # Check for new format tool_calls
+        for tool_call in message.get("tool_calls") or []:
+            # Convert new format to unified format
+            if "function" in tool_call:
+                function_info = tool_call["function"]
+                tool_name = function_info.get("name", "")
+                arguments = function_info.get("arguments", "")
+
+                # Parse arguments string as JSON (if it's a string)
+                if isinstance(arguments, str):
+                    try:
+                        arguments = json.loads(arguments)
+                    except json.JSONDecodeError:
+                        pass
+
+                # Extract server_name from tool_name (if available)
+                server_name, actual_tool_name = self._parse_new_format_tool_name(
+                    tool_name
+                )
+
+                tool_calls.append(
+                    {
+                        "server_name": server_name,
+                        "tool_name": actual_tool_name,
+                        "arguments": arguments,
+                        "id": tool_call.get("id", ""),
+                        "type": tool_call.get("type", "function"),
+                        "format": "new",
+                    }
+                )
+
+        # Check for old format MCP tool calls (maintain compatibility)
+        mcp_tool_call = self.parse_mcp_tool_call(text_content)
+        if mcp_tool_call:
+            mcp_tool_call["format"] = "mcp"  # Mark as old format
+            tool_calls.append(mcp_tool_call)
+
+        return tool_calls
+
+    def _build_step(
+        self, step_id: int, agent: str, message: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build a flow step for one message"""
+        role = message.get("role")
+        text_content = self.extract_text_content(message.get("content", []))
+        truncated = len(text_content) > PREVIEW_CHARS
+
+        return {
+            "step_id": step_id,
+            "agent": agent,
+            "role": role,
+            "content_preview": text_content[:PREVIEW_CHARS] + "..."
+            if truncated
+            else text_content,
+            "full_content": text_content,
+            "truncated": truncated,
+            "tool_calls": self._parse_tool_calls(message, text_content)
+            if role == "assistant"
+            else [],
+            "timestamp": message.get("timestamp", ""),
+        }
+
     def analyze_conversation_flow(self) -> List[Dict[str, Any]]:
-        """Analyze conversation flow, including tool calls"""
+        """
+        Analyze conversation flow, including tool calls
+
+        The flow is built once per analyzer and shared by all later calls, so
+        callers must not modify it.
+        """
+        with self._index_lock:
+            if self._flow is None:
+                self._flow = self._build_conversation_flow()
+        return self._flow
+
+    def _build_conversation_flow(self) -> List[Dict[str, Any]]:
         flow_steps = []
-        main_messages = self.get_main_agent_messages()
         sub_agent_sessions = self.get_browser_agent_sessions()
 
         sub_agent_call_count = 0
 
-        for i, message in enumerate(main_messages):
-            role = message.get("role")
-            content = message.get("content", [])
-
-            text_content = self.extract_text_content(content)
-
-            step = {
-                "step_id": i,
-                "agent": "main_agent",
-                "role": role,
-                "content_preview": text_content[:200] + "..."
-                if len(text_content) > 200
-                else text_content,
-                "full_content": text_content,
-                "tool_calls": [],
-                "browser_session": None,
-                "timestamp": message.get("timestamp", ""),
-                "browser_flow": [],
-            }
+        for i, message in enumerate(self.get_main_agent_messages()):
+            step = self._build_step(i, "main_agent", message)
+            step["browser_session"] = None
+            step["browser_flow"] = []
+
+            # Associate sub-agent calls with their sessions, in call order
+            for tool_call in step["tool_calls"]:
+                server_name = tool_call["server_name"]
+                if server_name.startswith("agent-"):
+                    sub_agent_call_count += 1
+                    session_id = f"{server_name}_{sub_agent_call_count}"
+                elif server_name.startswith("browsing-agent"):
+                    sub_agent_call_count += 1
+                    session_id = f"browser_agent_{sub_agent_call_count}"
+                else:
+                    continue
+                step["browser_session"] = session_id
 
-            # If it's an assistant message, check for tool calls
-            if role == "assistant":
-                # Check for new format tool_calls
-                if "tool_calls" in message and message["tool_calls"]:
-                    for tool_call in message["tool_calls"]:
-                        # Convert new format to unified format
-                        if "function" in tool_call:
-                            function_info = tool_call["function"]
-                            tool_name = function_info.get("name", "")
-                            arguments = function_info.get("arguments", "")
-
-                            # Parse arguments string as JSON (if it's a string)
-                            if isinstance(arguments, str):
-                                try:
-                                    arguments = json.loads(arguments)
-                                except json.JSONDecodeError:
-                                    pass
-
-                            # Extract server_name from tool_name (if available)
-                            server_name, actual_tool_name = (
-                                self._parse_new_format_tool_name(tool_name)
-                            )
-
-                            parsed_tool_call = {
-                                "server_name": server_name,
-                                "tool_name": actual_tool_name,
-                                "arguments": arguments,
-                                "id": tool_call.get("id", ""),
-                                "type": tool_call.get("type", "function"),
-                                "format": "new",
-                            }
-                            step["tool_calls"].append(parsed_tool_call)
-
-                            # Handle browser agent calls - maintain complete consistency with MCP format logic
-                            if server_name.startswith("agent-"):
-                                sub_agent_call_count += 1
-                                session_id = f"{server_name}_{sub_agent_call_count}"
-                                step["browser_session"] = session_id
-
-                                # Analyze browser session conversation flow
-                                if session_id in sub_agent_sessions:
-                                    browser_flow = self.analyze_browser_session_flow(
-                                        session_id
-                                    )
-                                    step["browser_flow"] = browser_flow
-                            elif server_name.startswith("browsing-agent"):
-                                sub_agent_call_count += 1
-                                session_id = f"browser_agent_{sub_agent_call_count}"
-                                step["browser_session"] = session_id
-
-                                # Analyze browser session conversation flow
-                                if session_id in sub_agent_sessions:
-                                    browser_flow = self.analyze_browser_session_flow(
-                                        session_id
-                                    )
-                                    step["browser_flow"] = browser_flow
-
-                # Check for old format MCP tool calls (maintain compatibility)
-                mcp_tool_call = self.parse_mcp_tool_call(text_content)
-                if mcp_tool_call:
-                    mcp_tool_call["format"] = "mcp"  # Mark as old format
-                    step["tool_calls"].append(mcp_tool_call)
-
-                    # If browsing-agent is called, associate browser session
-                    if mcp_tool_call["server_name"].startswith("agent-"):
-                        sub_agent_call_count += 1
-                        session_id = (
-                            f"{mcp_tool_call['server_name']}_{sub_agent_call_count}"
-                        )
-                        step["browser_session"] = session_id
-
-                        # Analyze browser session conversation flow
-                        if session_id in sub_agent_sessions:
-                            browser_flow = self.analyze_browser_session_flow(session_id)
-                            step["browser_flow"] = browser_flow
-                    elif mcp_tool_call["server_name"].startswith("browsing-agent"):
-                        sub_agent_call_count += 1
-                        session_id = f"browser_agent_{sub_agent_call_count}"
-                        step["browser_session"] = session_id
-
-                        # Analyze browser session conversation flow
-                        if session_id in sub_agent_sessions:
-                            browser_flow = self.analyze_browser_session_flow(session_id)
-                            step["browser_flow"] = browser_flow
+                # Analyze browser session conversation flow
+                if session_id in sub_agent_sessions:
+                    step["browser_flow"] = self.analyze_browser_session_flow(session_id)
             flow_steps.append(step)
 
         return flow_steps
 
     def analyze_browser_session_flow(self, session_id: str) -> List[Dict[str, Any]]:
         """Analyze browser session conversation flow"""
-        browser_messages = self.get_browser_agent_session_messages(session_id)
-        browser_flow = []
-
-        for i, message in enumerate(browser_messages):
-            role = message.get("role")
-            content = message.get("content", [])
-
-            text_content = self.extract_text_content(content)
-
-            step = {
-                "step_id": i,
-                "agent": session_id,
-                "role": role,
-                "content_preview": text_content[:200] + "..."
-                if len(text_content) > 200
-                else text_content,
-                "full_content": text_content,
-                "tool_calls": [],
-                "timestamp": message.get("timestamp", ""),
-            }
+        return [
+            self._build_step(i, session_id, message)
+            for i, message in enumerate(
+                self.get_browser_agent_session_messages(session_id)
+            )
+        ]
+
+    # ==================== Paginated Access ====================
+
+    @staticmethod
+    def _preview_step(step: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of a flow step without full message content"""
+        preview = {key: value for key, value in step.items() if key != "full_content"}
+        if step.get("browser_flow"):
+            preview["browser_flow"] = [
+                TraceAnalyzer._preview_step(browser_step)
+                for browser_step in step["browser_flow"]
+            ]
+        return preview
+
+    def get_flow_page(
+        self, offset: int = 0, limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Get a window of the conversation flow with message previews only
 
-            # If it's an assistant message, check for tool calls
-            if role == "assistant":
-                # Check for new format tool_calls
-                if "tool_calls" in message and message["tool_calls"]:
-                    for tool_call in message["tool_calls"]:
-                        # Convert new format to unified format
-                        if "function" in tool_call:
-                            function_info = tool_call["function"]
-                            tool_name = function_info.get("name", "")
-                            arguments = function_info.get("arguments", "")
-
-                            # Parse arguments string as JSON (if it's a string)
-                            if isinstance(arguments, str):
-                                try:
-                                    arguments = json.loads(arguments)
-                                except json.JSONDecodeError:
-                                    pass
-
-                            # Extract server_name from tool_name (if available)
-                            server_name, actual_tool_name = (
-                                self._parse_new_format_tool_name(tool_name)
-                            )
-
-                            parsed_tool_call = {
-                                "server_name": server_name,
-                                "tool_name": actual_tool_name,
-                                "arguments": arguments,
-                                "id": tool_call.get("id", ""),
-                                "type": tool_call.get("type", "function"),
-                                "format": "new",
-                            }
-                            step["tool_calls"].append(parsed_tool_call)
-
-                # Check for old format MCP tool calls (maintain compatibility)
-                mcp_tool_call = self.parse_mcp_tool_call(text_content)
-                if mcp_tool_call:
-                    mcp_tool_call["format"] = "mcp"  # Mark as old format
-                    step["tool_calls"].append(mcp_tool_call)
-
-            browser_flow.append(step)
-
-        return browser_flow
+        Args:
+            offset: Index of the first main agent step
+            limit: Maximum number of steps (None for all remaining steps)
+
+        Returns:
+            Dictionary with the total step count and the preview steps;
+            full content is fetched per message with get_step_content
+        """
+        flow_steps = self.analyze_conversation_flow()
+        offset = max(offset, 0)
+        end = len(flow_steps) if limit is None else offset + max(limit, 0)
+        return {
+            "total": len(flow_steps),
+            "offset": offset,
+            "steps": [self._preview_step(step) for step in flow_steps[offset:end]],
+        }
+
+    def get_step_content(
+        self, step_id: int, session_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get the full content of one message
+
+        Args:
+            step_id: Step index within the main agent flow or the session
+            session_id: Sub-agent session ID, None for the main agent
+
+        Returns:
+            Step with its full content and tool calls
+        """
+        if session_id is None:
+            steps = self.analyze_conversation_flow()
+        else:
+            steps = next(
+                (
+                    step["browser_flow"]
+                    for step in self.analyze_conversation_flow()
+                    if step.get("browser_session") == session_id
+                ),
+                [],
+            )
+        if not 0 <= step_id < len(steps):
+            raise IndexError(f"Step {step_id} not found")
+        step = steps[step_id]
+        return {
+            "step_id": step["step_id"],
+            "agent": step["agent"],
+            "role": step["role"],
+            "full_content": step["full_content"],
+            "tool_calls": step["tool_calls"],
+        }
 
     def get_execution_summary(self) -> Dict[str, Any]:
         """Get execution summary information"""
+        if self._execution_summary is None:
+            self._execution_summary = self._build_execution_summary()
+        return self._execution_summary
+
+    def _build_execution_summary(self) -> Dict[str, Any]:
         flow_steps = self.analyze_conversation_flow()
 
         total_steps = len(flow_steps)
@@ -437,3 +510,41 @@ class TraceAnalyzer:
             "status_distribution": status_count,
             "step_type_distribution": step_type_count,
         }
+
+
+class TraceAnalyzerCache:
+    """
+    LRU cache of TraceAnalyzer instances keyed by file path
+
+    An entry is rebuilt when the file's modification time or size changes, so
+    every user browsing a trace shares one parsed index of it.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], TraceAnalyzer]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(self, file_path: str) -> TraceAnalyzer:
+        """Get the analyzer of a file, loading it if missing or stale"""
+        file_path = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        version = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(file_path)
+                return entry[1]
+
+        # Parse outside the lock so other files stay available meanwhile
+        analyzer = TraceAnalyzer(file_path)
+
+        with self._lock:
+            self._entries[file_path] = (version, analyzer)
+            self._entries.move_to_end(file_path)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return analyzer
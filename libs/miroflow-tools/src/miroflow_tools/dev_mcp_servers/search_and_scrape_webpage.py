@@ -14,13 +14,9 @@ from tenacity import (
     stop_after_attempt,
     wait_exponential,
 )
-from tencentcloud.common import credential
-from tencentcloud.common.common_client import CommonClient
 from tencentcloud.common.exception.tencent_cloud_sdk_exception import (
     TencentCloudSDKException,
 )
-from tencentcloud.common.profile.client_profile import ClientProfile
-from tencentcloud.common.profile.http_profile import HttpProfile
 
 from ..mcp_servers.utils.url_unquote import decode_http_urls_in_dict
 
@@ -206,6 +202,12 @@ async def google_search(
 )
 async def make_sogou_request(query: str, cnt: int) -> Dict[str, Any]:
     """Make request to Tencent Cloud SearchPro API with retry logic."""
+    # The SDK client is imported on first use to keep server startup fast
+    from tencentcloud.common import credential
+    from tencentcloud.common.common_client import CommonClient
+    from tencentcloud.common.profile.client_profile import ClientProfile
+    from tencentcloud.common.profile.http_profile import HttpProfile
+
     cred = credential.Credential(TENCENTCLOUD_SECRET_ID, TENCENTCLOUD_SECRET_KEY)
     httpProfile = HttpProfile()
     httpProfile.endpoint = "wsa.tencentcloudapi.com"
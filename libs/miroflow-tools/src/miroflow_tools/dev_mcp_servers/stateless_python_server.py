@@ -3,7 +3,6 @@
 
 import os
 
-from e2b_code_interpreter import Sandbox
 from mcp.server.fastmcp import FastMCP
 
 # Initialize FastMCP server
@@ -28,6 +27,8 @@ async def python(code: str) -> str:
         Returns:
             A string containing the execution result including stdout and stderr.
     """
+    from e2b_code_interpreter import Sandbox
+
     sandbox = Sandbox.create(
         timeout=DEFAULT_TIMEOUT, api_key=E2B_API_KEY, template="1av7fdjfvcparqo8efq6"
     )
@@ -2,7 +2,9 @@
 # This source code is licensed under the MIT License.
 
 import asyncio
+import contextlib
 import functools
+import time
 from typing import Any, Awaitable, Callable, Protocol, TypeVar
 
 from mcp import ClientSession, StdioServerParameters  # (already imported in config.py)
@@ -15,6 +17,10 @@ from .mcp_servers.browser_session import PlaywrightSession
 
 R = TypeVar("R")
 
+# Metrics recorded into the registry set with set_metrics()
+TOOL_CALLS_METRIC = "miroflow_tool_calls_total"
+TOOL_LATENCY_METRIC = "miroflow_tool_call_seconds"
+
 
 def with_timeout(timeout_s: float = 300.0):
     """
@@ -58,6 +64,8 @@ class ToolManager(ToolManagerProtocol):
         self.browser_session = None
         self.tool_blacklist = tool_blacklist if tool_blacklist else set()
         self.task_log = None
+        self.tracer = None
+        self.metrics = None
 
     def set_task_log(self, task_log):
         """Set the task logger for structured logging."""
@@ -69,11 +77,48 @@ class ToolManager(ToolManagerProtocol):
             f"ToolManager initialized, loaded servers: {list(self.server_dict.keys())}",
         )
 
+    def set_tracer(self, tracer):
+        """Set the tracer that times tool calls (span() and record_span(), or None)."""
+        self.tracer = tracer
+
+    def set_metrics(self, metrics):
+        """Set the metrics registry that counts and times tool calls (or None)."""
+        self.metrics = metrics
+
+    def _observe_tool_call(self, server_name, tool_name, start_time, result):
+        """Record a finished tool call in the metrics registry if one is set."""
+        if self.metrics is None:
+            return
+        status = "error" if "error" in result else "ok"
+        self.metrics.counter(
+            TOOL_CALLS_METRIC, "Tool calls", ("server", "tool", "status")
+        ).inc(server=server_name, tool=tool_name, status=status)
+        self.metrics.histogram(
+            TOOL_LATENCY_METRIC, "Tool call latency", ("server", "tool")
+        ).observe(time.time() - start_time, server=server_name, tool=tool_name)
+
+    def _span(self, name, **attributes):
+        """Time a block with the tracer if one is set."""
+        if self.tracer is None:
+            return contextlib.nullcontext()
+        return self.tracer.span(name, **attributes)
+
+    def _record_span(self, name, start_ns, **attributes):
+        """Record a block timed from start_ns until now with the tracer if one is set."""
+        if self.tracer is not None:
+            self.tracer.record_span(name, start_ns, time.time_ns(), **attributes)
+
     def _log(self, level, step_name, message, metadata=None):
         """Helper method to log using task_log if available, otherwise skip logging."""
         if self.task_log:
             self.task_log.log_step(level, step_name, message, metadata)
 
+    async def close(self):
+        """Close the persistent browser session (and its server process) if one is open."""
+        if self.browser_session is not None:
+            browser_session, self.browser_session = self.browser_session, None
+            await browser_session.close()
+
     def _is_huggingface_dataset_or_space_url(self, url):
         """
         Check if the URL is a Hugging Face dataset or space URL.
@@ -203,7 +248,18 @@ class ToolManager(ToolManagerProtocol):
         :param arguments: Tool arguments dictionary
         :return: Dictionary containing result or error
         """
-
+        with self._span(
+            "tool.call", server_name=server_name, tool_name=tool_name
+        ) as span:
+            start_time = time.time()
+            result = await self._execute_tool_call(server_name, tool_name, arguments)
+            self._observe_tool_call(server_name, tool_name, start_time, result)
+            if span is not None and "error" in result:
+                span.set_error(str(result["error"]))
+            return result
+
+    async def _execute_tool_call(self, server_name, tool_name, arguments) -> Any:
+        """Execute a single tool call; see execute_tool_call."""
         # Original remote server call logic
         server_params = self.get_server_params(server_name)
         if not server_params:
@@ -229,10 +285,12 @@ class ToolManager(ToolManagerProtocol):
             try:
                 if self.browser_session is None:
                     self.browser_session = PlaywrightSession(server_params)
-                    await self.browser_session.connect()
-                tool_result = await self.browser_session.call_tool(
-                    tool_name, arguments=arguments
-                )
+                    with self._span("mcp.connect"):
+                        await self.browser_session.connect()
+                with self._span("mcp.call_tool"):
+                    tool_result = await self.browser_session.call_tool(
+                        tool_name, arguments=arguments
+                    )
                 return {
                     "server_name": server_name,
                     "tool_name": tool_name,
@@ -248,15 +306,19 @@ class ToolManager(ToolManagerProtocol):
             try:
                 result_content = None
                 if isinstance(server_params, StdioServerParameters):
+                    connect_start_ns = time.time_ns()
                     async with stdio_client(server_params) as (read, write):
                         async with ClientSession(
                             read, write, sampling_callback=None
                         ) as session:
-                            await session.initialize()
+                            self._record_span("mcp.spawn", connect_start_ns)
+                            with self._span("mcp.initialize"):
+                                await session.initialize()
                             try:
-                                tool_result = await session.call_tool(
-                                    tool_name, arguments=arguments
-                                )
+                                with self._span("mcp.call_tool"):
+                                    tool_result = await session.call_tool(
+                                        tool_name, arguments=arguments
+                                    )
                                 result_content = (
                                     tool_result.content[-1].text
                                     if tool_result.content
@@ -279,15 +341,19 @@ class ToolManager(ToolManagerProtocol):
                 elif isinstance(server_params, str) and server_params.startswith(
                     ("http://", "https://")
                 ):
+                    connect_start_ns = time.time_ns()
                     async with sse_client(server_params) as (read, write):
                         async with ClientSession(
                             read, write, sampling_callback=None
                         ) as session:
-                            await session.initialize()
+                            self._record_span("mcp.connect", connect_start_ns)
+                            with self._span("mcp.initialize"):
+                                await session.initialize()
                             try:
-                                tool_result = await session.call_tool(
-                                    tool_name, arguments=arguments
-                                )
+                                with self._span("mcp.call_tool"):
+                                    tool_result = await session.call_tool(
+                                        tool_name, arguments=arguments
+                                    )
                                 result_content = (
                                     tool_result.content[-1].text
                                     if tool_result.content
@@ -12,8 +12,6 @@ from urllib.parse import urlparse
 
 import requests
 from fastmcp import FastMCP
-from mutagen import File as MutagenFile
-from openai import OpenAI
 
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL", "https://api.openai.com/v1")
@@ -83,6 +81,8 @@ def _get_audio_duration(audio_path: str) -> float:
 
     # Try using mutagen for other audio formats (mp3, etc)
     try:
+        from mutagen import File as MutagenFile
+
         audio = MutagenFile(audio_path)
         if (
             audio is not None
@@ -138,6 +138,8 @@ async def audio_transcription(audio_path_or_url: str) -> str:
     transcription = None
 
     # Create client once outside the retry loop
+    from openai import OpenAI
+
     client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
 
     while retry < max_retries:
@@ -214,6 +216,8 @@ async def audio_question_answering(audio_path_or_url: str, question: str) -> str
     retry = 0
 
     # Create client once outside the retry loop
+    from openai import OpenAI
+
     client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
 
     # Initialize variables to avoid scope issues
@@ -12,8 +12,6 @@ from urllib.parse import urlparse
 
 import requests
 from fastmcp import FastMCP
-from mutagen import File as MutagenFile
-from openai import OpenAI
 
 WHISPER_API_KEY = os.environ.get("WHISPER_API_KEY")
 WHISPER_BASE_URL = os.environ.get("WHISPER_BASE_URL")
@@ -83,6 +81,8 @@ def _get_audio_duration(audio_path: str) -> float:
 
     # Try using mutagen for other audio formats (mp3, etc)
     try:
+        from mutagen import File as MutagenFile
+
         audio = MutagenFile(audio_path)
         if (
             audio is not None
@@ -136,6 +136,8 @@ async def audio_transcription(audio_path_or_url: str) -> str:
 
     while retry < max_retries:
         try:
+            from openai import OpenAI
+
             client = OpenAI(base_url=WHISPER_BASE_URL, api_key=WHISPER_API_KEY)
             if os.path.exists(audio_path_or_url):  # Check if the file exists locally
                 with open(audio_path_or_url, "rb") as audio_file:
@@ -6,10 +6,11 @@ import os
 import shlex
 from urllib.parse import urlparse
 
-from e2b_code_interpreter import Sandbox
 from fastmcp import FastMCP
 
 # Initialize FastMCP server
+# (each stdio call starts a fresh interpreter, so the e2b SDK is imported by
+# the tools that need it rather than at startup)
 mcp = FastMCP("e2b-python-interpreter")
 
 # API keys
@@ -101,6 +102,8 @@ async def create_sandbox(timeout: int = DEFAULT_TIMEOUT) -> str:
     for attempt in range(1, max_retries + 1):
         sandbox = None
         try:
+            from e2b_code_interpreter import Sandbox
+
             sandbox = Sandbox(
                 template=DEFAULT_TEMPLATE_ID,
                 timeout=timeout,
@@ -140,6 +143,8 @@ async def run_command(command: str, sandbox_id: str) -> str:
         return f"[ERROR]: '{sandbox_id}' is not a valid sandbox_id. Please create a real sandbox first using the create_sandbox tool."
 
     try:
+        from e2b_code_interpreter import Sandbox
+
         sandbox = Sandbox.connect(sandbox_id, api_key=E2B_API_KEY)
     except Exception:
         return f"[ERROR]: Failed to connect to sandbox {sandbox_id}. Make sure the sandbox is created and the sandbox_id is correct."
@@ -184,6 +189,8 @@ async def run_python_code(code_block: str, sandbox_id: str) -> str:
         return f"[ERROR]: '{sandbox_id}' is not a valid sandbox_id. Please create a real sandbox first using the create_sandbox tool."
 
     try:
+        from e2b_code_interpreter import Sandbox
+
         sandbox = Sandbox.connect(sandbox_id, api_key=E2B_API_KEY)
     except Exception:
         return f"[ERROR]: Failed to connect to sandbox {sandbox_id}. Make sure the sandbox is created and the sandbox_id is correct."
@@ -230,6 +237,8 @@ async def upload_file_from_local_to_sandbox(
         return f"[ERROR]: '{sandbox_id}' is not a valid sandbox_id. Please create a real sandbox first using the create_sandbox tool."
 
     try:
+        from e2b_code_interpreter import Sandbox
+
         sandbox = Sandbox.connect(sandbox_id, api_key=E2B_API_KEY)
     except Exception:
         return f"[ERROR]: Failed to connect to sandbox {sandbox_id}. Make sure the sandbox is created and the sandbox_id is correct."
@@ -294,6 +303,8 @@ async def download_file_from_internet_to_sandbox(
         return f"[ERROR]: '{sandbox_id}' is not a valid sandbox_id. Please create a real sandbox first using the create_sandbox tool."
 
     try:
+        from e2b_code_interpreter import Sandbox
+
         sandbox = Sandbox.connect(sandbox_id, api_key=E2B_API_KEY)
     except Exception:
         return f"[ERROR]: Failed to connect to sandbox {sandbox_id}. Make sure the sandbox is created and the sandbox_id is correct."
@@ -390,6 +401,8 @@ async def download_file_from_sandbox_to_local(
         return f"[ERROR]: '{sandbox_id}' is not a valid sandbox_id. Please create a real sandbox first using the create_sandbox tool."
 
     try:
+        from e2b_code_interpreter import Sandbox
+
         sandbox = Sandbox.connect(sandbox_id, api_key=E2B_API_KEY)
     except Exception:
         return f"[ERROR]: Failed to connect to sandbox {sandbox_id}. Make sure the sandbox is created and the sandbox_id is correct."
@@ -4,7 +4,6 @@
 import logging
 import os
 
-from anthropic import Anthropic
 from fastmcp import FastMCP
 
 logger = logging.getLogger("miroflow")
@@ -39,6 +38,8 @@ async def reasoning(question: str) -> str:
         }
     ]
 
+    from anthropic import Anthropic
+
     client = Anthropic(api_key=ANTHROPIC_API_KEY, base_url=ANTHROPIC_BASE_URL)
     response = client.messages.create(
         model="claude-3-7-sonnet-20250219",
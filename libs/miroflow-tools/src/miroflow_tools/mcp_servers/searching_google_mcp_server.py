@@ -9,7 +9,6 @@ import os
 import sys
 
 import requests
-import wikipedia
 from fastmcp import FastMCP
 from mcp import ClientSession, StdioServerParameters  # (already imported in config.py)
 from mcp.client.stdio import stdio_client
@@ -179,6 +178,9 @@ async def wiki_get_page_content(entity: str, first_sentences: int = 10) -> str:
         str: Formatted search results containing title, first sentences/full content, and URL.
              Returns error message if page not found or other issues occur.
     """
+    # Imported on first use: it is only needed by this tool
+    import wikipedia
+
     try:
         # Try to get the Wikipedia page directly
         page = wikipedia.page(title=entity, auto_suggest=False)
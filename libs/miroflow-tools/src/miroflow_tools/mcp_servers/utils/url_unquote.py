@@ -1,8 +1,7 @@
+import functools
 import re
 from urllib.parse import unquote
 
-from markdown_it import MarkdownIt
-
 # RFC 3986 reserved characters percent-encoding (decoding these would alter URL semantics/structure)
 # gen-delims: : / ? # [ ] @
 # sub-delims: ! $ & ' ( ) * + , ; =
@@ -135,11 +134,16 @@ def decode_http_urls_in_dict(data):
         return data
 
 
-md = MarkdownIt("commonmark")
+@functools.lru_cache(maxsize=1)
+def _markdown_parser():
+    # Imported on first use: every MCP server loads this module at startup
+    from markdown_it import MarkdownIt
+
+    return MarkdownIt("commonmark")
 
 
 def strip_markdown_links(markdown: str) -> str:
-    tokens = md.parse(markdown)
+    tokens = _markdown_parser().parse(markdown)
 
     def render(ts):
         out = []
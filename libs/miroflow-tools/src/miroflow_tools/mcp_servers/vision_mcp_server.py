@@ -6,7 +6,6 @@ import base64
 import os
 
 from fastmcp import FastMCP
-from openai import OpenAI
 
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL", "https://api.openai.com/v1")
@@ -100,6 +99,8 @@ async def visual_question_answering(media_path_or_url: str, question: str) -> st
     retry = 0
 
     # Create client once outside the retry loop
+    from openai import OpenAI
+
     client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
 
     # Initialize variables